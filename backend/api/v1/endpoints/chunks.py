@@ -4,7 +4,10 @@ from pydantic import BaseModel, Field
 import logging
 import os
 import uuid
+from backend.core.db.pg_connector import acquire_connection, get_db_pool
 from backend.core.tria_bots.ChunkProcessorBot import ChunkProcessorBot
+from backend.services.audio_analysis_pool import can_analyse, get_audio_analysis_pool
+from backend.services.streaming_upload import get_streaming_uploader
 from backend.auth.security import get_current_active_user # Assuming this is your dependency for auth
 from backend.core.models.user_models import UserInDB # Assuming this is your user model
 
@@ -14,6 +17,12 @@ logging.basicConfig(level=logging.INFO)
 
 router = APIRouter()
 
+
+def _chunk_type(content_type: str) -> str:
+    """Тип чанка для audiovisual_gestural_chunks.chunk_type по MIME-типу файла."""
+    major = (content_type or "").split("/", 1)[0]
+    return major if major in ("audio", "video") else "file"
+
 # Pydantic models for the new endpoint
 class PresignedUrlRequest(BaseModel):
     filename: str = Field(..., example="myvideo.mp4")
@@ -106,48 +115,63 @@ async def upload_chunk(
     object_key = f"user_chunks/{user_id}/{unique_filename}"
 
     try:
-        file_content = await file.read()
-        file_size = len(file_content)
-        logger.info(f"Read file content. Size: {file_size} bytes. Attempting upload to R2 with key: {object_key}")
-
-        s3_client.put_object(
-            Bucket=r2_bucket_name,
-            Key=object_key,
-            Body=file_content,
-            ContentType=file.content_type
-        )
-        logger.info(f"Successfully uploaded chunk to R2: {object_key}")
+        # Файл читается частями и уходит в R2 из пула потоков (multipart для больших файлов),
+        # event loop не блокируется, а в памяти не больше нескольких частей.
+        logger.info(f"Streaming chunk to R2 with key: {object_key}")
+        upload = await get_streaming_uploader().upload(s3_client, file, r2_bucket_name, object_key, file.content_type)
+        file_size = upload.size
+        logger.info(f"Successfully uploaded chunk to R2: {object_key} ({file_size} bytes in {upload.parts} part(s), sha256 {upload.sha256})")
     except Exception as e:
         logger.error(f"Failed to upload chunk to R2 for user {user_id}, file {unique_filename}. Error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to upload file to R2: {str(e)}")
 
+    chunk_id = uuid.uuid4()
+    metadata_saved = False
     try:
         chunk_processor = ChunkProcessorBot() # Assuming constructor is simple or dependencies are handled globally/env
         chunk_metadata = {
+            "chunk_id": str(chunk_id),
             "user_id": user_id,
-            "file_name": file.filename, # Original filename for reference
-            "unique_file_name": unique_filename, # Unique name used in storage
+            "chunk_type": _chunk_type(file.content_type),
             "storage_ref": object_key,
-            "content_type": file.content_type,
-            "size": file_size,
-            # Add other relevant metadata if ChunkProcessorBot expects more
+            "original_filename": file.filename,
+            "mime_type": file.content_type,
+            "custom_metadata_json": {
+                "stored_filename": unique_filename, # Unique name used in storage
+                "size": file_size,
+                "content_sha256": upload.sha256,
+            },
         }
         logger.info(f"Submitting chunk metadata for processing: {chunk_metadata}")
-        # Assuming process_chunk_metadata is async. If not, remove 'await'.
-        # Need to verify the definition of ChunkProcessorBot.process_chunk_metadata
-        await chunk_processor.process_chunk_metadata(chunk_metadata)
+        # Соединение берется из пула только на время записи строки, а не на всю загрузку.
+        async with acquire_connection(await get_db_pool()) as conn:
+            await chunk_processor.process_chunk_metadata(db=conn, chunk_metadata=chunk_metadata)
+        metadata_saved = True
         logger.info(f"Successfully submitted chunk metadata for {object_key} to ChunkProcessorBot.")
     except Exception as e:
         logger.error(f"Failed to process chunk metadata for {object_key} after R2 upload. Error: {e}", exc_info=True)
 
+    # Анализ аудио (громкость, спектр, CWT) идет в пуле процессов; результат пишется в строку чанка пачкой.
+    # Тело запроса к этому времени уже не в памяти, поэтому пул читает объект обратно из R2.
+    # Без сохраненной строки чанка результату некуда записаться, поэтому анализ ставится только после вставки.
+    analysis_queued = False
+    if metadata_saved and can_analyse(file.content_type):
+        def open_object():
+            return s3_client.get_object(Bucket=r2_bucket_name, Key=object_key)["Body"]
+        analysis_queued = get_audio_analysis_pool().submit(chunk_id, open_object, file.content_type, file_size)
+
     return {
         "message": "Chunk uploaded successfully. Metadata processing initiated.",
+        "chunk_id": str(chunk_id),
         "user_id": user_id,
         "original_filename": file.filename,
         "stored_filename": unique_filename,
         "storage_key": object_key,
         "content_type": file.content_type,
-        "size": file_size
+        "size": file_size,
+        "content_sha256": upload.sha256,
+        "metadata_saved": metadata_saved,
+        "audio_analysis_queued": analysis_queued
     }
 
 # Можно добавить другие эндпоинты, связанные с чанками, если необходимо
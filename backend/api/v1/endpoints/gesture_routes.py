@@ -7,7 +7,7 @@ from backend.core.models.multimodal_models import UserGestureModel
 # Предполагается, что crud_operations находится здесь
 from backend.core import crud_operations
 # Для подключения к БД
-from backend.core.db.pg_connector import get_db_connection
+from backend.core.db.pg_connector import get_pooled_db_connection
 # Для аутентификации и UserInDB
 from backend.auth.security import get_current_active_user # Убедитесь, что этот путь корректен
 from backend.core.models.user_models import UserInDB # Убедитесь, что этот путь корректен для UserInDB
@@ -25,7 +25,7 @@ async def read_user_gestures(
     user_id: str,
     # Опциональная часть: Проверка JWT и соответствия user_id
     # current_user: UserInDB = Security(get_current_active_user, scopes=[]), # Используем Security для возможности scopes
-    db: asyncpg.Connection = Depends(get_db_connection)
+    db: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     """
     Retrieve all gestures for a specific user.
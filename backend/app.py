@@ -13,6 +13,7 @@ import firebase_admin
 from firebase_admin import credentials
 import os
 import logging
+import time
 import boto3
 
 logger = logging.getLogger(__name__)
@@ -40,6 +41,19 @@ from backend.routers.interaction_chunks import router as legacy_interaction_chun
 from backend.routers.prompts import router as user_prompts_router # Renamed for clarity
 # from backend.routers.tria import router as legacy_tria_router
 from backend.routers import gestures_ws # <-- НОВЫЙ ИМПОРТ
+from backend.routers.hologram_frames import router as hologram_frames_router
+from backend.core.db.pg_connector import create_db_pool, close_db_pool, get_db_pool_stats
+from backend.auth.token_cache import start_auth_background_tasks, stop_auth_background_tasks
+from backend.services.embedding_batcher import get_embedding_batcher
+from backend.services.embedding_cache import get_embedding_cache
+from backend.services.embedding_index import (
+    get_embedding_index, load_embedding_index, start_embedding_index_refresh, stop_embedding_index_refresh,
+)
+from backend.services.learning_log_sink import get_learning_log_sink
+from backend.services.audio_analysis_pool import get_audio_analysis_pool
+from backend.services.background_tasks import get_background_runner
+from backend.services.streaming_upload import get_streaming_uploader
+from backend.tria_bots.CoordinationService import get_coordination_service, reset_coordination_service
 
 API_V1_PREFIX = "/api/v1"
 
@@ -61,6 +75,7 @@ app.include_router(legacy_chat_sessions_router, prefix=f"{API_V1_PREFIX}/chat-se
 app.include_router(user_gestures_router, prefix=f"{API_V1_PREFIX}/users/me/gestures", tags=["Current User Gestures"]) # Prefix added here
 app.include_router(user_holograms_router, prefix=f"{API_V1_PREFIX}/users/me/holograms", tags=["Current User Holograms"]) # Prefix added here
 app.include_router(user_prompts_router, prefix=f"{API_V1_PREFIX}/users/me/prompts", tags=["Current User Prompts"]) # New router added
+app.include_router(hologram_frames_router, prefix=f"{API_V1_PREFIX}/hologram-frames", tags=["Hologram Frames"])
 
 # Legacy routers - review if these are still needed or if functionality is covered by new routers
 app.include_router(legacy_interaction_chunks_router, prefix=f"{API_V1_PREFIX}/chunks", tags=["Interaction Chunks (Legacy)"])
@@ -84,6 +99,29 @@ async def read_root():
 async def health_check():
     return {"status": "ok", "message": "FastAPI is healthy"}
 
+@app.get("/healthz/db", tags=["System"])
+async def db_pool_health_check():
+    """Connection pool health and saturation metrics."""
+    stats = get_db_pool_stats()
+    return {"status": "ok" if stats["initialized"] else "unavailable", "pool": stats}
+
+@app.get("/healthz/background", tags=["System"])
+async def background_tasks_health_check():
+    """Backlog, lag and outcome counters of the background task runner."""
+    return {"status": "ok", "runner": get_background_runner().stats()}
+
+@app.get("/healthz/embeddings", tags=["System"])
+async def embeddings_health_check():
+    """Query-embedding cache hit/miss counters and in-process index size."""
+    index = get_embedding_index()
+    return {
+        "status": "ok",
+        "cache": get_embedding_cache().stats(),
+        "batcher": get_embedding_batcher().stats(),
+        "index": {"ready": index.is_ready, "size": len(index), "dimension": index.dimension,
+                  "age_seconds": round(time.monotonic() - index.loaded_at, 1) if index.loaded_at is not None else None},
+    }
+
 # --- CORS Middleware ---
 # from fastapi.middleware.cors import CORSMiddleware
 # origins = [
@@ -161,6 +199,36 @@ async def startup_event():
         logger.warning("One or more Backblaze B2 environment variables are missing. S3 client not initialized.")
         app.state.s3_client = None
 
+    # Database connection pool (sized via DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE)
+    try:
+        app.state.db_pool = await create_db_pool()
+    except Exception as e:
+        logger.error(f"Error creating database connection pool: {e}. Requests will retry lazily.", exc_info=True)
+        app.state.db_pool = None
+
+    # Shared bot graph for the gesture-intent sockets, bound to the pool rather than to a connection
+    if app.state.db_pool is not None:
+        await get_coordination_service()
+        # Learning log records spilled to disk while the database was unreachable
+        try:
+            await get_learning_log_sink().replay_spill()
+        except Exception as e:
+            logger.error(f"Error replaying spilled learning log records: {e}", exc_info=True)
+        try:
+            await get_audio_analysis_pool().sink.replay_spill()
+        except Exception as e:
+            logger.error(f"Error replaying spilled audio analysis results: {e}", exc_info=True)
+
+    # In-process ANN index over holograms_media_embeddings (EMBEDDING_INDEX_SOURCE)
+    try:
+        await load_embedding_index(app.state.db_pool)
+    except Exception as e:
+        logger.error(f"Error loading embedding index: {e}. Falling back to pgvector queries.", exc_info=True)
+    start_embedding_index_refresh(app.state.db_pool)
+
+    # Firebase signing key prefetch and coalesced last-login writes
+    start_auth_background_tasks()
+
     logger.info("FastAPI application startup event processing completed.")
 
 @app.on_event("shutdown")
@@ -169,9 +237,17 @@ async def shutdown_event():
     Releasing resources when the application stops.
     """
     logger.info("Shutting down... Releasing resources.")
-    # Here can be code for closing the database connection pool
-    # if app.state.db_pool:
-    #     await app.state.db_pool.close()
+    await stop_auth_background_tasks()
+    await stop_embedding_index_refresh()
+    await reset_coordination_service()  # queued intents are applied while the pool is still open
+    await get_background_runner().shutdown(timeout=float(os.getenv("BACKGROUND_TASKS_SHUTDOWN_TIMEOUT", 10)))
+    await get_audio_analysis_pool().close(timeout=float(os.getenv("AUDIO_ANALYSIS_SHUTDOWN_TIMEOUT", 10)))
+    await get_learning_log_sink().close()  # before the pool goes away; unwritable records are spilled
+    await close_db_pool()
+    app.state.db_pool = None
+    await get_embedding_batcher().close()
+    get_embedding_cache().close()
+    get_streaming_uploader().close()
 
 
 async def upload_chunk_async(bucket_name: str, file_key: str, chunk_data: bytes, part_number: int, upload_id: str):
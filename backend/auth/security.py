@@ -1,4 +1,5 @@
 import os
+import asyncio
 from typing import Optional, Dict, Any
 
 import firebase_admin
@@ -10,9 +11,12 @@ import logging # Added import
 from backend.core.models.user_models import UserInDB  # Ensure UserInDB reflects new schema (e.g., has firebase_uid)
 from backend.core import crud_operations
 import asyncpg  # For type hinting
-from backend.core.db.pg_connector import get_db_connection
+from backend.core.db.pg_connector import get_db_pool
+from backend.auth.token_cache import verified_token_cache, user_cache, last_login_recorder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+logger = logging.getLogger(__name__)
+
 # Initialize Firebase Admin SDK
 # It's recommended to do this once at application startup.
 # For example, in `backend/app.py` using the lifespan manager.
@@ -61,8 +65,15 @@ async def get_current_firebase_user(
         )
     
     id_token = bearer_token.credentials
+    cached_token = verified_token_cache.get(id_token)
+    if cached_token is not None:
+        return cached_token
+
     try:
-        decoded_token = auth.verify_id_token(id_token)
+        # verify_id_token is synchronous; run it off the event loop. Signing certificates
+        # are kept warm by SigningKeyRefresher, so this is normally CPU-only.
+        decoded_token = await asyncio.to_thread(auth.verify_id_token, id_token)
+        verified_token_cache.put(id_token, decoded_token)
         return decoded_token
     except firebase_admin.auth.InvalidIdTokenError as e:
         print(f"[AUTH DEBUG] Invalid Firebase ID token: {e}")
@@ -79,20 +90,16 @@ async def get_current_firebase_user(
         )
 
 async def get_current_user(
-    decoded_token: Dict[str, Any] = Depends(get_current_firebase_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    decoded_token: Dict[str, Any] = Depends(get_current_firebase_user)
 ) -> UserInDB:
     """
     Retrieves user from DB based on Firebase UID from decoded token.
     If user doesn't exist, it creates them.
-    """
-    if not db_conn:
-        print("[AUTH ERROR] DB connection not provided by dependency for get_current_user.")
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database service is currently unavailable."
-        )
 
+    User rows are cached for a short TTL and last-login updates are coalesced in the
+    background, so a request with a cached user performs no database round-trips.
+    A pooled connection is only borrowed on a cache miss.
+    """
     firebase_uid = decoded_token.get("uid")
     if not firebase_uid:
         print("[AUTH DEBUG] Firebase UID (uid) not found in decoded token.")
@@ -101,6 +108,20 @@ async def get_current_user(
             detail="Invalid token: UID missing.",
         )
 
+    cached_user = user_cache.get(firebase_uid)
+    if cached_user is not None:
+        last_login_recorder.record(firebase_uid)
+        return cached_user
+
+    try:
+        db_pool = await get_db_pool()
+    except Exception as e_pool:
+        print(f"[AUTH ERROR] Database pool unavailable for get_current_user: {e_pool}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database service is currently unavailable."
+        )
+
     try:
         # This new function will try to get the user by firebase_uid.
         # If not found, it will create the user using details from decoded_token.
@@ -108,10 +129,11 @@ async def get_current_user(
         # For now, we'll call a placeholder that reflects this logic.
         # The actual UserInDB model should contain firebase_uid.
         
-        user = await crud_operations.get_or_create_user_by_firebase_payload(
-            conn=db_conn, 
-            firebase_payload=decoded_token
-        )
+        async with db_pool.acquire() as db_conn:
+            user = await crud_operations.get_or_create_user_by_firebase_payload(
+                conn=db_conn,
+                firebase_payload=decoded_token
+            )
         
         if user is None:
             # This case should ideally be handled by get_or_create_user_by_firebase_payload
@@ -122,10 +144,12 @@ async def get_current_user(
                 detail="User not found and could not be provisioned."
             )
             
-        # Update last login time for the user
-        # This assumes update_user_last_login will be modified to accept firebase_uid
-        await crud_operations.update_user_last_login(conn=db_conn, firebase_uid=firebase_uid)
+        user_cache.put(firebase_uid, user)
+        # Last login time is written in coalesced background batches, not per request.
+        last_login_recorder.record(firebase_uid)
 
+    except HTTPException:
+        raise
     except asyncpg.PostgresError as pg_err:
         print(f"[AUTH DB ERROR] PostgreSQL error during user retrieval/creation for UID '{firebase_uid}': {pg_err}")
         raise HTTPException(
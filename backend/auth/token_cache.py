@@ -0,0 +1,268 @@
+# backend/auth/token_cache.py
+"""
+Per-process caches that keep Firebase authentication off the request hot path.
+
+- `VerifiedTokenCache`: decoded ID tokens keyed by a hash of the raw token, valid until the token's `exp`.
+- `SigningKeyRefresher`: keeps Google's token signing certificates warm in the Firebase Admin SDK's
+  HTTP cache so `verify_id_token` never blocks on the network.
+- `UserCache`: short-TTL cache of `UserInDB` rows keyed by Firebase UID.
+- `LastLoginRecorder`: coalesces `last_login_at` updates and writes them in batches in the background.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import firebase_admin
+from firebase_admin import auth
+
+from backend.core import crud_operations
+from backend.core.db.pg_connector import get_db_pool
+from backend.core.models.user_models import UserInDB
+from backend.utils.env import env_number
+
+logger = logging.getLogger(__name__)
+
+# Same URL the Firebase Admin SDK uses to fetch ID token signing certificates.
+ID_TOKEN_CERT_URI = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+
+
+class VerifiedTokenCache:
+    """
+    LRU cache of verified ID token payloads. Entries expire at the token's own `exp`
+    claim (minus a safety margin), so a cached token is never accepted after Firebase
+    itself would reject it. Raw tokens are never stored, only their SHA-256 digest.
+    """
+
+    def __init__(self, max_entries: int = 10000, expiry_margin_seconds: float = 5.0):
+        self.max_entries = max_entries
+        self.expiry_margin_seconds = expiry_margin_seconds
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(id_token: str) -> str:
+        return hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+
+    def get(self, id_token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(id_token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, decoded_token = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return decoded_token
+
+    def put(self, id_token: str, decoded_token: Dict[str, Any]) -> None:
+        exp = decoded_token.get("exp")
+        if not isinstance(exp, (int, float)):
+            return  # Without an expiry we cannot cache safely.
+        expires_at = float(exp) - self.expiry_margin_seconds
+        if expires_at <= time.time():
+            return
+        key = self._key(id_token)
+        self._entries[key] = (expires_at, decoded_token)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class UserCache:
+    """Short-TTL cache of user rows so authenticated requests skip the get-or-create query."""
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, UserInDB]]" = OrderedDict()
+
+    def get(self, firebase_uid: str) -> Optional[UserInDB]:
+        entry = self._entries.get(firebase_uid)
+        if entry is None:
+            return None
+        cached_at, user = entry
+        if time.monotonic() - cached_at > self.ttl_seconds:
+            del self._entries[firebase_uid]
+            return None
+        self._entries.move_to_end(firebase_uid)
+        return user
+
+    def put(self, firebase_uid: str, user: UserInDB) -> None:
+        self._entries[firebase_uid] = (time.monotonic(), user)
+        self._entries.move_to_end(firebase_uid)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, firebase_uid: str) -> None:
+        self._entries.pop(firebase_uid, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SigningKeyRefresher:
+    """
+    Periodically re-fetches Google's signing certificates through the Firebase Admin SDK's
+    own cache-control aware HTTP session, so verification always finds them in cache.
+
+    The session is only reachable through SDK internals (`auth._get_client(...)._token_verifier`).
+    If a firebase-admin release moves them, the refresher logs once and stops; verification
+    keeps working and simply fetches the certificates itself when its cache expires.
+    """
+
+    def __init__(self, refresh_interval_seconds: float = 1800.0):
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.last_refresh_at: Optional[float] = None
+        self.supported = True
+
+    @staticmethod
+    def _certificate_request():
+        get_client = getattr(auth, "_get_client", None)
+        if get_client is None:
+            return None
+        client = get_client(firebase_admin.get_app())
+        return getattr(getattr(client, "_token_verifier", None), "request", None)
+
+    def _fetch_certificates(self) -> bool:
+        if not firebase_admin._apps:
+            return False
+        # The token verifier's request object wraps a CacheControl session; fetching the
+        # certificate URL through it populates the same cache verify_id_token reads from.
+        request = self._certificate_request()
+        if request is None:
+            logger.warning("Firebase Admin SDK token verifier internals not available; signing key prefetch disabled.")
+            self.supported = False
+            return False
+        response = request(ID_TOKEN_CERT_URI)
+        return getattr(response, "status", 200) == 200
+
+    async def refresh_once(self) -> bool:
+        if not self.supported:
+            return False
+        try:
+            refreshed = await asyncio.to_thread(self._fetch_certificates)
+        except Exception as e:
+            logger.warning(f"Failed to prefetch Firebase signing certificates: {e}")
+            return False
+        if refreshed:
+            self.last_refresh_at = time.time()
+            logger.debug("Firebase signing certificates refreshed.")
+        return refreshed
+
+    async def _run(self):
+        while self.supported:
+            await self.refresh_once()
+            await asyncio.sleep(self.refresh_interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class LastLoginRecorder:
+    """
+    Coalesces `users.last_login_at` writes. Each UID is written at most once per
+    `min_interval_seconds`; pending updates are flushed together every `flush_interval_seconds`.
+    """
+
+    def __init__(self, min_interval_seconds: float = 300.0, flush_interval_seconds: float = 5.0):
+        self.min_interval_seconds = min_interval_seconds
+        self.flush_interval_seconds = flush_interval_seconds
+        self._pending: Dict[str, datetime] = {}
+        self._last_recorded: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, firebase_uid: str) -> None:
+        now = time.monotonic()
+        last = self._last_recorded.get(firebase_uid)
+        if last is not None and now - last < self.min_interval_seconds:
+            return
+        self._last_recorded[firebase_uid] = now
+        self._pending[firebase_uid] = datetime.now(timezone.utc)
+
+    async def flush(self) -> int:
+        # Forget rate-limit state for users whose window has passed to keep memory bounded.
+        cutoff = time.monotonic() - self.min_interval_seconds
+        self._last_recorded = {uid: ts for uid, ts in self._last_recorded.items() if ts >= cutoff}
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            pool = await get_db_pool()
+            async with pool.acquire() as conn:
+                await crud_operations.update_users_last_login(conn, list(pending.items()))
+        except Exception as e:
+            logger.error(f"Failed to flush {len(pending)} last-login updates: {e}")
+            # Put them back unless a newer timestamp was recorded meanwhile.
+            for uid, ts in pending.items():
+                self._pending.setdefault(uid, ts)
+            return 0
+        return len(pending)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+verified_token_cache = VerifiedTokenCache(
+    max_entries=int(env_number("AUTH_TOKEN_CACHE_MAX_ENTRIES", 10000)),
+)
+user_cache = UserCache(ttl_seconds=env_number("AUTH_USER_CACHE_TTL_SECONDS", 30.0))
+signing_key_refresher = SigningKeyRefresher(
+    refresh_interval_seconds=env_number("AUTH_SIGNING_KEY_REFRESH_SECONDS", 1800.0),
+)
+last_login_recorder = LastLoginRecorder(
+    min_interval_seconds=env_number("AUTH_LAST_LOGIN_MIN_INTERVAL_SECONDS", 300.0),
+)
+
+
+def start_auth_background_tasks() -> None:
+    """Starts signing key prefetch and last-login flushing. Called from the app startup hook."""
+    signing_key_refresher.start()
+    last_login_recorder.start()
+
+
+async def stop_auth_background_tasks() -> None:
+    """Stops background tasks and flushes pending last-login updates. Called on shutdown."""
+    await signing_key_refresher.stop()
+    await last_login_recorder.stop()
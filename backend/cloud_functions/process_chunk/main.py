@@ -1,8 +1,10 @@
 import os
 import json
 import uuid
+import asyncio
 import datetime
 import logging # Import the logging module
+from typing import Optional
 
 # Firebase Functions specific imports
 from firebase_functions import storage_fn, options as firebase_options
@@ -11,7 +13,13 @@ from firebase_functions import storage_fn, options as firebase_options
 from backend.core.models.multimodal_models import AudiovisualGesturalChunkModel
 from backend.core.db.pg_connector import get_db_connection
 from backend.core.tria_bots.ChunkProcessorBot import ChunkProcessorBot
+from backend.services.audio_analysis_pool import STATUS_EXTRACTED, STATUS_FAILED, can_analyse
+from backend.utils.audio_features import compute_audio_features
+from backend.utils.env import env_number
+from backend.utils.pcm_reader import open_pcm
 import asyncpg
+import firebase_admin
+from firebase_admin import storage as firebase_storage
 
 # Configure basic logging for Cloud Functions
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +33,28 @@ def get_env_var(var_name):
         raise ValueError(f"Environment variable {var_name} not set.")
     return value
 
+def analyse_audio_object(bucket: str, name: str, content_type: str, size: Optional[int] = None) -> dict:
+    """
+    Streams a WAV/PCM object from Storage and returns its features (backend/utils/audio_features.py).
+    A single invocation handles a single chunk, so the analysis runs inline rather than in the
+    API server's process pool. The decoded audio is held in memory at once, so only the first
+    PROCESS_CHUNK_MAX_SECONDS (default 120 s, ~46 MB as float32 stereo at 48 kHz) are analysed;
+    `size` (the object size in bytes) gives the length of headerless PCM for the truncation flag.
+    """
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app()
+    max_seconds = env_number("PROCESS_CHUNK_MAX_SECONDS", 120.0)
+    with firebase_storage.bucket(bucket).blob(name).open("rb") as source:
+        reader = open_pcm(source, content_type, total_bytes=size)
+        pcm = reader.read(int(max_seconds * reader.sample_rate))
+        if reader.total_samples is not None:
+            truncated = reader.total_samples > pcm.shape[1]
+        else:  # object size unknown: check whether the stream goes on
+            truncated = reader.read(1).shape[1] > 0
+    features = compute_audio_features(pcm, reader.sample_rate)
+    features["truncated"] = truncated
+    return features
+
 @storage_fn.on_object_finalized()
 async def process_chunk_storage(event: storage_fn.CloudEvent[storage_fn.StorageObjectData]):
     """
@@ -79,6 +109,20 @@ async def process_chunk_storage(event: storage_fn.CloudEvent[storage_fn.StorageO
             "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
         }
         
+        # Audio features are stored with the row right away, no write-back needed
+        if can_analyse(content_type):
+            try:
+                size = int(event.data.size) if event.data.size is not None else None
+                features = await asyncio.to_thread(analyse_audio_object, bucket, name, content_type, size)
+                chunk_metadata["tria_extracted_features_json"] = features
+                chunk_metadata["tria_processing_status"] = STATUS_EXTRACTED
+                if not features["truncated"]:
+                    chunk_metadata["duration_seconds"] = features["duration_seconds"]
+            except Exception as e:
+                logger.warning(f"Audio analysis failed for {name}: {type(e).__name__}: {e}")
+                chunk_metadata["tria_extracted_features_json"] = {"error": f"{type(e).__name__}: {e}"}
+                chunk_metadata["tria_processing_status"] = STATUS_FAILED
+
         # Instantiate ChunkProcessorBot
         chunk_processor_bot = ChunkProcessorBot()
         logger.info("ChunkProcessorBot instantiated. Attempting DB connection.")
@@ -6,14 +6,14 @@ and basic error handling for various data models used in the application.
 """
 
 import asyncpg
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, List, Tuple
 from uuid import uuid4, UUID
 from datetime import datetime
 import logging
 
 # Import Pydantic models from their respective modules
 from backend.core.models.user_models import UserInDB
-from backend.core.models.multimodal_models import UserGestureModel
+from backend.core.models.multimodal_models import AudiovisualGesturalChunkModel, UserGestureModel
 from backend.core.models.learning_log_models import TriaLearningLogModel
 from backend.core.models.hologram_models import UserHologramResponseModel
 
@@ -63,6 +63,32 @@ async def get_user_by_firebase_uid(db: asyncpg.Connection, firebase_uid: str) ->
         raise
 
 
+async def update_users_last_login(db: asyncpg.Connection, logins: List[Tuple[str, datetime]]) -> None:
+    """
+    Writes `last_login_at` for many users in one round-trip.
+
+    Args:
+        db: An active asyncpg database connection.
+        logins: (firebase_uid, login_time) pairs. A stored timestamp is never moved backwards.
+
+    Raises:
+        asyncpg.PostgresError: If a database error occurs during the update.
+    """
+    if not logins:
+        return
+    sql = """
+        UPDATE users
+        SET last_login_at = $2
+        WHERE firebase_uid = $1 AND (last_login_at IS NULL OR last_login_at < $2);
+    """
+    try:
+        await db.executemany(sql, logins)
+        logger.info(f"Updated last_login_at for {len(logins)} users.")
+    except asyncpg.PostgresError:
+        logger.exception(f"Database error while updating last_login_at for {len(logins)} users.")
+        raise
+
+
 async def create_tria_learning_log_entry(
     db: asyncpg.Connection, *, log_entry_create: TriaLearningLogModel
 ) -> TriaLearningLogModel:
@@ -112,17 +138,14 @@ async def create_tria_learning_log_entry(
 
 
 async def create_audiovisual_gestural_chunk(
-    db: asyncpg.Connection, *, chunk_create: None
-) -> None:
+    db: asyncpg.Connection, *, chunk_create: AudiovisualGesturalChunkModel
+) -> AudiovisualGesturalChunkModel:
     """
-    Creates a new audiovisual/gestural chunk record in the database.
+    Creates a new audiovisual/gestural chunk record in the database (see ChunkRepository.create_chunk).
     """
-    # This function was likely intended to use AudiovisualGesturalChunkModel,
-    # but that model is currently causing import issues and is not used in this refactored context.
-    # Keeping the function stubbed or removing it depends on future plans.
-    # For now, stubbing with None types to allow import fix.
-    logger.warning("create_audiovisual_gestural_chunk is called but is currently stubbed.")
-    pass # Functionality needs to be re-evaluated or removed.
+    # Поздний импорт: репозиторий тянет pg_connector
+    from backend.repositories.chunk_repository import ChunkRepository
+    return await ChunkRepository(db).create_chunk(chunk_create)
 
 
 async def get_chunk_by_id(db: asyncpg.Connection, chunk_id: UUID) -> Optional[None]:
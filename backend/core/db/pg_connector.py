@@ -1,7 +1,12 @@
 import asyncpg
+import asyncio
 import os
+import time
 import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Union
 from dotenv import load_dotenv
+from backend.utils.env import env_int
 
 # Load environment variables from .env file
 load_dotenv()
@@ -17,7 +22,8 @@ async def get_db_connection():
     
     This function is intended for use in environments where a new connection is needed
     per operation or per function invocation (e.g., in stateless Cloud Functions).
-    For applications requiring connection pooling, a different approach would be used.
+    The FastAPI application uses the pooled `get_pooled_db_connection` dependency instead;
+    callers of this function own the connection and must close it.
 
     Returns:
         asyncpg.Connection: An active database connection object.
@@ -45,6 +51,169 @@ async def get_db_connection():
         logger.exception(f"An unexpected error occurred during database connection attempt.")
         raise # Re-raise any other unexpected error
 
+# --- Connection pool --------------------------------------------------------
+# The FastAPI application keeps a single asyncpg pool per process. It is created
+# in `app.py`'s startup hook and drained in its shutdown hook; request handlers
+# borrow a connection through `get_pooled_db_connection`.
+#
+# No type codecs are registered on pooled connections: `vector` values travel in their text
+# form (`pgvector.Vector.to_text` / `from_text` in the repositories), exactly as they do on the
+# plain connections from `get_db_connection`, so both paths accept and return the same types.
+
+DEFAULT_POOL_MIN_SIZE = 1
+DEFAULT_POOL_MAX_SIZE = 10
+DEFAULT_POOL_CLOSE_TIMEOUT_SECONDS = 10.0
+
+_db_pool: Optional[asyncpg.Pool] = None
+_db_pool_lock = asyncio.Lock()
+_pool_metrics: Dict[str, float] = {
+    "acquire_count": 0,
+    "acquire_errors": 0,
+    "acquire_wait_total_ms": 0.0,
+    "acquire_wait_max_ms": 0.0,
+    "in_use": 0,
+}
+
+
+async def create_db_pool(min_size: Optional[int] = None, max_size: Optional[int] = None) -> asyncpg.Pool:
+    """
+    Creates the process-wide connection pool (idempotent).
+
+    Pool size is read from `DB_POOL_MIN_SIZE` / `DB_POOL_MAX_SIZE` unless passed explicitly.
+    `DB_POOL_MAX_INACTIVE_LIFETIME` (seconds) controls how long idle connections are kept.
+
+    Raises:
+        ValueError: If the `NEON_DATABASE_URL` environment variable is not set.
+        asyncpg.PostgresError: If the initial connections cannot be established.
+    """
+    global _db_pool
+    async with _db_pool_lock:
+        if _db_pool is not None:
+            return _db_pool
+
+        db_url = os.environ.get('NEON_DATABASE_URL')
+        if not db_url:
+            logger.critical("FATAL: NEON_DATABASE_URL environment variable is not set. Cannot create database pool.")
+            raise ValueError("NEON_DATABASE_URL environment variable is not set.")
+
+        min_size = min_size if min_size is not None else env_int("DB_POOL_MIN_SIZE", DEFAULT_POOL_MIN_SIZE)
+        max_size = max_size if max_size is not None else env_int("DB_POOL_MAX_SIZE", DEFAULT_POOL_MAX_SIZE)
+        max_size = max(max_size, 1)
+        min_size = max(0, min(min_size, max_size))
+        max_inactive_lifetime = float(env_int("DB_POOL_MAX_INACTIVE_LIFETIME", 300))
+
+        _db_pool = await asyncpg.create_pool(
+            dsn=db_url,
+            min_size=min_size,
+            max_size=max_size,
+            max_inactive_connection_lifetime=max_inactive_lifetime,
+        )
+        logger.info(f"Database connection pool created (min_size={min_size}, max_size={max_size}).")
+        return _db_pool
+
+
+async def get_db_pool() -> asyncpg.Pool:
+    """
+    Returns the process-wide pool, creating it lazily if the startup hook has not run
+    (e.g. in scripts or tests that import routers directly).
+    """
+    if _db_pool is not None:
+        return _db_pool
+    return await create_db_pool()
+
+
+async def close_db_pool(timeout: float = DEFAULT_POOL_CLOSE_TIMEOUT_SECONDS) -> None:
+    """
+    Gracefully drains the pool: waits up to `timeout` seconds for borrowed connections
+    to be released, then terminates whatever is left.
+    """
+    global _db_pool
+    async with _db_pool_lock:
+        pool, _db_pool = _db_pool, None
+    if pool is None:
+        return
+    try:
+        await asyncio.wait_for(pool.close(), timeout=timeout)
+        logger.info("Database connection pool closed.")
+    except asyncio.TimeoutError:
+        logger.warning(f"Database pool did not drain within {timeout}s; terminating remaining connections.")
+        pool.terminate()
+
+
+# Repositories and bots accept either a single connection or the pool itself. With the pool,
+# every query borrows a connection only for its own duration (asyncpg.Pool exposes
+# fetch/fetchrow/fetchval/execute/executemany), so long-lived callers such as WebSocket
+# sessions never pin a connection between operations.
+DBExecutor = Union[asyncpg.Connection, asyncpg.Pool]
+
+
+@asynccontextmanager
+async def acquire_connection(executor: DBExecutor) -> AsyncIterator[asyncpg.Connection]:
+    """
+    Yields a single connection for multi-statement work (transactions): borrows one from
+    the pool if `executor` is a pool, otherwise yields the connection as is.
+    """
+    if isinstance(executor, asyncpg.Pool):
+        async with executor.acquire() as conn:
+            yield conn
+    else:
+        yield executor
+
+
+async def get_pooled_db_connection() -> AsyncIterator[asyncpg.Connection]:
+    """
+    FastAPI dependency that borrows a connection from the pool for the duration of a request
+    and always returns it afterwards.
+
+    Usage:
+        db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
+    """
+    pool = await get_db_pool()
+    started = time.perf_counter()
+    try:
+        conn = await pool.acquire()
+    except Exception:
+        _pool_metrics["acquire_errors"] += 1
+        logger.exception("Failed to acquire a database connection from the pool.")
+        raise
+    wait_ms = (time.perf_counter() - started) * 1000.0
+    _pool_metrics["acquire_count"] += 1
+    _pool_metrics["acquire_wait_total_ms"] += wait_ms
+    _pool_metrics["acquire_wait_max_ms"] = max(_pool_metrics["acquire_wait_max_ms"], wait_ms)
+    _pool_metrics["in_use"] += 1
+    try:
+        yield conn
+    finally:
+        _pool_metrics["in_use"] -= 1
+        await pool.release(conn)
+
+
+def get_db_pool_stats() -> Dict[str, Any]:
+    """
+    Returns pool health and saturation metrics for monitoring endpoints.
+    `saturation` is the share of the maximum pool size currently borrowed by requests.
+    """
+    acquire_count = _pool_metrics["acquire_count"]
+    stats: Dict[str, Any] = {
+        "initialized": _db_pool is not None,
+        "in_use": _pool_metrics["in_use"],
+        "acquire_count": acquire_count,
+        "acquire_errors": _pool_metrics["acquire_errors"],
+        "acquire_wait_avg_ms": (_pool_metrics["acquire_wait_total_ms"] / acquire_count) if acquire_count else 0.0,
+        "acquire_wait_max_ms": _pool_metrics["acquire_wait_max_ms"],
+    }
+    if _db_pool is not None:
+        max_size = _db_pool.get_max_size()
+        stats.update({
+            "size": _db_pool.get_size(),
+            "idle": _db_pool.get_idle_size(),
+            "min_size": _db_pool.get_min_size(),
+            "max_size": max_size,
+            "saturation": (_pool_metrics["in_use"] / max_size) if max_size else 0.0,
+        })
+    return stats
+
+
 async def test_connection():
     """
     Tests the database connection by attempting to connect and executing a simple query.
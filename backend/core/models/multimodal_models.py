@@ -45,6 +45,13 @@ class AudiovisualGesturalChunkModel(BaseUUIDModel):
             ]
         }
 
+class AudioChunkFeaturesUpdate(BaseModel):
+    """Result of the audio analysis pool, written back to the chunk row in batches."""
+    chunk_id: UUID = Field(..., description="ID of the audiovisual/gestural chunk.")
+    tria_processing_status: str = Field(..., description="'features_extracted' or 'features_failed'.")
+    tria_extracted_features_json: Optional[Dict[str, Any]] = Field(default=None, description="Features from backend/utils/audio_features.py, or the error.")
+    duration_seconds: Optional[float] = Field(default=None, description="Decoded duration; only fills an empty column.")
+
 class UserGestureModel(BaseModel):
     gesture_id: int = Field(..., description="Primary key for the gesture.")
     user_id: str = Field(..., description="Firebase UID of the user who owns this gesture.")
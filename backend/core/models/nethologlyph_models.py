@@ -1,8 +1,12 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any, Union
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, field_validator, model_validator
+from typing import Optional, List, Dict, Any, Union, ClassVar, Tuple
 from datetime import datetime
 import uuid
 
+import numpy as np
+
+from backend.utils.landmark_buffers import as_landmark_array
+
 # Content from backend/models/nethologlyph_models.py
 
 # --- Common Types (mirroring common_types.proto) ---
@@ -38,20 +42,59 @@ class HolographicSymbolNetModel(BaseModel):
     is_interactive: Optional[bool] = False
     metadata: Optional[Dict[str, Any]] = None
 
+    # Mapping to nethologlyph.HolographicSymbol (see backend/utils/protobuf_mapper.py)
+    proto_field_map: ClassVar[Dict[str, str]] = {"element_id": "symbol_id", "symbol_type": "type", "rotation": "orientation"}
+    proto_json_rest_field: ClassVar[str] = "material_properties_json"
+
 class GestureChunkNetModel(BaseModel):
     sequence_id: Optional[str] = None
     timestamp: float # Relative to packet or absolute
     hand: Optional[str] = None # 'left', 'right'
+    # Legacy per-point form; converted into `landmarks` on validation and never filled from the wire.
     key_points: Optional[List[Vector3NetModel]] = None
+    # float32 array of shape (N, 21, 3); may be a read-only view into the received packet bytes.
+    landmarks: Optional[np.ndarray] = None
     recognized_intent: Optional[str] = None
     confidence: Optional[float] = None
 
+    # Mapping to nethologlyph.GestureChunk; landmarks <-> packed landmark_data_3d
+    proto_field_map: ClassVar[Dict[str, str]] = {
+        "sequence_id": "gesture_sequence_id",
+        "landmarks": "landmark_data_3d",
+        "recognized_intent": "recognized_gesture_type",
+    }
+    proto_exclude: ClassVar[Tuple[str, ...]] = ("key_points",)
+    proto_json_rest_field: ClassVar[str] = "temporal_spatial_metadata_json"
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @field_validator("landmarks", mode="before")
+    @classmethod
+    def _landmarks_as_array(cls, value):
+        return None if value is None else as_landmark_array(value)
+
+    @field_serializer("landmarks", when_used="json")
+    def _landmarks_as_lists(self, landmarks: Optional[np.ndarray]):
+        # JSON (model_dump(mode="json"), backplane envelopes) gets nested [hand][point][xyz] lists
+        return None if landmarks is None else landmarks.tolist()
+
+    @model_validator(mode="after")
+    def _key_points_to_landmarks(self):
+        if self.landmarks is None and self.key_points:
+            self.landmarks = as_landmark_array([(p.x, p.y, p.z) for p in self.key_points])
+            self.key_points = None
+        return self
+
 class TriaStateUpdateNetModel(BaseModel):
     status: str
     current_focus_entity_id: Optional[str] = None
     available_commands: Optional[List[str]] = None
     message_to_user: Optional[str] = None
 
+    # Mapping to nethologlyph.TriaStateUpdate: status is the state key, the rest travels as JSON
+    proto_field_map: ClassVar[Dict[str, str]] = {"status": "state_key"}
+    proto_json_rest_field: ClassVar[str] = "state_value_json"
+
 class MediaStreamChunkNetModel(BaseModel):
     stream_id: str
     chunk_index: int
@@ -73,6 +116,7 @@ class SceneUpdatePayload(BaseModel):
 class HandshakeRequestPayload(BaseModel):
     client_version: str
     supported_features: Optional[List[str]] = None
+    scene_ids: Optional[List[str]] = None # Scenes to join; their updates are delivered only to members
 
 class HandshakeResponsePayload(BaseModel):
     server_version: str
@@ -80,7 +80,8 @@ class ChunkProcessorBot:
             # --- Construct Pydantic model data from dictionary ---
             # Convert UUID strings to UUID objects and handle optional fields gracefully.
             model_data = {
-                "id": UUID(chunk_metadata["chunk_id"]), # The 'id' field in the model maps to 'chunk_id' in DB.
+                # IDModel.id is only populated through its alias; a plain "id" would be ignored and a new UUID generated.
+                "_id": UUID(chunk_metadata["chunk_id"]), # The 'id' field in the model maps to 'chunk_id' in DB.
                 "user_id": chunk_metadata["user_id"],
                 "chunk_type": chunk_metadata["chunk_type"],
                 "storage_ref": chunk_metadata["storage_ref"],
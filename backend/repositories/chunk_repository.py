@@ -0,0 +1,96 @@
+import json
+import logging
+from typing import List
+
+import asyncpg
+
+from backend.core.db.pg_connector import DBExecutor
+from backend.core.models.multimodal_models import AudioChunkFeaturesUpdate, AudiovisualGesturalChunkModel
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkRepository:
+    def __init__(self, conn: DBExecutor):
+        self.conn = conn
+
+    async def create_chunk(self, chunk: AudiovisualGesturalChunkModel) -> AudiovisualGesturalChunkModel:
+        """
+        Вставляет строку чанка с id из модели (он же уходит в пул анализа аудио).
+        Возвращает модель, построенную из сохраненной строки.
+        """
+        sql = """
+            INSERT INTO audiovisual_gestural_chunks (
+                id, user_id, chunk_type, storage_ref, original_filename, mime_type, duration_seconds,
+                resolution_width, resolution_height, tria_processing_status, tria_extracted_features_json,
+                related_gesture_id, related_hologram_id, custom_metadata_json, created_at, updated_at
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11::jsonb, $12, $13, $14::jsonb, $15, $16)
+            RETURNING *;
+        """
+        try:
+            row = await self.conn.fetchrow(
+                sql,
+                chunk.id,
+                chunk.user_id,
+                chunk.chunk_type,
+                chunk.storage_ref,
+                chunk.original_filename,
+                chunk.mime_type,
+                chunk.duration_seconds,
+                chunk.resolution_width,
+                chunk.resolution_height,
+                chunk.tria_processing_status,
+                json.dumps(chunk.tria_extracted_features_json) if chunk.tria_extracted_features_json is not None else None,
+                chunk.related_gesture_id,
+                chunk.related_hologram_id,
+                json.dumps(chunk.custom_metadata_json) if chunk.custom_metadata_json is not None else None,
+                chunk.created_at,
+                chunk.updated_at,
+            )
+        except asyncpg.PostgresError as e:
+            logger.error(f"DB error in ChunkRepository.create_chunk for chunk {chunk.id}: {e}", exc_info=True)
+            raise
+        data = dict(row)
+        for column in ("tria_extracted_features_json", "custom_metadata_json"):
+            if isinstance(data.get(column), str):
+                data[column] = json.loads(data[column])
+        data["_id"] = data.pop("id")  # IDModel.id is populated through its alias
+        return AudiovisualGesturalChunkModel(**data)
+
+    async def update_extracted_features(self, updates: List[AudioChunkFeaturesUpdate]) -> int:
+        """
+        Пакетная запись результатов анализа аудио в строки чанков одним UPDATE ... FROM unnest(...).
+        duration_seconds заполняется, только если он ещё пуст; при повторе id побеждает последняя запись.
+        Возвращает число реально обновленных строк; id без строки в таблице логируются.
+        """
+        latest = {update.chunk_id: update for update in updates}
+        if not latest:
+            return 0
+        sql = """
+            UPDATE audiovisual_gestural_chunks AS c
+            SET tria_extracted_features_json = v.features::jsonb,
+                tria_processing_status = v.status,
+                duration_seconds = COALESCE(c.duration_seconds, v.duration),
+                updated_at = CURRENT_TIMESTAMP
+            FROM unnest($1::uuid[], $2::text[], $3::text[], $4::float8[]) AS v(id, features, status, duration)
+            WHERE c.id = v.id
+            RETURNING c.id;
+        """
+        ids = list(latest)
+        features = [
+            json.dumps(latest[chunk_id].tria_extracted_features_json)
+            if latest[chunk_id].tria_extracted_features_json is not None else None
+            for chunk_id in ids
+        ]
+        statuses = [latest[chunk_id].tria_processing_status for chunk_id in ids]
+        durations = [latest[chunk_id].duration_seconds for chunk_id in ids]
+        try:
+            rows = await self.conn.fetch(sql, ids, features, statuses, durations)
+        except asyncpg.PostgresError as e:
+            logger.error(f"DB error in ChunkRepository.update_extracted_features for {len(ids)} chunk(s): {e}", exc_info=True)
+            raise
+        updated = {row["id"] for row in rows}
+        if len(updated) < len(ids):
+            missing = [str(chunk_id) for chunk_id in ids if chunk_id not in updated]
+            logger.warning(f"ChunkRepository.update_extracted_features: no chunk row for {len(missing)} id(s): {missing}")
+        return len(updated)
@@ -1,8 +1,13 @@
 import asyncpg
-from typing import List, Optional, Dict, Any
+import json
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 import logging
-import pgvector # Для to_sql и обратного преобразования, если понадобится
+from pgvector import Vector # Текстовая форма vector ('[0.1,0.2,...]') в обе стороны
+
+from backend.core.db.pg_connector import DBExecutor
+from backend.services.embedding_cache import get_embedding_cache
+from backend.services.embedding_index import get_embedding_index
 
 # Предположим, что у нас есть Pydantic модель для представления строки из таблицы эмбеддингов.
 # Если ее нет, можно возвращать dict или создать простую модель здесь.
@@ -24,6 +29,15 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+
+def _vector_to_sql(vector: Any) -> str:
+    """Текстовая форма pgvector для параметров запросов (кодек vector на соединениях не регистрируется)."""
+    return Vector(vector).to_text()
+
+
+def _vector_from_sql(value: str) -> List[float]:
+    return Vector.from_text(value).to_list()
+
 # Имя таблицы эмбеддингов. Используем ту же, что и в Genkit.
 # В Genkit используется 'holograms_media_embeddings'.
 # В задании указана 'hologram_semantic_embeddings'. Уточняем на 'holograms_media_embeddings'.
@@ -31,7 +45,7 @@ EMBEDDINGS_TABLE_NAME = "holograms_media_embeddings"
 
 
 class EmbeddingRepository:
-    def __init__(self, conn: asyncpg.Connection):
+    def __init__(self, conn: DBExecutor):
         self.conn = conn
 
     async def find_closest_embedding(self, query_embedding: List[float]) -> Optional[EmbeddingDB]:
@@ -43,11 +57,19 @@ class EmbeddingRepository:
             logger.warning("EmbeddingRepository: query_embedding is empty.")
             return None
 
+        # Сначала in-process индекс (если загружен, не устарел и той же размерности);
+        # pgvector остается источником истины и отвечает, если индекс ничего не нашел.
+        index = get_embedding_index()
+        if index.covers(query_embedding):
+            hits = index.search(query_embedding, k=1)
+            if hits:
+                return self._from_index_hit(hits[0])
+
         # Убедимся, что pgvector зарегистрирован для соединения, если это необходимо на уровне репозитория.
         # Обычно это делается один раз при установке соединения или глобально.
         # await pgvector.register_vector(self.conn) # Может быть избыточно, если уже сделано
 
-        query_embedding_sql = pgvector.to_sql(query_embedding)
+        query_embedding_sql = _vector_to_sql(query_embedding)
 
         # SQL-запрос для поиска ближайшего вектора
         # Используем L2 расстояние (<->), косинусное расстояние (<#>), или внутреннее произведение (<%>)
@@ -64,12 +86,12 @@ class EmbeddingRepository:
             if row:
                 # Преобразуем 'embedding' из строкового формата pgvector обратно в List[float]
                 # asyncpg возвращает его уже как list, если тип колонки vector корректно обработан
-                # Если нет, то pgvector.from_sql(row['embedding'])
+                # Если нет, то _vector_from_sql(row['embedding'])
                 # Но обычно asyncpg это делает сам при правильной настройке.
                 # Проверим тип row['embedding']
                 embedding_vector = row['embedding']
                 if isinstance(embedding_vector, str): # На случай если asyncpg вернул строку
-                    embedding_vector = pgvector.from_sql(embedding_vector)
+                    embedding_vector = _vector_from_sql(embedding_vector)
 
                 return EmbeddingDB(
                     id=row['id'],
@@ -85,6 +107,60 @@ class EmbeddingRepository:
             logger.error(f"Unexpected error in EmbeddingRepository.find_closest_embedding: {e}")
             raise
 
+    async def find_closest_embeddings(self, query_embedding: List[float], top_k: int = 5,
+                                      metadata_filters: Optional[Dict[str, Any]] = None) -> List[EmbeddingDB]:
+        """
+        Находит top_k ближайших эмбеддингов (L2). metadata_filters - равенство по ключам metadata
+        (в SQL-варианте через `metadata @> filters`).
+        """
+        if not query_embedding or top_k <= 0:
+            return []
+
+        index = get_embedding_index()
+        if index.covers(query_embedding):
+            hits = index.search(query_embedding, k=top_k, filters=metadata_filters)
+            if hits:
+                return [self._from_index_hit(hit) for hit in hits]
+
+        params: List[Any] = [_vector_to_sql(query_embedding), top_k]
+        where = ""
+        if metadata_filters:
+            params.append(json.dumps(metadata_filters))
+            where = "WHERE metadata @> $3::jsonb"
+        sql = f"""
+            SELECT id, content, embedding, metadata
+            FROM {EMBEDDINGS_TABLE_NAME}
+            {where}
+            ORDER BY embedding <-> $1
+            LIMIT $2;
+        """
+        try:
+            rows = await self.conn.fetch(sql, *params)
+            results = []
+            for row in rows:
+                embedding_vector = row['embedding']
+                if isinstance(embedding_vector, str):
+                    embedding_vector = _vector_from_sql(embedding_vector)
+                results.append(EmbeddingDB(
+                    id=row['id'],
+                    content=row['content'],
+                    embedding_vector=embedding_vector,
+                    metadata=row['metadata']
+                ))
+            return results
+        except asyncpg.PostgresError as e:
+            logger.error(f"DB error in EmbeddingRepository.find_closest_embeddings: {e}")
+            raise
+
+    @staticmethod
+    def _from_index_hit(hit) -> EmbeddingDB:
+        return EmbeddingDB(
+            id=hit.id,
+            content=hit.content,
+            embedding_vector=hit.embedding.tolist(),
+            metadata=hit.metadata
+        )
+
     async def update_embedding_vector(self, embedding_id: UUID, new_vector: List[float]) -> bool:
         """
         Обновляет вектор существующего эмбеддинга по его ID.
@@ -93,7 +169,7 @@ class EmbeddingRepository:
             logger.warning(f"EmbeddingRepository: new_vector is empty for id {embedding_id}.")
             return False
 
-        new_vector_sql = pgvector.to_sql(new_vector)
+        new_vector_sql = _vector_to_sql(new_vector)
 
         sql = f"""
             UPDATE {EMBEDDINGS_TABLE_NAME}
@@ -112,7 +188,10 @@ class EmbeddingRepository:
         try:
             result = await self.conn.execute(sql_update, new_vector_sql, embedding_id)
             # execute возвращает строку вида "UPDATE N", где N - количество обновленных строк.
-            return result == "UPDATE 1"
+            updated = result == "UPDATE 1"
+            if updated:
+                get_embedding_index().update_vector(embedding_id, new_vector)
+            return updated
         except asyncpg.PostgresError as e:
             logger.error(f"DB error in EmbeddingRepository.update_embedding_vector for id {embedding_id}: {e}")
             raise
@@ -120,6 +199,64 @@ class EmbeddingRepository:
             logger.error(f"Unexpected error in EmbeddingRepository.update_embedding_vector for id {embedding_id}: {e}")
             raise
 
+    async def update_embedding_vectors_bulk(self, updates: List[Tuple[Any, List[float]]]) -> List[Any]:
+        """
+        Обновляет векторы нескольких эмбеддингов одним UPDATE ... FROM unnest(...).
+        updates - пары (embedding_id, new_vector); при повторе id побеждает последняя запись.
+        Возвращает ID реально обновленных строк (несуществующих в таблице в ответе нет);
+        in-process индекс обновляется только для них.
+        """
+        latest = {embedding_id: vector for embedding_id, vector in updates if vector}
+        if not latest:
+            return []
+        sql_update = f"""
+            UPDATE {EMBEDDINGS_TABLE_NAME} AS t
+            SET embedding = v.vec::vector
+            FROM unnest($1::uuid[], $2::text[]) AS v(id, vec)
+            WHERE t.id = v.id
+            RETURNING t.id;
+        """
+        ids = list(latest)
+        vectors = [_vector_to_sql(latest[embedding_id]) for embedding_id in ids]
+        try:
+            rows = await self.conn.fetch(sql_update, ids, vectors)
+        except asyncpg.PostgresError as e:
+            logger.error(f"DB error in EmbeddingRepository.update_embedding_vectors_bulk for {len(ids)} rows: {e}")
+            raise
+        updated = [row['id'] for row in rows]
+        if len(updated) < len(ids):
+            missing = set(ids) - set(updated)
+            logger.warning(f"EmbeddingRepository.update_embedding_vectors_bulk: {len(missing)} id(s) not found: {sorted(map(str, missing))}")
+        index = get_embedding_index()
+        for embedding_id in updated:
+            index.update_vector(embedding_id, latest[embedding_id])
+        return updated
+
+    async def get_embedding_vectors(self, embedding_ids: List[Any]) -> Dict[Any, List[float]]:
+        """
+        Текущие векторы по списку ID одним запросом, в обход in-process индекса
+        (его копия в другом воркере может отставать). Отсутствующих ID в ответе нет.
+        """
+        if not embedding_ids:
+            return {}
+        sql = f"""
+            SELECT id, embedding
+            FROM {EMBEDDINGS_TABLE_NAME}
+            WHERE id = ANY($1::uuid[]);
+        """
+        try:
+            rows = await self.conn.fetch(sql, list(embedding_ids))
+        except asyncpg.PostgresError as e:
+            logger.error(f"DB error in EmbeddingRepository.get_embedding_vectors for {len(embedding_ids)} ids: {e}")
+            raise
+        vectors = {}
+        for row in rows:
+            embedding_vector = row['embedding']
+            if isinstance(embedding_vector, str):
+                embedding_vector = _vector_from_sql(embedding_vector)
+            vectors[row['id']] = embedding_vector
+        return vectors
+
     async def get_embedding_by_id(self, embedding_id: UUID) -> Optional[EmbeddingDB]:
         """
         Получает эмбеддинг по его ID. (Может понадобиться для проверки)
@@ -134,7 +271,7 @@ class EmbeddingRepository:
             if row:
                 embedding_vector = row['embedding']
                 if isinstance(embedding_vector, str):
-                    embedding_vector = pgvector.from_sql(embedding_vector)
+                    embedding_vector = _vector_from_sql(embedding_vector)
                 return EmbeddingDB(
                     id=row['id'],
                     content=row['content'],
@@ -153,29 +290,12 @@ class EmbeddingRepository:
         """
         Создает эмбеддинг для query_text и ищет ближайший в БД.
         """
-        # Для этой функции нужен доступ к genai или аналогичному сервису эмбеддингов.
-        # Это немного нарушает принцип репозитория (не должен знать о внешних AI сервисах).
-        # В идеале, эмбеддинг запроса должен создаваться в сервисе и передаваться в find_closest_embedding.
-        # Но для выполнения задания реализуем здесь.
-        import google.generativeai as genai # Поздний импорт, чтобы избежать цикличной зависимости или проблем при старте
-        import os
-
-        # Попытка конфигурации, если еще не сделана (может быть избыточно, если genai конфигурируется глобально)
-        # if not genai.API_KEY and not os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
-        #     api_key = os.getenv("GOOGLE_API_KEY")
-        #     if api_key:
-        #         genai.configure(api_key=api_key)
-        #     else:
-        #         logger.error("Google AI API key or ADC not configured for EmbeddingRepository.")
-        #         return None
-
+        # Эмбеддинг запроса берется через общий кэш (LRU + опциональный SQLite, single-flight),
+        # поэтому повторяющиеся запросы (например, одно и то же имя документа) не ходят в genai.
         try:
-            result = await genai.embed_content_async(
-                model=model_name,
-                content=query_text,
-                task_type="RETRIEVAL_QUERY"
+            query_embedding = await get_embedding_cache().get_embedding(
+                query_text, model=model_name, task_type="RETRIEVAL_QUERY"
             )
-            query_embedding = result['embedding']
             if query_embedding:
                 return await self.find_closest_embedding(query_embedding)
             else:
@@ -1,12 +1,13 @@
 import asyncpg
 from typing import List, Optional, Dict, Any
 import logging
+from backend.core.db.pg_connector import DBExecutor
 from backend.core.models.gesture_models import UserGestureDefinitionDB, UserGestureDefinitionCreate
 
 logger = logging.getLogger(__name__)
 
 class GestureRepository:
-    def __init__(self, conn: asyncpg.Connection):
+    def __init__(self, conn: DBExecutor):
         self.conn = conn
 
     async def get_gestures_by_user_id(self, user_id: str, skip: int = 0, limit: int = 100) -> List[UserGestureDefinitionDB]:
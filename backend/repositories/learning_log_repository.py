@@ -1,13 +1,14 @@
 import asyncpg
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from uuid import UUID
 import logging
+from backend.core.db.pg_connector import DBExecutor
 from backend.core.models.tria_learning_models import TriaLearningLogDB, TriaLearningLogCreate
 
 logger = logging.getLogger(__name__)
 
 class LearningLogRepository:
-    def __init__(self, conn: asyncpg.Connection):
+    def __init__(self, conn: DBExecutor):
         self.conn = conn
 
     async def create_log_entry(
@@ -61,6 +62,41 @@ class LearningLogRepository:
             logger.error(f"Unexpected error in LearningLogRepository.create_log_entry for user {log_entry_in.user_id}: {e}", exc_info=True)
             raise
 
+    async def create_log_entries(self, log_entries_in: List[TriaLearningLogCreate]) -> int:
+        """
+        Пакетная вставка записей лога одним executemany (без RETURNING). Возвращает число записей.
+        """
+        if not log_entries_in:
+            return 0
+        sql = """
+            INSERT INTO tria_learning_log (
+                user_id, session_id, intent_vector, context_embedding_id,
+                action_result, result_message, modified_embedding_id,
+                feedback_signal, additional_metadata
+            )
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9);
+        """
+        args = [
+            (
+                entry.user_id,
+                entry.session_id,
+                entry.intent_vector,
+                entry.context_embedding_id,
+                entry.action_result,
+                entry.result_message,
+                entry.modified_embedding_id,
+                entry.feedback_signal,
+                entry.additional_metadata
+            )
+            for entry in log_entries_in
+        ]
+        try:
+            await self.conn.executemany(sql, args)
+            return len(args)
+        except asyncpg.PostgresError as e:
+            logger.error(f"DB error in LearningLogRepository.create_log_entries for {len(args)} entries: {e}", exc_info=True)
+            raise
+
     async def get_log_entry_by_id(self, log_id: UUID) -> Optional[TriaLearningLogDB]:
         """
         Извлекает запись лога по ее ID.
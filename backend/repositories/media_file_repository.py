@@ -0,0 +1,56 @@
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import asyncpg
+
+from backend.core.db.pg_connector import DBExecutor
+from backend.core.models.multimodal_models import MediaFileDB
+
+logger = logging.getLogger(__name__)
+
+MEDIA_FILE_COLUMNS = """id, user_id, file_name, storage_path, file_type, file_size_bytes, duration_seconds,
+                       resolution_width, resolution_height, metadata, created_at, updated_at"""
+
+
+def _to_model(row: asyncpg.Record) -> MediaFileDB:
+    data = dict(row)
+    if isinstance(data.get("metadata"), str):  # jsonb arrives as text without a registered codec
+        data["metadata"] = json.loads(data["metadata"])
+    data["metadata"] = data.get("metadata") or {}
+    return MediaFileDB(**data)
+
+
+class MediaFileRepository:
+    def __init__(self, conn: DBExecutor):
+        self.conn = conn
+
+    async def get_media_file(self, media_file_id: int) -> Optional[MediaFileDB]:
+        sql = f"SELECT {MEDIA_FILE_COLUMNS} FROM media_files WHERE id = $1;"
+        try:
+            row = await self.conn.fetchrow(sql, media_file_id)
+            return _to_model(row) if row else None
+        except asyncpg.PostgresError as e:
+            logger.error(f"DB error in MediaFileRepository.get_media_file for media file {media_file_id}: {e}")
+            raise
+
+    async def merge_metadata(self, media_file_id: int, patch: Dict[str, Any],
+                             duration_seconds: Optional[float] = None) -> Optional[MediaFileDB]:
+        """
+        Merges `patch` into the top level of `metadata` (jsonb ||), and sets duration_seconds
+        when given and still empty.
+        """
+        sql = f"""
+            UPDATE media_files
+            SET metadata = COALESCE(metadata, '{{}}'::jsonb) || $2::jsonb,
+                duration_seconds = COALESCE(duration_seconds, $3),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = $1
+            RETURNING {MEDIA_FILE_COLUMNS};
+        """
+        try:
+            row = await self.conn.fetchrow(sql, media_file_id, json.dumps(patch), duration_seconds)
+            return _to_model(row) if row else None
+        except asyncpg.PostgresError as e:
+            logger.error(f"DB error in MediaFileRepository.merge_metadata for media file {media_file_id}: {e}")
+            raise
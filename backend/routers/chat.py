@@ -6,7 +6,7 @@ import logging
 from backend.services.chat_service import ChatService
 from backend.core import models as core_models
 from backend.auth import security
-from backend.core.db.pg_connector import get_db_connection
+from backend.core.db.pg_connector import get_pooled_db_connection
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +23,7 @@ class CreateSessionPayload(core_models.UserChatSessionBase):
 async def create_chat_session_endpoint(
     payload: CreateSessionPayload,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     chat_service = ChatService(db_conn)
     # Service method create_new_chat_session takes user_id and optional title
@@ -39,7 +39,7 @@ async def create_chat_session_endpoint(
 @router.get("/sessions/", response_model=List[core_models.UserChatSessionDB])
 async def list_chat_sessions_endpoint(
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection),
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000)
 ):
@@ -51,7 +51,7 @@ async def list_chat_sessions_endpoint(
 async def get_chat_session_endpoint(
     session_id: int,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     chat_service = ChatService(db_conn)
     session = await chat_service.get_specific_user_chat_session(session_id=session_id, user_id=current_user.firebase_uid)
@@ -67,7 +67,7 @@ async def update_chat_session_endpoint(
     session_id: int,
     payload: UpdateSessionPayload,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     chat_service = ChatService(db_conn)
     updated_session = await chat_service.update_chat_session_title(
@@ -83,7 +83,7 @@ async def update_chat_session_endpoint(
 async def delete_chat_session_endpoint(
     session_id: int,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     chat_service = ChatService(db_conn)
     deleted = await chat_service.delete_specific_user_chat_session(session_id=session_id, user_id=current_user.firebase_uid)
@@ -96,7 +96,7 @@ async def add_message_to_session_endpoint(
     session_id: int,
     message_in: core_models.NewChatMessageRequest,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     chat_service = ChatService(db_conn)
 
@@ -122,7 +122,7 @@ async def add_message_to_session_endpoint(
 async def list_messages_for_session_endpoint(
     session_id: int,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection),
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000)
 ):
@@ -139,7 +139,7 @@ async def list_messages_for_session_endpoint(
 async def get_session_with_history_endpoint(
     session_id: int,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection),
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection),
     message_skip: int = Query(0, ge=0), # Renamed from skip for clarity
     message_limit: int = Query(100, ge=1, le=200) # Renamed from limit for clarity
 ):
@@ -9,7 +9,7 @@ import asyncpg
 from backend.services.chat_service import ChatService # ADDED
 from backend.core.models import chat_models, user_models
 from backend.auth import security
-from backend.core.db.pg_connector import get_db_connection
+from backend.core.db.pg_connector import get_pooled_db_connection
 
 # Removed: async def get_llm_response(...) - this logic is now in ChatService (as a stub)
 
@@ -22,7 +22,7 @@ router = APIRouter(
 async def create_new_chat_session_for_user(
     session_in: chat_models.UserChatSessionCreate,
     current_user: user_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     chat_service = ChatService(db_conn)
     # Логика присвоения default title теперь в сервисе
@@ -40,7 +40,7 @@ async def create_new_chat_session_for_user(
 @router.get("/", response_model=List[chat_models.UserChatSessionDB])
 async def list_user_chat_sessions(
     current_user: user_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection),
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=200)
 ):
@@ -56,7 +56,7 @@ async def list_user_chat_sessions(
 async def get_specific_user_chat_session(
     session_id: int,
     current_user: user_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     chat_service = ChatService(db_conn)
     print(f"[CHAT SESSION ROUTER INFO] User {current_user.firebase_uid} fetching chat session ID: {session_id}")
@@ -73,7 +73,7 @@ async def get_specific_user_chat_session(
 async def delete_specific_user_chat_session(
     session_id: int,
     current_user: user_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     chat_service = ChatService(db_conn)
     print(f"[CHAT SESSION ROUTER INFO] User {current_user.firebase_uid} deleting chat session ID: {session_id}")
@@ -90,7 +90,7 @@ async def delete_specific_user_chat_session(
 async def get_messages_for_session(
     session_id: int,
     current_user: user_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection),
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection),
     limit: int = Query(50, ge=1, le=200) 
 ):
     chat_service = ChatService(db_conn)
@@ -114,7 +114,7 @@ async def add_message_to_session(
     message_in: chat_models.ChatMessageCreate,
     # request: Request, # Request больше не нужен здесь, если Pub/Sub логика ушла в сервис или удалена
     current_user: user_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     chat_service = ChatService(db_conn)
     print(f"[CHAT MSG ROUTER INFO] User {current_user.firebase_uid} adding message to session ID: {session_id}.")
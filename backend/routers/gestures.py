@@ -6,7 +6,7 @@ from backend.services.gesture_service import GestureService
 # Updated import to use models from backend.core.models via __init__.py
 from backend.core import models as core_models
 from backend.auth import security
-from backend.core.db.pg_connector import get_db_connection
+from backend.core.db.pg_connector import get_pooled_db_connection
 # Field is not used directly here anymore after removing local GestureUpdate, but pydantic might be needed for other things.
 # from pydantic import Field # Keep if other Pydantic features are used, else remove.
 
@@ -21,7 +21,7 @@ router = APIRouter(
 async def create_new_user_gesture(
     gesture_in: core_models.UserGestureDefinitionCreate,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user), # Use UserInDB from core_models
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     gesture_service = GestureService(db_conn)
     try:
@@ -43,7 +43,7 @@ async def create_new_user_gesture(
 @router.get("/", response_model=List[core_models.UserGestureDefinitionDB])
 async def list_user_gestures(
     current_user: core_models.UserInDB = Depends(security.get_current_active_user), # Use UserInDB from core_models
-    db_conn: asyncpg.Connection = Depends(get_db_connection),
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=200) 
 ):
@@ -59,7 +59,7 @@ async def list_user_gestures(
 async def get_specific_user_gesture(
     gesture_id: int,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user), # Use UserInDB from core_models
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     gesture_service = GestureService(db_conn)
     # print(f"[GUESTURE ROUTER INFO] User {current_user.firebase_uid} fetching gesture ID: {gesture_id}")
@@ -77,7 +77,7 @@ async def update_existing_user_gesture(
     gesture_id: int,
     gesture_update: core_models.GestureUpdate, # Use GestureUpdate from core_models
     current_user: core_models.UserInDB = Depends(security.get_current_active_user), # Use UserInDB from core_models
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     gesture_service = GestureService(db_conn)
     update_data = gesture_update.dict(exclude_unset=True) 
@@ -100,7 +100,7 @@ async def update_existing_user_gesture(
 async def delete_user_defined_gesture(
     gesture_id: int,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user), # Use UserInDB from core_models
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     gesture_service = GestureService(db_conn)
     # print(f"[GUESTURE ROUTER INFO] User {current_user.firebase_uid} deleting gesture ID: {gesture_id}")
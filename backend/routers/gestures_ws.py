@@ -1,7 +1,7 @@
 # backend/routers/gestures_ws.py
 import logging
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-import asyncpg
+from starlette.websockets import WebSocketState
 
 # Импортируем сервис после того, как он будет создан.
 # Для корректной работы FastAPI при запуске, лучше, чтобы импорт был сверху.
@@ -9,8 +9,12 @@ import asyncpg
 # или создать заглушку сервиса, чтобы файл мог быть импортирован в app.py.
 # Поскольку мы создаем сервис на следующем шаге, пока оставляем как есть.
 # from backend.services.gesture_intent_service import GestureIntentService # Заменено на CoordinationService
-from backend.tria_bots.CoordinationService import CoordinationService # <-- НОВЫЙ ИМПОРТ
-from backend.core.db.pg_connector import get_db_connection
+from backend.tria_bots.CoordinationService import get_coordination_service
+from backend.services.gesture_intent_pipeline import GestureIntentPipeline
+from backend.utils.env import env_int
+from backend.utils.gesture_intent_codec import (
+    SUBPROTOCOL_JSON, SUBPROTOCOL_PROTOBUF, describe_gesture_chunk, encode_response, parse_intent_chunk,
+)
 # Для аутентификации предполагается, что UserInDB импортируется security
 from backend.auth.security import get_current_active_user
 from backend.core.models.user_models import UserInDB
@@ -30,40 +34,74 @@ async def websocket_endpoint(
     # и передавать user_id как часть сообщения, но это небезопасно для прода.
     # Решение из задания - оставить Depends, значит клиент должен обеспечить передачу токена.
     user: UserInDB = Depends(get_current_active_user),
-    db: asyncpg.Connection = Depends(get_db_connection)
 ):
-    await websocket.accept()
-    logger.info(f"WebSocket connection established for user {user.firebase_uid if user else 'unknown (auth pending fix)'}")
+    # Бинарный режим (GestureChunk/GestureIntentResponse) - если клиент предложил соответствующий subprotocol
+    offered = websocket.scope.get("subprotocols") or []
+    binary_mode = SUBPROTOCOL_PROTOBUF in offered
+    subprotocol = SUBPROTOCOL_PROTOBUF if binary_mode else (SUBPROTOCOL_JSON if SUBPROTOCOL_JSON in offered else None)
+    await websocket.accept(subprotocol=subprotocol)
+    logger.info(f"WebSocket connection established for user {user.firebase_uid if user else 'unknown (auth pending fix)'} ({'binary' if binary_mode else 'json'} mode)")
 
-    # ✅ Инициализируем CoordinationService
-    coordination_service = CoordinationService(db)
+    # Убедимся, что user.firebase_uid передается, если user объект существует
+    user_identifier = user.firebase_uid if user else "anonymous_websocket_user" # Fallback, если user почему-то None
+    # Общий для всех сокетов сервис поверх пула: соединение берется только на время запроса к БД,
+    # так что открытый, но простаивающий сокет не держит ни соединения, ни собственных ботов.
+    coordination_service = await get_coordination_service()
+
+    async def handle_intent(intent_data: dict) -> dict:
+        return await coordination_service.handle_gesture_intent(user_id=user_identifier, intent_data=intent_data)
+
+    async def handle_chunk(item) -> dict:
+        chunk, landmarks = item
+        return await coordination_service.handle_gesture_chunk(user_id=user_identifier, chunk=chunk, landmarks=landmarks)
+
+    async def send_binary(response: dict):
+        await websocket.send_bytes(encode_response(response))
+
+    # Чтение сокета не ждет обработки: reader -> очередь -> воркеры -> writer (ответы в порядке поступления)
+    pipeline_options = dict(
+        max_queue=env_int("GESTURE_INTENT_QUEUE_SIZE", 64),
+        concurrency=env_int("GESTURE_INTENT_CONCURRENCY", 4),
+    )
+    if binary_mode:
+        pipeline = GestureIntentPipeline(handle_chunk, send_binary, describe=lambda item: describe_gesture_chunk(item[0]), **pipeline_options)
+    else:
+        pipeline = GestureIntentPipeline(handle_intent, websocket.send_json, **pipeline_options)
+    pipeline.start()
 
     try:
+        while binary_mode:
+            data = await websocket.receive_bytes()
+            try:
+                chunk, landmarks = parse_intent_chunk(data)
+            except Exception as e:
+                await pipeline.reply({"status": "error", "message": f"Malformed GestureChunk: {e}"})
+                continue
+            if not chunk.recognized_gesture_type and landmarks is None:
+                await pipeline.reply({"status": "error", "message": "Intent not provided in message data"}, chunk.gesture_id)
+                continue
+            await pipeline.submit((chunk, landmarks))
+
         while True:
             data = await websocket.receive_json()
-            # Ожидаем данные в формате {"intent": "select", "context": {...}}
-            # Проверка data и его содержимого (intent) должна быть здесь или в CoordinationService
+            # Ожидаем данные в формате {"intent": "select", "context": {...}, "correlation_id": "..."}
             intent_val = data.get("intent") # переименовал, чтобы не конфликтовать с модулем `intent`
 
-            if not intent_val:
-                logger.warning(f"Received WebSocket message without intent from user {user.firebase_uid if user else 'unknown'}")
-                await websocket.send_json({"status": "error", "message": "Intent not provided in message data"})
+            # Без intent допускается последовательность landmarks - намерение определит распознавание жестов
+            if not intent_val and not data.get("landmarks"):
+                logger.warning(f"Received WebSocket message without intent from user {user_identifier}")
+                await pipeline.reply({"status": "error", "message": "Intent not provided in message data"}, data.get("correlation_id"))
                 continue
 
-            logger.info(f"Received intent_data from user {user.firebase_uid if user else 'unknown'}: {data}")
-
-            # ✅ Вызываем центральный обработчик
-            # Убедимся, что user.firebase_uid передается, если user объект существует
-            user_identifier = user.firebase_uid if user else "anonymous_websocket_user" # Fallback, если user почему-то None
-
-            result = await coordination_service.handle_gesture_intent(user_id=user_identifier, intent_data=data)
-
-            await websocket.send_json(result)
+            logger.debug(f"Received intent_data from user {user_identifier}: {data}")
+            await pipeline.submit(data)
 
     except WebSocketDisconnect:
-        logger.info(f"WebSocket connection closed for user {user.firebase_uid if user else 'unknown'}")
+        logger.info(f"WebSocket connection closed for user {user_identifier} (pipeline: {pipeline.stats()})")
     except Exception as e:
-        logger.error(f"Error in WebSocket for user {user.firebase_uid if user else 'unknown'}: {e}", exc_info=True)
+        logger.error(f"Error in WebSocket for user {user_identifier}: {e}", exc_info=True)
         # Попытаемся закрыть соединение с кодом ошибки, если оно еще открыто
-        if websocket.client_state != WebSocketDisconnect: # Проверка состояния сокета
-             await websocket.close(code=1011) # INTERNAL_SERVER_ERROR
+        if websocket.client_state != WebSocketState.DISCONNECTED:
+            await websocket.close(code=1011) # INTERNAL_SERVER_ERROR
+    finally:
+        await pipeline.close()
@@ -0,0 +1,141 @@
+# backend/routers/hologram_frames.py
+"""
+Precomputed hologram frames (backend/services/hologram_frame_store.py).
+
+    POST /hologram-frames/media/{media_file_id}      поставить рендер трека в очередь (202)
+    GET  /hologram-frames/media/{media_file_id}      запись из media_files.metadata["hologram_frames"]
+    GET  /hologram-frames/{key}                      .holo файл целиком, с поддержкой Range (206)
+    GET  /hologram-frames/{key}/frames?start=&count= отдельный .holo с диапазоном кадров
+"""
+import logging
+import os
+from typing import Iterator
+
+import asyncpg
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+
+from backend.auth import security
+from backend.core import models as core_models
+from backend.core.db.pg_connector import get_pooled_db_connection
+from backend.repositories.media_file_repository import MediaFileRepository
+from backend.services.hologram_frame_store import METADATA_KEY, get_hologram_frame_store
+from backend.utils.hologram_frame_file import parse_byte_range
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Hologram Frames"])
+
+HOLO_MEDIA_TYPE = "application/vnd.holograms.frames"
+READ_BLOCK = 64 * 1024
+# Содержимое файла определяется ключом (хэш аудио + настройки), поэтому его можно кэшировать навсегда.
+IMMUTABLE_CACHE = "private, max-age=31536000, immutable"
+MAX_FRAMES_PER_REQUEST = 100_000
+
+
+def _iter_file(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = f.read(min(READ_BLOCK, remaining))
+            if not block:
+                return
+            remaining -= len(block)
+            yield block
+
+
+async def _owned_media_file(media_file_id: int, user: core_models.UserInDB, db_conn: asyncpg.Connection):
+    media_file = await MediaFileRepository(db_conn).get_media_file(media_file_id)
+    if media_file is None or media_file.user_id != user.firebase_uid:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Media file not found.")
+    return media_file
+
+
+@router.post("/media/{media_file_id}", status_code=status.HTTP_202_ACCEPTED)
+async def schedule_media_render(
+    media_file_id: int,
+    request: Request,
+    current_user: core_models.UserInDB = Depends(security.get_current_active_user),
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection),
+):
+    store = get_hologram_frame_store()
+    media_file = await _owned_media_file(media_file_id, current_user, db_conn)
+    linked = (media_file.metadata or {}).get(METADATA_KEY)
+    if linked and store.exists(linked.get("key", "")):
+        return {"status": "ready", METADATA_KEY: linked}
+
+    s3_client = getattr(request.app.state, "s3_client", None)
+    db_pool = getattr(request.app.state, "db_pool", None)
+    if s3_client is None or db_pool is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Storage or database is unavailable.")
+    # Рендер идёт в фоне через пул соединений: соединение запроса к тому времени уже будет возвращено.
+    if not store.schedule_media_render(media_file_id, db_pool, s3_client, os.getenv("R2_BUCKET_NAME")):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Render queue is full, retry later.")
+    return {"status": "scheduled", "media_file_id": media_file_id}
+
+
+@router.get("/media/{media_file_id}")
+async def get_media_frames_entry(
+    media_file_id: int,
+    current_user: core_models.UserInDB = Depends(security.get_current_active_user),
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection),
+):
+    store = get_hologram_frame_store()
+    media_file = await _owned_media_file(media_file_id, current_user, db_conn)
+    linked = (media_file.metadata or {}).get(METADATA_KEY)
+    if linked and store.exists(linked.get("key", "")):
+        return {"status": "ready", METADATA_KEY: linked}
+    if store.is_scheduled(media_file_id):
+        return {"status": "scheduled", "media_file_id": media_file_id}
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hologram frames have not been rendered for this media file.")
+
+
+@router.get("/{key}")
+async def get_frame_file(
+    key: str,
+    request: Request,
+    current_user: core_models.UserInDB = Depends(security.get_current_active_user),
+):
+    store = get_hologram_frame_store()
+    frame_file = store.open(key)
+    if frame_file is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hologram frames not found.")
+
+    headers = {"Accept-Ranges": "bytes", "ETag": f'"{key}"', "Cache-Control": IMMUTABLE_CACHE}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    size = frame_file.size
+    try:
+        byte_range = parse_byte_range(request.headers.get("range"), size)
+    except ValueError:
+        return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                        headers={**headers, "Content-Range": f"bytes */{size}"})
+    if byte_range is None:
+        return StreamingResponse(_iter_file(frame_file.path, 0, size - 1), media_type=HOLO_MEDIA_TYPE,
+                                 headers={**headers, "Content-Length": str(size)})
+    start, end = byte_range
+    headers.update({"Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)})
+    return StreamingResponse(_iter_file(frame_file.path, start, end), status_code=status.HTTP_206_PARTIAL_CONTENT,
+                             media_type=HOLO_MEDIA_TYPE, headers=headers)
+
+
+@router.get("/{key}/frames")
+async def get_frame_range(
+    key: str,
+    start: int = Query(0, ge=0),
+    count: int = Query(1024, ge=1, le=MAX_FRAMES_PER_REQUEST),
+    current_user: core_models.UserInDB = Depends(security.get_current_active_user),
+):
+    """Кадры [start, start + count) отдельным .holo файлом (header.start_frame = start)."""
+    frame_file = get_hologram_frame_store().open(key)
+    if frame_file is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hologram frames not found.")
+    if start >= len(frame_file):
+        raise HTTPException(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                            detail=f"start is past the last frame ({len(frame_file)} frames).")
+    # До MAX_FRAMES_PER_REQUEST кадров (~65 МБ): отдаем потоком из файла, вне event loop
+    return StreamingResponse(frame_file.iter_slice(start, count, READ_BLOCK), media_type=HOLO_MEDIA_TYPE,
+                             headers={"Cache-Control": IMMUTABLE_CACHE, "X-Frame-Count": str(len(frame_file)),
+                                      "Content-Length": str(frame_file.slice_header(start, count).size)})
@@ -5,7 +5,7 @@ import asyncpg
 from backend.services.hologram_service import HologramService
 from backend.core import models as core_models # Updated import
 from backend.auth import security
-from backend.core.db.pg_connector import get_db_connection
+from backend.core.db.pg_connector import get_pooled_db_connection
 # from pydantic import Field # Field might not be needed if HologramUpdate is simple
 
 router = APIRouter(
@@ -19,7 +19,7 @@ router = APIRouter(
 async def create_new_user_hologram(
     hologram_in: core_models.UserHologramCreate,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     hologram_service = HologramService(db_conn)
     try:
@@ -41,7 +41,7 @@ async def create_new_user_hologram(
 @router.get("/", response_model=List[core_models.UserHologramDB])
 async def list_user_holograms(
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection),
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=200)
 ):
@@ -57,7 +57,7 @@ async def list_user_holograms(
 async def get_specific_user_hologram(
     hologram_id: int,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     hologram_service = HologramService(db_conn)
     # print(f"[HOLOGRAM ROUTER INFO] User {current_user.firebase_uid} fetching hologram ID: {hologram_id}")
@@ -75,7 +75,7 @@ async def update_existing_user_hologram(
     hologram_id: int,
     hologram_update: core_models.HologramUpdate, # Use HologramUpdate from core_models
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     hologram_service = HologramService(db_conn)
     update_data = hologram_update.dict(exclude_unset=True)
@@ -98,7 +98,7 @@ async def update_existing_user_hologram(
 async def delete_user_saved_hologram(
     hologram_id: int,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     hologram_service = HologramService(db_conn)
     # print(f"[HOLOGRAM ROUTER INFO] User {current_user.firebase_uid} deleting hologram ID: {hologram_id}")
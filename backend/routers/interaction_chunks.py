@@ -4,7 +4,7 @@ import json # Added for Pub/Sub message serialization
 import traceback # For logging Pub/Sub errors
 
 from backend.core import crud_operations
-from backend.core.db.pg_connector import get_db_connection
+from backend.core.db.pg_connector import get_pooled_db_connection
 from backend.core.models.interaction_chunk_model import InteractionChunkCreate, InteractionChunkDB
 from backend.core.models.user_models import UserInDB
 from backend.auth import security 
@@ -18,7 +18,7 @@ async def submit_interaction_chunk(
     request: Request, # Added Request to access app.state
     chunk_create_data: InteractionChunkCreate,
     current_user: UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     """
     Receives an interaction chunk from the client, saves its metadata to the database,
@@ -6,7 +6,7 @@ import logging
 from backend.services.prompt_service import PromptService
 from backend.core import models as core_models
 from backend.auth import security
-from backend.core.db.pg_connector import get_db_connection
+from backend.core.db.pg_connector import get_pooled_db_connection
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +19,7 @@ router = APIRouter(
 async def create_prompt_version_endpoint(
     prompt_in: core_models.UserPromptVersionCreate,
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     prompt_service = PromptService(db_conn)
     created_prompt_version = await prompt_service.create_new_prompt_version(
@@ -34,7 +34,7 @@ async def create_prompt_version_endpoint(
 @router.get("/titles/", response_model=List[core_models.UserPromptTitleInfo])
 async def list_prompt_titles_endpoint(
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     prompt_service = PromptService(db_conn)
     titles = await prompt_service.list_user_prompt_titles(user_id=current_user.firebase_uid)
@@ -44,7 +44,7 @@ async def list_prompt_titles_endpoint(
 async def list_versions_for_prompt_title_endpoint(
     prompt_title: str = Path(..., description="The title of the prompt to fetch versions for."),
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection),
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection),
     skip: int = Query(0, ge=0, description="Number of records to skip."),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return.")
 ):
@@ -61,7 +61,7 @@ async def list_versions_for_prompt_title_endpoint(
 async def get_latest_prompt_version_endpoint(
     prompt_title: str = Path(..., description="The title of the prompt."),
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     prompt_service = PromptService(db_conn)
     latest_version = await prompt_service.get_latest_prompt_version(
@@ -77,7 +77,7 @@ async def get_specific_prompt_version_endpoint(
     prompt_title: str = Path(..., description="The title of the prompt."),
     version_number: int = Path(..., description="The version number of the prompt."),
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     prompt_service = PromptService(db_conn)
     prompt_version = await prompt_service.get_prompt_version(
@@ -93,7 +93,7 @@ async def get_specific_prompt_version_endpoint(
 async def get_prompt_version_by_id_endpoint(
     prompt_version_id: int = Path(..., description="The specific ID of the prompt version."),
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     prompt_service = PromptService(db_conn)
     prompt_version = await prompt_service.get_prompt_version_by_id(
@@ -108,7 +108,7 @@ async def get_prompt_version_by_id_endpoint(
 async def delete_prompt_version_endpoint(
     prompt_version_id: int = Path(..., description="The ID of the prompt version to delete."),
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     prompt_service = PromptService(db_conn)
     deleted = await prompt_service.delete_prompt_version(
@@ -123,7 +123,7 @@ async def delete_prompt_version_endpoint(
 async def delete_all_versions_for_prompt_title_endpoint(
     prompt_title: str = Path(..., description="The title of the prompt for which all versions will be deleted."),
     current_user: core_models.UserInDB = Depends(security.get_current_active_user),
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     prompt_service = PromptService(db_conn)
     deleted_count = await prompt_service.delete_prompt_by_title(
@@ -5,7 +5,7 @@ import logging
 
 from backend.core.crud_operations import get_holograms_by_user_id
 from backend.core.models.hologram_models import UserHologramResponseModel
-from backend.core.db.pg_connector import get_db_connection
+from backend.core.db.pg_connector import get_pooled_db_connection
 
 router = APIRouter(
     prefix="/users",
@@ -17,7 +17,7 @@ logger = logging.getLogger(__name__)
 @router.get("/{user_id}/holograms", response_model=List[UserHologramResponseModel])
 async def get_user_holograms_public_endpoint(
     user_id: str,
-    db_conn: asyncpg.Connection = Depends(get_db_connection)
+    db_conn: asyncpg.Connection = Depends(get_pooled_db_connection)
 ):
     """
     Retrieve all holograms for a specific user.
@@ -1,6 +1,9 @@
 import asyncio
+import json
 import logging
-from typing import Dict, Any, Optional
+import os
+from typing import Dict, Any, Iterable, Optional, Sequence
+from uuid import uuid4
 
 from google.protobuf.timestamp_pb2 import Timestamp
 # Assuming definitions_pb2 will be generated from your .proto files
@@ -30,6 +33,9 @@ from backend.core.models.nethologlyph_models import (
     HolographicSymbolNetModel, # Pydantic version of HolographicSymbol proto
     GestureChunkNetModel,      # Pydantic version of GestureChunk proto
     TriaStateUpdateNetModel,   # Pydantic version of TriaStateUpdate proto
+    SceneUpdatePayload,        # Diffed into nethologlyph.SceneDelta by SceneStateStore
+    HandshakeRequestPayload,
+    HandshakeResponsePayload,
     # Add other Pydantic models corresponding to other NetHoloPacket payload types
 )
 from backend.core.models.hologram_models import ( # These might be what your internal messages use
@@ -40,23 +46,81 @@ from backend.core.models.gesture_models import (
     InterpretedGestureSequenceDB as InternalGestureSequence,
 )
 
-from backend.utils.protobuf_mapper import to_protobuf, from_protobuf, datetime_to_protobuf_timestamp, protobuf_timestamp_to_datetime
+from backend.utils.protobuf_mapper import to_protobuf, from_protobuf, fill_protobuf, datetime_to_protobuf_timestamp, protobuf_timestamp_to_datetime
+from backend.utils.landmark_buffers import landmarks_from_packet
+from backend.services.background_tasks import PRIORITY_HIGH, get_background_runner
+from backend.services.client_send_queue import ClientSendQueue, DROP_OLDEST
+from backend.services.glyph_rooms import RoomRegistry, scene_topic, session_topic
+from backend.services.scene_state_store import SceneStateStore, quantize_scene_delta
+from backend.services.glyph_backplane import (
+    BROADCAST_CHANNEL, Backplane, create_backplane, default_worker_id, worker_channel,
+)
+from backend.utils.transform_codec import FEATURE_QUANTIZED_TRANSFORMS
+from backend.utils.packet_framing import FEATURE_PACKET_FRAMING, is_frame, split_frame
+from backend.utils.env import env_int, env_number
 from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+NETHOLOGLYPH_SERVER_VERSION = "0.1.0"
+# Optional protocol features a client can ask for in HandshakeRequestPayload.supported_features
+SUPPORTED_FEATURES = (FEATURE_QUANTIZED_TRANSFORMS, FEATURE_PACKET_FRAMING)
+# Payload types that skip tick batching (sent as soon as the client's writer is free)
+PRIORITY_PAYLOADS = frozenset({"tria_state"})
+
 class NetHoloGlyphService:
-    def __init__(self, coordination_service: Any): # coordination_service should be typed properly later
+    def __init__(self, coordination_service: Any, # coordination_service should be typed properly later
+                 send_queue_size: Optional[int] = None, drop_policy: Optional[str] = None,
+                 send_timeout: Optional[float] = None, backplane: Optional[Backplane] = None,
+                 worker_id: Optional[str] = None):
         """
         Initializes the NetHoloGlyphService.
 
         Args:
             coordination_service: An instance of the CoordinationService for internal message handling.
+            send_queue_size: Max packets queued per client (NETHOLOGLYPH_SEND_QUEUE_SIZE, default 256).
+            drop_policy: "drop_oldest" or "coalesce_latest" (NETHOLOGLYPH_DROP_POLICY).
+            send_timeout: Seconds before a stuck send evicts the client (NETHOLOGLYPH_SEND_TIMEOUT).
+            backplane: Cross-worker message bus; defaults to create_backplane() (NETHOLOGLYPH_BACKPLANE_URL,
+                none when unset). Needs `await start()` before use.
+            worker_id: This worker's id on the backplane (NETHOLOGLYPH_WORKER_ID, default host-pid).
         """
         self.coordination_service = coordination_service
         self.connected_clients: Dict[str, Any] = {}  # Stores client_id: websocket_connection
+        self.send_queues: Dict[str, ClientSendQueue] = {}  # client_id: outgoing queue + writer task
+        self.rooms = RoomRegistry()  # scene/session topics -> subscribed client_ids
+        self.client_features: Dict[str, frozenset] = {}  # client_id: features accepted in the handshake
+        self.send_queue_size = send_queue_size or env_int("NETHOLOGLYPH_SEND_QUEUE_SIZE", 256)
+        self.drop_policy = drop_policy or os.environ.get("NETHOLOGLYPH_DROP_POLICY", DROP_OLDEST)
+        self.send_timeout = send_timeout or env_number("NETHOLOGLYPH_SEND_TIMEOUT", 5.0)
+        # Batching for clients that negotiated packet framing (NETHOLOGLYPH_FLUSH_INTERVAL_MS, NETHOLOGLYPH_MAX_FRAME_BYTES)
+        self.flush_interval = env_number("NETHOLOGLYPH_FLUSH_INTERVAL_MS", 16) / 1000.0
+        self.max_frame_bytes = env_int("NETHOLOGLYPH_MAX_FRAME_BYTES", 65536)
+        self.evicted_clients = 0
+        # Authoritative scene state; scene updates go out as versioned deltas (NETHOLOGLYPH_KEYFRAME_INTERVAL,
+        # NETHOLOGLYPH_SCENE_HISTORY)
+        self.scene_store = SceneStateStore(
+            keyframe_interval=env_int("NETHOLOGLYPH_KEYFRAME_INTERVAL", 300),
+            max_history=env_int("NETHOLOGLYPH_SCENE_HISTORY", 256),
+            position_step=env_number("NETHOLOGLYPH_POSITION_STEP", 1e-3),
+        )
+        self.backplane = backplane if backplane is not None else create_backplane()
+        self.worker_id = worker_id or default_worker_id()
+        self.backplane_forwarded = 0
+        self.backplane_received = 0
         logger.info("NetHoloGlyphService initialized.")
 
+    async def start(self):
+        """Connects to the backplane (if configured) so sends reach clients held by other workers."""
+        if self.backplane is not None:
+            await self.backplane.start([worker_channel(self.worker_id), BROADCAST_CHANNEL], self._on_backplane_message)
+
+    async def close(self):
+        for client_id in list(self.connected_clients):
+            await self.unregister_client(client_id)
+        if self.backplane is not None:
+            await self.backplane.close()
+
     async def register_client(self, client_id: str, websocket: Any):
         """
         Registers a new client connection.
@@ -67,7 +131,19 @@ class NetHoloGlyphService:
         """
         if client_id in self.connected_clients:
             logger.warning(f"Client {client_id} already registered. Overwriting existing connection.")
+            await self.send_queues.pop(client_id).close()
         self.connected_clients[client_id] = websocket
+        send_queue = ClientSendQueue(
+            client_id, websocket, max_size=self.send_queue_size, drop_policy=self.drop_policy,
+            send_timeout=self.send_timeout, on_dead=self._evict_dead_client, max_frame_bytes=self.max_frame_bytes,
+        )
+        self.send_queues[client_id] = send_queue
+        send_queue.start()
+        if self.backplane is not None:
+            try:
+                await self.backplane.set_presence(client_id, self.worker_id)
+            except Exception as e:  # retried by the backplane's presence refresh
+                logger.error(f"Failed to publish presence of {client_id}: {e!r}")
         logger.info(f"Client {client_id} registered and connected.")
         # Optionally, send a handshake response or initial state upon registration
 
@@ -80,37 +156,173 @@ class NetHoloGlyphService:
         """
         if client_id in self.connected_clients:
             del self.connected_clients[client_id]
+            self.rooms.remove_client(client_id)
+            self.client_features.pop(client_id, None)
+            send_queue = self.send_queues.pop(client_id, None)
+            if send_queue is not None:
+                await send_queue.close()
+            if self.backplane is not None:
+                try:
+                    await self.backplane.clear_presence(client_id, self.worker_id)
+                except Exception as e:  # the entry expires on its own
+                    logger.error(f"Failed to clear presence of {client_id}: {e!r}")
             logger.info(f"Client {client_id} unregistered and disconnected.")
         else:
             logger.warning(f"Attempted to unregister non-existent client: {client_id}")
 
+    def _evict_dead_client(self, client_id: str):
+        """Called by a client's writer task when sending fails or times out."""
+        self.connected_clients.pop(client_id, None)
+        self.send_queues.pop(client_id, None)
+        self.rooms.remove_client(client_id)
+        self.client_features.pop(client_id, None)
+        self.evicted_clients += 1
+        if self.backplane is not None:
+            get_background_runner().submit(self.backplane.clear_presence, client_id, self.worker_id, priority=PRIORITY_HIGH)
+        logger.info(f"Client {client_id} evicted after a failed send.")
+
+    def handle_handshake(self, client_id: str, request: HandshakeRequestPayload) -> HandshakeResponsePayload:
+        """
+        Accepts the subset of the client's supported_features this server implements; later
+        packets to the client use them (e.g. PackedTransforms in scene deltas).
+        """
+        accepted = [feature for feature in request.supported_features or [] if feature in SUPPORTED_FEATURES]
+        self.client_features[client_id] = frozenset(accepted)
+        send_queue = self.send_queues.get(client_id)
+        if send_queue is not None and FEATURE_PACKET_FRAMING in accepted:
+            send_queue.flush_interval = self.flush_interval
+        for scene_id in request.scene_ids or []:
+            self.subscribe_client(client_id, scene_id=scene_id)
+        logger.info(f"Handshake with {client_id} (client {request.client_version}): accepted features {accepted}.")
+        return HandshakeResponsePayload(
+            server_version=NETHOLOGLYPH_SERVER_VERSION, session_id=str(uuid4()), accepted_features=accepted,
+        )
+
+    def subscribe_client(self, client_id: str, scene_id: Optional[str] = None, session_id: Optional[str] = None,
+                         payload_types: Optional[Iterable[str]] = None):
+        """
+        Subscribes a registered client to a scene and/or session room.
+
+        Args:
+            payload_types: Optional interest filter (NetHoloPacket oneof names, e.g. ["holo_symbol"]).
+        """
+        if client_id not in self.connected_clients:
+            logger.warning(f"Cannot subscribe unknown client {client_id}.")
+            return
+        if scene_id:
+            self.rooms.subscribe(client_id, scene_topic(scene_id), payload_types)
+            # A joining client starts from the current snapshot, then follows the delta stream.
+            if self.scene_store.version_of(scene_id):
+                self.send_queues[client_id].enqueue(self._scene_packet_bytes(self.scene_store.keyframe(scene_id), client_id))
+        if session_id:
+            self.rooms.subscribe(client_id, session_topic(session_id), payload_types)
+
+    def unsubscribe_client(self, client_id: str, scene_id: Optional[str] = None, session_id: Optional[str] = None):
+        if scene_id:
+            self.rooms.unsubscribe(client_id, scene_topic(scene_id))
+        if session_id:
+            self.rooms.unsubscribe(client_id, session_topic(session_id))
+
+    def _wants_quantized(self, client_id: str) -> bool:
+        return FEATURE_QUANTIZED_TRANSFORMS in self.client_features.get(client_id, ())
+
+    def _quantized_packet_bytes(self, proto_packet: Any, scene_delta: Any, default: bytes) -> bytes:
+        """`proto_packet` with its scene delta's transforms packed; `default` if there is nothing to pack."""
+        quantized = quantize_scene_delta(scene_delta, self.scene_store.codec_for(scene_delta.scene_id))
+        if quantized is scene_delta:
+            return default
+        compact_packet = nethologlyph_pb2.NetHoloPacket()
+        compact_packet.CopyFrom(proto_packet)
+        compact_packet.scene_delta.CopyFrom(quantized)
+        return compact_packet.SerializeToString()
+
+    def _scene_packet_bytes(self, scene_delta: Any, client_id: Optional[str] = None) -> bytes:
+        if client_id is not None and self._wants_quantized(client_id):
+            scene_delta = quantize_scene_delta(scene_delta, self.scene_store.codec_for(scene_delta.scene_id))
+        proto_packet = nethologlyph_pb2.NetHoloPacket()
+        proto_packet.packet_id = str(uuid4())
+        proto_packet.timestamp.GetCurrentTime()
+        proto_packet.source_id = "NetHoloGlyphService"
+        proto_packet.scene_delta.CopyFrom(scene_delta)
+        return proto_packet.SerializeToString()
+
+    def _handle_scene_resync(self, client_id: str, request: Any):
+        """Answers a client's SceneResyncRequest with the missed deltas or a keyframe."""
+        send_queue = self.send_queues.get(client_id)
+        if send_queue is None:
+            return
+        # Asking for a scene's state is also how a client joins its room.
+        self.rooms.subscribe(client_id, scene_topic(request.scene_id))
+        messages = self.scene_store.resync(request.scene_id, request.last_known_version)
+        for scene_delta in messages:
+            send_queue.enqueue(self._scene_packet_bytes(scene_delta, client_id))
+        logger.debug(f"Resync of scene {request.scene_id} for {client_id} from version {request.last_known_version}: {len(messages)} packet(s).")
+
+    def get_fanout_stats(self) -> Dict[str, Any]:
+        """Queue depth, drops and send latency per client plus totals."""
+        per_client = {client_id: q.stats() for client_id, q in self.send_queues.items()}
+        return {
+            "clients": len(per_client),
+            "evicted_clients": self.evicted_clients,
+            "total_depth": sum(c["depth"] for c in per_client.values()),
+            "total_dropped": sum(c["dropped"] for c in per_client.values()),
+            "worker_id": self.worker_id,
+            "backplane": type(self.backplane).__name__ if self.backplane is not None else None,
+            "backplane_forwarded": self.backplane_forwarded,
+            "backplane_received": self.backplane_received,
+            "rooms": self.rooms.stats(),
+            "scenes": self.scene_store.stats(),
+            "per_client": per_client,
+        }
+
     async def process_incoming_glyph(self, client_id: str, binary_data: bytes):
         """
-        Processes an incoming binary NetHoloGlyph packet from a client.
+        Processes an incoming binary NetHoloGlyph message from a client.
 
         Args:
             client_id: The ID of the client sending the data.
-            binary_data: The raw binary data of the NetHoloPacket.
+            binary_data: A serialized NetHoloPacket or a multi-packet frame (see packet_framing.py).
         """
         if client_id not in self.connected_clients:
             logger.error(f"Received glyph from unknown or unregistered client: {client_id}. Discarding.")
             return
 
+        if is_frame(binary_data):
+            try:
+                packets = list(split_frame(binary_data))
+            except ValueError as e:
+                logger.error(f"Malformed NetHoloGlyph frame from {client_id}: {e}. Discarding.")
+                return
+            for packet in packets:
+                await self._process_packet(client_id, packet)
+            return
+        await self._process_packet(client_id, binary_data)
+
+    async def _process_packet(self, client_id: str, binary_data: Any):
+        """Handles one serialized NetHoloPacket (bytes or a zero-copy view into a frame)."""
         try:
             proto_packet = nethologlyph_pb2.NetHoloPacket()
             proto_packet.ParseFromString(binary_data)
-            logger.debug(f"Received NetHoloPacket from {client_id}. Packet ID: {proto_packet.header.packet_id}, Type: {proto_packet.WhichOneof('payload')}")
+            logger.debug(f"Received NetHoloPacket from {client_id}. Packet ID: {proto_packet.packet_id}, Type: {proto_packet.WhichOneof('payload')}")
 
             pydantic_payload: Optional[Any] = None
             payload_type_str = proto_packet.WhichOneof('payload')
 
-            # Convert Protobuf payload to the corresponding Pydantic model
-            if payload_type_str == "holographic_symbol":
-                pydantic_payload = from_protobuf(proto_packet.holographic_symbol, HolographicSymbolNetModel)
+            # Convert Protobuf payload to the corresponding Pydantic model (oneof names from definitions.proto)
+            if payload_type_str == "holo_symbol":
+                pydantic_payload = from_protobuf(proto_packet.holo_symbol, HolographicSymbolNetModel)
             elif payload_type_str == "gesture_chunk":
-                pydantic_payload = from_protobuf(proto_packet.gesture_chunk, GestureChunkNetModel)
-            elif payload_type_str == "tria_state_update": # Assuming TriaStateUpdate is a defined proto message
-                pydantic_payload = from_protobuf(proto_packet.tria_state_update, TriaStateUpdateNetModel)
+                # Landmarks become a zero-copy (N, 21, 3) float32 view into binary_data when the
+                # packed field can be located on the wire; otherwise the mapper copies them once.
+                landmarks = landmarks_from_packet(binary_data)
+                overrides = {"landmarks": landmarks} if landmarks is not None else None
+                pydantic_payload = from_protobuf(proto_packet.gesture_chunk, GestureChunkNetModel, overrides=overrides)
+            elif payload_type_str == "tria_state":
+                pydantic_payload = from_protobuf(proto_packet.tria_state, TriaStateUpdateNetModel)
+            elif payload_type_str == "scene_resync_request":
+                # Answered here from the scene store; nothing for the CoordinationService.
+                self._handle_scene_resync(client_id, proto_packet.scene_resync_request)
+                return
             # Add more elif blocks for other payload types defined in your .proto file
             # e.g., handshake_request, scene_update_request etc.
             else:
@@ -126,8 +338,8 @@ class NetHoloGlyphService:
                     payload=pydantic_payload.model_dump(), # Pydantic v2
                     # payload=pydantic_payload.dict(), # Pydantic v1
                     user_id=client_id, # Assuming client_id is the user_id for now
-                    session_id=proto_packet.header.session_id if proto_packet.header.HasField("session_id") else None, # If session_id is in header
-                    correlation_id=proto_packet.header.packet_id # Use packet_id for correlation
+                    session_id=None, # NetHoloPacket has no session field yet
+                    correlation_id=proto_packet.packet_id # Use packet_id for correlation
                 )
                 logger.debug(f"Dispatching InternalMessage for {payload_type_str} from {client_id} to CoordinationService.")
                 await self.coordination_service.handle_internal_message(internal_message)
@@ -138,24 +350,82 @@ class NetHoloGlyphService:
             logger.error(f"Error processing incoming glyph from {client_id}: {e}", exc_info=True)
             # Optionally, send an error packet back to the client
 
-    async def send_outgoing_glyph(self, internal_message: InternalMessage, target_client_id: Optional[str] = None):
+    def _backplane_envelope(self, internal_message: InternalMessage, target_client_id: Optional[str],
+                            topic: Optional[str]) -> bytes:
+        return json.dumps({
+            "origin": self.worker_id,
+            "target": target_client_id,
+            "topic": topic,
+            "message": internal_message.model_dump(mode="json"),
+        }, separators=(",", ":")).encode()
+
+    async def _on_backplane_message(self, channel: str, data: bytes):
+        envelope = json.loads(data)
+        if envelope.get("origin") == self.worker_id:
+            return  # Own broadcast, already delivered locally.
+        self.backplane_received += 1
+        internal_message = InternalMessage(**envelope["message"])
+        await self._deliver_locally(internal_message, envelope.get("target"), envelope.get("topic"))
+
+    async def send_outgoing_glyph(self, internal_message: InternalMessage, target_client_id: Optional[str] = None,
+                                  topic: Optional[str] = None):
         """
         Converts an InternalMessage to a NetHoloGlyph packet and sends it to clients.
+        With a backplane, clients held by other workers are reached too: a targeted message goes
+        only to the worker holding the client, other messages to every worker.
 
         Args:
             internal_message: The InternalMessage to send.
-            target_client_id: If specified, sends only to this client. Otherwise, broadcasts.
+            target_client_id: If specified, sends only to this client.
+            topic: Room to deliver to. If omitted, derived from payload["scene_id"] or the message's
+                session_id; messages with neither are broadcast to every client. Clients that have
+                not joined any room get room messages too, as before rooms existed.
         """
+        if target_client_id and target_client_id not in self.connected_clients and self.backplane is not None:
+            try:
+                worker_id = await self.backplane.lookup(target_client_id)
+                if worker_id is None:
+                    logger.warning(f"Target client {target_client_id} not connected to any worker.")
+                    return
+                await self.backplane.publish(worker_channel(worker_id), self._backplane_envelope(internal_message, target_client_id, topic))
+                self.backplane_forwarded += 1
+            except Exception as e:
+                logger.error(f"Failed to forward glyph for {target_client_id} over the backplane: {e!r}")
+            return
+        # Local clients first: a backplane outage must not cost them the message.
+        await self._deliver_locally(internal_message, target_client_id, topic)
+        if self.backplane is not None and not target_client_id:
+            # Scene updates are applied by every worker's scene store in arrival order, so a
+            # given scene's updates should come from a single worker.
+            try:
+                await self.backplane.publish(BROADCAST_CHANNEL, self._backplane_envelope(internal_message, None, topic))
+                self.backplane_forwarded += 1
+            except Exception as e:
+                logger.error(f"Failed to publish glyph to other workers: {e!r}")
+
+    async def send_outgoing_glyphs(self, internal_messages: Sequence[InternalMessage], topic: Optional[str] = None):
+        """Sends several non-targeted messages, forwarding them to other workers in one batch publish."""
+        for internal_message in internal_messages:
+            await self._deliver_locally(internal_message, None, topic)
+        if self.backplane is not None and internal_messages:
+            try:
+                await self.backplane.publish_batch([
+                    (BROADCAST_CHANNEL, self._backplane_envelope(internal_message, None, topic)) for internal_message in internal_messages
+                ])
+                self.backplane_forwarded += len(internal_messages)
+            except Exception as e:
+                logger.error(f"Failed to publish {len(internal_messages)} glyphs to other workers: {e!r}")
+
+    async def _deliver_locally(self, internal_message: InternalMessage, target_client_id: Optional[str] = None,
+                               topic: Optional[str] = None):
+        """Builds the packet and queues it for the matching clients connected to this worker."""
         try:
             proto_packet = nethologlyph_pb2.NetHoloPacket()
             
-            # Populate header
-            proto_packet.header.packet_id = str(internal_message.message_id) # Assuming message_id is UUID
-            proto_packet.header.timestamp.FromDatetime(internal_message.timestamp.replace(tzinfo=timezone.utc)) # Ensure datetime is offset-aware
-            proto_packet.header.source_id = internal_message.source_service # e.g., "TriaSystem" or specific bot
-            if target_client_id:
-                 proto_packet.header.target_id = target_client_id
-            # proto_packet.header.version = "0.1.0" # Set your protocol version
+            # Populate packet envelope fields
+            proto_packet.packet_id = str(internal_message.message_id) # Assuming message_id is UUID
+            proto_packet.timestamp.FromDatetime(internal_message.timestamp.replace(tzinfo=timezone.utc)) # Ensure datetime is offset-aware
+            proto_packet.source_id = internal_message.source_service # e.g., "TriaSystem" or specific bot
 
             # Determine payload type from internal_message.event_type or payload structure
             # This mapping needs to be robust.
@@ -163,20 +433,18 @@ class NetHoloGlyphService:
             
             payload_data = internal_message.payload
             pydantic_model_instance: Optional[Any] = None
-            proto_payload_instance: Optional[Any] = None
             oneof_field_name: Optional[str] = None
+            scene_delta: Optional[Any] = None
 
             # Example mapping from internal event_type or payload model type to Protobuf oneof field
             if internal_message.event_type == "holographic_symbol_update":
                 # Assume payload_data is a dict that can be parsed by InternalHolographicSymbol
                 pydantic_model_instance = InternalHolographicSymbol(**payload_data)
-                proto_payload_instance = to_protobuf(pydantic_model_instance, nethologlyph_pb2.HolographicSymbol)
-                oneof_field_name = "holographic_symbol"
+                oneof_field_name = "holo_symbol"
             elif internal_message.event_type == "tria_state_update_external":
                 # Assume payload_data is a dict for TriaStateUpdateNetModel
                 pydantic_model_instance = TriaStateUpdateNetModel(**payload_data) # Or your internal Pydantic model for Tria state
-                proto_payload_instance = to_protobuf(pydantic_model_instance, nethologlyph_pb2.TriaStateUpdate)
-                oneof_field_name = "tria_state_update"
+                oneof_field_name = "tria_state"
             # Add more elif blocks for other InternalMessage types and their corresponding Protobuf payloads
             # e.g., gesture recognition results from Tria to be sent to client
             elif internal_message.event_type == "gesture_sequence_processed":
@@ -185,44 +453,86 @@ class NetHoloGlyphService:
                 # This implies a conversion from InternalGestureSequence to GestureChunkNetModel or directly to proto.
                 # For simplicity, let's assume a direct mapping for now, or that payload is already GestureChunkNetModel compatible.
                 # If InternalGestureSequence maps directly to proto_packet.gesture_chunk fields:
-                proto_payload_instance = to_protobuf(pydantic_model_instance, nethologlyph_pb2.GestureChunk)
                 oneof_field_name = "gesture_chunk"
+            elif internal_message.event_type == "scene_update":
+                # Only what changed since the scene's last version is sent (see SceneStateStore).
+                scene_delta = self.scene_store.apply_update(SceneUpdatePayload(**payload_data))
+                if scene_delta is None:
+                    logger.debug(f"Scene update for {payload_data.get('scene_id')} changed nothing. Not sending.")
+                    return
+                oneof_field_name = "scene_delta"
 
             else:
                 logger.warning(f"No Protobuf mapping for InternalMessage event_type: {internal_message.event_type}. Cannot send.")
                 return
 
-            if proto_payload_instance and oneof_field_name:
-                getattr(proto_packet, oneof_field_name).CopyFrom(proto_payload_instance)
+            if scene_delta is not None:
+                proto_packet.scene_delta.CopyFrom(scene_delta)
+            elif pydantic_model_instance is not None and oneof_field_name:
+                # Written straight into the packet's oneof member, no intermediate message copy
+                fill_protobuf(pydantic_model_instance, getattr(proto_packet, oneof_field_name))
             else:
                 logger.error(f"Failed to create or assign Protobuf payload for event_type: {internal_message.event_type}")
                 return
 
+            # Serialize once; every recipient's writer task sends the same bytes object.
             binary_data_to_send = proto_packet.SerializeToString()
+            # Newer states of the same element may replace queued ones (coalesce_latest policy).
+            # Scene deltas are never coalesced: each one builds on the previous version.
+            coalesce_key = getattr(pydantic_model_instance, "element_id", None)
+            priority = oneof_field_name in PRIORITY_PAYLOADS
+            quantized_data: Optional[bytes] = None
+
+            def data_for(client_id: str) -> bytes:
+                # Clients that negotiated quantized transforms get the packed variant (serialized once).
+                nonlocal quantized_data
+                if scene_delta is None or not self._wants_quantized(client_id):
+                    return binary_data_to_send
+                if quantized_data is None:
+                    quantized_data = self._quantized_packet_bytes(proto_packet, scene_delta, binary_data_to_send)
+                return quantized_data
 
             if target_client_id:
-                if target_client_id in self.connected_clients:
-                    websocket = self.connected_clients[target_client_id]
-                    await websocket.send_bytes(binary_data_to_send) # Assuming FastAPI WebSocket or similar
-                    logger.debug(f"Sent NetHoloPacket (type: {oneof_field_name}) to client {target_client_id}. Packet ID: {proto_packet.header.packet_id}")
+                send_queue = self.send_queues.get(target_client_id)
+                if send_queue is not None:
+                    send_queue.enqueue(data_for(target_client_id), coalesce_key, priority)
+                    logger.debug(f"Queued NetHoloPacket (type: {oneof_field_name}) for client {target_client_id}. Packet ID: {proto_packet.packet_id}")
                 else:
                     logger.warning(f"Target client {target_client_id} not found for outgoing glyph.")
+                return
+
+            if topic is None:
+                if payload_data.get("scene_id"):
+                    topic = scene_topic(str(payload_data["scene_id"]))
+                elif internal_message.session_id:
+                    topic = session_topic(internal_message.session_id)
+
+            if topic is not None:
+                # O(subscribers): only the room's members (with a matching interest filter) are visited.
+                delivered = 0
+                for client_id in self.rooms.subscribers(topic, oneof_field_name):
+                    send_queue = self.send_queues.get(client_id)
+                    if send_queue is not None:
+                        send_queue.enqueue(data_for(client_id), coalesce_key, priority)
+                        delivered += 1
+                # Clients that never joined a room (no scene_ids in the handshake, no resync yet)
+                # keep receiving everything. Skipped entirely once every client has joined a room.
+                if self.rooms.client_count < len(self.send_queues):
+                    for client_id, send_queue in self.send_queues.items():
+                        if self.rooms.is_subscribed(client_id):
+                            continue
+                        send_queue.enqueue(data_for(client_id), coalesce_key, priority)
+                        delivered += 1
+                logger.debug(f"Published NetHoloPacket (type: {oneof_field_name}) to {delivered} subscribers of {topic}. Packet ID: {proto_packet.packet_id}")
             else: # Broadcast to all connected clients
-                if not self.connected_clients:
+                if not self.send_queues:
                     logger.info("No clients connected to broadcast NetHoloPacket.")
                     return
-                
-                logger.info(f"Broadcasting NetHoloPacket (type: {oneof_field_name}) to {len(self.connected_clients)} clients. Packet ID: {proto_packet.header.packet_id}")
-                # Use asyncio.gather for concurrent sending if websockets are truly independent
-                # For simplicity, iterating here.
-                for client_id, websocket in self.connected_clients.items():
-                    try:
-                        await websocket.send_bytes(binary_data_to_send)
-                        logger.debug(f"Broadcasted NetHoloPacket to client {client_id}.")
-                    except Exception as e_send:
-                        logger.error(f"Error sending broadcast to client {client_id}: {e_send}. Removing client.")
-                        # Consider unregistering client on send error after retries or based on error type
-                        # await self.unregister_client(client_id) # Be careful with modifying dict during iteration
+
+                logger.debug(f"Broadcasting NetHoloPacket (type: {oneof_field_name}) to {len(self.send_queues)} clients. Packet ID: {proto_packet.packet_id}")
+                # Non-blocking: a slow client only grows (and eventually trims) its own queue.
+                for client_id, send_queue in self.send_queues.items():
+                    send_queue.enqueue(data_for(client_id), coalesce_key, priority)
 
         except Exception as e:
             logger.error(f"Error preparing or sending outgoing glyph: {e}", exc_info=True)
\ No newline at end of file
@@ -0,0 +1,279 @@
+# backend/services/audio_analysis_pool.py
+"""
+Feature extraction for uploaded audio chunks in a process pool.
+
+`submit()` puts a chunk on a bounded queue and returns at once (False when the queue is full).
+`max_workers` consumers take jobs off the queue; each decodes the WAV/PCM stream in a thread
+straight into a `multiprocessing.shared_memory` block and hands only the block's name to a
+`ProcessPoolExecutor` worker (backend/utils/audio_features.analyse_shared_pcm), so the samples
+are never pickled. A source can also be a function opening the stream, e.g. reading the object
+back from R2; it is then opened in the decoding thread. Since a block exists only while its
+consumer waits for the worker, at most `max_workers` decoded chunks are held at a time, each
+capped at `max_seconds` of audio.
+
+Results (or the error) go through a write-behind sink (backend/services/learning_log_sink.py)
+and reach `audiovisual_gestural_chunks` in batches of one UPDATE ... FROM unnest(...); the chunk
+row must already exist (the upload endpoint inserts it before submitting).
+
+    get_audio_analysis_pool().submit(chunk_id, io.BytesIO(data), "audio/wav", len(data))
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+from uuid import UUID
+
+import numpy as np
+
+from backend.core.models.multimodal_models import AudioChunkFeaturesUpdate
+from backend.services.learning_log_sink import WriteBehindSink
+from backend.utils.audio_features import analyse_shared_pcm
+from backend.utils.env import env_number
+from backend.utils.pcm_reader import WAV_CONTENT_TYPES, open_pcm
+
+logger = logging.getLogger(__name__)
+
+STATUS_EXTRACTED = "features_extracted"
+STATUS_FAILED = "features_failed"
+# application/octet-stream is left out on purpose: chunks of that type are as often video as raw PCM.
+ANALYSABLE_CONTENT_TYPES = WAV_CONTENT_TYPES | {"audio/pcm", "audio/l16", "audio/x-raw"}
+READ_BLOCK_SAMPLES = 65536
+
+# A binary stream, or a function opening one in the decoding thread (e.g. an R2 `get_object` body).
+PcmSource = Union[BinaryIO, Callable[[], BinaryIO]]
+
+
+def can_analyse(content_type: Optional[str]) -> bool:
+    return (content_type or "").split(";")[0].strip().lower() in ANALYSABLE_CONTENT_TYPES
+
+
+def load_shared_pcm(fileobj: BinaryIO, content_type: Optional[str] = None, total_bytes: Optional[int] = None,
+                    max_seconds: Optional[float] = None) -> Tuple[shared_memory.SharedMemory, Tuple[int, int], int, bool]:
+    """
+    Decodes a WAV/PCM stream into a new shared memory block holding float32 (2, n) samples.
+    Returns (block, shape, sample_rate, truncated); the caller closes and unlinks the block.
+    """
+    reader = open_pcm(fileobj, content_type, total_bytes=total_bytes)
+    max_samples = int(max_seconds * reader.sample_rate) if max_seconds else None
+    limit = reader.total_samples
+    if limit is None:  # unknown length: collect the blocks first, then copy them over once
+        pieces, count = [], 0
+        for piece in reader.blocks(READ_BLOCK_SAMPLES):
+            pieces.append(piece)
+            count += piece.shape[1]
+            if max_samples is not None and count > max_samples:
+                break
+        limit = count
+    truncated = max_samples is not None and limit > max_samples
+    if truncated:
+        limit = max_samples
+    if limit <= 0:
+        raise ValueError("Audio stream contains no samples.")
+
+    block = shared_memory.SharedMemory(create=True, size=2 * limit * 4)
+    try:
+        pcm = np.ndarray((2, limit), dtype=np.float32, buffer=block.buf)
+        filled = 0
+        source = pieces if reader.total_samples is None else reader.blocks(READ_BLOCK_SAMPLES)
+        for piece in source:
+            take = min(piece.shape[1], limit - filled)
+            pcm[:, filled:filled + take] = piece[:, :take]
+            filled += take
+            if filled >= limit:
+                break
+        del pcm
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    # A WAV header may promise more samples than the body holds; the worker only sees what arrived.
+    return block, (2, filled), reader.sample_rate, truncated
+
+
+def _load_source(source: PcmSource, content_type: Optional[str], total_bytes: Optional[int],
+                 max_seconds: Optional[float]):
+    if not callable(source):
+        return load_shared_pcm(source, content_type, total_bytes, max_seconds)
+    fileobj = source()
+    try:
+        return load_shared_pcm(fileobj, content_type, total_bytes, max_seconds)
+    finally:
+        fileobj.close()
+
+
+def _release_decoded(decode: "asyncio.Future") -> None:
+    if not decode.cancelled() and decode.exception() is None:
+        block = decode.result()[0]
+        block.close()
+        block.unlink()
+
+
+class AudioAnalysisPool:
+    """
+    Args:
+        sink: Write-behind sink for the results; None keeps them out of the database (analyse() still works).
+        max_workers: Worker processes, and chunks decoded at the same time.
+        max_pending: Chunks waiting in the queue; `submit()` rejects new chunks beyond it.
+        job_timeout: Seconds a chunk may spend decoding and in the worker.
+        max_seconds: Audio analysed per chunk; longer chunks are truncated.
+        chunk_size: CWT chunk size for the `cwt` summary.
+        max_cwt_frames: CWT frames sampled per chunk.
+        start_method: multiprocessing start method of the worker processes.
+    """
+
+    def __init__(self, sink: Optional[WriteBehindSink] = None, max_workers: int = 2, max_pending: int = 64,
+                 job_timeout: float = 120.0, max_seconds: float = 600.0, chunk_size: int = 1024,
+                 max_cwt_frames: int = 64, start_method: str = "spawn"):
+        self.sink = sink
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.job_timeout = job_timeout
+        self.max_seconds = max_seconds
+        self.chunk_size = chunk_size
+        self.max_cwt_frames = max_cwt_frames
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumers: List[asyncio.Task] = []
+        self._closing = False
+        self.metrics = {"submitted": 0, "completed": 0, "failed": 0, "timed_out": 0, "rejected": 0, "shared_bytes": 0}
+
+    def _ensure_started(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context(self.start_method))
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._consumers = [asyncio.ensure_future(self._consume()) for _ in range(self.max_workers)]
+
+    async def analyse(self, source: PcmSource, content_type: Optional[str] = None,
+                      total_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """Features of one WAV/PCM stream, computed in the process pool (no queueing, no write-back)."""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        decode = asyncio.ensure_future(asyncio.to_thread(
+            _load_source, source, content_type, total_bytes, self.max_seconds))
+        try:
+            block, shape, sample_rate, truncated = await asyncio.shield(decode)
+        except asyncio.CancelledError:
+            decode.add_done_callback(_release_decoded)  # the thread cannot be stopped; free its block once it is done
+            raise
+        try:
+            self.metrics["shared_bytes"] += shape[1] * 8
+            features = await loop.run_in_executor(self._executor, functools.partial(
+                analyse_shared_pcm, block.name, shape, sample_rate, self.chunk_size, self.max_cwt_frames))
+        finally:
+            # Normally the worker has detached by now. After a timeout it may still be attached; unlinking
+            # only drops the name then, and the memory goes away when the worker lets go of it.
+            block.close()
+            block.unlink()
+        features["truncated"] = truncated
+        return features
+
+    def submit(self, chunk_id: UUID, source: PcmSource, content_type: Optional[str] = None,
+               total_bytes: Optional[int] = None) -> bool:
+        """Queues a chunk for analysis and write-back. Returns False if the chunk was rejected."""
+        if self._closing:
+            self.metrics["rejected"] += 1
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((chunk_id, source, content_type, total_bytes))
+        except asyncio.QueueFull:
+            self.metrics["rejected"] += 1
+            logger.warning(f"AudioAnalysisPool: queue full ({self.max_pending}); chunk {chunk_id} is not analysed.")
+            return False
+        self.metrics["submitted"] += 1
+        return True
+
+    async def _consume(self) -> None:
+        while True:
+            chunk_id, source, content_type, total_bytes = await self._queue.get()
+            try:
+                update = await self._analyse_chunk(chunk_id, source, content_type, total_bytes)
+                if self.sink is not None:
+                    self.sink.add(update)
+            except Exception as e:
+                logger.error(f"AudioAnalysisPool: unexpected error for chunk {chunk_id}: {e}", exc_info=True)
+            finally:
+                if not callable(source):
+                    source.close()
+                self._queue.task_done()
+
+    async def _analyse_chunk(self, chunk_id: UUID, source: PcmSource, content_type: Optional[str],
+                             total_bytes: Optional[int]) -> AudioChunkFeaturesUpdate:
+        try:
+            features = await asyncio.wait_for(self.analyse(source, content_type, total_bytes), self.job_timeout)
+        except asyncio.TimeoutError:
+            self.metrics["timed_out"] += 1
+            logger.warning(f"AudioAnalysisPool: chunk {chunk_id} timed out after {self.job_timeout}s.")
+            return AudioChunkFeaturesUpdate(chunk_id=chunk_id, tria_processing_status=STATUS_FAILED,
+                                            tria_extracted_features_json={"error": "timeout"})
+        except Exception as e:
+            self.metrics["failed"] += 1
+            logger.warning(f"AudioAnalysisPool: chunk {chunk_id} could not be analysed: {type(e).__name__}: {e}")
+            return AudioChunkFeaturesUpdate(chunk_id=chunk_id, tria_processing_status=STATUS_FAILED,
+                                            tria_extracted_features_json={"error": f"{type(e).__name__}: {e}"})
+        self.metrics["completed"] += 1
+        return AudioChunkFeaturesUpdate(chunk_id=chunk_id, tria_processing_status=STATUS_EXTRACTED,
+                                        tria_extracted_features_json=features,
+                                        duration_seconds=None if features["truncated"] else features["duration_seconds"])
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """Stops accepting chunks, finishes the queued ones (up to `timeout`), then flushes the results."""
+        self._closing = True
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"AudioAnalysisPool: {self.backlog} chunk(s) left unanalysed at shutdown.")
+            for consumer in self._consumers:
+                consumer.cancel()
+            await asyncio.gather(*self._consumers, return_exceptions=True)
+            self._consumers, self._queue = [], None
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+        if self.sink is not None:
+            await self.sink.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {**self.metrics, "backlog": self.backlog, "workers": self.max_workers}
+        if self.sink is not None:
+            stats["sink"] = self.sink.stats()
+        return stats
+
+
+async def _write_features_batch(updates: List[AudioChunkFeaturesUpdate]) -> None:
+    # Поздние импорты: пул создается при старте приложения
+    from backend.core.db.pg_connector import get_db_pool
+    from backend.repositories.chunk_repository import ChunkRepository
+    await ChunkRepository(await get_db_pool()).update_extracted_features(updates)
+
+
+audio_analysis_pool = AudioAnalysisPool(
+    sink=WriteBehindSink(
+        _write_features_batch,
+        AudioChunkFeaturesUpdate,
+        max_batch_size=int(env_number("AUDIO_ANALYSIS_BATCH_SIZE", 100)),
+        flush_interval=env_number("AUDIO_ANALYSIS_FLUSH_INTERVAL_MS", 2000.0) / 1000.0,
+        spill_path=os.environ.get("AUDIO_ANALYSIS_SPILL_PATH", os.path.join(tempfile.gettempdir(), "audio_chunk_features.spill.jsonl")) or None,
+    ),
+    max_workers=int(env_number("AUDIO_ANALYSIS_WORKERS", 2)),
+    max_pending=int(env_number("AUDIO_ANALYSIS_MAX_PENDING", 64)),
+    job_timeout=env_number("AUDIO_ANALYSIS_TIMEOUT", 120.0),
+    max_seconds=env_number("AUDIO_ANALYSIS_MAX_SECONDS", 600.0),
+    start_method=os.environ.get("AUDIO_ANALYSIS_START_METHOD", "spawn"),
+)
+
+
+def get_audio_analysis_pool() -> AudioAnalysisPool:
+    return audio_analysis_pool
@@ -0,0 +1,155 @@
+# backend/services/background_tasks.py
+"""
+Bounded executor for fire-and-forget work (learning-bot analysis, presence cleanup, ...).
+
+Jobs are queued by priority (lower runs first, FIFO within a priority) and run by at most
+`max_concurrency` workers, each with a timeout. The runner keeps a reference to every job
+until it finishes, so nothing is garbage-collected mid-flight, and `shutdown()` drains the
+backlog (up to a deadline) when the application stops.
+
+    get_background_runner().submit(bot.process_interaction_for_learning, data)
+"""
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from backend.utils.env import env_number
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+JobFn = Callable[..., Awaitable[Any]]
+
+
+class _Job:
+    __slots__ = ("fn", "args", "kwargs", "name", "timeout", "enqueued_at")
+
+    def __init__(self, fn: JobFn, args: tuple, kwargs: dict, name: str, timeout: Optional[float]):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.name = name
+        self.timeout = timeout
+        self.enqueued_at = time.monotonic()
+
+
+class BackgroundTaskRunner:
+    """
+    Args:
+        max_concurrency: Jobs running at the same time.
+        max_backlog: Jobs waiting to run; `submit()` rejects new jobs beyond it.
+        default_timeout: Seconds a job may run before it is cancelled (None - no limit).
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_backlog: int = 1000, default_timeout: Optional[float] = 30.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_backlog = max_backlog
+        self.default_timeout = default_timeout
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._closing = False
+        self.running = 0
+        self.metrics = {"submitted": 0, "completed": 0, "failed": 0, "timed_out": 0, "rejected": 0,
+                        "lag_total_ms": 0.0, "lag_max_ms": 0.0}
+
+    def submit(self, fn: JobFn, *args, priority: int = PRIORITY_NORMAL, timeout: Optional[float] = None,
+               name: Optional[str] = None, **kwargs) -> bool:
+        """
+        Queues `fn(*args, **kwargs)` (an async callable, not a coroutine object, so a rejected job
+        never leaves an un-awaited coroutine behind). Returns False if the job was rejected.
+        """
+        name = name or getattr(fn, "__qualname__", repr(fn))
+        if self._closing or self.backlog >= self.max_backlog:
+            self.metrics["rejected"] += 1
+            logger.warning(f"BackgroundTaskRunner: rejected job {name} (backlog {self.backlog}, closing={self._closing}).")
+            return False
+        self._ensure_started()
+        job = _Job(fn, args, kwargs, name, timeout if timeout is not None else self.default_timeout)
+        self._queue.put_nowait((priority, next(self._sequence), job))
+        self.metrics["submitted"] += 1
+        return True
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_started(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker(), name=f"background-task-worker-{i}")
+                             for i in range(self.max_concurrency)]
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            lag_ms = (time.monotonic() - job.enqueued_at) * 1000.0
+            self.metrics["lag_total_ms"] += lag_ms
+            self.metrics["lag_max_ms"] = max(self.metrics["lag_max_ms"], lag_ms)
+            self.running += 1
+            try:
+                await asyncio.wait_for(job.fn(*job.args, **job.kwargs), timeout=job.timeout)
+                self.metrics["completed"] += 1
+            except asyncio.TimeoutError:
+                self.metrics["timed_out"] += 1
+                logger.error(f"BackgroundTaskRunner: job {job.name} timed out after {job.timeout}s.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics["failed"] += 1
+                logger.error(f"BackgroundTaskRunner: job {job.name} failed: {e}", exc_info=True)
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    async def drain(self) -> None:
+        """Waits until every queued job has finished."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def shutdown(self, timeout: float = 10.0) -> None:
+        """Stops accepting jobs, runs the backlog for up to `timeout` seconds, then cancels the rest."""
+        self._closing = True
+        try:
+            await asyncio.wait_for(self.drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"BackgroundTaskRunner: {self.backlog} queued and {self.running} running job(s) "
+                           f"cancelled after {timeout}s shutdown deadline.")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._closing = False
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.metrics["completed"] + self.metrics["failed"] + self.metrics["timed_out"]
+        started = finished + self.running
+        return {
+            "backlog": self.backlog,
+            "running": self.running,
+            "submitted": self.metrics["submitted"],
+            "completed": self.metrics["completed"],
+            "failed": self.metrics["failed"],
+            "timed_out": self.metrics["timed_out"],
+            "rejected": self.metrics["rejected"],
+            "lag_avg_ms": self.metrics["lag_total_ms"] / started if started else 0.0,
+            "lag_max_ms": self.metrics["lag_max_ms"],
+        }
+
+
+background_runner = BackgroundTaskRunner(
+    max_concurrency=int(env_number("BACKGROUND_TASKS_CONCURRENCY", 4)),
+    max_backlog=int(env_number("BACKGROUND_TASKS_MAX_BACKLOG", 1000)),
+    default_timeout=env_number("BACKGROUND_TASKS_TIMEOUT", 30.0) or None,
+)
+
+
+def get_background_runner() -> BackgroundTaskRunner:
+    return background_runner
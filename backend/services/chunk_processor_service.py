@@ -1,9 +1,11 @@
 from typing import Optional, List, Dict, Any
+from datetime import datetime
 import asyncpg
 
 from backend.core import crud_operations
 from backend.core.models.interaction_chunk_model import InteractionChunkCreate, InteractionChunkDB
 from backend.core.models.hologram_embedding_models import HologramSemanticEmbedding # Import the new model
+from backend.services.embedding_batcher import get_embedding_batcher
 
 # Assuming these would be initialized elsewhere and passed (e.g., via dependency injection)
 # For now, just a placeholder for dependencies like LLM client for embedding generation.
@@ -42,6 +44,13 @@ async def process_new_chunk_and_generate_embedding(
     
     # Placeholder for a generated embedding vector and metadata
     simulated_embedding_vector = [0.0] * 768  # Assuming 768 dimensions for text-embedding-004
+    chunk_text = chunk_create_data.speech_transcription_client or chunk_create_data.user_feedback_text
+    if chunk_text:
+        # Goes through the shared batcher so chunks arriving together share one embeddings request.
+        try:
+            simulated_embedding_vector = await get_embedding_batcher().embed(chunk_text, task_type="RETRIEVAL_DOCUMENT")
+        except Exception as e:
+            print(f"[CHUNK PROCESSOR WARNING] Embedding generation failed, using placeholder vector: {e}")
     simulated_semantic_type = "interaction_summary"
     simulated_gesture_affordances = {"movable": True} # Placeholder
     simulated_vector_operators = {"rotate_perspective": {"axis": "y"}} # Placeholder
@@ -0,0 +1,212 @@
+# backend/services/client_send_queue.py
+"""
+Per-client outgoing queue for NetHoloGlyph WebSocket connections.
+
+Each connected client gets a bounded queue of already-serialized packets and one writer task
+that drains it, so a slow client only delays itself. When a queue is full the oldest packet is
+dropped; with the `coalesce_latest` policy a packet that carries a newer state of an element
+already waiting in the queue replaces it in place instead. A client whose send fails or times
+out is reported through `on_dead` so the owner can evict it.
+
+With a `flush_interval` (clients that negotiated packet framing) the writer sends at most once
+per tick: everything queued by then goes out as one multi-packet frame
+(backend/utils/packet_framing.py). Priority packets skip the tick and are sent on their own.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from backend.utils.packet_framing import encode_frame, framed_size
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+COALESCE_LATEST = "coalesce_latest"
+DROP_POLICIES = (DROP_OLDEST, COALESCE_LATEST)
+
+
+class ClientSendQueue:
+    """
+    Args:
+        client_id: Identifier used in logs and passed to `on_dead`.
+        websocket: Object with an async `send_bytes(bytes)` method.
+        max_size: Maximum packets waiting to be sent.
+        drop_policy: DROP_OLDEST or COALESCE_LATEST.
+        send_timeout: Seconds a single send may take before the client is considered dead.
+        on_dead: Callback `(client_id) -> None` invoked once when the writer gives up.
+        flush_interval: Seconds between batched sends (0 = one WebSocket message per packet).
+        max_frame_bytes: Upper bound for one batched frame; the rest waits for the next tick.
+    """
+
+    def __init__(self, client_id: str, websocket: Any, max_size: int = 256, drop_policy: str = DROP_OLDEST,
+                 send_timeout: float = 5.0, on_dead: Optional[Callable[[str], None]] = None,
+                 flush_interval: float = 0.0, max_frame_bytes: int = 65536):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}'. Expected one of {DROP_POLICIES}.")
+        self.client_id = client_id
+        self.websocket = websocket
+        self.max_size = max_size
+        self.drop_policy = drop_policy
+        self.send_timeout = send_timeout
+        self.on_dead = on_dead
+        self.flush_interval = flush_interval
+        self.max_frame_bytes = max_frame_bytes
+
+        # Entries are [coalesce_key, data]; lists so a coalesced update can swap data in place.
+        self._entries: Deque[List[Any]] = deque()
+        self._by_key: Dict[str, List[Any]] = {}
+        self._priority: Deque[bytes] = deque()
+        self._ready = asyncio.Event()
+        self._urgent = asyncio.Event()  # wakes a writer waiting for the tick
+        self._next_flush = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+
+        self.sent = 0  # packets
+        self.messages_sent = 0  # WebSocket messages (a frame counts once)
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.last_send_latency = 0.0
+        self.avg_send_latency = 0.0  # EWMA, seconds
+        self.max_send_latency = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._priority)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"nethologlyph-writer-{self.client_id}")
+
+    def enqueue(self, data: bytes, coalesce_key: Optional[str] = None, priority: bool = False) -> bool:
+        """
+        Queues a packet without blocking. Returns False if the queue is closed.
+        Priority packets are sent before anything else and never wait for a tick.
+        """
+        if self.closed:
+            return False
+        if priority:
+            if len(self._priority) >= self.max_size:
+                self._priority.popleft()
+                self.dropped += 1
+            self._priority.append(data)
+            self._ready.set()
+            self._urgent.set()
+            return True
+        if self.drop_policy == COALESCE_LATEST and coalesce_key is not None:
+            entry = self._by_key.get(coalesce_key)
+            if entry is not None:
+                entry[1] = data
+                self.coalesced += 1
+                return True
+        if len(self._entries) >= self.max_size:
+            oldest = self._entries.popleft()
+            if oldest[0] is not None and self._by_key.get(oldest[0]) is oldest:
+                del self._by_key[oldest[0]]
+            self.dropped += 1
+        entry = [coalesce_key, data]
+        self._entries.append(entry)
+        if coalesce_key is not None and self.drop_policy == COALESCE_LATEST:
+            self._by_key[coalesce_key] = entry
+        self.max_depth = max(self.max_depth, len(self._entries))
+        self._ready.set()
+        return True
+
+    def _pop_entry(self) -> bytes:
+        entry = self._entries.popleft()
+        key, data = entry
+        if key is not None and self._by_key.get(key) is entry:
+            del self._by_key[key]
+        return data
+
+    def _take_batch(self) -> List[bytes]:
+        """Oldest queued packets that fit in one frame (always at least one)."""
+        batch = [self._pop_entry()]
+        size = framed_size([len(batch[0])])
+        while self._entries and size + 4 + len(self._entries[0][1]) <= self.max_frame_bytes:
+            data = self._pop_entry()
+            batch.append(data)
+            size += 4 + len(data)
+        return batch
+
+    async def _wait_for_tick(self) -> None:
+        """Sleeps until the next flush tick, or until a priority packet arrives."""
+        loop = asyncio.get_running_loop()
+        delay = self._next_flush - loop.time()
+        if delay > 0 and not self._priority:
+            self._urgent.clear()
+            try:
+                await asyncio.wait_for(self._urgent.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send(self, data: bytes, packets: int = 1) -> None:
+        started = time.perf_counter()
+        await asyncio.wait_for(self.websocket.send_bytes(data), timeout=self.send_timeout)
+        latency = time.perf_counter() - started
+        self.messages_sent += 1
+        self.sent += packets
+        self.last_send_latency = latency
+        self.avg_send_latency = latency if self.messages_sent == 1 else 0.9 * self.avg_send_latency + 0.1 * latency
+        self.max_send_latency = max(self.max_send_latency, latency)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while not self.closed:
+                if self._priority:
+                    await self._send(self._priority.popleft())
+                    continue
+                if not self._entries:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                if self.flush_interval <= 0:
+                    await self._send(self._pop_entry())
+                    continue
+                await self._wait_for_tick()
+                if self._priority or not self._entries:
+                    continue
+                now = loop.time()
+                # Keep ticks on a fixed grid; after an idle gap the first batch goes out at once.
+                self._next_flush = self._next_flush + self.flush_interval if self._next_flush + self.flush_interval > now else now + self.flush_interval
+                batch = self._take_batch()
+                await self._send(encode_frame(batch) if len(batch) > 1 else batch[0], len(batch))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Send to NetHoloGlyph client {self.client_id} failed ({type(e).__name__}: {e}). Evicting.")
+            self.closed = True
+            self._entries.clear()
+            self._by_key.clear()
+            self._priority.clear()
+            if self.on_dead is not None:
+                self.on_dead(self.client_id)
+
+    async def close(self) -> None:
+        self.closed = True
+        self._entries.clear()
+        self._by_key.clear()
+        self._priority.clear()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self._entries),
+            "priority_depth": len(self._priority),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "messages_sent": self.messages_sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "avg_send_latency_ms": round(self.avg_send_latency * 1000, 3),
+            "max_send_latency_ms": round(self.max_send_latency * 1000, 3),
+        }
@@ -0,0 +1,179 @@
+# backend/services/embedding_batcher.py
+"""
+Micro-batching client for the Google embeddings API.
+
+Concurrent `embed()` calls for the same (model, task_type) are collected for a short window
+(or until `max_batch_size` texts are queued) and sent as one `batch_embed_contents` request;
+each caller gets its own vector back. The number of queued texts and of batch requests on the
+wire are both bounded, and failed batches are retried with exponential backoff and full jitter.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import random
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.utils.env import env_number
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "models/text-embedding-004"
+GOOGLE_EMBEDDING_MAX_BATCH_SIZE = 100  # Лимит batch_embed_contents
+
+BatchEmbedFn = Callable[[List[str], str, str], Awaitable[List[List[float]]]]
+BatchKey = Tuple[str, str]
+
+
+async def genai_embed_batch(texts: List[str], model: str, task_type: str) -> List[List[float]]:
+    """One `batch_embed_contents` round-trip for a list of texts."""
+    import google.generativeai as genai  # Поздний импорт, как в EmbeddingRepository
+    result = await genai.embed_content_async(model=model, content=texts, task_type=task_type)
+    return result['embedding']
+
+
+class FakeEmbedder:
+    """
+    Deterministic offline embedder for tests and local runs: the same text always maps to
+    the same unit vector. Records the size of every batch it receives.
+    """
+
+    def __init__(self, dimension: int = 768, latency_seconds: float = 0.0, fail_times: int = 0):
+        self.dimension = dimension
+        self.latency_seconds = latency_seconds
+        self.fail_times = fail_times
+        self.batch_sizes: List[int] = []
+
+    def vector_for(self, text: str, model: str = DEFAULT_EMBEDDING_MODEL, task_type: str = "RETRIEVAL_QUERY") -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(f"{model}|{task_type}|{text}".encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimension)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    async def __call__(self, texts: List[str], model: str, task_type: str) -> List[List[float]]:
+        self.batch_sizes.append(len(texts))
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise ConnectionError("FakeEmbedder: simulated transient failure")
+        return [self.vector_for(text, model, task_type) for text in texts]
+
+
+class EmbeddingBatcher:
+    """
+    Args:
+        embed_batch: Coroutine `(texts, model, task_type) -> vectors` doing one batch request.
+        window_ms: How long the first queued text waits for companions before the batch is sent.
+        max_batch_size: A batch is sent immediately once this many distinct texts are queued.
+        max_in_flight: Maximum concurrent batch requests.
+        max_pending: Maximum queued + in-flight texts; further `embed()` calls wait (backpressure).
+        max_retries: Retries per batch after the first attempt.
+        retry_base_delay: Base of the exponential backoff, in seconds.
+    """
+
+    def __init__(self, embed_batch: BatchEmbedFn = genai_embed_batch, window_ms: float = 5.0,
+                 max_batch_size: int = GOOGLE_EMBEDDING_MAX_BATCH_SIZE, max_in_flight: int = 4,
+                 max_pending: int = 1000, max_retries: int = 3, retry_base_delay: float = 0.2):
+        self.embed_batch = embed_batch
+        self.window_seconds = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._pending_slots = asyncio.Semaphore(max_pending)
+        # Per (model, task_type): text -> future shared by every caller asking for that text.
+        self._queues: Dict[BatchKey, Dict[str, asyncio.Future]] = {}
+        self._timers: Dict[BatchKey, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+        self.metrics = {"requests": 0, "batches": 0, "texts_sent": 0, "retries": 0, "failed_batches": 0}
+
+    async def embed(self, text: str, model: str = DEFAULT_EMBEDDING_MODEL, task_type: str = "RETRIEVAL_QUERY") -> List[float]:
+        """Embeds one text as part of the next batch. Signature matches `EmbeddingCache.compute`."""
+        self.metrics["requests"] += 1
+        await self._pending_slots.acquire()
+        try:
+            key = (model, task_type)
+            queue = self._queues.setdefault(key, {})
+            future = queue.get(text)
+            if future is None:
+                future = asyncio.get_running_loop().create_future()
+                queue[text] = future
+                if len(queue) >= self.max_batch_size:
+                    self._flush(key)
+                elif key not in self._timers:
+                    self._timers[key] = asyncio.get_running_loop().call_later(self.window_seconds, self._flush, key)
+            return await asyncio.shield(future)
+        finally:
+            self._pending_slots.release()
+
+    async def embed_many(self, texts: Sequence[str], model: str = DEFAULT_EMBEDDING_MODEL,
+                         task_type: str = "RETRIEVAL_DOCUMENT") -> List[List[float]]:
+        return list(await asyncio.gather(*(self.embed(text, model, task_type) for text in texts)))
+
+    def _flush(self, key: BatchKey) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        queue = self._queues.pop(key, None)
+        if not queue:
+            return
+        task = asyncio.ensure_future(self._send(key, queue))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, key: BatchKey, queue: Dict[str, asyncio.Future]) -> None:
+        model, task_type = key
+        texts = list(queue)
+        attempt = 0
+        async with self._in_flight:
+            while True:
+                try:
+                    vectors = await self.embed_batch(texts, model, task_type)
+                    if len(vectors) != len(texts):
+                        raise ValueError(f"Embedding batch returned {len(vectors)} vectors for {len(texts)} texts.")
+                    break
+                except Exception as e:
+                    if attempt >= self.max_retries:
+                        self.metrics["failed_batches"] += 1
+                        logger.error(f"EmbeddingBatcher: batch of {len(texts)} failed after {attempt + 1} attempts: {e}")
+                        for future in queue.values():
+                            if not future.done():
+                                future.set_exception(e)
+                        return
+                    delay = random.uniform(0, self.retry_base_delay * (2 ** attempt))
+                    attempt += 1
+                    self.metrics["retries"] += 1
+                    logger.warning(f"EmbeddingBatcher: batch failed ({e}); retry {attempt}/{self.max_retries} in {delay:.3f}s.")
+                    await asyncio.sleep(delay)
+        self.metrics["batches"] += 1
+        self.metrics["texts_sent"] += len(texts)
+        for text, vector in zip(texts, vectors):
+            future = queue[text]
+            if not future.done():
+                future.set_result(list(vector))
+
+    async def close(self) -> None:
+        """Sends whatever is queued and waits for in-flight batches."""
+        for key in list(self._queues):
+            self._flush(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self.metrics)
+        stats["queued"] = sum(len(queue) for queue in self._queues.values())
+        return stats
+
+
+embedding_batcher = EmbeddingBatcher(
+    embed_batch=FakeEmbedder() if os.environ.get("EMBEDDING_BACKEND") == "fake" else genai_embed_batch,
+    window_ms=env_number("EMBEDDING_BATCH_WINDOW_MS", 5.0),
+    max_batch_size=int(env_number("EMBEDDING_BATCH_MAX_SIZE", GOOGLE_EMBEDDING_MAX_BATCH_SIZE)),
+    max_in_flight=int(env_number("EMBEDDING_BATCH_MAX_IN_FLIGHT", 4)),
+)
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    return embedding_batcher
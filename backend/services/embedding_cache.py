@@ -0,0 +1,184 @@
+# backend/services/embedding_cache.py
+"""
+Cache for query embeddings produced by `genai.embed_content_async`.
+
+Entries are keyed by (model, task_type, normalized text). A bounded in-memory LRU serves
+repeated queries (MemoryBot asks for the same document name over and over); an optional
+SQLite file keeps them across restarts. Concurrent requests for the same key share a single
+outbound call, so a burst of identical gesture intents costs one embedding request.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.services.embedding_batcher import get_embedding_batcher
+from backend.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "models/text-embedding-004"
+
+CacheKey = Tuple[str, str, str]
+ComputeFn = Callable[[str, str, str], Awaitable[List[float]]]
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC plus whitespace collapsing; case is preserved because it changes embeddings."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+async def genai_embed(text: str, model: str, task_type: str) -> List[float]:
+    """Direct call to the Google AI embedding endpoint (no caching)."""
+    import google.generativeai as genai  # Поздний импорт, как в EmbeddingRepository
+    result = await genai.embed_content_async(model=model, content=text, task_type=task_type)
+    return result['embedding']
+
+
+class _SqliteTier:
+    """On-disk tier: one row per key with the vector stored as a float32 blob."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_embeddings ("
+            " model TEXT NOT NULL, task_type TEXT NOT NULL, text TEXT NOT NULL, vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, task_type, text))"
+        )
+        self._conn.commit()
+
+    def get(self, key: CacheKey) -> Optional[List[float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM query_embeddings WHERE model = ? AND task_type = ? AND text = ?", key
+            ).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+    def put(self, key: CacheKey, vector: List[float]) -> None:
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_embeddings (model, task_type, text, vector) VALUES (?, ?, ?, ?)",
+                (*key, blob),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache with single-flight request coalescing.
+
+    Args:
+        compute: Coroutine `(text, model, task_type) -> vector` called on a miss.
+        max_entries: Size of the in-memory LRU.
+        sqlite_path: Optional path of the on-disk tier.
+    """
+
+    def __init__(self, compute: ComputeFn = genai_embed, max_entries: int = 4096, sqlite_path: Optional[str] = None):
+        self.compute = compute
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[CacheKey, List[float]]" = OrderedDict()
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+        self._disk: Optional[_SqliteTier] = None
+        if sqlite_path:
+            try:
+                self._disk = _SqliteTier(sqlite_path)
+            except sqlite3.Error as e:
+                logger.error(f"EmbeddingCache: cannot open SQLite tier at {sqlite_path}: {e}. Using memory only.")
+        self.metrics = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def _remember(self, key: CacheKey, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get_embedding(self, text: str, model: str = DEFAULT_EMBEDDING_MODEL,
+                            task_type: str = "RETRIEVAL_QUERY") -> List[float]:
+        """Returns a copy of the cached vector, computing it once if needed. Errors propagate."""
+        key = (model, task_type, normalize_text(text))
+
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.metrics["memory_hits"] += 1
+            return list(vector)
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.metrics["coalesced"] += 1
+        else:
+            # The load runs as its own task so a cancelled caller does not cancel it for the others.
+            task = asyncio.ensure_future(self._load(key))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish_load(key, done))
+        return list(await asyncio.shield(task))
+
+    def _finish_load(self, key: CacheKey, task: asyncio.Future) -> None:
+        self._in_flight.pop(key, None)
+        # If every waiter was cancelled nobody awaits the task; retrieve its error here so it
+        # is logged once instead of as "Task exception was never retrieved".
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"EmbeddingCache: load for model {key[0]} failed: {task.exception()}")
+
+    async def _load(self, key: CacheKey) -> List[float]:
+        model, task_type, text = key
+        try:
+            vector = None
+            if self._disk is not None:
+                vector = await asyncio.to_thread(self._disk.get, key)
+                if vector is not None:
+                    self.metrics["disk_hits"] += 1
+            if vector is None:
+                self.metrics["misses"] += 1
+                vector = list(await self.compute(text, model, task_type))
+                if self._disk is not None:
+                    try:
+                        await asyncio.to_thread(self._disk.put, key, vector)
+                    except sqlite3.Error as e:
+                        logger.warning(f"EmbeddingCache: failed to persist embedding: {e}")
+        except Exception:
+            self.metrics["errors"] += 1
+            raise
+        self._remember(key, vector)
+        return vector
+
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self.metrics)
+        stats["memory_entries"] = len(self._memory)
+        stats["in_flight"] = len(self._in_flight)
+        return stats
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+
+# Misses go through the micro-batcher, so a burst of distinct queries becomes one batch request.
+embedding_cache = EmbeddingCache(
+    compute=get_embedding_batcher().embed,
+    max_entries=env_int("EMBEDDING_CACHE_MAX_ENTRIES", 4096),
+    sqlite_path=os.environ.get("EMBEDDING_CACHE_SQLITE_PATH") or None,
+)
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    return embedding_cache
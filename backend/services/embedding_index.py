@@ -0,0 +1,401 @@
+# backend/services/embedding_index.py
+"""
+In-process approximate nearest neighbour index over `holograms_media_embeddings`.
+
+PostgreSQL/pgvector stays the source of truth: the index is loaded at startup (from the table
+or from a JSON dump whose rows carry their table ids) and kept in sync by
+`EmbeddingRepository.update_embedding_vector`. Search is IVF-flat implemented with NumPy:
+vectors live in one contiguous float32 matrix, k-means centroids partition it into inverted
+lists, and a query only scores the rows in its `nprobe` closest lists. Small corpora are
+searched exhaustively, which is already faster than a network round-trip.
+
+Every worker process holds its own copy, and an update only reaches the copy of the worker
+that wrote it. Copies loaded from the table are therefore reloaded every
+EMBEDDING_INDEX_REFRESH_SECONDS, and an index older than twice that (the reload keeps failing)
+stops answering queries. Search results may still lag the table by one refresh interval, so
+read-modify-write paths (gesture intents) re-read the current vectors from the table first.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import asyncpg
+import numpy as np
+
+from backend.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_TABLE_NAME = "holograms_media_embeddings"
+_LOAD_QUERY = f"SELECT id, content, embedding, metadata FROM {EMBEDDINGS_TABLE_NAME};"
+
+
+@dataclass
+class IndexedEmbedding:
+    id: Any
+    distance: float
+    content: Optional[str]
+    metadata: Optional[Dict[str, Any]]
+    embedding: np.ndarray  # float32 view into the index matrix; copy before mutating
+
+
+def _metadata_matches(metadata: Optional[Dict[str, Any]], filters: Dict[str, Any]) -> bool:
+    """Equality filter; a list-valued metadata field matches if it contains the wanted value."""
+    if not filters:
+        return True
+    if not isinstance(metadata, dict):
+        return False
+    for key, wanted in filters.items():
+        value = metadata.get(key)
+        if isinstance(value, list) and not isinstance(wanted, list):
+            if wanted not in value:
+                return False
+        elif value != wanted:
+            return False
+    return True
+
+
+class EmbeddingIndex:
+    """
+    Mutable IVF-flat index with L2 distance (the same metric as pgvector's `<->`).
+
+    Args:
+        dimension: Vector size. Inferred from the first vector if None.
+        exact_search_threshold: Below this many rows every query is exhaustive.
+        nprobe: Number of inverted lists scanned per query once IVF is built.
+        kmeans_iterations: Lloyd iterations used when (re)building centroids.
+        max_age_seconds: After this long since loading, `covers()` is False; None never expires.
+    """
+
+    def __init__(self, dimension: Optional[int] = None, exact_search_threshold: int = 4096,
+                 nprobe: int = 8, kmeans_iterations: int = 10, seed: int = 0,
+                 max_age_seconds: Optional[float] = None):
+        self.dimension = dimension
+        self.max_age_seconds = max_age_seconds
+        self.exact_search_threshold = exact_search_threshold
+        self.nprobe = nprobe
+        self.kmeans_iterations = kmeans_iterations
+        self._rng = np.random.default_rng(seed)
+
+        self._vectors = np.zeros((0, dimension or 0), dtype=np.float32)
+        self._sq_norms = np.zeros(0, dtype=np.float32)
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._size = 0
+        self._ids: List[Any] = []
+        self._contents: List[Optional[str]] = []
+        self._metadata: List[Optional[Dict[str, Any]]] = []
+        self._row_by_id: Dict[Any, int] = {}
+
+        self._centroids: Optional[np.ndarray] = None
+        self._built_at_size = 0
+        self.is_ready = False
+        self.loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def covers(self, query: Any) -> bool:
+        """True if the index is loaded, not expired and built for vectors of the query's size."""
+        if not self.is_ready or self._size == 0 or len(query) != self.dimension:
+            return False
+        if self.max_age_seconds is not None and self.loaded_at is not None:
+            return time.monotonic() - self.loaded_at <= self.max_age_seconds
+        return True
+
+    # --- Storage -----------------------------------------------------------------
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        vectors = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        sq_norms = np.zeros(new_capacity, dtype=np.float32)
+        sq_norms[:self._size] = self._sq_norms[:self._size]
+        assignments = np.zeros(new_capacity, dtype=np.int32)
+        assignments[:self._size] = self._assignments[:self._size]
+        self._vectors, self._sq_norms, self._assignments = vectors, sq_norms, assignments
+
+    def _as_vector(self, embedding: Any) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if self.dimension is None:
+            self.dimension = vector.shape[0]
+            self._vectors = np.zeros((0, self.dimension), dtype=np.float32)
+        if vector.shape[0] != self.dimension:
+            return None
+        return vector
+
+    def _nearest_centroid(self, vector: np.ndarray) -> int:
+        if self._centroids is None:
+            return 0
+        distances = np.sum((self._centroids - vector) ** 2, axis=1)
+        return int(np.argmin(distances))
+
+    def upsert(self, embedding_id: Any, embedding: Any, content: Optional[str] = None,
+               metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Adds or replaces a vector. Content/metadata are kept unless new values are given."""
+        vector = self._as_vector(embedding)
+        if vector is None:
+            logger.warning(f"EmbeddingIndex: dimension mismatch for id {embedding_id}; expected {self.dimension}. Skipped.")
+            return False
+
+        row = self._row_by_id.get(embedding_id)
+        if row is None:
+            self._ensure_capacity(self._size + 1)
+            row = self._size
+            self._size += 1
+            self._row_by_id[embedding_id] = row
+            self._ids.append(embedding_id)
+            self._contents.append(content)
+            self._metadata.append(metadata)
+        else:
+            if content is not None:
+                self._contents[row] = content
+            if metadata is not None:
+                self._metadata[row] = metadata
+
+        self._vectors[row] = vector
+        self._sq_norms[row] = float(vector @ vector)
+        self._assignments[row] = self._nearest_centroid(vector)
+
+        if self._size >= self.exact_search_threshold and self._size >= 2 * max(self._built_at_size, 1):
+            self.build()
+        return True
+
+    def update_vector(self, embedding_id: Any, embedding: Any) -> bool:
+        """Incremental update used after a write to pgvector. Unknown ids are ignored."""
+        if embedding_id not in self._row_by_id:
+            return False
+        return self.upsert(embedding_id, embedding)
+
+    def remove(self, embedding_id: Any) -> bool:
+        row = self._row_by_id.pop(embedding_id, None)
+        if row is None:
+            return False
+        last = self._size - 1
+        if row != last:
+            # Swap-remove keeps the matrix dense.
+            self._vectors[row] = self._vectors[last]
+            self._sq_norms[row] = self._sq_norms[last]
+            self._assignments[row] = self._assignments[last]
+            self._ids[row] = self._ids[last]
+            self._contents[row] = self._contents[last]
+            self._metadata[row] = self._metadata[last]
+            self._row_by_id[self._ids[row]] = row
+        self._ids.pop()
+        self._contents.pop()
+        self._metadata.pop()
+        self._size = last
+        return True
+
+    # --- IVF ---------------------------------------------------------------------
+
+    def build(self) -> None:
+        """(Re)trains k-means centroids and reassigns every row to its inverted list."""
+        n = self._size
+        if n < self.exact_search_threshold:
+            self._centroids = None
+            self._built_at_size = n
+            return
+        vectors = self._vectors[:n]
+        n_lists = max(1, int(np.sqrt(n)))
+        centroids = vectors[self._rng.choice(n, size=n_lists, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            assignments = self._assign_to(centroids, vectors)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            counts = np.bincount(assignments, minlength=n_lists).astype(np.float32)
+            non_empty = counts > 0
+            centroids[non_empty] = sums[non_empty] / counts[non_empty, None]
+        self._centroids = centroids
+        self._assignments[:n] = self._assign_to(centroids, vectors)
+        self._built_at_size = n
+        logger.info(f"EmbeddingIndex: built IVF with {n_lists} lists over {n} vectors.")
+
+    @staticmethod
+    def _assign_to(centroids: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        centroid_sq = np.einsum("ij,ij->i", centroids, centroids)
+        # argmin ||v - c||^2 == argmin (||c||^2 - 2 v.c)
+        scores = centroid_sq[None, :] - 2.0 * (vectors @ centroids.T)
+        return np.argmin(scores, axis=1).astype(np.int32)
+
+    # --- Search ------------------------------------------------------------------
+
+    def search(self, query: Any, k: int = 1, filters: Optional[Dict[str, Any]] = None) -> List[IndexedEmbedding]:
+        """
+        Returns up to `k` nearest rows by L2 distance, optionally restricted to rows whose
+        metadata matches `filters`.
+        """
+        if self._size == 0 or k <= 0:
+            return []
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        if q.shape[0] != self.dimension:
+            logger.warning(f"EmbeddingIndex: query dimension {q.shape[0]} != index dimension {self.dimension}.")
+            return []
+
+        n = self._size
+        if self._centroids is None:
+            candidates = np.arange(n)
+        else:
+            centroid_distances = np.sum((self._centroids - q) ** 2, axis=1)
+            probe = np.argsort(centroid_distances)[:self.nprobe]
+            candidates = np.nonzero(np.isin(self._assignments[:n], probe))[0]
+            if candidates.size == 0:
+                candidates = np.arange(n)
+
+        # ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2
+        distances = self._sq_norms[candidates] - 2.0 * (self._vectors[candidates] @ q) + float(q @ q)
+        np.maximum(distances, 0.0, out=distances)
+
+        if filters:
+            order = np.argsort(distances)
+        elif candidates.size > k:
+            top = np.argpartition(distances, k)[:k]
+            order = top[np.argsort(distances[top])]
+        else:
+            order = np.argsort(distances)
+
+        results: List[IndexedEmbedding] = []
+        for position in order:
+            row = int(candidates[position])
+            metadata = self._metadata[row]
+            if filters and not _metadata_matches(metadata, filters):
+                continue
+            results.append(IndexedEmbedding(
+                id=self._ids[row],
+                distance=float(np.sqrt(distances[position])),
+                content=self._contents[row],
+                metadata=metadata,
+                embedding=self._vectors[row],
+            ))
+            if len(results) >= k:
+                break
+        return results
+
+    # --- Loading -----------------------------------------------------------------
+
+    def load_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        loaded = 0
+        for row in rows:
+            embedding = row.get("embedding")
+            if isinstance(embedding, str):
+                embedding = json.loads(embedding)  # pgvector text form: "[0.1,0.2,...]"
+            if embedding is None:
+                continue
+            metadata = row.get("metadata")
+            if isinstance(metadata, str):
+                metadata = json.loads(metadata)
+            if self.upsert(row["id"], embedding, content=row.get("content"), metadata=metadata):
+                loaded += 1
+        self.build()
+        self.is_ready = True
+        self.loaded_at = time.monotonic()
+        logger.info(f"EmbeddingIndex: loaded {loaded} vectors (dimension={self.dimension}).")
+        return loaded
+
+    async def load_from_db(self, conn: asyncpg.Connection) -> int:
+        """Fetches the table on the event loop; parsing and the k-means build run in a worker thread."""
+        rows = await conn.fetch(_LOAD_QUERY)
+        return await asyncio.to_thread(self.load_rows, (dict(row) for row in rows))
+
+    def load_from_json(self, path: str) -> int:
+        """
+        Loads a dump of the table: a list of {"id", "text", "embedding", "metadata"} objects.
+        Rows without an id (e.g. the Genkit `embeddings_database.json`) cannot be matched to
+        table rows and are skipped; a dump without any ids leaves the index unloaded.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            documents = json.load(f)
+        rows = [{
+            "id": document["id"],
+            "content": document.get("text", document.get("content")),
+            "embedding": document.get("embedding"),
+            "metadata": document.get("metadata"),
+        } for document in documents if document.get("id")]
+        if len(rows) < len(documents):
+            logger.warning(f"EmbeddingIndex: {len(documents) - len(rows)} of {len(documents)} rows in {path} have no id; skipped.")
+        if not rows:
+            logger.warning(f"EmbeddingIndex: {path} has no rows with table ids; using pgvector for similarity search.")
+            return 0
+        return self.load_rows(rows)
+
+
+def _new_index(max_age_seconds: Optional[float] = None) -> EmbeddingIndex:
+    return EmbeddingIndex(
+        exact_search_threshold=env_int("EMBEDDING_INDEX_EXACT_THRESHOLD", 4096),
+        nprobe=env_int("EMBEDDING_INDEX_NPROBE", 8),
+        max_age_seconds=max_age_seconds,
+    )
+
+
+embedding_index = _new_index()
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def get_embedding_index() -> EmbeddingIndex:
+    """Process-wide index. Check `covers(query)` before relying on it; callers fall back to pgvector."""
+    return embedding_index
+
+
+async def load_embedding_index(pool: Optional[asyncpg.Pool] = None, source: Optional[str] = None) -> int:
+    """
+    Loads the process-wide index according to EMBEDDING_INDEX_SOURCE: empty disables it,
+    "db" reads the table through `pool`, anything else is treated as a path to a JSON dump.
+    A new index is built and swapped in, so queries keep using the old one while it loads.
+    """
+    global embedding_index
+    source = source if source is not None else os.environ.get("EMBEDDING_INDEX_SOURCE", "")
+    if not source:
+        logger.info("EmbeddingIndex disabled (EMBEDDING_INDEX_SOURCE not set); using pgvector for similarity search.")
+        return 0
+    if source == "db":
+        if pool is None:
+            logger.warning("EmbeddingIndex: EMBEDDING_INDEX_SOURCE=db but no database pool is available.")
+            return 0
+        refresh = env_int("EMBEDDING_INDEX_REFRESH_SECONDS", 300)
+        index = _new_index(max_age_seconds=2 * refresh if refresh > 0 else None)
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(_LOAD_QUERY)
+        # Connection is back in the pool before the CPU-bound load/build
+        loaded = await asyncio.to_thread(index.load_rows, (dict(row) for row in rows))
+    else:
+        index = _new_index()
+        loaded = await asyncio.to_thread(index.load_from_json, source)
+    if index.is_ready:
+        embedding_index = index
+    return loaded
+
+
+async def _refresh_loop(pool: asyncpg.Pool, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await load_embedding_index(pool, "db")
+        except Exception as e:
+            logger.error(f"EmbeddingIndex: reload failed: {e}. Keeping the previous copy until it expires.")
+
+
+def start_embedding_index_refresh(pool: Optional[asyncpg.Pool]) -> None:
+    """Reloads a table-backed index every EMBEDDING_INDEX_REFRESH_SECONDS (0 disables). Called on startup."""
+    global _refresh_task
+    interval = env_int("EMBEDDING_INDEX_REFRESH_SECONDS", 300)
+    if pool is None or interval <= 0 or os.environ.get("EMBEDDING_INDEX_SOURCE", "") != "db":
+        return
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_loop(pool, interval))
+
+
+async def stop_embedding_index_refresh() -> None:
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
@@ -0,0 +1,208 @@
+# backend/services/gesture_intent_pipeline.py
+"""
+Per-connection pipeline for /ws/v1/gesture-intent.
+
+The socket reader only validates and enqueues; up to `concurrency` workers run the intent
+handler; a single writer sends responses in the order the intents arrived. Every response
+carries the intent's `correlation_id` (taken from the message or generated).
+
+- Bounded queue: when it is full, new intents are answered immediately with
+  `{"status": "rejected", "reason": "queue_full"}`.
+- Coalescing: an intent of a coalescible type (`navigate` by default) that repeats the intent
+  and context of one still waiting in the queue replaces it; the replaced one is answered with
+  `{"status": "superseded", "superseded_by": <new correlation_id>}`.
+- Backpressure: `{"type": "backpressure", "state": "pause"}` is sent as soon as the queue reaches
+  the high watermark and `"resume"` once it drains to the low watermark.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+IntentHandler = Callable[[Any], Awaitable[Dict[str, Any]]]
+SendFunc = Callable[[Dict[str, Any]], Awaitable[None]]
+# item -> (correlation_id, intent, context) used for correlation and coalescing
+DescribeFunc = Callable[[Any], Tuple[Optional[str], Optional[str], Any]]
+
+DEFAULT_COALESCE_INTENTS = ("navigate",)
+
+
+def describe_json_intent(data: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Any]:
+    return data.get("correlation_id"), data.get("intent"), data.get("context")
+
+
+class _Job:
+    __slots__ = ("data", "correlation_id", "coalesce_key", "response")
+
+    def __init__(self, data: Any, correlation_id: str, coalesce_key: Optional[str],
+                 response: "asyncio.Future[Dict[str, Any]]"):
+        self.data = data
+        self.correlation_id = correlation_id
+        self.coalesce_key = coalesce_key
+        self.response = response
+
+
+class GestureIntentPipeline:
+    """
+    Args:
+        handler: `async (intent) -> response dict`, e.g. CoordinationService.handle_gesture_intent.
+        send: `async (message dict) -> None`, e.g. WebSocket.send_json. Never called concurrently.
+        max_queue: Intents waiting for a worker before new ones are rejected.
+        concurrency: Intents processed at the same time.
+        high_watermark / low_watermark: Queue depths that trigger pause / resume signals
+            (default 75% / 25% of max_queue).
+        coalesce_intents: Intent types whose waiting duplicates are superseded.
+        describe: Extracts (correlation_id, intent, context) from a submitted item; the default
+            reads JSON intents, binary mode passes gesture_intent_codec.describe_gesture_chunk.
+    """
+
+    def __init__(self, handler: IntentHandler, send: SendFunc, max_queue: int = 64, concurrency: int = 4,
+                 high_watermark: Optional[int] = None, low_watermark: Optional[int] = None,
+                 coalesce_intents: Iterable[str] = DEFAULT_COALESCE_INTENTS,
+                 describe: DescribeFunc = describe_json_intent):
+        self.handler = handler
+        self.send = send
+        self.max_queue = max_queue
+        self.concurrency = max(1, concurrency)
+        self.high_watermark = high_watermark if high_watermark is not None else max(1, max_queue * 3 // 4)
+        self.low_watermark = low_watermark if low_watermark is not None else max_queue // 4
+        self.coalesce_intents = frozenset(coalesce_intents)
+        self.describe = describe
+
+        self._queue: "asyncio.Queue[_Job]" = asyncio.Queue(maxsize=max_queue)
+        self._outbox: "asyncio.Queue[asyncio.Future]" = asyncio.Queue()  # responses in arrival order
+        self._waiting: Dict[str, _Job] = {}  # coalesce_key -> job not yet picked up by a worker
+        self._send_lock = asyncio.Lock()
+        self._unsent = 0
+        self._all_sent = asyncio.Event()
+        self._all_sent.set()
+        self._tasks: List[asyncio.Task] = []
+        self.paused = False
+
+        self.accepted = 0
+        self.rejected = 0
+        self.superseded = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker(), name=f"gesture-intent-worker-{i}") for i in range(self.concurrency)]
+            self._tasks.append(asyncio.create_task(self._writer(), name="gesture-intent-writer"))
+
+    def _coalesce_key(self, intent: Optional[str], context: Any) -> Optional[str]:
+        if intent not in self.coalesce_intents:
+            return None
+        if isinstance(context, str):
+            return f"{intent}:{context}"
+        return f"{intent}:{json.dumps(context, sort_keys=True, default=str)}"
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        async with self._send_lock:
+            await self.send(message)
+
+    async def _enqueue_response(self, future: "asyncio.Future[Dict[str, Any]]") -> None:
+        self._unsent += 1
+        self._all_sent.clear()
+        await self._outbox.put(future)
+
+    def _resolved(self, response: Dict[str, Any]) -> "asyncio.Future[Dict[str, Any]]":
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(response)
+        return future
+
+    async def submit(self, data: Any) -> str:
+        """Queues an intent without waiting for it to be processed. Returns its correlation_id."""
+        correlation_id, intent, context = self.describe(data)
+        correlation_id = str(correlation_id or uuid.uuid4())
+        coalesce_key = self._coalesce_key(intent, context)
+        loop = asyncio.get_running_loop()
+
+        waiting = self._waiting.get(coalesce_key) if coalesce_key is not None else None
+        if waiting is not None:
+            # Take over the queued job's slot; its original sender gets a "superseded" answer.
+            waiting.response.set_result({"status": "superseded", "correlation_id": waiting.correlation_id, "superseded_by": correlation_id})
+            waiting.data = data
+            waiting.correlation_id = correlation_id
+            waiting.response = loop.create_future()
+            await self._enqueue_response(waiting.response)
+            self.superseded += 1
+            return correlation_id
+
+        if self._queue.full():
+            self.rejected += 1
+            await self._enqueue_response(self._resolved({
+                "status": "rejected", "reason": "queue_full", "correlation_id": correlation_id, "queue_depth": self._queue.qsize(),
+            }))
+            return correlation_id
+
+        job = _Job(data, correlation_id, coalesce_key, loop.create_future())
+        if coalesce_key is not None:
+            self._waiting[coalesce_key] = job
+        self._queue.put_nowait(job)
+        await self._enqueue_response(job.response)
+        self.accepted += 1
+
+        if not self.paused and self._queue.qsize() >= self.high_watermark:
+            self.paused = True
+            await self._send({"type": "backpressure", "state": "pause", "queue_depth": self._queue.qsize()})
+        return correlation_id
+
+    async def reply(self, response: Dict[str, Any], correlation_id: Optional[str] = None) -> None:
+        """Queues a ready response (e.g. a validation error) in order with the others."""
+        await self._enqueue_response(self._resolved({**response, "correlation_id": correlation_id or str(uuid.uuid4())}))
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            if job.coalesce_key is not None and self._waiting.get(job.coalesce_key) is job:
+                del self._waiting[job.coalesce_key]
+            if self.paused and self._queue.qsize() <= self.low_watermark:
+                self.paused = False
+                await self._send({"type": "backpressure", "state": "resume", "queue_depth": self._queue.qsize()})
+            try:
+                result = await self.handler(job.data)
+                response = {**(result or {}), "correlation_id": job.correlation_id}
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Gesture intent {job.correlation_id} failed: {e}", exc_info=True)
+                response = {"status": "error", "message": str(e), "correlation_id": job.correlation_id}
+            finally:
+                self._queue.task_done()
+            job.response.set_result(response)
+
+    async def _writer(self) -> None:
+        while True:
+            future = await self._outbox.get()
+            try:
+                await self._send(await future)
+            finally:
+                self._unsent -= 1
+                if not self._unsent:
+                    self._all_sent.set()
+
+    async def drain(self) -> None:
+        """Waits until every accepted intent has been answered."""
+        await self._all_sent.wait()
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "paused": self.paused,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "superseded": self.superseded,
+            "failed": self.failed,
+        }
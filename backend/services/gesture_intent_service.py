@@ -3,14 +3,19 @@ import logging
 import asyncpg
 import numpy as np
 import os # Для доступа к GOOGLE_APPLICATION_CREDENTIALS
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from uuid import UUID
+from backend.core.db.pg_connector import DBExecutor
 from backend.repositories.embedding_repository import EmbeddingRepository
+from backend.services.embedding_cache import get_embedding_cache
+from backend.services.intent_batcher import IntentBatcher
+from backend.services.learning_log_sink import get_learning_log_sink
+from backend.utils.env import env_number
 
 # Импорт Google AI SDK
 import google.generativeai as genai
 
 # Импорты для логирования
-from backend.repositories.learning_log_repository import LearningLogRepository
 from backend.core.models.tria_learning_models import TriaLearningLogCreate
 
 logger = logging.getLogger(__name__)
@@ -44,28 +49,39 @@ for key in SEMANTIC_DIRECTIONS:
     if np.linalg.norm(SEMANTIC_DIRECTIONS[key]) != 0:
         SEMANTIC_DIRECTIONS[key] = SEMANTIC_DIRECTIONS[key] / np.linalg.norm(SEMANTIC_DIRECTIONS[key])
 
+EMBEDDING_DIMENSION = 768
+# Все направления одной float32-матрицей: строка на намерение, для пакетного применения.
+DIRECTION_ROWS = {intent_type: row for row, intent_type in enumerate(SEMANTIC_DIRECTIONS)}
+DIRECTION_MATRIX = np.stack([SEMANTIC_DIRECTIONS[t] for t in DIRECTION_ROWS]).astype(np.float32)
+
 
 class GestureIntentService:
-    def __init__(self, conn: asyncpg.Connection):
+    def __init__(self, conn: DBExecutor):
         self.conn = conn
         self.embedding_repo = EmbeddingRepository(conn)
-        self.learning_log_repo = LearningLogRepository(conn) # <-- Инициализируем новый репозиторий
+        # Записи tria_learning_log пишутся в фоне пачками, вне пути ответа пользователю
+        self.learning_log_sink = get_learning_log_sink()
         self.embedding_model_name = "models/text-embedding-004" # Имя модели для Google AI SDK
+        # Одиночные намерения от параллельных запросов собираются в пакеты для apply_intents_batch
+        self.intent_batcher = IntentBatcher(
+            self.apply_intents_batch,
+            window_ms=env_number("GESTURE_INTENT_BATCH_WINDOW_MS", 5.0),
+            max_batch_size=int(env_number("GESTURE_INTENT_BATCH_MAX_SIZE", 64)),
+        )
 
     async def _get_embedding(self, text: str) -> Optional[List[float]]:
         """Вспомогательная функция для получения эмбеддинга текста."""
         try:
-            result = await genai.embed_content_async(
+            return await get_embedding_cache().get_embedding(
+                text,
                 model=self.embedding_model_name,
-                content=text,
                 task_type="RETRIEVAL_QUERY" # или "SEMANTIC_SIMILARITY" в зависимости от задачи
             )
-            return result['embedding']
         except Exception as e:
             logger.error(f"Failed to get embedding for text '{text[:50]}...': {e}")
             return None
 
-    async def apply_intent_to_embedding(self, user_id: str, intent_vector: dict, context_embedding: Any) -> dict: # Any пока что для EmbeddingDB
+    async def apply_intent_to_embedding(self, user_id: str, intent_vector: dict, context_embedding: Any) -> dict: # Any для EmbeddingDB
         """
         Применяет вектор намерения к предоставленному базовому эмбеддингу.
 
@@ -73,101 +89,203 @@ class GestureIntentService:
             user_id (str): Идентификатор пользователя.
             intent_vector (dict): Словарь, содержащий 'type' (строка намерения) и 'intensity' (float).
             context_embedding (EmbeddingDB): Объект найденного эмбеддинга из БД.
+
+        Намерение применяется в составе ближайшего пакета (см. IntentBatcher): параллельные вызовы
+        дают один bulk UPDATE, а каждый вызывающий получает свой результат.
         """
-        intent_type = intent_vector.get("type", "unknown")
-        intensity_factor = float(intent_vector.get("intensity", 0.1)) # Используем intensity из intent_vector
-
-        logger.info(f"Applying intent_type '{intent_type}' with intensity {intensity_factor} to embedding_id {context_embedding.id} for user {user_id}")
-
-        # ✅ ШАГ 1: Проверка Аффордансов
-        # Убедимся, что context_embedding.metadata существует и является словарем
-        if not isinstance(context_embedding.metadata, dict):
-            logger.warning(f"Metadata for embedding {context_embedding.id} is not a dict or is missing. Skipping affordance check.")
-            # Можно вернуть ошибку или продолжить без проверки, в зависимости от требований
-            # return {"status": "error", "message": "Missing or invalid metadata for affordance check."}
-        else:
-            available_gestures = context_embedding.metadata.get("gesture_affordances", [])
-            if not isinstance(available_gestures, list): # Дополнительная проверка типа
-                logger.warning(f"gesture_affordances for embedding {context_embedding.id} is not a list: {available_gestures}. Treating as no affordances.")
-                available_gestures = []
+        return await self.intent_batcher.apply(user_id, intent_vector, context_embedding)
+
+    async def apply_intents_batch(self, items: Sequence[Tuple[str, dict, Any]]) -> List[dict]:
+        """
+        Пакетная версия apply_intent_to_embedding: принимает пары (user_id, intent_vector, context_embedding)
+        и возвращает результаты в том же порядке.
+
+        Сдвиги по SEMANTIC_DIRECTIONS и нормализация выполняются одной float32-операцией над матрицей,
+        а все измененные векторы пишутся одним bulk UPDATE. Если в пакете несколько намерений для
+        одного эмбеддинга, они применяются последовательно (каждое к результату предыдущего),
+        как если бы запросы пришли по одному.
+        """
+        results: List[Optional[dict]] = [None] * len(items)
+        log_entries: List[TriaLearningLogCreate] = []
+
+        def finish(position: int, status: str, message: str, modified_id: Optional[UUID] = None, **extra):
+            user_id, intent_vector, context_embedding = items[position]
+            results[position] = {"status": status, "message": message, **extra}
+            log_entries.append(self._build_log_entry(user_id, intent_vector, context_embedding, status, message, modified_id))
+
+        # 1. Проверки, не требующие векторной арифметики
+        applicable: List[Tuple[int, int, float]] = []  # (позиция в items, строка DIRECTION_MATRIX, интенсивность)
+        for position, (user_id, intent_vector, context_embedding) in enumerate(items):
+            intent_type = intent_vector.get("type", "unknown")
+
+            if not context_embedding:
+                finish(position, "error", "Context embedding was not provided.")
+                continue
+
+            # Битая интенсивность портит только свой элемент, а не весь пакет
+            try:
+                intensity_factor = float(intent_vector.get("intensity", 0.1))
+            except (TypeError, ValueError):
+                intensity_factor = float("nan")
+            if not np.isfinite(intensity_factor):
+                message = f"Invalid intensity {intent_vector.get('intensity')!r} for intent '{intent_type}'."
+                logger.warning(f"{message} User: {user_id}.")
+                finish(position, "error", message)
+                continue
+
+            # Проверка Аффордансов
+            if not isinstance(context_embedding.metadata, dict):
+                logger.warning(f"Metadata for embedding {context_embedding.id} is not a dict or is missing. Affordance check might be unreliable.")
+                available_gestures = [] # Предполагаем отсутствие аффордансов, если метаданные некорректны
+            else:
+                available_gestures = context_embedding.metadata.get("gesture_affordances", [])
+                if not isinstance(available_gestures, list):
+                    logger.warning(f"gesture_affordances for embedding {context_embedding.id} is not a list: {available_gestures}. Treating as no affordances.")
+                    available_gestures = []
 
             if intent_type not in available_gestures:
                 message = f"Intent '{intent_type}' is not applicable to this context (Embedding ID: {context_embedding.id}). Available gestures: {available_gestures}"
                 logger.warning(message)
-                return {"status": "ignored", "message": message, "available_gestures": available_gestures}
-
-        # 2. Получаем вектор модификации для нашего намерения (стало Шаг 2)
-        direction_vector_np = SEMANTIC_DIRECTIONS.get(intent_type)
-        if direction_vector_np is None:
-            logger.info(f"Intent type '{intent_type}' has no defined vector operation for user {user_id}. No action taken.")
-            return {"status": "ignored", "message": f"Intent type '{intent_type}' has no defined vector operation."}
-
-        if direction_vector_np.shape[0] != 768: # Проверка согласованности размерности
-            logger.error(f"Dimension mismatch for SEMANTIC_DIRECTIONS['{intent_type}']. Expected 768, got {direction_vector_np.shape[0]}.")
-            return {"status": "error", "message": f"Internal configuration error for intent type '{intent_type}'."}
-
-        # 2. Выполняем векторную арифметику
-        # context_embedding.embedding это List[float] (или embedding_vector если alias сработал)
-        # Убедимся, что используем правильное имя поля, которое содержит вектор List[float]
-        # В модели EmbeddingDB это поле 'embedding', которое алиасится в 'embedding_vector' при создании объекта.
-        # Если объект приходит из репозитория, он должен иметь поле 'embedding' как List[float].
-
-        base_vector_list = context_embedding.embedding # Должно быть List[float]
-        if not isinstance(base_vector_list, list) or not all(isinstance(n, (int, float)) for n in base_vector_list):
-            logger.error(f"Base embedding vector is not a list of numbers. ID: {context_embedding.id}. Type: {type(base_vector_list)}")
-            return {"status": "error", "message": "Corrupted base embedding data (not a list of numbers)."}
-
-        base_vector_np = np.array(base_vector_list)
-
-        if base_vector_np.shape[0] != 768:
-            logger.error(f"Dimension mismatch for base_vector. Expected 768, got {base_vector_np.shape[0]}. Embedding ID: {context_embedding.id}")
-            return {"status": "error", "message": "Corrupted base embedding data (dimension mismatch)."}
-
-        modified_vector_np = base_vector_np + (direction_vector_np * intensity_factor)
-
-        # Нормализуем, чтобы не "улететь" из семантического пространства
-        norm = np.linalg.norm(modified_vector_np)
-        if norm == 0: # Избегаем деления на ноль
-            logger.warning(f"Norm of modified vector is zero for intent_type '{intent_type}', embedding ID {context_embedding.id}. Using original vector.")
-            modified_vector_list = base_vector_np.tolist()
-        else:
-            modified_vector_np /= norm
-            modified_vector_list = modified_vector_np.tolist()
-            logger.info(f"Applied intent_type '{intent_type}', modified embedding {context_embedding.id}. Norm before: {np.linalg.norm(base_vector_np):.4f}, Norm after: {np.linalg.norm(modified_vector_np):.4f}")
-
-
-        # Обновляем вектор в базе данных (стало Шаг 3)
-        success = await self.embedding_repo.update_embedding_vector(
-            embedding_id=context_embedding.id,
-            new_vector=modified_vector_list
-        )
-
-        if success:
-            return {
-                "status": "success",
-                "message": f"Intent '{intent_type}' applied. Embedding '{context_embedding.id}' was modified.",
-                "modified_embedding_id": str(context_embedding.id)
-            }
-        else:
-            logger.error(f"Failed to update embedding {context_embedding.id} in database for intent_type '{intent_type}'.")
-            return {
-                "status": "error",
-                "message": f"Failed to update embedding for intent_type '{intent_type}'.",
-                "target_embedding_id": str(context_embedding.id)
-            }
-
-    async def _log_interaction(self, user_id: str, intent_vector: dict, context_embedding: Optional[Any], action_result_status: str, message: str, modified_embedding_id: Optional[UUID] = None):
-        # Убедимся, что context_embedding не None перед доступом к его id
+                finish(position, "ignored", message, available_gestures=available_gestures)
+                continue
+
+            direction_row = DIRECTION_ROWS.get(intent_type)
+            if direction_row is None:
+                message = f"Intent type '{intent_type}' has no defined vector operation."
+                logger.info(f"{message} for user {user_id}. No action taken.")
+                finish(position, "ignored", message)
+                continue
+
+            applicable.append((position, direction_row, intensity_factor))
+
+        # 2. Текущие векторы перечитываются из таблицы одним запросом: контекст мог прийти из
+        # in-process индекса, копия которого в этом воркере отстает от записей других воркеров
+        current: Optional[Dict[Any, List[float]]] = None
+        if applicable:
+            try:
+                current = await self.embedding_repo.get_embedding_vectors(
+                    list({items[position][2].id for position, _, _ in applicable})
+                )
+            except Exception as e:
+                logger.error(f"Failed to re-read base embeddings; using the vectors from the request context: {e}")
+                current = None
+            if current is not None:
+                found = []
+                for entry in applicable:
+                    context_embedding = items[entry[0]][2]
+                    if context_embedding.id in current:
+                        found.append(entry)
+                    else:
+                        finish(entry[0], "error", f"Embedding '{context_embedding.id}' no longer exists.",
+                               target_embedding_id=str(context_embedding.id))
+                applicable = found
+        base_vectors = [
+            current[items[position][2].id] if current is not None else items[position][2].embedding
+            for position, _, _ in applicable
+        ]
+
+        # Базовые векторы одной матрицей; построчная проверка только если пакет не конвертируется целиком
+        base_matrix, valid = self._stack_base_vectors(base_vectors)
+        rows = []
+        for (position, direction_row, intensity_factor), ok in zip(applicable, valid):
+            if ok:
+                rows.append((position, direction_row, intensity_factor))
+                continue
+            context_embedding = items[position][2]
+            logger.error(f"Base embedding vector is malformed (expected {EMBEDDING_DIMENSION} numbers). ID: {context_embedding.id}")
+            finish(position, "error", "Corrupted base embedding data (not a list of numbers or dimension mismatch).")
+        base_matrix = base_matrix[np.asarray(valid, dtype=bool)] if len(applicable) else base_matrix
+
+        # 3. Векторная арифметика: раунд k содержит k-е вхождение каждого эмбеддинга в пакете
+        rounds: List[List[int]] = []
+        occurrences: Dict[Any, int] = {}
+        for row_index, (position, _, _) in enumerate(rows):
+            embedding_id = items[position][2].id
+            occurrence = occurrences.get(embedding_id, 0)
+            occurrences[embedding_id] = occurrence + 1
+            if occurrence == len(rounds):
+                rounds.append([])
+            rounds[occurrence].append(row_index)
+
+        latest: Dict[Any, np.ndarray] = {}
+        for round_rows in rounds:
+            ids = [items[rows[i][0]][2].id for i in round_rows]
+            base = np.stack([latest[eid] if eid in latest else base_matrix[i] for eid, i in zip(ids, round_rows)])
+            direction_rows = np.fromiter((rows[i][1] for i in round_rows), dtype=np.intp, count=len(round_rows))
+            intensities = np.fromiter((rows[i][2] for i in round_rows), dtype=np.float32, count=len(round_rows))
+
+            modified = base + DIRECTION_MATRIX[direction_rows] * intensities[:, None]
+            norms = np.linalg.norm(modified, axis=1)
+            zero = norms == 0
+            if zero.any():
+                logger.warning(f"Norm of modified vector is zero for {int(zero.sum())} intent(s); using original vectors.")
+                modified[zero] = base[zero]
+                norms[zero] = 1.0
+            modified /= norms[:, None]
+            for eid, vector in zip(ids, modified):
+                latest[eid] = vector
+
+        # 4. Один bulk UPDATE на все измененные эмбеддинги (последнее состояние каждого);
+        # успешными считаются только строки, которые UPDATE ... RETURNING действительно вернул
+        persisted_ids = set()
+        if latest:
+            try:
+                persisted_ids = set(await self.embedding_repo.update_embedding_vectors_bulk(
+                    [(embedding_id, vector.tolist()) for embedding_id, vector in latest.items()]
+                ))
+                logger.info(f"Applied {len(rows)} intent(s) to {len(persisted_ids)} of {len(latest)} embedding(s) in one batch.")
+            except Exception as e:
+                logger.error(f"Failed to persist {len(latest)} modified embedding(s): {e}", exc_info=True)
+
+        for position, _, _ in rows:
+            _, intent_vector, context_embedding = items[position]
+            intent_type = intent_vector.get("type", "unknown")
+            if context_embedding.id in persisted_ids:
+                finish(position, "success",
+                       f"Intent '{intent_type}' applied. Embedding '{context_embedding.id}' was modified.",
+                       context_embedding.id, modified_embedding_id=str(context_embedding.id))
+            else:
+                finish(position, "error", f"Failed to update embedding for intent_type '{intent_type}'.",
+                       target_embedding_id=str(context_embedding.id))
+
+        await self._log_interactions(log_entries)
+        return results
+
+    @staticmethod
+    def _stack_base_vectors(vectors: Sequence[Any]) -> Tuple[np.ndarray, List[bool]]:
+        """Собирает векторы в float32-матрицу (N, 768) и флаги валидности для каждой строки."""
+        if not vectors:
+            return np.zeros((0, EMBEDDING_DIMENSION), dtype=np.float32), []
+        try:
+            matrix = np.asarray(vectors, dtype=np.float32)
+            if matrix.ndim == 2 and matrix.shape[1] == EMBEDDING_DIMENSION:
+                return matrix, [True] * len(vectors)
+        except (TypeError, ValueError):
+            pass
+        # Медленный путь: ищем конкретные битые строки
+        matrix = np.zeros((len(vectors), EMBEDDING_DIMENSION), dtype=np.float32)
+        valid = []
+        for i, v in enumerate(vectors):
+            try:
+                vector = np.asarray(v, dtype=np.float32)
+                ok = vector.shape == (EMBEDDING_DIMENSION,)
+            except (TypeError, ValueError):
+                ok = False
+            if ok:
+                matrix[i] = vector
+            valid.append(ok)
+        return matrix, valid
+
+    @staticmethod
+    def _build_log_entry(user_id: str, intent_vector: dict, context_embedding: Optional[Any], action_result_status: str, message: str, modified_embedding_id: Optional[UUID] = None) -> TriaLearningLogCreate:
         # context_embedding_id может быть None, если, например, контекст не был найден MemoryBot'ом
-        # или если проверка аффордансов произошла до того, как context_embedding был получен (что не должно быть, но для безопасности)
-
         current_context_embedding_id = None
         if hasattr(context_embedding, 'id'): # Проверяем, что у объекта есть атрибут id
             current_context_embedding_id = context_embedding.id
         elif context_embedding is not None: # Если это не None, но без id, логируем предупреждение
-            logger.warning(f"Context embedding object provided to _log_interaction does not have an 'id' attribute: {type(context_embedding)}")
+            logger.warning(f"Context embedding object provided to _build_log_entry does not have an 'id' attribute: {type(context_embedding)}")
 
-        log_entry = TriaLearningLogCreate(
+        return TriaLearningLogCreate(
             user_id=user_id,
             # session_id=intent_vector.get("session_id"), # Если session_id передается в intent_vector
             intent_vector=intent_vector,
@@ -177,101 +295,9 @@ class GestureIntentService:
             modified_embedding_id=modified_embedding_id
             # additional_metadata можно будет добавить позже, если нужно
         )
-        try:
-            await self.learning_log_repo.create_log_entry(log_entry)
-            logger.info(f"Interaction logged for user {user_id}. Result: {action_result_status}, Intent: {intent_vector.get('type')}")
-        except Exception as e:
-            logger.error(f"Failed to create learning log entry for user {user_id}: {e}", exc_info=True)
-
-    # Обновленный apply_intent_to_embedding с логированием
-    async def apply_intent_to_embedding(self, user_id: str, intent_vector: dict, context_embedding: Any) -> dict: # Any для EmbeddingDB
-        intent_type = intent_vector.get("type", "unknown")
-        intensity_factor = float(intent_vector.get("intensity", 0.1))
-        action_result_status: str = "error" # Default to error
-        message_to_return: str = "An unexpected error occurred."
-        modified_id: Optional[UUID] = None
-
-        logger.info(f"Applying intent_type '{intent_type}' with intensity {intensity_factor} to embedding_id {context_embedding.id if context_embedding else 'N/A'} for user {user_id}")
-
-        if not context_embedding: # Добавим проверку, если context_embedding может быть None
-            action_result_status = "error"
-            message_to_return = "Context embedding was not provided."
-            await self._log_interaction(user_id, intent_vector, context_embedding, action_result_status, message_to_return, modified_id)
-            return {"status": action_result_status, "message": message_to_return}
-
-        # Проверка Аффордансов
-        if not isinstance(context_embedding.metadata, dict):
-            logger.warning(f"Metadata for embedding {context_embedding.id} is not a dict or is missing. Affordance check might be unreliable.")
-            available_gestures = [] # Предполагаем отсутствие аффордансов, если метаданные некорректны
-        else:
-            available_gestures = context_embedding.metadata.get("gesture_affordances", [])
-            if not isinstance(available_gestures, list):
-                logger.warning(f"gesture_affordances for embedding {context_embedding.id} is not a list: {available_gestures}. Treating as no affordances.")
-                available_gestures = []
-
-        if intent_type not in available_gestures:
-            action_result_status = "ignored"
-            message_to_return = f"Intent '{intent_type}' is not applicable to this context (Embedding ID: {context_embedding.id}). Available gestures: {available_gestures}"
-            logger.warning(message_to_return)
-            await self._log_interaction(user_id, intent_vector, context_embedding, action_result_status, message_to_return, modified_id)
-            return {"status": action_result_status, "message": message_to_return, "available_gestures": available_gestures}
-
-        direction_vector_np = SEMANTIC_DIRECTIONS.get(intent_type)
-        if direction_vector_np is None:
-            action_result_status = "ignored"
-            message_to_return = f"Intent type '{intent_type}' has no defined vector operation."
-            logger.info(f"{message_to_return} for user {user_id}. No action taken.")
-            await self._log_interaction(user_id, intent_vector, context_embedding, action_result_status, message_to_return, modified_id)
-            return {"status": action_result_status, "message": message_to_return}
-
-        if direction_vector_np.shape[0] != 768:
-            action_result_status = "error"
-            message_to_return = f"Internal configuration error for intent type '{intent_type}' (dimension mismatch)."
-            logger.error(f"Dimension mismatch for SEMANTIC_DIRECTIONS['{intent_type}']. Expected 768, got {direction_vector_np.shape[0]}.")
-            await self._log_interaction(user_id, intent_vector, context_embedding, action_result_status, message_to_return, modified_id)
-            return {"status": action_result_status, "message": message_to_return}
-
-        base_vector_list = context_embedding.embedding
-        if not isinstance(base_vector_list, list) or not all(isinstance(n, (int, float)) for n in base_vector_list):
-            action_result_status = "error"
-            message_to_return = "Corrupted base embedding data (not a list of numbers)."
-            logger.error(f"Base embedding vector is not a list of numbers. ID: {context_embedding.id}. Type: {type(base_vector_list)}")
-            await self._log_interaction(user_id, intent_vector, context_embedding, action_result_status, message_to_return, modified_id)
-            return {"status": action_result_status, "message": message_to_return}
-
-        base_vector_np = np.array(base_vector_list)
-        if base_vector_np.shape[0] != 768:
-            action_result_status = "error"
-            message_to_return = "Corrupted base embedding data (dimension mismatch)."
-            logger.error(f"Dimension mismatch for base_vector. Expected 768, got {base_vector_np.shape[0]}. Embedding ID: {context_embedding.id}")
-            await self._log_interaction(user_id, intent_vector, context_embedding, action_result_status, message_to_return, modified_id)
-            return {"status": action_result_status, "message": message_to_return}
-
-        modified_vector_np = base_vector_np + (direction_vector_np * intensity_factor)
-        norm = np.linalg.norm(modified_vector_np)
-        if norm == 0:
-            logger.warning(f"Norm of modified vector is zero for intent_type '{intent_type}', embedding ID {context_embedding.id}. Using original vector.")
-            modified_vector_list = base_vector_np.tolist()
-        else:
-            modified_vector_np /= norm
-            modified_vector_list = modified_vector_np.tolist()
-
-        logger.info(f"Applied intent_type '{intent_type}', modified embedding {context_embedding.id}. Norm before: {np.linalg.norm(base_vector_np):.4f}, Norm after: {np.linalg.norm(modified_vector_np):.4f}")
-
-        success = await self.embedding_repo.update_embedding_vector(
-            embedding_id=context_embedding.id,
-            new_vector=modified_vector_list
-        )
 
-        if success:
-            action_result_status = "success"
-            message_to_return = f"Intent '{intent_type}' applied. Embedding '{context_embedding.id}' was modified."
-            modified_id = context_embedding.id
-            await self._log_interaction(user_id, intent_vector, context_embedding, action_result_status, message_to_return, modified_id)
-            return {"status": action_result_status, "message": message_to_return, "modified_embedding_id": str(modified_id)}
-        else:
-            action_result_status = "error"
-            message_to_return = f"Failed to update embedding for intent_type '{intent_type}'."
-            logger.error(f"Failed to update embedding {context_embedding.id} in database for intent_type '{intent_type}'.")
-            await self._log_interaction(user_id, intent_vector, context_embedding, action_result_status, message_to_return, modified_id)
-            return {"status": action_result_status, "message": message_to_return, "target_embedding_id": str(context_embedding.id)}
+    async def _log_interactions(self, log_entries: List[TriaLearningLogCreate]):
+        if not log_entries:
+            return
+        self.learning_log_sink.add_many(log_entries)
+        logger.debug(f"Queued {len(log_entries)} interaction(s) for the learning log.")
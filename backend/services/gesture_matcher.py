@@ -0,0 +1,238 @@
+# backend/services/gesture_matcher.py
+"""
+Server-side recognition of user-defined gestures (user_gesture_definitions).
+
+A definition takes part in matching if its `gesture_definition` JSON carries landmark data:
+
+    {"intent": "select",                      # optional: intent the gesture stands for
+     "samples": [<sequence>, ...]}            # or "landmarks": <sequence> for a single sample
+
+where a sequence is a list of frames, each frame `hands x 21 x 3` floats (nested or flat).
+
+Each user's templates are compiled once into NumPy arrays (normalized, resampled, with their
+LB_Keogh envelopes) and kept in a per-user LRU cache. GestureService invalidates a user's entry
+whenever a definition is created, updated or deleted; `ttl_seconds` bounds staleness for changes
+made by other processes. A query is compared against the templates in order of their LB_Keogh
+lower bound: candidates whose bound cannot beat the best distance so far are skipped, the rest
+go through banded DTW in small batches with early abandoning (backend/utils/gesture_dtw.py).
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from backend.utils.env import env_number
+from backend.utils.gesture_dtw import (
+    DEFAULT_SEQUENCE_LENGTH, dtw_distances, envelope, lb_keogh, prepare_sequence,
+)
+
+logger = logging.getLogger(__name__)
+
+DefinitionsLoader = Callable[[], Awaitable[Sequence[Any]]]  # -> UserGestureDefinitionDB-like objects
+
+
+@dataclass
+class GestureMatch:
+    gesture_id: Any
+    gesture_name: str
+    intent: Optional[str]
+    distance: float  # RMS landmark distance along the warping path, in hand-size units
+    confidence: float
+
+
+class _TemplateGroup:
+    """Templates with the same number of hands (same frame dimension)."""
+
+    def __init__(self, templates: np.ndarray, owners: List[int], window: int):
+        self.templates = templates  # (K, L, D)
+        self.owners = owners  # template index -> definition index
+        self.upper, self.lower = envelope(templates, window)
+
+
+class CompiledTemplates:
+    def __init__(self, definitions: List[Dict[str, Any]], groups: Dict[int, _TemplateGroup]):
+        self.definitions = definitions  # {"id", "name", "intent"} per definition
+        self.groups = groups  # frame dimension -> group
+        self.compiled_at = time.monotonic()
+
+    @property
+    def template_count(self) -> int:
+        return sum(len(group.owners) for group in self.groups.values())
+
+
+def _definition_samples(definition: Dict[str, Any]) -> List[Any]:
+    if not isinstance(definition, dict):
+        return []
+    if definition.get("samples"):
+        return list(definition["samples"])
+    if definition.get("landmarks"):
+        return [definition["landmarks"]]
+    return []
+
+
+def compile_templates(definitions: Sequence[Any], length: int = DEFAULT_SEQUENCE_LENGTH,
+                      window: int = 3) -> CompiledTemplates:
+    """UserGestureDefinitionDB-like objects -> CompiledTemplates. Malformed samples are skipped."""
+    described: List[Dict[str, Any]] = []
+    by_dimension: Dict[int, List[np.ndarray]] = {}
+    owners: Dict[int, List[int]] = {}
+    for definition in definitions:
+        body = definition.gesture_definition or {}
+        for sample in _definition_samples(body):
+            try:
+                frames = np.asarray(sample, dtype=np.float32)
+                prepared = prepare_sequence(frames.reshape(frames.shape[0], -1, 21, 3), length)
+            except (ValueError, TypeError, IndexError) as e:
+                logger.warning(f"GestureMatcher: skipping malformed sample of gesture {definition.id}: {e}")
+                continue
+            if not described or described[-1]["id"] != definition.id:
+                described.append({"id": definition.id, "name": definition.gesture_name,
+                                  "intent": body.get("intent") if isinstance(body, dict) else None})
+            by_dimension.setdefault(prepared.shape[1], []).append(prepared)
+            owners.setdefault(prepared.shape[1], []).append(len(described) - 1)
+    groups = {dimension: _TemplateGroup(np.stack(samples), owners[dimension], window)
+              for dimension, samples in by_dimension.items()}
+    return CompiledTemplates(described, groups)
+
+
+class GestureMatcher:
+    """
+    Args:
+        sequence_length: Frames every sequence is resampled to.
+        window_fraction: Sakoe-Chiba band as a fraction of sequence_length.
+        reject_distance: RMS landmark distance (hand-size units) at which confidence reaches 0.
+        min_confidence: Matches below it are not reported.
+        max_users: Users whose compiled templates are kept (LRU).
+        ttl_seconds: Compiled templates older than this are reloaded.
+        batch_size: Candidates sent through DTW together.
+    """
+
+    def __init__(self, sequence_length: int = DEFAULT_SEQUENCE_LENGTH, window_fraction: float = 0.1,
+                 reject_distance: float = 0.5, min_confidence: float = 0.6, max_users: int = 1024,
+                 ttl_seconds: float = 300.0, batch_size: int = 8):
+        self.sequence_length = sequence_length
+        self.window = max(0, int(round(sequence_length * window_fraction)))
+        self.reject_distance = reject_distance
+        self.min_confidence = min_confidence
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.batch_size = max(1, batch_size)
+        self._cache: "OrderedDict[str, CompiledTemplates]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._stale_loads: Set[asyncio.Task] = set()  # loads started before an invalidation
+        self.metrics = {"cache_hits": 0, "compiles": 0, "invalidations": 0, "queries": 0, "matches": 0,
+                        "lb_pruned": 0, "dtw_computed": 0, "abandoned": 0}
+
+    def invalidate(self, user_id: str) -> None:
+        """Drops the user's compiled templates; a load already in flight will not be cached."""
+        self._cache.pop(user_id, None)
+        task = self._loading.pop(user_id, None)
+        if task is not None:
+            self._stale_loads.add(task)
+        self.metrics["invalidations"] += 1
+
+    async def templates_for(self, user_id: str, load: DefinitionsLoader) -> CompiledTemplates:
+        compiled = self._cache.get(user_id)
+        if compiled is not None and time.monotonic() - compiled.compiled_at < self.ttl_seconds:
+            self._cache.move_to_end(user_id)
+            self.metrics["cache_hits"] += 1
+            return compiled
+
+        task = self._loading.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._compile(user_id, load))
+            self._loading[user_id] = task
+            task.add_done_callback(lambda done: self._load_finished(user_id, done))
+        return await asyncio.shield(task)
+
+    def _load_finished(self, user_id: str, task: asyncio.Task) -> None:
+        if self._loading.get(user_id) is task:
+            del self._loading[user_id]
+        self._stale_loads.discard(task)
+
+    async def _compile(self, user_id: str, load: DefinitionsLoader) -> CompiledTemplates:
+        definitions = await load()
+        compiled = compile_templates(definitions, self.sequence_length, self.window)
+        self.metrics["compiles"] += 1
+        if asyncio.current_task() not in self._stale_loads:
+            self._cache[user_id] = compiled
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.max_users:
+                self._cache.popitem(last=False)
+        logger.debug(f"GestureMatcher: compiled {compiled.template_count} template(s) for user {user_id}.")
+        return compiled
+
+    def match(self, frames, compiled: CompiledTemplates) -> Optional[GestureMatch]:
+        """
+        Best template for a landmark sequence (frames of `hands x 21 x 3` floats, nested or flat),
+        or None if nothing reaches min_confidence. Raises ValueError if `frames` is not such a sequence.
+        """
+        self.metrics["queries"] += 1
+        try:
+            frames = np.asarray(frames, dtype=np.float32)
+        except TypeError as e:
+            raise ValueError(f"landmarks are not numeric: {e}") from e
+        if frames.ndim < 2 or not frames.shape[0] or frames[0].size % 63:
+            raise ValueError(f"expected frames of hands x 21 x 3 landmarks, got shape {frames.shape}")
+        query = prepare_sequence(frames.reshape(frames.shape[0], -1, 21, 3), self.sequence_length)
+        group = compiled.groups.get(query.shape[1])
+        if group is None:
+            return None
+
+        bounds = lb_keogh(query, group.upper, group.lower)
+        order = np.argsort(bounds)
+        best_distance, best_index = np.inf, -1
+        computed = 0
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            batch = batch[bounds[batch] < best_distance]
+            if not len(batch):
+                break  # bounds are sorted: nothing further down the list can beat the best distance
+            distances = dtw_distances(query, group.templates[batch], self.window, abandon_at=best_distance)
+            computed += len(batch)
+            self.metrics["abandoned"] += int(np.isinf(distances).sum())
+            candidate = int(np.argmin(distances))
+            if distances[candidate] < best_distance:
+                best_distance, best_index = float(distances[candidate]), int(batch[candidate])
+        self.metrics["dtw_computed"] += computed
+        self.metrics["lb_pruned"] += len(order) - computed
+
+        if best_index < 0:
+            return None
+        landmark_count = query.shape[1] // 3
+        rms = float(np.sqrt(best_distance / (self.sequence_length * landmark_count)))
+        confidence = max(0.0, 1.0 - rms / self.reject_distance)
+        if confidence < self.min_confidence:
+            return None
+        self.metrics["matches"] += 1
+        definition = compiled.definitions[group.owners[best_index]]
+        return GestureMatch(definition["id"], definition["name"], definition["intent"], rms, confidence)
+
+    async def recognize(self, user_id: str, frames, load: DefinitionsLoader) -> Optional[GestureMatch]:
+        compiled = await self.templates_for(user_id, load)
+        if not compiled.groups:
+            return None
+        return self.match(frames, compiled)
+
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self.metrics)
+        stats["cached_users"] = len(self._cache)
+        return stats
+
+
+gesture_matcher = GestureMatcher(
+    sequence_length=int(env_number("GESTURE_MATCH_SEQUENCE_LENGTH", DEFAULT_SEQUENCE_LENGTH)),
+    window_fraction=env_number("GESTURE_MATCH_WINDOW_FRACTION", 0.1),
+    reject_distance=env_number("GESTURE_MATCH_REJECT_DISTANCE", 0.5),
+    min_confidence=env_number("GESTURE_MATCH_MIN_CONFIDENCE", 0.6),
+    max_users=int(env_number("GESTURE_TEMPLATE_CACHE_USERS", 1024)),
+    ttl_seconds=env_number("GESTURE_TEMPLATE_CACHE_TTL", 300.0),
+)
+
+
+def get_gesture_matcher() -> GestureMatcher:
+    return gesture_matcher
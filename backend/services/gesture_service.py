@@ -1,6 +1,7 @@
 import asyncpg
 from typing import List, Optional, Dict, Any
 from backend.repositories.gesture_repository import GestureRepository
+from backend.services.gesture_matcher import get_gesture_matcher
 from backend.core.models.gesture_models import UserGestureDefinitionDB, UserGestureDefinitionCreate
 from backend.core.models.gesture_models import CoreGestureModel # GestureUpdate была в gesture.py роутере, но не в моделях gesture_models, возможно это была ошибка в задании
                                                                  # Используем GestureUpdate из gesture_models.py если она там есть или создадим ее.
@@ -38,7 +39,10 @@ class GestureService:
         Создает новое определение жеста для пользователя.
         """
         # Здесь может быть валидация или другая бизнес-логика
-        return await self.repo.create_gesture(user_id=user_id, gesture_in=gesture_in)
+        created = await self.repo.create_gesture(user_id=user_id, gesture_in=gesture_in)
+        if created:
+            get_gesture_matcher().invalidate(user_id) # скомпилированные шаблоны распознавания устарели
+        return created
 
     async def get_specific_user_gesture(self, gesture_id: int, user_id: str) -> Optional[UserGestureDefinitionDB]:
         """
@@ -55,10 +59,16 @@ class GestureService:
             # В репозитории есть похожая проверка, но лучше и на уровне сервиса
             return await self.repo.get_gesture_by_id(gesture_id=gesture_id, user_id=user_id) # или None, или ошибка
 
-        return await self.repo.update_gesture(gesture_id=gesture_id, user_id=user_id, gesture_update_data=gesture_update_data)
+        updated = await self.repo.update_gesture(gesture_id=gesture_id, user_id=user_id, gesture_update_data=gesture_update_data)
+        if updated:
+            get_gesture_matcher().invalidate(user_id)
+        return updated
 
     async def delete_user_defined_gesture(self, gesture_id: int, user_id: str) -> bool:
         """
         Удаляет определение жеста пользователя.
         """
-        return await self.repo.delete_gesture(gesture_id=gesture_id, user_id=user_id)
+        deleted = await self.repo.delete_gesture(gesture_id=gesture_id, user_id=user_id)
+        if deleted:
+            get_gesture_matcher().invalidate(user_id)
+        return deleted
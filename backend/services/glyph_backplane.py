@@ -0,0 +1,395 @@
+# backend/services/glyph_backplane.py
+"""
+Message backplane connecting NetHoloGlyphService instances in different workers/replicas.
+
+Every worker subscribes to two channels: its own (`nethologlyph:worker:<worker_id>`) for messages
+aimed at clients it holds, and a shared broadcast channel for topic/room and global sends.
+Presence (client_id -> worker_id) is kept in the backplane so a targeted send goes only to the
+worker holding that client. On a RESP server each presence entry expires after `presence_ttl`
+seconds unless its worker refreshes it, so clients of a worker that died stop being routed there.
+
+Implementations:
+- `InMemoryBackplane`: workers in one process share an `InMemoryHub` (tests, single worker);
+- `RespBackplane`: minimal Redis-protocol (RESP2) client over TCP or a Unix socket. Works with
+  Redis or any RESP-compatible server (KeyDB, Dragonfly, a local stand-in on a socket file).
+  Dropped connections are reopened with exponential backoff and the channels re-subscribed.
+
+`create_backplane()` picks one from NETHOLOGLYPH_BACKPLANE_URL.
+"""
+import abc
+import asyncio
+import logging
+import os
+import socket
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlparse
+
+from backend.utils.env import env_number
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_CHANNEL = "nethologlyph:broadcast"
+PRESENCE_KEY = "nethologlyph:presence"  # RESP keys are f"{PRESENCE_KEY}:{client_id}"
+
+MessageHandler = Callable[[str, bytes], Awaitable[None]]
+
+
+def worker_channel(worker_id: str) -> str:
+    return f"nethologlyph:worker:{worker_id}"
+
+
+def default_worker_id() -> str:
+    return os.environ.get("NETHOLOGLYPH_WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+
+class BackplaneError(Exception):
+    pass
+
+
+class BackplaneConnectionError(BackplaneError):
+    """The connection to the backplane server was lost (as opposed to an error reply)."""
+
+
+class Backplane(abc.ABC):
+    """Interface shared by the backplane implementations."""
+
+    @abc.abstractmethod
+    async def start(self, channels: Sequence[str], on_message: MessageHandler) -> None:
+        ...
+
+    async def publish(self, channel: str, data: bytes) -> None:
+        await self.publish_batch([(channel, data)])
+
+    @abc.abstractmethod
+    async def publish_batch(self, items: Sequence[Tuple[str, bytes]]) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def set_presence(self, client_id: str, worker_id: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def clear_presence(self, client_id: str, worker_id: str) -> None:
+        """Removes the client's presence entry if it still points at `worker_id`."""
+
+    @abc.abstractmethod
+    async def lookup(self, client_id: str) -> Optional[str]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryHub:
+    """Shared state of in-process InMemoryBackplane instances."""
+
+    def __init__(self):
+        self.subscribers: Dict[str, Set["InMemoryBackplane"]] = {}
+        self.presence: Dict[str, str] = {}
+
+
+class InMemoryBackplane(Backplane):
+    def __init__(self, hub: Optional[InMemoryHub] = None):
+        self.hub = hub or InMemoryHub()
+        self._channels: List[str] = []
+        self._on_message: Optional[MessageHandler] = None
+
+    async def start(self, channels: Sequence[str], on_message: MessageHandler) -> None:
+        self._on_message = on_message
+        self._channels = list(channels)
+        for channel in self._channels:
+            self.hub.subscribers.setdefault(channel, set()).add(self)
+
+    async def publish_batch(self, items: Sequence[Tuple[str, bytes]]) -> None:
+        for channel, data in items:
+            for backplane in list(self.hub.subscribers.get(channel, ())):
+                await backplane._on_message(channel, data)
+
+    async def set_presence(self, client_id: str, worker_id: str) -> None:
+        self.hub.presence[client_id] = worker_id
+
+    async def clear_presence(self, client_id: str, worker_id: str) -> None:
+        if self.hub.presence.get(client_id) == worker_id:
+            del self.hub.presence[client_id]
+
+    async def lookup(self, client_id: str) -> Optional[str]:
+        return self.hub.presence.get(client_id)
+
+    async def close(self) -> None:
+        for channel in self._channels:
+            self.hub.subscribers.get(channel, set()).discard(self)
+        self._channels = []
+
+
+def _encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+class RespConnection:
+    """
+    One RESP2 connection. Commands on a connection are serialized; pipelines go out in one write.
+    If a pipeline is interrupted before all its replies were read (cancellation, I/O error, a
+    malformed reply), the connection is marked `broken` and refuses further commands: its
+    remaining replies would otherwise be read as answers to the next command.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self._lock = asyncio.Lock()
+        self.broken = False
+
+    @classmethod
+    async def open(cls, url: str) -> "RespConnection":
+        parsed = urlparse(url)
+        if parsed.scheme == "unix":
+            reader, writer = await asyncio.open_unix_connection(parsed.path)
+        elif parsed.scheme in ("redis", "tcp"):
+            reader, writer = await asyncio.open_connection(parsed.hostname or "localhost", parsed.port or 6379)
+        else:
+            raise BackplaneError(f"Unsupported backplane URL scheme '{parsed.scheme}'.")
+        connection = cls(reader, writer)
+        if parsed.password:
+            await connection.execute("AUTH", parsed.password)
+        return connection
+
+    async def read_reply(self):
+        """Next reply; an error reply is raised as BackplaneError."""
+        reply = await self._read_value()
+        if isinstance(reply, BackplaneError):
+            raise reply
+        return reply
+
+    async def _read_value(self):
+        """Next reply, with error replies returned as BackplaneError values instead of raised."""
+        line = await self.reader.readline()
+        if not line:
+            raise BackplaneConnectionError("Backplane connection closed.")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            return BackplaneError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = await self.reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            return None if count < 0 else [await self._read_value() for _ in range(count)]
+        raise BackplaneConnectionError(f"Unexpected RESP reply type {kind!r}; connection out of sync.")
+
+    async def execute(self, *args):
+        return (await self.pipeline([args]))[0]
+
+    async def pipeline(self, commands: Sequence[Sequence]) -> List:
+        """
+        Sends the commands in one write and reads all their replies. An error reply is raised
+        (the first one) only after every reply has been read, so the connection stays in sync.
+        """
+        async with self._lock:
+            if self.broken:
+                raise BackplaneConnectionError("Backplane connection is out of sync and must be reopened.")
+            try:
+                self.writer.write(b"".join(_encode_command(*command) for command in commands))
+                await self.writer.drain()
+                replies = [await self._read_value() for _ in commands]
+            except BaseException:
+                # Unread replies may be left on the socket; never reuse it.
+                self.broken = True
+                self.writer.close()
+                raise
+        for reply in replies:
+            if isinstance(reply, BackplaneError):
+                raise reply
+        return replies
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+
+
+# Errors after which a connection is reopened
+_CONNECTION_ERRORS = (BackplaneConnectionError, ConnectionError, OSError, asyncio.IncompleteReadError)
+
+
+class RespBackplane(Backplane):
+    """
+    Args:
+        url: redis://[:password@]host:port or unix:///path/to/socket
+        presence_key: Prefix of the per-client presence keys (client_id -> worker_id).
+        presence_ttl: Seconds a presence entry lives without a refresh; this worker refreshes its
+            own entries every presence_ttl / 3.
+        reconnect_delay: First retry delay after a lost connection, doubled up to reconnect_max_delay.
+    """
+
+    def __init__(self, url: str, presence_key: str = PRESENCE_KEY, presence_ttl: float = 60.0,
+                 reconnect_delay: float = 0.5, reconnect_max_delay: float = 30.0):
+        self.url = url
+        self.presence_key = presence_key
+        self.presence_ttl = max(1, int(presence_ttl))
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self._commands: Optional[RespConnection] = None
+        self._subscriber: Optional[RespConnection] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self._channels: List[str] = []
+        self._present: Dict[str, str] = {}  # clients of this worker: client_id -> worker_id
+        self._reconnect_lock = asyncio.Lock()
+        self.reconnects = 0
+
+    def _presence(self, client_id: str) -> str:
+        return f"{self.presence_key}:{client_id}"
+
+    async def start(self, channels: Sequence[str], on_message: MessageHandler) -> None:
+        self._channels = list(channels)
+        self._commands = await RespConnection.open(self.url)
+        await self._subscribe()
+        self._listener = asyncio.create_task(self._listen(on_message), name="nethologlyph-backplane-listener")
+        self._refresher = asyncio.create_task(self._refresh_presence(), name="nethologlyph-backplane-presence")
+        logger.info(f"NetHoloGlyph backplane connected ({self.url}), subscribed to {self._channels}.")
+
+    async def _subscribe(self) -> None:
+        # A subscribed RESP connection can't run other commands, hence the second connection.
+        subscriber = await RespConnection.open(self.url)
+        try:
+            subscriber.writer.write(_encode_command("SUBSCRIBE", *self._channels))
+            await subscriber.writer.drain()
+            for _ in self._channels:
+                await subscriber.read_reply()  # ["subscribe", channel, count]
+        except BaseException:
+            await subscriber.close()
+            raise
+        self._subscriber = subscriber
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.reconnect_max_delay, self.reconnect_delay * 2 ** attempt)
+
+    async def _listen(self, on_message: MessageHandler) -> None:
+        while True:
+            try:
+                reply = await self._subscriber.read_reply()
+            except _CONNECTION_ERRORS as e:
+                logger.error(f"Backplane subscription to {self.url} lost: {e!r}. Reconnecting.")
+                await self._subscriber.close()
+                await self._resubscribe()
+                continue
+            if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                try:
+                    await on_message(reply[1].decode(), reply[2])
+                except Exception as e:
+                    logger.error(f"Error handling backplane message on {reply[1]!r}: {e}", exc_info=True)
+
+    async def _resubscribe(self) -> None:
+        """Reopens the subscriber connection, retrying with backoff until it succeeds."""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._backoff(attempt))
+            try:
+                await self._subscribe()
+            except (BackplaneError, *_CONNECTION_ERRORS) as e:
+                attempt += 1
+                logger.warning(f"Backplane reconnect to {self.url} failed (attempt {attempt}): {e!r}")
+                continue
+            self.reconnects += 1
+            logger.info(f"Backplane subscription restored ({self.url}), channels {self._channels}.")
+            return
+
+    async def _pipeline(self, commands: Sequence[Sequence]) -> List:
+        """Runs commands on the command connection, reopening it once if it was lost."""
+        connection = self._commands
+        try:
+            return await connection.pipeline(commands)
+        except _CONNECTION_ERRORS as e:
+            logger.error(f"Backplane command connection to {self.url} lost: {e!r}. Reconnecting.")
+            async with self._reconnect_lock:
+                if self._commands is connection:  # not already replaced by a concurrent caller
+                    await connection.close()
+                    self._commands = await RespConnection.open(self.url)
+                    self.reconnects += 1
+            return await self._commands.pipeline(commands)
+
+    async def _execute(self, *args):
+        return (await self._pipeline([args]))[0]
+
+    async def _refresh_presence(self) -> None:
+        interval = self.presence_ttl / 3
+        attempt = 0
+        while True:
+            await asyncio.sleep(interval if attempt == 0 else self._backoff(attempt - 1))
+            if not self._present:
+                continue
+            try:
+                await self._pipeline([
+                    ("SET", self._presence(client_id), worker_id, "EX", self.presence_ttl)
+                    for client_id, worker_id in list(self._present.items())
+                ])
+                attempt = 0
+            except Exception as e:
+                attempt += 1
+                logger.error(f"Backplane presence refresh failed (attempt {attempt}): {e!r}")
+
+    async def publish_batch(self, items: Sequence[Tuple[str, bytes]]) -> None:
+        if items:
+            await self._pipeline([("PUBLISH", channel, data) for channel, data in items])
+
+    async def set_presence(self, client_id: str, worker_id: str) -> None:
+        self._present[client_id] = worker_id
+        await self._execute("SET", self._presence(client_id), worker_id, "EX", self.presence_ttl)
+
+    async def clear_presence(self, client_id: str, worker_id: str) -> None:
+        if self._present.get(client_id) == worker_id:
+            del self._present[client_id]
+        # Read-then-delete; losing the race only leaves a reconnecting client briefly unroutable.
+        current = await self._execute("GET", self._presence(client_id))
+        if current is not None and current.decode() == worker_id:
+            await self._execute("DEL", self._presence(client_id))
+
+    async def lookup(self, client_id: str) -> Optional[str]:
+        worker = await self._execute("GET", self._presence(client_id))
+        return worker.decode() if worker is not None else None
+
+    async def close(self) -> None:
+        for task in (self._listener, self._refresher):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        for connection in (self._subscriber, self._commands):
+            if connection is not None:
+                await connection.close()
+        self._listener = self._refresher = self._subscriber = self._commands = None
+
+
+_process_hub = InMemoryHub()
+
+
+def create_backplane(url: Optional[str] = None) -> Optional[Backplane]:
+    """
+    NETHOLOGLYPH_BACKPLANE_URL: empty -> no backplane (single process), "memory://" -> in-process
+    hub, "redis://host:port" / "unix:///path" -> RESP server.
+    NETHOLOGLYPH_PRESENCE_TTL: seconds a RESP presence entry survives without a refresh (default 60).
+    """
+    url = url if url is not None else os.environ.get("NETHOLOGLYPH_BACKPLANE_URL", "")
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemoryBackplane(_process_hub)
+    return RespBackplane(url, presence_ttl=env_number("NETHOLOGLYPH_PRESENCE_TTL", 60))
@@ -0,0 +1,86 @@
+# backend/services/glyph_rooms.py
+"""
+Topic/room membership for NetHoloGlyph delivery.
+
+Clients subscribe to topics - one per scene (`scene:<scene_id>`) and per session
+(`session:<session_id>`) - optionally restricted to certain payload types (the NetHoloPacket
+oneof names, e.g. {"holo_symbol", "tria_state"}). Publishing to a topic touches only that
+topic's subscribers, so the cost of an update no longer grows with the total number of
+connected clients. Clients join a scene room through the handshake (`scene_ids`) or by sending
+a SceneResyncRequest; a client that never joined any room still receives everything.
+"""
+import logging
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def scene_topic(scene_id: str) -> str:
+    return f"scene:{scene_id}"
+
+
+def session_topic(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+class RoomRegistry:
+    """
+    Bidirectional index topic <-> client. Each (client, topic) subscription carries an optional
+    interest filter; None means "all payload types".
+    """
+
+    def __init__(self):
+        self._members: Dict[str, Dict[str, Optional[FrozenSet[str]]]] = {}  # topic -> {client_id: filter}
+        self._topics_by_client: Dict[str, Set[str]] = {}
+
+    def subscribe(self, client_id: str, topic: str, payload_types: Optional[Iterable[str]] = None) -> None:
+        """Adds (or updates the interest filter of) a subscription."""
+        interest = frozenset(payload_types) if payload_types is not None else None
+        self._members.setdefault(topic, {})[client_id] = interest
+        self._topics_by_client.setdefault(client_id, set()).add(topic)
+
+    def unsubscribe(self, client_id: str, topic: str) -> None:
+        members = self._members.get(topic)
+        if members is not None:
+            members.pop(client_id, None)
+            if not members:
+                del self._members[topic]
+        topics = self._topics_by_client.get(client_id)
+        if topics is not None:
+            topics.discard(topic)
+            if not topics:
+                del self._topics_by_client[client_id]
+
+    def remove_client(self, client_id: str) -> None:
+        """Drops every subscription of a disconnected client."""
+        for topic in self._topics_by_client.pop(client_id, ()):
+            members = self._members.get(topic)
+            if members is not None:
+                members.pop(client_id, None)
+                if not members:
+                    del self._members[topic]
+
+    def subscribers(self, topic: str, payload_type: Optional[str] = None) -> Iterator[str]:
+        """Clients subscribed to `topic` whose interest filter admits `payload_type`."""
+        for client_id, interest in self._members.get(topic, {}).items():
+            if interest is None or payload_type is None or payload_type in interest:
+                yield client_id
+
+    def is_subscribed(self, client_id: str) -> bool:
+        """True if the client has joined at least one topic."""
+        return client_id in self._topics_by_client
+
+    @property
+    def client_count(self) -> int:
+        """Number of clients with at least one subscription."""
+        return len(self._topics_by_client)
+
+    def topics_of(self, client_id: str) -> List[str]:
+        return sorted(self._topics_by_client.get(client_id, ()))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "topics": len(self._members),
+            "subscriptions": sum(len(members) for members in self._members.values()),
+            "clients": len(self._topics_by_client),
+        }
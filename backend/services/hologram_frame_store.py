@@ -0,0 +1,236 @@
+# backend/services/hologram_frame_store.py
+"""
+Precomputed hologram frames for uploaded tracks.
+
+A track is rendered once with the streaming CWT encoder (backend/utils/cwt_stream.py) into a
+memory-mapped columnar .holo file (backend/utils/hologram_frame_file.py) and then served to every
+client that visualizes it, instead of each browser decoding and analysing the audio itself.
+
+Files are keyed by the SHA-256 of the audio bytes plus a digest of the encoder settings, so the
+same track uploaded twice is rendered once, and changing HOLOGRAM_FRAMES_HOP / _CHUNK_SIZE
+produces new files instead of serving stale ones. The hash is computed while the audio streams
+through the encoder; nothing is buffered in full. After rendering a media file the entry is
+linked from `media_files.metadata["hologram_frames"]`.
+
+    entry = await get_hologram_frame_store().render_media_file(media_file_id, pool, s3_client, bucket)
+    frames = get_hologram_frame_store().open(entry["key"])   # FrameFile or None
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, Optional, Set, Tuple
+
+from backend.core.db.pg_connector import DBExecutor
+from backend.repositories.media_file_repository import MediaFileRepository
+from backend.services.background_tasks import PRIORITY_LOW, get_background_runner
+from backend.utils.cwt_hologram import DEFAULT_TARGET_FREQUENCIES, frequency_key
+from backend.utils.cwt_stream import iter_hologram_blocks
+from backend.utils.env import env_number
+from backend.utils.hologram_frame_file import VERSION, FrameFile, FrameFileWriter, read_header
+from backend.utils.pcm_reader import open_pcm
+
+logger = logging.getLogger(__name__)
+
+METADATA_KEY = "hologram_frames"
+KEY_PATTERN = re.compile(r"^[0-9a-f]{64}-[0-9a-f]{12}$")
+
+
+class _HashingReader(io.RawIOBase):
+    """Forward-only view of a binary stream that feeds every byte read into `hasher`."""
+
+    def __init__(self, fileobj: BinaryIO, hasher):
+        self._fileobj = fileobj
+        self._hasher = hasher
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._fileobj.read(len(buffer))
+        if not data:
+            return 0
+        buffer[:len(data)] = data
+        self._hasher.update(data)
+        self.bytes_read += len(data)
+        return len(data)
+
+
+def split_storage_path(storage_path: str, default_bucket: Optional[str]) -> Tuple[Optional[str], str]:
+    """"s3://bucket/key" or "gs://bucket/key" -> (bucket, key); a bare object key keeps the default bucket."""
+    if "://" in storage_path:
+        bucket, _, key = storage_path.split("://", 1)[1].partition("/")
+        return bucket, key
+    return default_bucket, storage_path
+
+
+class HologramFrameStore:
+    """
+    Args:
+        root: Directory for .holo files (sharded by the first two hex digits of the key).
+        chunk_size: Wavelet support of the encoder in samples.
+        hop: Samples between frames.
+        frequencies: Band centre frequencies.
+        max_open_files: Memory-mapped files kept open (LRU). An evicted file is only dropped from
+            the cache, never unmapped, so readers still holding it are unaffected.
+        render_timeout: Seconds a scheduled render may take on the background runner.
+    """
+
+    def __init__(self, root: str, chunk_size: int = 1024, hop: int = 256,
+                 frequencies=DEFAULT_TARGET_FREQUENCIES, max_open_files: int = 64, render_timeout: float = 600.0):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.hop = hop
+        self.frequencies = frequencies
+        self.max_open_files = max_open_files
+        self.render_timeout = render_timeout
+        settings = f"holo/{VERSION}:{chunk_size}:{hop}:{frequency_key(frequencies)}"
+        self.settings_digest = hashlib.sha256(settings.encode()).hexdigest()[:12]
+        self._open: "OrderedDict[str, FrameFile]" = OrderedDict()
+        self._open_lock = threading.Lock()  # open() is also reached from worker threads
+        self._scheduled: Set[int] = set()
+        self.metrics = {"renders": 0, "dedup_hits": 0, "frames_rendered": 0, "open_hits": 0, "open_misses": 0}
+
+    def key_for(self, content_hash: str) -> str:
+        return f"{content_hash}-{self.settings_digest}"
+
+    def path_for(self, key: str) -> str:
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid hologram frame key: {key!r}.")
+        return os.path.join(self.root, key[:2], f"{key}.holo")
+
+    def exists(self, key: str) -> bool:
+        return KEY_PATTERN.match(key) is not None and os.path.exists(self.path_for(key))
+
+    def open(self, key: str) -> Optional[FrameFile]:
+        """Memory-mapped frames for `key`, or None if the key is unknown or has not been rendered."""
+        with self._open_lock:
+            frame_file = self._open.get(key)
+            if frame_file is not None:
+                self._open.move_to_end(key)
+                self.metrics["open_hits"] += 1
+                return frame_file
+            if not self.exists(key):
+                return None
+            self.metrics["open_misses"] += 1
+            frame_file = FrameFile(self.path_for(key))
+            self._open[key] = frame_file
+            while len(self._open) > self.max_open_files:
+                self._open.popitem(last=False)
+            return frame_file
+
+    def describe(self, key: str) -> Dict[str, Any]:
+        """The entry stored in media_files.metadata["hologram_frames"] (reads only the file header)."""
+        header = read_header(self.path_for(key))
+        return {
+            "key": key,
+            "content_hash": key.split("-", 1)[0],
+            "format": f"holo/{VERSION}",
+            "frame_count": header.frame_count,
+            "sample_rate": header.sample_rate,
+            "chunk_size": header.chunk_size,
+            "hop": header.hop,
+            "bands": header.bands,
+            "frame_rate": header.sample_rate / header.hop,
+            "duration_seconds": header.frame_count * header.hop / header.sample_rate,
+            "size_bytes": header.size,
+        }
+
+    def render(self, fileobj: BinaryIO, content_type: Optional[str] = None, total_bytes: Optional[int] = None,
+               content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Renders a WAV/PCM stream (blocking, CPU-bound - run it in a worker thread) and returns its
+        entry. With a known `content_hash` an already rendered file is returned without reading.
+        """
+        if content_hash and self.exists(self.key_for(content_hash)):
+            self.metrics["dedup_hits"] += 1
+            return self.describe(self.key_for(content_hash))
+
+        hasher = hashlib.sha256()
+        source = io.BufferedReader(_HashingReader(fileobj, hasher))
+        reader = open_pcm(source, content_type, total_bytes=total_bytes)
+        os.makedirs(self.root, exist_ok=True)
+        writer = FrameFileWriter(os.path.join(self.root, "pending.holo"), reader.sample_rate, self.chunk_size,
+                                 self.hop, self.frequencies)
+        try:
+            for block in iter_hologram_blocks(reader, self.chunk_size, self.hop, frequencies=self.frequencies):
+                writer.write(block.db_levels, block.pan_angles)
+            while source.read(1 << 20):  # trailing chunks still count towards the content hash
+                pass
+        except BaseException:
+            writer.discard()
+            raise
+
+        key = self.key_for(hasher.hexdigest())
+        if self.exists(key):
+            writer.discard()
+            self.metrics["dedup_hits"] += 1
+        else:
+            writer.commit(hasher.digest(), self.path_for(key))
+            self.metrics["renders"] += 1
+            self.metrics["frames_rendered"] += writer.frame_count
+            logger.info(f"HologramFrameStore: rendered {writer.frame_count} frame(s) into {key}.")
+        return self.describe(key)
+
+    async def render_media_file(self, media_file_id: int, db: DBExecutor, s3_client,
+                                bucket: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Renders a media_files row (if not rendered yet) and links the result from its metadata."""
+        repository = MediaFileRepository(db)
+        media_file = await repository.get_media_file(media_file_id)
+        if media_file is None:
+            return None
+        linked = (media_file.metadata or {}).get(METADATA_KEY) or {}
+        if linked.get("key") == self.key_for(linked.get("content_hash", "")) and self.exists(linked["key"]):
+            return linked
+
+        object_bucket, object_key = split_storage_path(media_file.storage_path, bucket)
+        response = await asyncio.to_thread(s3_client.get_object, Bucket=object_bucket, Key=object_key)
+        try:
+            entry = await asyncio.to_thread(
+                self.render, response["Body"], media_file.file_type or response.get("ContentType"),
+                response.get("ContentLength"), (media_file.metadata or {}).get("content_sha256"))
+        finally:
+            response["Body"].close()
+        await repository.merge_metadata(media_file_id, {METADATA_KEY: entry}, duration_seconds=entry["duration_seconds"])
+        return entry
+
+    def schedule_media_render(self, media_file_id: int, db: DBExecutor, s3_client, bucket: Optional[str]) -> bool:
+        """Queues render_media_file on the background runner; a media file already queued is not queued twice."""
+        if media_file_id in self._scheduled:
+            return True
+
+        async def job():
+            try:
+                await self.render_media_file(media_file_id, db, s3_client, bucket)
+            finally:
+                self._scheduled.discard(media_file_id)
+
+        accepted = get_background_runner().submit(job, priority=PRIORITY_LOW, timeout=self.render_timeout,
+                                                  name=f"hologram-frames:{media_file_id}")
+        if accepted:
+            self._scheduled.add(media_file_id)
+        return accepted
+
+    def is_scheduled(self, media_file_id: int) -> bool:
+        return media_file_id in self._scheduled
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics, "open_files": len(self._open), "scheduled": len(self._scheduled)}
+
+
+hologram_frame_store = HologramFrameStore(
+    root=os.environ.get("HOLOGRAM_FRAMES_DIR", os.path.join("data", "hologram_frames")),
+    chunk_size=int(env_number("HOLOGRAM_FRAMES_CHUNK_SIZE", 1024)),
+    hop=int(env_number("HOLOGRAM_FRAMES_HOP", 256)),
+    max_open_files=int(env_number("HOLOGRAM_FRAMES_MAX_OPEN", 64)),
+    render_timeout=env_number("HOLOGRAM_FRAMES_RENDER_TIMEOUT", 600.0),
+)
+
+
+def get_hologram_frame_store() -> HologramFrameStore:
+    return hologram_frame_store
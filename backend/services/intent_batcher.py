@@ -0,0 +1,93 @@
+# backend/services/intent_batcher.py
+"""
+Micro-batching front for `GestureIntentService.apply_intents_batch`.
+
+Concurrent single intents (one per WebSocket message) are collected for a short window, or until
+`max_batch_size` are queued, and applied with one batch call - one vector re-read and one bulk
+UPDATE for the whole group; each caller gets its own result back. Batches are applied one at a
+time, so two intents on the same embedding are never read-modified-written concurrently by this
+worker.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+IntentItem = Tuple[str, dict, Any]  # (user_id, intent_vector, context_embedding)
+ApplyBatchFn = Callable[[Sequence[IntentItem]], Awaitable[List[dict]]]
+
+
+class IntentBatcher:
+    """
+    Args:
+        apply_batch: Coroutine `(items) -> results` returning one result per item, in order.
+        window_ms: How long the first queued intent waits for companions before the batch is applied.
+        max_batch_size: A batch is applied immediately once this many intents are queued.
+        max_in_flight: Maximum concurrent batch calls.
+    """
+
+    def __init__(self, apply_batch: ApplyBatchFn, window_ms: float = 5.0, max_batch_size: int = 64,
+                 max_in_flight: int = 1):
+        self.apply_batch = apply_batch
+        self.window_seconds = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._queue: List[Tuple[IntentItem, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self.metrics = {"requests": 0, "batches": 0, "intents_applied": 0, "failed_batches": 0}
+
+    async def apply(self, user_id: str, intent_vector: dict, context_embedding: Any) -> dict:
+        """Applies one intent as part of the next batch and returns its own result."""
+        self.metrics["requests"] += 1
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append(((user_id, intent_vector, context_embedding), future))
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        # A cancelled caller does not cancel the batch its intent is part of
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        queue, self._queue = self._queue, []
+        if not queue:
+            return
+        task = asyncio.ensure_future(self._send(queue))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, queue: List[Tuple[IntentItem, asyncio.Future]]) -> None:
+        async with self._in_flight:
+            try:
+                results = await self.apply_batch([item for item, _ in queue])
+                if len(results) != len(queue):
+                    raise ValueError(f"Intent batch returned {len(results)} results for {len(queue)} intents.")
+            except Exception as e:
+                self.metrics["failed_batches"] += 1
+                logger.error(f"IntentBatcher: batch of {len(queue)} intent(s) failed: {e}", exc_info=True)
+                for _, future in queue:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+        self.metrics["batches"] += 1
+        self.metrics["intents_applied"] += len(queue)
+        for (_, future), result in zip(queue, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Applies whatever is queued and waits for in-flight batches."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self.metrics)
+        stats["queued"] = len(self._queue)
+        return stats
@@ -0,0 +1,295 @@
+# backend/services/learning_log_sink.py
+"""
+Write-behind sink for tria_learning_log.
+
+Request handlers `add()` records and return immediately; the sink writes them in batches of up
+to `max_batch_size` (as soon as that many are queued, or `flush_interval` seconds after the first
+one) through a single `write_batch` call, e.g. one executemany.
+
+- Bounded memory: at most `max_buffer` records are held; beyond that new records go straight to
+  the spill file (or are dropped and counted if there is none).
+- A batch that still fails after retries is appended to the spill file (JSON lines) instead of
+  being lost; the file is replayed after the next successful write and on `replay_spill()`.
+- `close()` writes (or spills) everything still buffered, so records survive a shutdown at least
+  once. A crash between a write and the removal of its spill lines can duplicate rows, never lose them.
+- The spill file may be shared by several worker processes: appends and the hand-over to a replay
+  take an exclusive lock on `<spill_path>.lock`, and only the process holding `<spill_path>.replay.lock`
+  replays (fcntl.flock; without fcntl only tasks of one process are coordinated).
+"""
+import asyncio
+import logging
+import os
+import random
+import tempfile
+from collections import deque
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Deque, Dict, Generic, List, Optional, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from backend.core.models.tria_learning_models import TriaLearningLogCreate
+from backend.utils.env import env_number
+
+logger = logging.getLogger(__name__)
+
+RecordT = TypeVar("RecordT", bound=BaseModel)
+WriteBatchFn = Callable[[List[RecordT]], Awaitable[object]]
+
+
+class WriteBehindSink(Generic[RecordT]):
+    """
+    Args:
+        write_batch: Coroutine persisting a list of records in one round-trip.
+        record_type: Pydantic model of the records, used to read the spill file back.
+        max_batch_size: Records per write_batch call; reaching it triggers a flush.
+        flush_interval: Seconds the oldest buffered record waits for companions.
+        max_buffer: Records held in memory before new ones are spilled (or dropped).
+        spill_path: JSON-lines file for records that could not be written; None disables spilling.
+        max_retries: Retries per batch after the first attempt (exponential backoff, full jitter).
+    """
+
+    def __init__(self, write_batch: WriteBatchFn, record_type: Type[RecordT], max_batch_size: int = 500,
+                 flush_interval: float = 1.0, max_buffer: int = 10000, spill_path: Optional[str] = None,
+                 max_retries: int = 2, retry_base_delay: float = 0.2):
+        self.write_batch = write_batch
+        self.record_type = record_type
+        self.max_batch_size = max(1, max_batch_size)
+        self.flush_interval = flush_interval
+        self.max_buffer = max(self.max_batch_size, max_buffer)
+        self.spill_path = spill_path
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+
+        self._buffer: Deque[RecordT] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self._spill_lock = asyncio.Lock()
+        self._replay_lock = asyncio.Lock()
+        self._pending_spill: List[RecordT] = []  # overflow waiting for the next spill write
+        self.metrics = {"added": 0, "written": 0, "batches": 0, "retries": 0, "spilled": 0, "replayed": 0, "dropped": 0}
+
+    def add(self, record: RecordT) -> None:
+        """Buffers one record; never waits for the database."""
+        self.add_many([record])
+
+    def add_many(self, records: Sequence[RecordT]) -> None:
+        self.metrics["added"] += len(records)
+        for record in records:
+            if len(self._buffer) < self.max_buffer:
+                self._buffer.append(record)
+            elif self.spill_path:
+                self._pending_spill.append(record)
+            else:
+                self.metrics["dropped"] += 1
+        if self._pending_spill:
+            logger.warning(f"WriteBehindSink: buffer full ({self.max_buffer}); spilling {len(self._pending_spill)} record(s) to {self.spill_path}.")
+        flushing = self._flush_task is not None and not self._flush_task.done()
+        if flushing or not self._buffer and not self._pending_spill:
+            return
+        if len(self._buffer) >= self.max_batch_size or self._pending_spill:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._start_flush(drain=False)
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._start_flush, True)
+
+    def _start_flush(self, drain: bool) -> None:
+        if drain:
+            self._timer = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_loop(drain))
+
+    async def _flush_loop(self, drain: bool) -> None:
+        # Full batches go out as soon as they exist; a partial one only when its timer fires (drain).
+        # Records added while a batch is being written are picked up by the same loop.
+        try:
+            while self._pending_spill or len(self._buffer) >= (1 if drain else self.max_batch_size):
+                await self._flush_once()
+        except Exception as e:
+            logger.error(f"WriteBehindSink: flush failed: {e}", exc_info=True)
+        finally:
+            if self._buffer and self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._start_flush, True)
+
+    async def _flush_once(self) -> None:
+        if self._pending_spill:
+            overflow, self._pending_spill = self._pending_spill, []
+            await self._spill(overflow)
+        batch = [self._buffer.popleft() for _ in range(min(self.max_batch_size, len(self._buffer)))]
+        if not batch:
+            return
+        if await self._write(batch):
+            await self.replay_spill()
+        else:
+            await self._spill(batch)
+
+    async def _write(self, batch: List[RecordT]) -> bool:
+        attempt = 0
+        async with self._write_lock:
+            while True:
+                try:
+                    await self.write_batch(batch)
+                    self.metrics["batches"] += 1
+                    self.metrics["written"] += len(batch)
+                    return True
+                except Exception as e:
+                    if attempt >= self.max_retries:
+                        logger.error(f"WriteBehindSink: batch of {len(batch)} failed after {attempt + 1} attempts: {e}")
+                        return False
+                    delay = random.uniform(0, self.retry_base_delay * (2 ** attempt))
+                    attempt += 1
+                    self.metrics["retries"] += 1
+                    logger.warning(f"WriteBehindSink: batch failed ({e}); retry {attempt}/{self.max_retries} in {delay:.3f}s.")
+                    await asyncio.sleep(delay)
+
+    async def _spill(self, records: List[RecordT]) -> None:
+        if not records:
+            return
+        if not self.spill_path:
+            self.metrics["dropped"] += len(records)
+            logger.error(f"WriteBehindSink: no spill file configured; dropped {len(records)} record(s).")
+            return
+        lines = "".join(record.model_dump_json() + "\n" for record in records)
+        async with self._spill_lock:
+            await asyncio.to_thread(_append_locked, self.spill_path, lines)
+        self.metrics["spilled"] += len(records)
+
+    async def replay_spill(self) -> int:
+        """
+        Writes spilled records back in batches; whatever fails again stays in the spill file.
+        Returns 0 without waiting if another process is replaying the same file.
+        """
+        if not self.spill_path:
+            return 0
+        async with self._replay_lock:
+            with _file_lock(self.spill_path + ".replay.lock", blocking=False) as acquired:
+                if not acquired:
+                    return 0
+                replay_path = self.spill_path + ".replay"
+                async with self._spill_lock:
+                    lines = await asyncio.to_thread(_claim_spill, self.spill_path, replay_path)
+                if lines is None:
+                    return 0
+                records = []
+                for line in lines:
+                    try:
+                        records.append(self.record_type.model_validate_json(line))
+                    except ValueError as e:
+                        logger.error(f"WriteBehindSink: skipping unreadable spill line: {e}")
+                replayed = 0
+                for start in range(0, len(records), self.max_batch_size):
+                    batch = records[start:start + self.max_batch_size]
+                    if not await self._write(batch):
+                        rest = "".join(record.model_dump_json() + "\n" for record in records[start:])
+                        async with self._spill_lock:
+                            await asyncio.to_thread(_append_locked, self.spill_path, rest)
+                        break
+                    replayed += len(batch)
+                os.remove(replay_path)
+        if replayed:
+            self.metrics["replayed"] += replayed
+            logger.info(f"WriteBehindSink: replayed {replayed} spilled record(s).")
+        return replayed
+
+    async def flush(self) -> None:
+        """Writes (or spills) everything buffered right now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        while self._buffer or self._pending_spill:
+            await self._flush_once()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def close(self) -> None:
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self.metrics)
+        stats["buffered"] = len(self._buffer)
+        return stats
+
+
+def _append_text(path: str, text: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_lines(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line for line in f.read().splitlines() if line.strip()]
+
+
+@contextmanager
+def _file_lock(path: str, blocking: bool = True):
+    """Exclusive advisory lock on `path` (created if missing). Yields False if non-blocking and held elsewhere."""
+    if fcntl is None:
+        yield True
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _append_locked(path: str, text: str) -> None:
+    with _file_lock(path + ".lock"):
+        _append_text(path, text)
+
+
+def _claim_spill(spill_path: str, replay_path: str) -> Optional[List[str]]:
+    """
+    Moves the spill file aside for replay and returns its lines; None if there is nothing to replay.
+    Called with the replay lock held, so a leftover replay file is from an interrupted replay.
+    """
+    with _file_lock(spill_path + ".lock"):
+        if not os.path.exists(replay_path):
+            if not os.path.exists(spill_path):
+                return None
+            os.replace(spill_path, replay_path)
+    return _read_lines(replay_path)
+
+
+async def _write_learning_log_batch(entries: List[TriaLearningLogCreate]) -> None:
+    # Поздние импорты: пул создается при старте приложения
+    from backend.core.db.pg_connector import get_db_pool
+    from backend.repositories.learning_log_repository import LearningLogRepository
+    await LearningLogRepository(await get_db_pool()).create_log_entries(entries)
+
+
+learning_log_sink: WriteBehindSink[TriaLearningLogCreate] = WriteBehindSink(
+    _write_learning_log_batch,
+    TriaLearningLogCreate,
+    max_batch_size=int(env_number("LEARNING_LOG_BATCH_SIZE", 500)),
+    flush_interval=env_number("LEARNING_LOG_FLUSH_INTERVAL_MS", 1000.0) / 1000.0,
+    max_buffer=int(env_number("LEARNING_LOG_MAX_BUFFER", 10000)),
+    spill_path=os.environ.get("LEARNING_LOG_SPILL_PATH", os.path.join(tempfile.gettempdir(), "tria_learning_log.spill.jsonl")) or None,
+)
+
+
+def get_learning_log_sink() -> WriteBehindSink[TriaLearningLogCreate]:
+    return learning_log_sink
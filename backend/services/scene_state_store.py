@@ -0,0 +1,417 @@
+# backend/services/scene_state_store.py
+"""
+Authoritative, versioned scene state for NetHoloGlyph scene sync.
+
+`SceneStateStore` keeps the current elements of every scene (keyed by `scene_id`) and turns each
+incoming `SceneUpdatePayload` into a `SceneDelta` that carries only what actually changed:
+new elements in full, field-level `ElementDelta`s (position / orientation / scale / color / type /
+other properties) for existing ones, and removed ids. Every non-empty update bumps the scene
+version; clients apply a delta only on top of its `base_version`.
+
+Recent deltas are kept so a client that missed some (dropped packets, late subscribe) can be
+caught up by replaying them; if it is too far behind it gets a keyframe (full snapshot) instead.
+Every `keyframe_interval` versions the published message is a keyframe, so replicas converge
+even without asking. A field that was removed is flagged in `ElementDelta.cleared_mask` rather
+than sent as a zero value.
+
+For clients that negotiated quantized transforms, `quantize_scene_delta()` moves the
+position/orientation/scale changes of a delta into one `PackedTransforms` block
+(backend/utils/transform_codec.py).
+
+`SceneReplica` is the client-side counterpart: it applies deltas and reports version gaps as a
+`SceneResyncRequest` to send back. Keyframes always replace its state, so a replica that outlived
+a server restart (versions start again from 0) recovers with the next keyframe.
+"""
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.core.models.nethologlyph_models import (
+    HolographicSymbolNetModel,
+    QuaternionNetModel,
+    SceneUpdatePayload,
+    Vector3NetModel,
+)
+from backend.utils.protobuf_mapper import fill_protobuf, from_protobuf
+from backend.utils.transform_codec import TransformCodec
+from nethologlyph.generated_pb2 import definitions_pb2 as pb
+
+logger = logging.getLogger(__name__)
+
+# ElementDelta.changed_mask bits (see nethologlyph/protocol/definitions.proto)
+MASK_POSITION = 1
+MASK_ORIENTATION = 2
+MASK_SCALE = 4
+MASK_COLOR = 8
+MASK_TYPE = 16
+MASK_PROPERTIES = 32
+_TRANSFORM_MASK = MASK_POSITION | MASK_ORIENTATION | MASK_SCALE
+# Bits whose field can be removed (None); ElementDelta.cleared_mask uses these
+_CLEARABLE_MASK = _TRANSFORM_MASK | MASK_COLOR
+
+_PROPERTY_FIELDS = ("text_content", "is_interactive", "metadata")
+# mask bit -> HolographicSymbolNetModel fields it covers
+_MASK_FIELDS: Dict[int, Tuple[str, ...]] = {
+    MASK_POSITION: ("position",),
+    MASK_ORIENTATION: ("rotation",),
+    MASK_SCALE: ("scale",),
+    MASK_COLOR: ("color_rgba",),
+    MASK_TYPE: ("symbol_type",),
+    MASK_PROPERTIES: _PROPERTY_FIELDS,
+}
+
+
+def _properties_json(model: HolographicSymbolNetModel) -> str:
+    return json.dumps(model.model_dump(include=set(_PROPERTY_FIELDS), mode="json"), sort_keys=True, separators=(",", ":"))
+
+
+def _snapshot(model: HolographicSymbolNetModel) -> Dict[int, Any]:
+    """Comparable per-bit values of an element (tuples of floats, strings)."""
+    position, rotation, scale = model.position, model.rotation, model.scale
+    return {
+        MASK_POSITION: (position.x, position.y, position.z) if position is not None else None,
+        MASK_ORIENTATION: (rotation.x, rotation.y, rotation.z, rotation.w) if rotation is not None else None,
+        MASK_SCALE: (scale.x, scale.y, scale.z) if scale is not None else None,
+        MASK_COLOR: tuple(model.color_rgba) if model.color_rgba is not None else None,
+        MASK_TYPE: model.symbol_type,
+        MASK_PROPERTIES: _properties_json(model),
+    }
+
+
+def _differs(old: Any, new: Any, epsilon: float) -> bool:
+    if isinstance(old, tuple) and isinstance(new, tuple):
+        return len(old) != len(new) or any(abs(a - b) > epsilon for a, b in zip(old, new))
+    return old != new
+
+
+def _fill_element_delta(change: "pb.ElementDelta", model: HolographicSymbolNetModel, mask: int) -> None:
+    change.symbol_id = model.element_id
+    change.changed_mask = mask
+    change.cleared_mask = sum(
+        bit for bit in _MASK_FIELDS if mask & bit & _CLEARABLE_MASK and getattr(model, _MASK_FIELDS[bit][0]) is None
+    )
+    if mask & MASK_POSITION and model.position is not None:
+        change.position.x, change.position.y, change.position.z = model.position.x, model.position.y, model.position.z
+    if mask & MASK_ORIENTATION and model.rotation is not None:
+        o = change.orientation
+        o.x, o.y, o.z, o.w = model.rotation.x, model.rotation.y, model.rotation.z, model.rotation.w
+    if mask & MASK_SCALE and model.scale is not None:
+        change.scale.x, change.scale.y, change.scale.z = model.scale.x, model.scale.y, model.scale.z
+    if mask & MASK_COLOR and model.color_rgba is not None:
+        change.color_rgba.extend(model.color_rgba)
+    if mask & MASK_TYPE:
+        change.type = model.symbol_type
+    if mask & MASK_PROPERTIES:
+        change.properties_json = _properties_json(model)
+
+
+def apply_element_delta(model: HolographicSymbolNetModel, change: "pb.ElementDelta") -> HolographicSymbolNetModel:
+    """Returns a copy of `model` with the fields flagged in `change` replaced (or cleared)."""
+    mask = change.changed_mask
+    cleared = mask & change.cleared_mask & _CLEARABLE_MASK
+    update: Dict[str, Any] = {_MASK_FIELDS[bit][0]: None for bit in _MASK_FIELDS if cleared & bit}
+    mask &= ~cleared
+    if mask & MASK_POSITION:
+        update["position"] = Vector3NetModel(x=change.position.x, y=change.position.y, z=change.position.z)
+    if mask & MASK_ORIENTATION:
+        o = change.orientation
+        update["rotation"] = QuaternionNetModel(x=o.x, y=o.y, z=o.z, w=o.w)
+    if mask & MASK_SCALE:
+        update["scale"] = Vector3NetModel(x=change.scale.x, y=change.scale.y, z=change.scale.z)
+    if mask & MASK_COLOR:
+        update["color_rgba"] = list(change.color_rgba)
+    if mask & MASK_TYPE:
+        update["symbol_type"] = change.type
+    if mask & MASK_PROPERTIES and change.properties_json:
+        properties = json.loads(change.properties_json)
+        update.update({name: properties.get(name) for name in _PROPERTY_FIELDS})
+    return model.model_copy(update=update)
+
+
+def _transform_rows(change: "pb.ElementDelta") -> Optional[Tuple[Tuple[float, ...], Tuple[float, ...], Tuple[float, ...]]]:
+    """(position, orientation, scale) of a change, NaN where not changed; None if not packable."""
+    mask = change.changed_mask
+    nan3, nan4 = (np.nan,) * 3, (np.nan,) * 4
+    position, orientation, scale = nan3, nan4, nan3
+    # PackedTransforms cannot express a cleared field.
+    if mask & change.cleared_mask & _TRANSFORM_MASK:
+        return None
+    if mask & MASK_POSITION:
+        position = (change.position.x, change.position.y, change.position.z)
+    if mask & MASK_ORIENTATION:
+        o = change.orientation
+        orientation = (o.x, o.y, o.z, o.w)
+    if mask & MASK_SCALE:
+        scale = (change.scale.x, change.scale.y, change.scale.z)
+    return position, orientation, scale
+
+
+def quantize_scene_delta(delta: "pb.SceneDelta", codec: TransformCodec) -> "pb.SceneDelta":
+    """
+    Returns a copy of `delta` whose position/orientation/scale changes travel in
+    `packed_transforms`; other field changes stay as (trimmed) ElementDeltas. Keyframes and deltas
+    without packable transform changes are returned unchanged.
+    """
+    if delta.is_keyframe:
+        return delta
+    candidates = []
+    for change in delta.changes:
+        if change.changed_mask & _TRANSFORM_MASK:
+            rows = _transform_rows(change)
+            if rows is not None:
+                candidates.append((change, rows))
+    if not candidates:
+        return delta
+
+    positions = np.array([rows[0] for _, rows in candidates], dtype=np.float64)
+    in_range = codec.positions_in_range(positions)
+    packed = [(change, rows) for (change, rows), ok in zip(candidates, in_range) if ok]
+    if not packed:
+        return delta
+    packed_ids = {id(change) for change, _ in packed}
+
+    compact = pb.SceneDelta()
+    compact.CopyFrom(delta)
+    del compact.changes[:]
+    for change in delta.changes:
+        if id(change) not in packed_ids:
+            compact.changes.add().CopyFrom(change)
+        elif change.changed_mask & ~_TRANSFORM_MASK:
+            rest = compact.changes.add()
+            rest.CopyFrom(change)
+            rest.changed_mask = change.changed_mask & ~_TRANSFORM_MASK
+            rest.ClearField("position")
+            rest.ClearField("orientation")
+            rest.ClearField("scale")
+    codec.pack(
+        compact.packed_transforms,
+        [change.symbol_id for change, _ in packed],
+        np.array([rows[0] for _, rows in packed], dtype=np.float64),
+        np.array([rows[1] for _, rows in packed], dtype=np.float64),
+        np.array([rows[2] for _, rows in packed], dtype=np.float64),
+    )
+    return compact
+
+
+@dataclass
+class ElementRecord:
+    model: HolographicSymbolNetModel
+    snapshot: Dict[int, Any]
+    version: int  # scene version of the last change to this element
+
+
+class SceneState:
+    def __init__(self, scene_id: str, max_history: int):
+        self.scene_id = scene_id
+        self.version = 0
+        self.elements: Dict[str, ElementRecord] = {}
+        self.settings: Optional[Dict[str, Any]] = None
+        self.history: Deque["pb.SceneDelta"] = deque(maxlen=max_history)
+        self._keyframe: Optional["pb.SceneDelta"] = None  # cached snapshot of the current version
+
+
+class SceneStateStore:
+    """
+    Args:
+        keyframe_interval: Publish a keyframe instead of a delta every N versions (0 disables).
+        max_history: Deltas kept per scene for replay-based resync.
+        epsilon: Float changes at or below this are not considered changes (sensor jitter).
+    """
+
+    def __init__(self, keyframe_interval: int = 300, max_history: int = 256, epsilon: float = 1e-4,
+                 position_step: float = 1e-3):
+        self.keyframe_interval = keyframe_interval
+        self.max_history = max_history
+        self.epsilon = epsilon
+        self.position_step = position_step
+        self.scenes: Dict[str, SceneState] = {}
+        self.deltas_published = 0
+        self.keyframes_published = 0
+        self.resyncs_replayed = 0
+        self.resyncs_keyframed = 0
+
+    def _scene(self, scene_id: str) -> SceneState:
+        state = self.scenes.get(scene_id)
+        if state is None:
+            state = self.scenes[scene_id] = SceneState(scene_id, self.max_history)
+        return state
+
+    def version_of(self, scene_id: str) -> int:
+        state = self.scenes.get(scene_id)
+        return state.version if state is not None else 0
+
+    def apply_update(self, update: SceneUpdatePayload) -> Optional["pb.SceneDelta"]:
+        """
+        Merges an update into the scene. Only fields set on each upserted element are taken into
+        account, so partial updates (e.g. just `position`) are fine.
+
+        Returns:
+            The message to publish to the scene (a delta, or a keyframe when one is due),
+            or None if nothing changed.
+        """
+        state = self._scene(update.scene_id)
+        delta = pb.SceneDelta(scene_id=update.scene_id, base_version=state.version)
+        touched: List[ElementRecord] = []
+
+        for incoming in update.upsert_elements or ():
+            record = state.elements.get(incoming.element_id)
+            if record is None:
+                record = ElementRecord(model=incoming, snapshot=_snapshot(incoming), version=0)
+                state.elements[incoming.element_id] = record
+                fill_protobuf(incoming, delta.upserts.add())
+                touched.append(record)
+                continue
+            candidate = record.model.model_copy(update={name: getattr(incoming, name) for name in incoming.model_fields_set})
+            new_snapshot = _snapshot(candidate)
+            mask = 0
+            for bit, old_value in record.snapshot.items():
+                if _differs(old_value, new_snapshot[bit], self.epsilon):
+                    mask |= bit
+            if not mask:
+                continue
+            # Sub-epsilon changes of other fields are not taken over, so the server never drifts
+            # from what replicas have.
+            record.model = record.model.model_copy(update={
+                name: getattr(candidate, name) for bit, names in _MASK_FIELDS.items() if mask & bit for name in names
+            })
+            for bit in _MASK_FIELDS:
+                if mask & bit:
+                    record.snapshot[bit] = new_snapshot[bit]
+            _fill_element_delta(delta.changes.add(), record.model, mask)
+            touched.append(record)
+
+        for element_id in update.delete_element_ids or ():
+            if state.elements.pop(element_id, None) is not None:
+                delta.removed_ids.append(element_id)
+
+        if update.scene_settings is not None and update.scene_settings != state.settings:
+            state.settings = update.scene_settings
+            delta.scene_settings_json = json.dumps(update.scene_settings, separators=(",", ":"))
+
+        if not (delta.upserts or delta.changes or delta.removed_ids or delta.HasField("scene_settings_json")):
+            return None
+
+        state.version += 1
+        delta.version = state.version
+        for record in touched:
+            record.version = state.version
+        state.history.append(delta)
+        state._keyframe = None
+
+        if self.keyframe_interval and state.version % self.keyframe_interval == 0:
+            self.keyframes_published += 1
+            keyframe = self.keyframe(update.scene_id)
+            published = pb.SceneDelta()
+            published.CopyFrom(keyframe)
+            published.base_version = delta.base_version
+            return published
+        self.deltas_published += 1
+        return delta
+
+    def keyframe(self, scene_id: str) -> "pb.SceneDelta":
+        """Full snapshot of the scene at its current version (cached until the next change)."""
+        state = self._scene(scene_id)
+        if state._keyframe is None:
+            keyframe = pb.SceneDelta(scene_id=scene_id, base_version=0, version=state.version, is_keyframe=True)
+            for record in state.elements.values():
+                fill_protobuf(record.model, keyframe.upserts.add())
+            if state.settings is not None:
+                keyframe.scene_settings_json = json.dumps(state.settings, separators=(",", ":"))
+            state._keyframe = keyframe
+        return state._keyframe
+
+    def resync(self, scene_id: str, last_known_version: int) -> List["pb.SceneDelta"]:
+        """
+        Messages that bring a replica at `last_known_version` up to date: the missed deltas if
+        they are all still in history, otherwise a single keyframe.
+        """
+        state = self.scenes.get(scene_id)
+        if state is None or last_known_version == state.version:
+            return []
+        history = state.history
+        if history and 0 < last_known_version < state.version and history[0].base_version <= last_known_version:
+            self.resyncs_replayed += 1
+            return [delta for delta in history if delta.base_version >= last_known_version]
+        self.resyncs_keyframed += 1
+        return [self.keyframe(scene_id)]
+
+    def codec_for(self, scene_id: str) -> TransformCodec:
+        """Transform codec of a scene; its origin comes from scene_settings["origin"] ([x, y, z]) if set."""
+        state = self.scenes.get(scene_id)
+        origin = (state.settings or {}).get("origin") if state is not None else None
+        return TransformCodec(origin if origin is not None else (0.0, 0.0, 0.0), self.position_step)
+
+    def drop_scene(self, scene_id: str) -> None:
+        self.scenes.pop(scene_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "scenes": len(self.scenes),
+            "elements": sum(len(state.elements) for state in self.scenes.values()),
+            "deltas_published": self.deltas_published,
+            "keyframes_published": self.keyframes_published,
+            "resyncs_replayed": self.resyncs_replayed,
+            "resyncs_keyframed": self.resyncs_keyframed,
+        }
+
+
+class SceneReplica:
+    """Client-side copy of one scene built from received SceneDelta messages."""
+
+    def __init__(self, scene_id: str):
+        self.scene_id = scene_id
+        self.version = 0
+        self.elements: Dict[str, HolographicSymbolNetModel] = {}
+        self.settings: Optional[Dict[str, Any]] = None
+
+    def apply(self, delta: "pb.SceneDelta") -> Optional["pb.SceneResyncRequest"]:
+        """
+        Applies a delta or keyframe. Returns a resync request (and leaves state untouched) if the
+        delta does not start at the local version; stale deltas are ignored. Keyframes are applied
+        whatever their version: one older than the local state means the server restarted.
+        """
+        if delta.is_keyframe:
+            self.elements = {symbol.symbol_id: from_protobuf(symbol, HolographicSymbolNetModel) for symbol in delta.upserts}
+            self.settings = json.loads(delta.scene_settings_json) if delta.HasField("scene_settings_json") else None
+            self.version = delta.version
+            return None
+        if delta.version <= self.version:
+            return None
+        if delta.base_version != self.version:
+            return pb.SceneResyncRequest(scene_id=self.scene_id, last_known_version=self.version)
+        for symbol in delta.upserts:
+            self.elements[symbol.symbol_id] = from_protobuf(symbol, HolographicSymbolNetModel)
+        for change in delta.changes:
+            model = self.elements.get(change.symbol_id)
+            if model is not None:
+                self.elements[change.symbol_id] = apply_element_delta(model, change)
+        if delta.HasField("packed_transforms"):
+            self._apply_packed_transforms(delta.packed_transforms)
+        for element_id in delta.removed_ids:
+            self.elements.pop(element_id, None)
+        if delta.HasField("scene_settings_json"):
+            self.settings = json.loads(delta.scene_settings_json)
+        self.version = delta.version
+        return None
+
+    def _apply_packed_transforms(self, packed: "pb.PackedTransforms") -> None:
+        symbol_ids, positions, orientations, scales = TransformCodec.unpack(packed)
+        for i, symbol_id in enumerate(symbol_ids):
+            model = self.elements.get(symbol_id)
+            if model is None:
+                continue
+            update: Dict[str, Any] = {}
+            if not np.isnan(positions[i, 0]):
+                x, y, z = positions[i].tolist()
+                update["position"] = Vector3NetModel(x=x, y=y, z=z)
+            if not np.isnan(orientations[i, 0]):
+                x, y, z, w = orientations[i].tolist()
+                update["rotation"] = QuaternionNetModel(x=x, y=y, z=z, w=w)
+            if not np.isnan(scales[i, 0]):
+                x, y, z = scales[i].tolist()
+                update["scale"] = Vector3NetModel(x=x, y=y, z=z)
+            self.elements[symbol_id] = model.model_copy(update=update)
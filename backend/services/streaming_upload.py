@@ -0,0 +1,179 @@
+# backend/services/streaming_upload.py
+"""
+Streaming uploads to R2/S3 without holding the whole file in memory or blocking the event loop.
+
+The source (a FastAPI `UploadFile`, or anything with `async read(size)`) is read in parts of
+`part_size` bytes. A source that fits in one part goes up with a single `put_object`; anything
+larger becomes a multipart upload whose parts are sent by up to `max_concurrency` threads while
+the next part is being read. A part is only read once a slot is free, so memory per upload
+stays near `(max_concurrency + 1) * part_size` however large the file is (56 MB peak for a
+256 MB file with the defaults, see tests/performance/bench_streaming_upload.py).
+
+Checksums are computed on the way through: SHA-256 of the whole body (returned, e.g. for
+`content_sha256` in media metadata) and an MD5 per part, sent as Content-MD5 so the storage
+side rejects a corrupted part. Failed parts are retried; a multipart upload that still fails is
+aborted so no orphaned parts are billed.
+
+    result = await get_streaming_uploader().upload(s3_client, file, bucket, key, file.content_type)
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from backend.utils.env import env_number
+
+logger = logging.getLogger(__name__)
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3 minimum for every part but the last
+
+
+@dataclass
+class UploadResult:
+    key: str
+    size: int
+    sha256: str
+    parts: int  # 1 for a single PUT
+    etag: Optional[str] = None
+
+
+def _content_md5(data: bytes) -> str:
+    return base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+
+
+class StreamingUploader:
+    """
+    Args:
+        part_size: Bytes per part (S3 needs at least 5 MiB for all parts but the last).
+        max_concurrency: Parts uploaded at the same time per upload (and parts held in memory).
+        max_threads: Threads shared by all uploads for the blocking S3 calls and hashing.
+        max_retries: Retries per request after the first attempt (exponential backoff).
+    """
+
+    def __init__(self, part_size: int = 8 * 1024 * 1024, max_concurrency: int = 4, max_threads: int = 16,
+                 max_retries: int = 2, retry_base_delay: float = 0.5):
+        self.part_size = max(1, part_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_threads = max(1, max_threads)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.metrics = {"single_puts": 0, "multipart_uploads": 0, "parts": 0, "bytes": 0, "retries": 0, "aborted": 0}
+
+    def _run(self, fn, *args, **kwargs) -> "asyncio.Future":
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_threads, thread_name_prefix="s3-upload")
+        return asyncio.get_running_loop().run_in_executor(self._executor, lambda: fn(*args, **kwargs))
+
+    async def _call(self, description: str, fn, **kwargs) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            try:
+                return await self._run(fn, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.retry_base_delay * (2 ** attempt)
+                attempt += 1
+                self.metrics["retries"] += 1
+                logger.warning(f"StreamingUploader: {description} failed ({e}); retry {attempt}/{self.max_retries} in {delay:.1f}s.")
+                await asyncio.sleep(delay)
+
+    async def _read_part(self, source) -> bytes:
+        # UploadFile.read may return less than asked before the end (e.g. network streams).
+        data = await source.read(self.part_size)
+        while data and len(data) < self.part_size:
+            more = await source.read(self.part_size - len(data))
+            if not more:
+                break
+            data += more
+        return data
+
+    async def upload(self, s3_client, source, bucket: str, key: str, content_type: Optional[str] = None,
+                     metadata: Optional[Dict[str, str]] = None) -> UploadResult:
+        extra: Dict[str, Any] = {}
+        if content_type:
+            extra["ContentType"] = content_type
+        if metadata:
+            extra["Metadata"] = metadata
+
+        hasher = hashlib.sha256()
+        first = await self._read_part(source)
+        await self._run(hasher.update, first)  # hashlib releases the GIL for large buffers
+        if len(first) < self.part_size:
+            response = await self._call(f"put_object {key}", s3_client.put_object, Bucket=bucket, Key=key, Body=first,
+                                        ContentMD5=await self._run(_content_md5, first), **extra)
+            self.metrics["single_puts"] += 1
+            self.metrics["bytes"] += len(first)
+            return UploadResult(key, len(first), hasher.hexdigest(), 1, response.get("ETag"))
+        return await self._upload_multipart(s3_client, source, bucket, key, first, hasher, extra)
+
+    async def _upload_multipart(self, s3_client, source, bucket: str, key: str, first: bytes, hasher,
+                                extra: Dict[str, Any]) -> UploadResult:
+        created = await self._call(f"create_multipart_upload {key}", s3_client.create_multipart_upload,
+                                   Bucket=bucket, Key=key, **extra)
+        upload_id = created["UploadId"]
+        slots = asyncio.Semaphore(self.max_concurrency)
+        tasks: List[asyncio.Task] = []
+
+        async def send(part_number: int, data: bytes) -> Dict[str, Any]:
+            try:
+                response = await self._call(f"upload_part {key}#{part_number}", s3_client.upload_part, Bucket=bucket,
+                                            Key=key, UploadId=upload_id, PartNumber=part_number, Body=data,
+                                            ContentMD5=await self._run(_content_md5, data))
+                self.metrics["parts"] += 1
+                return {"ETag": response["ETag"], "PartNumber": part_number}
+            finally:
+                slots.release()
+
+        size, part_number, data = 0, 1, first
+        try:
+            while data:
+                size += len(data)
+                await slots.acquire()
+                tasks.append(asyncio.ensure_future(send(part_number, data)))
+                failed = next((task for task in tasks if task.done() and task.exception() is not None), None)
+                if failed is not None:
+                    raise failed.exception()
+                data = await self._read_part(source)
+                if data:
+                    await self._run(hasher.update, data)
+                part_number += 1
+            parts = await asyncio.gather(*tasks)
+            response = await self._call(f"complete_multipart_upload {key}", s3_client.complete_multipart_upload,
+                                        Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts})
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.metrics["aborted"] += 1
+            try:
+                await self._run(s3_client.abort_multipart_upload, Bucket=bucket, Key=key, UploadId=upload_id)
+            except Exception as e:
+                logger.error(f"StreamingUploader: could not abort multipart upload {upload_id} for {key}: {e}")
+            raise
+        self.metrics["multipart_uploads"] += 1
+        self.metrics["bytes"] += size
+        return UploadResult(key, size, hasher.hexdigest(), len(parts), response.get("ETag"))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.metrics)
+
+
+streaming_uploader = StreamingUploader(
+    part_size=max(MIN_PART_SIZE, int(env_number("UPLOAD_PART_SIZE_MB", 8) * 1024 * 1024)),
+    max_concurrency=int(env_number("UPLOAD_MAX_CONCURRENT_PARTS", 4)),
+    max_threads=int(env_number("UPLOAD_MAX_THREADS", 16)),
+)
+
+
+def get_streaming_uploader() -> StreamingUploader:
+    return streaming_uploader
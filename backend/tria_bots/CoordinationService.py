@@ -1,6 +1,10 @@
 import logging
 import asyncpg
-import asyncio # ✅ Added import
+from typing import Any, Optional
+
+import numpy as np
+from backend.core.db.pg_connector import DBExecutor, get_db_pool
+from backend.services.background_tasks import PRIORITY_LOW, get_background_runner
 from backend.services.gesture_intent_service import GestureIntentService
 from backend.tria_bots.GestureBot import GestureBot
 from backend.tria_bots.MemoryBot import MemoryBot
@@ -9,7 +13,9 @@ from backend.tria_bots.LearningBot import LearningBot # <-- Убедись, чт
 logger = logging.getLogger(__name__)
 
 class CoordinationService:
-    def __init__(self, db_conn: asyncpg.Connection):
+    def __init__(self, db_conn: DBExecutor):
+        # db_conn - пул (общий экземпляр, см. get_coordination_service) или отдельное соединение.
+        # Боты не хранят состояния между запросами, поэтому один экземпляр обслуживает все сокеты.
         self.db_conn = db_conn
         self.gesture_bot = GestureBot(self.db_conn)
         self.memory_bot = MemoryBot(self.db_conn)
@@ -24,9 +30,20 @@ class CoordinationService:
         logger.info(f"CoordinationService: Handling intent '{intent_data.get('intent')}' for user {user_id}")
 
         # 1. GestureBot анализирует сырые данные и формирует структурированный "вектор намерения"
-        intent_vector = await self.gesture_bot.analyze_raw_gesture(intent_data)
+        intent_vector = await self.gesture_bot.analyze_raw_gesture(intent_data, user_id=user_id)
         logger.info(f"CoordinationService: Intent vector from GestureBot: {intent_vector}")
+        return await self._handle_intent_vector(user_id, intent_vector)
 
+    async def handle_gesture_chunk(self, user_id: str, chunk: Any, landmarks: Optional[np.ndarray] = None):
+        """
+        То же, что handle_gesture_intent, но для бинарного протокола: намерение приходит как
+        GestureChunk (protobuf), без промежуточного dict/JSON.
+        """
+        intent_vector = await self.gesture_bot.analyze_gesture_chunk(chunk, landmarks, user_id=user_id)
+        logger.debug(f"CoordinationService: Handling binary intent '{intent_vector['type']}' for user {user_id}")
+        return await self._handle_intent_vector(user_id, intent_vector)
+
+    async def _handle_intent_vector(self, user_id: str, intent_vector: dict):
         # 2. MemoryBot находит релевантный контекст (эмбеддинг) в базе знаний
         prepared_context = await self.memory_bot.find_and_prepare_context(intent_vector)
 
@@ -37,7 +54,8 @@ class CoordinationService:
 
         logger.info(f"CoordinationService: Context prepared by MemoryBot: Embedding ID {prepared_context['base_embedding'].id}")
 
-        # 3. GestureIntentService применяет намерение к найденному контексту
+        # 3. GestureIntentService применяет намерение к найденному контексту; параллельные запросы
+        # попадают в общий пакет (один bulk UPDATE), но каждый ждет только свой результат
         result = await self.gesture_intent_service.apply_intent_to_embedding(
             user_id=user_id,
             intent_vector=intent_vector,
@@ -52,8 +70,33 @@ class CoordinationService:
             "context_embedding_id": prepared_context['base_embedding'].id, # Сохраняем ID, а не весь объект
             "result": result
         }
-        # В реальном приложении это был бы вызов через очередь задач (Celery, etc.)
-        # Сейчас просто вызываем асинхронный метод
-        asyncio.create_task(self.learning_bot.process_interaction_for_learning(log_data_for_learning))
+        # Ограниченный фоновый исполнитель: держит ссылку на задачу, ограничивает параллелизм
+        # и дожидается очереди при остановке приложения
+        get_background_runner().submit(self.learning_bot.process_interaction_for_learning, log_data_for_learning, priority=PRIORITY_LOW)
 
         return result
+
+
+_shared_coordination_service: Optional[CoordinationService] = None
+
+
+async def get_coordination_service() -> CoordinationService:
+    """
+    Общий CoordinationService процесса поверх пула соединений: граф ботов создается один раз,
+    а соединение берется из пула только на время отдельного запроса к БД.
+    """
+    global _shared_coordination_service
+    if _shared_coordination_service is None:
+        _shared_coordination_service = CoordinationService(await get_db_pool())
+    return _shared_coordination_service
+
+
+async def reset_coordination_service() -> None:
+    """
+    Применяет уже собранные намерения и сбрасывает общий экземпляр (при закрытии пула,
+    чтобы не держать ссылку на закрытый пул).
+    """
+    global _shared_coordination_service
+    service, _shared_coordination_service = _shared_coordination_service, None
+    if service is not None:
+        await service.gesture_intent_service.intent_batcher.close()
@@ -1,21 +1,30 @@
 # backend/tria_bots/GestureBot.py
 import asyncpg
+import json
 import logging
+from typing import Any, Optional
+
+import numpy as np
+from backend.core.db.pg_connector import DBExecutor
+from backend.repositories.gesture_repository import GestureRepository
+from backend.services.gesture_matcher import get_gesture_matcher
+
+MAX_TEMPLATE_DEFINITIONS = 500
 
 logger = logging.getLogger(__name__)
 
 class GestureBot:
-    def __init__(self, db_conn: asyncpg.Connection):
+    def __init__(self, db_conn: DBExecutor):
         self.db_conn = db_conn
         logger.info("GestureBot initialized.")
 
-    async def analyze_raw_gesture(self, raw_gesture_data: dict) -> dict:
+    async def analyze_raw_gesture(self, raw_gesture_data: dict, user_id: Optional[str] = None) -> dict:
         """
         Analyzes raw gesture data and forms an "intent vector".
-        Currently, it extracts intent and context from raw_gesture_data.
+        Intent and context come from raw_gesture_data; if it also carries a landmark sequence
+        ("landmarks": frames x hands x 21 x 3), the user's gesture templates are matched against it.
         """
         intent_type = raw_gesture_data.get("intent", "unknown")
-        # Future: ML model for landmark analysis could be integrated here.
 
         # Forms an "intent vector" based on data from the frontend.
         intent_vector = {
@@ -23,5 +32,53 @@ class GestureBot:
             "intensity": raw_gesture_data.get("intensity", 0.5), # Placeholder for intensity
             "target_context": raw_gesture_data.get("context", {}) # Context from frontend
         }
+        if user_id and raw_gesture_data.get("landmarks"):
+            await self._recognize(user_id, raw_gesture_data["landmarks"], intent_vector)
         logger.info(f"GestureBot: Analyzed raw_gesture_data. Intent vector: {intent_vector}")
         return intent_vector
+
+    async def analyze_gesture_chunk(self, chunk: Any, landmarks: Optional[np.ndarray] = None,
+                                    user_id: Optional[str] = None) -> dict:
+        """
+        Same intent vector as analyze_raw_gesture, built straight from a binary GestureChunk
+        (see backend/utils/gesture_intent_codec.py). `landmarks` is the (N, 21, 3) float32 view of
+        the chunk's landmark data; only its hand count goes into the (JSON-logged) intent vector.
+        With `"hands": H` in the metadata JSON, N > H landmarks sets are a sequence of N / H frames
+        and are matched against the user's gesture templates.
+        """
+        context = json.loads(chunk.temporal_spatial_metadata_json) if chunk.temporal_spatial_metadata_json else {}
+        intent_vector = {
+            "type": chunk.recognized_gesture_type or "unknown",
+            "intensity": chunk.confidence or 0.5, # Placeholder for intensity, as in analyze_raw_gesture
+            "target_context": context,
+        }
+        if landmarks is not None:
+            hands = int(context.get("hands") or landmarks.shape[0]) if isinstance(context, dict) else int(landmarks.shape[0])
+            intent_vector["hands"] = hands
+            if user_id and hands and landmarks.shape[0] > hands and landmarks.shape[0] % hands == 0:
+                await self._recognize(user_id, landmarks.reshape(-1, hands, 21, 3), intent_vector)
+        logger.debug(f"GestureBot: Analyzed GestureChunk. Intent vector: {intent_vector}")
+        return intent_vector
+
+    async def _recognize(self, user_id: str, frames, intent_vector: dict) -> None:
+        """
+        Matches a landmark sequence against the user's templates (backend/services/gesture_matcher.py).
+        A match is recorded under "recognized_gesture" and supplies the intent when the client sent none.
+        """
+        async def load_definitions():
+            return await GestureRepository(self.db_conn).get_gestures_by_user_id(user_id, limit=MAX_TEMPLATE_DEFINITIONS)
+
+        try:
+            match = await get_gesture_matcher().recognize(user_id, frames, load_definitions)
+        except (ValueError, TypeError, IndexError) as e:
+            logger.warning(f"GestureBot: landmark sequence from user {user_id} cannot be matched: {e}")
+            return
+        if match is None:
+            return
+        intent_vector["recognized_gesture"] = {
+            "gesture_id": match.gesture_id,
+            "name": match.gesture_name,
+            "confidence": round(match.confidence, 3),
+        }
+        if intent_vector["type"] in (None, "", "unknown") and match.intent:
+            intent_vector["type"] = match.intent
@@ -1,11 +1,12 @@
 # backend/tria_bots/LearningBot.py
 import asyncpg
 import logging
+from backend.core.db.pg_connector import DBExecutor
 
 logger = logging.getLogger(__name__)
 
 class LearningBot:
-    def __init__(self, db_conn: asyncpg.Connection):
+    def __init__(self, db_conn: DBExecutor):
         self.db_conn = db_conn
         logger.info("LearningBot initialized.")
 
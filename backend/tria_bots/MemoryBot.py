@@ -3,11 +3,12 @@ import asyncpg
 import logging
 from typing import List, Dict, Any, Optional
 from backend.repositories.embedding_repository import EmbeddingRepository, EmbeddingDB
+from backend.core.db.pg_connector import DBExecutor
 
 logger = logging.getLogger(__name__)
 
 class MemoryBot:
-    def __init__(self, db_conn: asyncpg.Connection):
+    def __init__(self, db_conn: DBExecutor):
         self.db_conn = db_conn
         self.embedding_repo = EmbeddingRepository(self.db_conn)
         logger.info("MemoryBot initialized.")
@@ -0,0 +1,170 @@
+# backend/utils/audio_features.py
+"""
+Feature summary of an audio chunk, stored in `tria_extracted_features_json`.
+
+    duration     seconds, samples, sample rate
+    loudness     RMS / peak / crest in dBFS, gated loudness over 400 ms blocks (BS.1770 gating,
+                 without the K-weighting filter), share of silent 50 ms blocks
+    spectrum     Welch average of the mono mix: centroid, bandwidth, 85% roll-off, flatness,
+                 zero-crossing rate and octave band powers (dB relative to the total)
+    cwt          hologram encoder (backend/utils/cwt_hologram.py) over at most `max_cwt_frames`
+                 evenly spaced chunks: mean level and pan per band, share of levels clamped at 0 dB
+
+Everything here is CPU-bound NumPy and runs inside the analysis process pool
+(backend/services/audio_analysis_pool.py). `analyse_shared_pcm` is the pool entry point: it
+reads the PCM straight out of a shared memory block instead of receiving a pickled copy.
+"""
+from multiprocessing import shared_memory
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from backend.utils.cwt_hologram import DB_MAX, DEFAULT_TARGET_FREQUENCIES, encode_frames
+
+OCTAVE_CENTRES = (31.5, 63.0, 125.0, 250.0, 500.0, 1000.0, 2000.0, 4000.0, 8000.0, 16000.0)
+WELCH_SEGMENT = 2048
+LOUDNESS_BLOCK_SECONDS = 0.4
+SILENCE_BLOCK_SECONDS = 0.05
+SILENCE_DBFS = -60.0
+ABSOLUTE_GATE_DBFS = -70.0
+RELATIVE_GATE_DB = -10.0
+FLOOR_DBFS = -120.0
+EPSILON = 1e-12
+
+
+def _dbfs(power) -> np.ndarray:
+    return np.maximum(10.0 * np.log10(np.asarray(power, dtype=np.float64) + EPSILON), FLOOR_DBFS)
+
+
+def _round(value: float, digits: int = 2) -> float:
+    return round(float(value), digits)
+
+
+def _block_powers(mono: np.ndarray, block: int) -> np.ndarray:
+    usable = len(mono) // block * block
+    if not usable:
+        return np.array([np.mean(mono * mono)]) if len(mono) else np.zeros(0)
+    return np.mean(mono[:usable].reshape(-1, block) ** 2, axis=1)
+
+
+def loudness_features(pcm: np.ndarray, sample_rate: float) -> Dict[str, Any]:
+    mono = pcm.mean(axis=0, dtype=np.float64)
+    flat = pcm.reshape(-1)
+    power = float(np.dot(flat, flat)) / flat.size if flat.size else 0.0
+    peak = float(np.max(np.abs(pcm))) if pcm.size else 0.0
+
+    # Overlapping 400 ms blocks every 100 ms, absolute gate at -70 dBFS, then relative gate 10 dB
+    # below the mean of what passed, as in BS.1770 (minus the K-weighting pre-filter).
+    block = max(1, int(LOUDNESS_BLOCK_SECONDS * sample_rate))
+    step = max(1, block // 4)
+    if len(mono) >= block:
+        squares = np.concatenate([[0.0], np.cumsum(mono * mono)])
+        starts = np.arange(0, len(mono) - block + 1, step)
+        blocks = (squares[starts + block] - squares[starts]) / block
+    else:
+        blocks = np.array([np.mean(mono * mono)]) if len(mono) else np.zeros(0)
+    gated = blocks[_dbfs(blocks) > ABSOLUTE_GATE_DBFS]
+    if gated.size:
+        gated = gated[_dbfs(gated) > _dbfs(gated.mean()) + RELATIVE_GATE_DB]
+    gated_loudness = float(_dbfs(gated.mean())) if gated.size else FLOOR_DBFS
+
+    silence = _block_powers(mono, max(1, int(SILENCE_BLOCK_SECONDS * sample_rate)))
+    return {
+        "rms_dbfs": _round(_dbfs(power)),
+        "peak_dbfs": _round(_dbfs(peak * peak)),
+        "crest_db": _round(_dbfs(peak * peak) - _dbfs(power)),
+        "gated_loudness_dbfs": _round(gated_loudness),
+        "silence_ratio": _round(np.mean(_dbfs(silence) < SILENCE_DBFS) if silence.size else 1.0, 3),
+    }
+
+
+def spectral_features(pcm: np.ndarray, sample_rate: float) -> Dict[str, Any]:
+    mono = pcm.mean(axis=0).astype(np.float32)
+    segment = min(WELCH_SEGMENT, max(2, len(mono)))
+    padded = np.zeros(max(segment, len(mono)), dtype=np.float32)
+    padded[:len(mono)] = mono
+    hop = segment // 2
+    windows = np.lib.stride_tricks.sliding_window_view(padded, segment)[::hop]
+    spectrum = np.mean(np.abs(np.fft.rfft(windows * np.hanning(segment).astype(np.float32), axis=1)) ** 2, axis=0)
+    freqs = np.fft.rfftfreq(segment, 1.0 / sample_rate)
+
+    total = float(spectrum.sum())
+    if total <= EPSILON:
+        centroid = bandwidth = rolloff = flatness = 0.0
+    else:
+        weights = spectrum / total
+        centroid = float(np.sum(freqs * weights))
+        bandwidth = float(np.sqrt(np.sum(weights * (freqs - centroid) ** 2)))
+        rolloff = float(freqs[min(len(freqs) - 1, np.searchsorted(np.cumsum(weights), 0.85))])
+        flatness = float(np.exp(np.mean(np.log(spectrum + EPSILON))) / (np.mean(spectrum) + EPSILON))
+
+    band_powers = {}
+    for centre in OCTAVE_CENTRES:
+        if centre / np.sqrt(2) >= sample_rate / 2:
+            break
+        in_band = (freqs >= centre / np.sqrt(2)) & (freqs < centre * np.sqrt(2))
+        band_powers[f"{centre:g}"] = _round(_dbfs(spectrum[in_band].sum() / total) if total > EPSILON else FLOOR_DBFS)
+
+    crossings = np.count_nonzero(np.signbit(mono[1:]) != np.signbit(mono[:-1])) if len(mono) > 1 else 0
+    return {
+        "centroid_hz": _round(centroid, 1),
+        "bandwidth_hz": _round(bandwidth, 1),
+        "rolloff_hz": _round(rolloff, 1),
+        "flatness": _round(flatness, 4),
+        "zero_crossing_rate": _round(crossings / max(1, len(mono) - 1), 4),
+        "octave_band_db": band_powers,
+    }
+
+
+def cwt_summary(pcm: np.ndarray, sample_rate: float, chunk_size: int = 1024, max_cwt_frames: int = 64,
+                frequencies=DEFAULT_TARGET_FREQUENCIES) -> Dict[str, Any]:
+    frequencies = np.asarray(frequencies, dtype=np.float32)
+    length = pcm.shape[1]
+    count = max(1, min(max_cwt_frames, -(-length // chunk_size)))
+    starts = np.linspace(0, max(0, length - chunk_size), count).astype(np.int64)
+    frames = np.zeros((count, 2, chunk_size), dtype=np.float32)
+    for i, start in enumerate(starts):
+        piece = pcm[:, start:start + chunk_size]
+        frames[i, :, :piece.shape[1]] = piece
+    db_levels, pan_angles = encode_frames(frames, sample_rate, frequencies)
+
+    bands = len(frequencies)
+    band_db = 0.5 * (db_levels[:, :bands] + db_levels[:, bands:]).mean(axis=0)
+    return {
+        "frames": count,
+        "chunk_size": chunk_size,
+        "band_mean_db": np.round(band_db, 1).tolist(),
+        "band_mean_pan": np.round(pan_angles.mean(axis=0), 1).tolist(),
+        "mean_db": _round(band_db.mean()),
+        "saturated_ratio": _round(np.mean(db_levels >= DB_MAX), 3),
+    }
+
+
+def compute_audio_features(pcm: np.ndarray, sample_rate: float, chunk_size: int = 1024,
+                           max_cwt_frames: int = 64) -> Dict[str, Any]:
+    """Features of float32 stereo PCM shaped (2, samples)."""
+    pcm = np.asarray(pcm, dtype=np.float32)
+    if pcm.ndim != 2 or pcm.shape[0] != 2:
+        raise ValueError(f"Expected stereo PCM shaped (2, samples), got {pcm.shape}.")
+    return {
+        "duration_seconds": _round(pcm.shape[1] / sample_rate, 3),
+        "samples": int(pcm.shape[1]),
+        "sample_rate": float(sample_rate),
+        "loudness": loudness_features(pcm, sample_rate),
+        "spectrum": spectral_features(pcm, sample_rate),
+        "cwt": cwt_summary(pcm, sample_rate, chunk_size, max_cwt_frames),
+    }
+
+
+def analyse_shared_pcm(shm_name: str, shape: Tuple[int, int], sample_rate: float, chunk_size: int = 1024,
+                       max_cwt_frames: int = 64) -> Dict[str, Any]:
+    """Process pool entry point: features of float32 PCM living in the shared memory block `shm_name`."""
+    block = shared_memory.SharedMemory(name=shm_name)
+    try:
+        pcm = np.ndarray(shape, dtype=np.float32, buffer=block.buf)
+        try:
+            return compute_audio_features(pcm, sample_rate, chunk_size, max_cwt_frames)
+        finally:
+            del pcm  # the view must go before the block can be closed
+    finally:
+        block.close()
@@ -0,0 +1,166 @@
+# backend/utils/cwt_hologram.py
+"""
+Server-side counterpart of `encode_audio_to_hologram` from backend/rust/fastcwt_processor.
+
+Output contract is the same as the WASM encoder: for one stereo chunk and 130 target frequencies,
+260 dB levels (left bands, then right bands, clamped to [-100, 0]) and 130 pan angles in degrees
+(interaural phase difference mapped to [-90, 90]).
+
+The Rust code runs, for every frequency, an FFT of the Morlet wavelet and a full-length IFFT of
+`X * W`, and then keeps only the centre sample. That sample is a single dot product:
+
+    coeff = 1/N * sum_k X[k] * W[k] * exp(2*pi*i * k * c / N),   c = N // 2
+
+so the whole bank collapses into one (N, bands) matrix that depends only on (chunk_size,
+sample_rate, frequencies) and is cached. Since the audio is real, X is taken from `rfft` and the
+negative-frequency half is folded into the matrix as well, which turns a batch of chunks into one
+real-valued GEMM: `[Re X, Im X] @ bank -> [Re coeff, Im coeff]`.
+"""
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+OMEGA0 = 6.0
+BAND_COUNT = 130
+DB_MIN = -100.0
+DB_MAX = 0.0
+EPSILON = 1e-6
+DEFAULT_SAMPLE_RATE = 48000.0
+
+# Same set as TARGET_FREQUENCIES in frontend/js/audio/webAudioEngine.js: semitone steps from 20 Hz.
+DEFAULT_TARGET_FREQUENCIES = (20.0 * np.power(2.0, np.arange(BAND_COUNT) / 12.0)).astype(np.float32)
+
+
+def morlet_wavelet(scale: float, size: int) -> np.ndarray:
+    """Complex Morlet wavelet sampled like the Rust `morlet_wavelet`: centred at size / 2, no normalization."""
+    t = (np.arange(size, dtype=np.float64) - size / 2.0) / scale
+    return np.exp(-0.5 * t * t) * np.exp(1j * OMEGA0 * t)
+
+
+def frequency_key(frequencies) -> Tuple[float, ...]:
+    return tuple(np.asarray(frequencies, dtype=np.float32).ravel().tolist())
+
+
+@lru_cache(maxsize=32)
+def _wavelet_bank(chunk_size: int, sample_rate: float, frequencies: Tuple[float, ...]) -> np.ndarray:
+    n = chunk_size
+    freqs = np.asarray(frequencies, dtype=np.float64)
+    scales = OMEGA0 * sample_rate / (2.0 * np.pi * freqs)
+    wavelets = np.stack([morlet_wavelet(scale, n) for scale in scales])  # (bands, N)
+    k = np.arange(n)
+    centre_tap = np.fft.fft(wavelets, axis=1) * np.exp(2j * np.pi * k * (n // 2) / n) / n  # (bands, N)
+
+    # Fold the bins above Nyquist onto their conjugate rfft bins: X[N - m] = conj(X[m]).
+    half = n // 2 + 1
+    positive = centre_tap[:, :half]
+    negative = np.zeros_like(positive)
+    mirrored = np.arange(1, n - half + 1)
+    negative[:, mirrored] = centre_tap[:, n - mirrored]
+    with_real = (positive + negative).T  # multiplies Re X
+    with_imag = (1j * (positive - negative)).T  # multiplies Im X
+
+    bank = np.empty((2 * half, 2 * len(freqs)), dtype=np.float32)
+    bank[:half, :len(freqs)], bank[:half, len(freqs):] = with_real.real, with_real.imag
+    bank[half:, :len(freqs)], bank[half:, len(freqs):] = with_imag.real, with_imag.imag
+    bank.setflags(write=False)
+    return bank
+
+
+def wavelet_bank(chunk_size: int, sample_rate: float, frequencies=DEFAULT_TARGET_FREQUENCIES) -> np.ndarray:
+    """
+    Real (2 * (N // 2 + 1), 2 * bands) matrix mapping `[Re rfft(x), Im rfft(x)]` of an N-sample chunk
+    to `[Re coeff, Im coeff]` of the centre CWT coefficient per band. Cached, read-only.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}.")
+    return _wavelet_bank(int(chunk_size), float(sample_rate), frequency_key(frequencies))
+
+
+def wavelet_bank_cache_info():
+    return _wavelet_bank.cache_info()
+
+
+def centre_coefficients(frames: np.ndarray, sample_rate: float, frequencies=DEFAULT_TARGET_FREQUENCIES) -> np.ndarray:
+    """(..., N) real chunks -> (..., bands) complex64 centre CWT coefficients."""
+    frames = np.asarray(frames, dtype=np.float32)
+    bank = wavelet_bank(frames.shape[-1], sample_rate, frequencies)
+    spectrum = np.fft.rfft(frames.reshape(-1, frames.shape[-1]), axis=-1)
+    features = np.concatenate([spectrum.real, spectrum.imag], axis=-1).astype(np.float32, copy=False)
+    parts = features @ bank
+    bands = bank.shape[1] // 2
+    coefficients = parts[:, :bands] + 1j * parts[:, bands:]
+    return coefficients.astype(np.complex64, copy=False).reshape(frames.shape[:-1] + (bands,))
+
+
+def levels_and_pan(coefficients: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (frames, 2, bands) complex CWT coefficients -> float32 dB levels (frames, 2 * bands, left bands
+    first) and pan angles (frames, bands), with the clamping and phase wrapping of the Rust encoder.
+    """
+    levels = 20.0 * np.log10(np.abs(coefficients) + EPSILON)
+    db_levels = np.clip(levels, DB_MIN, DB_MAX).reshape(len(coefficients), -1)
+
+    phases = np.angle(coefficients)
+    phase_diff = phases[:, 0] - phases[:, 1]
+    phase_diff = np.where(phase_diff <= -np.pi, phase_diff + 2.0 * np.pi, phase_diff)
+    phase_diff = np.where(phase_diff > np.pi, phase_diff - 2.0 * np.pi, phase_diff)
+    pan_angles = np.clip(phase_diff / np.pi * 90.0, -90.0, 90.0)
+    return db_levels.astype(np.float32), pan_angles.astype(np.float32)
+
+
+def encode_frames(frames, sample_rate: float = DEFAULT_SAMPLE_RATE,
+                  frequencies=DEFAULT_TARGET_FREQUENCIES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (frames, 2, N) or (2, N) stereo chunks -> (dB levels (frames, 2 * bands), pan angles (frames, bands)),
+    both float32; a single (2, N) chunk gives 1-D results.
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    single = frames.ndim == 2
+    if single:
+        frames = frames[None]
+    if frames.ndim != 3 or frames.shape[1] != 2 or frames.shape[2] == 0:
+        raise ValueError(f"Expected stereo chunks shaped (frames, 2, N), got {frames.shape}.")
+
+    db_levels, pan_angles = levels_and_pan(centre_coefficients(frames, sample_rate, frequencies))
+    return (db_levels[0], pan_angles[0]) if single else (db_levels, pan_angles)
+
+
+def encode_audio_to_hologram(left_channel, right_channel, sample_rate: float,
+                             target_frequencies=DEFAULT_TARGET_FREQUENCIES) -> Tuple[np.ndarray, np.ndarray]:
+    """Same signature and result as the WASM export, returning (260 dB levels, 130 pan angles)."""
+    left = np.asarray(left_channel, dtype=np.float32)
+    right = np.asarray(right_channel, dtype=np.float32)
+    if left.shape != right.shape or left.ndim != 1:
+        raise ValueError(f"Left and right channels must be 1-D and equally long, got {left.shape} and {right.shape}.")
+    if len(target_frequencies) != BAND_COUNT:
+        raise ValueError(f"Expected {BAND_COUNT} target frequencies, got {len(target_frequencies)}.")
+    return encode_frames(np.stack([left, right]), sample_rate, target_frequencies)
+
+
+def encode_signal(left_channel, right_channel, sample_rate: float = DEFAULT_SAMPLE_RATE,
+                  chunk_size: int = 1024, hop: Optional[int] = None,
+                  frequencies: Sequence[float] = DEFAULT_TARGET_FREQUENCIES,
+                  block_frames: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hologram frames for a whole stereo recording: chunks of `chunk_size` samples every `hop`
+    samples (default: no overlap, the tail is zero-padded), encoded `block_frames` chunks at a time.
+    """
+    left = np.asarray(left_channel, dtype=np.float32).ravel()
+    right = np.asarray(right_channel, dtype=np.float32).ravel()
+    if left.shape != right.shape:
+        raise ValueError(f"Channels differ in length: {left.shape[0]} vs {right.shape[0]}.")
+    hop = hop or chunk_size
+    count = max(1, -(-max(0, len(left) - chunk_size) // hop) + 1)
+    padded = np.zeros((2, (count - 1) * hop + chunk_size), dtype=np.float32)
+    padded[0, :len(left)], padded[1, :len(right)] = left, right
+    windows = np.lib.stride_tricks.sliding_window_view(padded, chunk_size, axis=1)[:, ::hop]  # (2, count, N)
+
+    bands = len(frequencies)
+    db_levels = np.empty((count, 2 * bands), dtype=np.float32)
+    pan_angles = np.empty((count, bands), dtype=np.float32)
+    for start in range(0, count, block_frames):
+        block = windows[:, start:start + block_frames].transpose(1, 0, 2)
+        db_levels[start:start + len(block)], pan_angles[start:start + len(block)] = (
+            encode_frames(block, sample_rate, frequencies))
+    return db_levels, pan_angles
@@ -0,0 +1,215 @@
+# backend/utils/cwt_stream.py
+"""
+Streaming hologram frames for audio of any length (overlap-save CWT).
+
+`encode_audio_to_hologram` analyses each chunk on its own, with circular convolution inside the
+chunk. For a long recording the wavelets are instead run over the continuous signal: every band's
+Morlet wavelet (the same `chunk_size`-sample support as the chunk encoder, M taps) is convolved
+with the audio block by block with overlap-save - FFT size L, L - M + 1 new samples per block,
+the last M - 1 samples carried over - and the output is sampled every `hop` samples. Frame k is
+centred on sample `k * hop`:
+
+    coeff_k = sum_n w[n] * x[k * hop + M // 2 - n]
+
+which for audio that repeats every `chunk_size` samples (and hop = chunk_size) is exactly what
+the chunk encoder returns. State is one (2, L) block buffer, so memory does not grow with the
+length of the input. A stream can start at any frame: the source is positioned at
+`start_sample` and only frames from `start_frame` on are produced.
+
+Only every hop-th output sample is needed, so the block's inverse FFT is never computed in full.
+With L = Q * hop, the outputs p0, p0 + hop, ... are an inverse FFT of size Q over the spectrum
+folded onto Q bins, `Z[r] = sum_q X[r + qQ] H[r + qQ] exp(2*pi*i * (r + qQ) * p0 / L)`. The fold
+is a batched (2, hop) @ (hop, bands) product per bin, which replaces 2 * bands inverse FFTs of
+length L per block with one small one.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from backend.utils.cwt_hologram import (
+    DEFAULT_TARGET_FREQUENCIES, OMEGA0, frequency_key, levels_and_pan, morlet_wavelet,
+)
+from backend.utils.pcm_reader import PcmReader
+
+
+@dataclass
+class HologramFrames:
+    start_index: int  # index of the first frame in the block
+    db_levels: np.ndarray  # (frames, 2 * bands) float32
+    pan_angles: np.ndarray  # (frames, bands) float32
+
+    def __len__(self) -> int:
+        return len(self.db_levels)
+
+
+@dataclass
+class HologramFrame:
+    index: int
+    time_seconds: float
+    db_levels: np.ndarray  # (2 * bands,)
+    pan_angles: np.ndarray  # (bands,)
+
+
+@lru_cache(maxsize=16)
+def _folded_spectra(fft_size: int, taps: int, hop: int, sample_rate: float,
+                    frequencies: Tuple[float, ...]) -> np.ndarray:
+    """Wavelet spectra at length L laid out as (Q, hop, bands), bin k = q * Q + r at [r, q]."""
+    scales = OMEGA0 * sample_rate / (2.0 * np.pi * np.asarray(frequencies, dtype=np.float64))
+    wavelets = np.stack([morlet_wavelet(scale, taps) for scale in scales])
+    spectra = np.fft.fft(wavelets, n=fft_size, axis=1).astype(np.complex64)  # (bands, L)
+    folded = np.ascontiguousarray(spectra.reshape(len(scales), hop, fft_size // hop).transpose(2, 1, 0))
+    folded.setflags(write=False)
+    return folded
+
+
+def _default_fft_size(taps: int, hop: int) -> int:
+    return -(-4 * taps // hop) * hop
+
+
+class StreamingCwtEncoder:
+    """
+    Push-style overlap-save encoder: `feed()` stereo samples as they arrive, `finish()` at the end.
+    Both return HologramFrames (possibly empty).
+
+    Args:
+        sample_rate: Sample rate of the audio.
+        chunk_size: Wavelet support in samples (the chunk size the browser encoder would use).
+        hop: Samples between frames.
+        frequencies: Band centre frequencies.
+        fft_size: Overlap-save block length, a multiple of hop (default: the first one >= 4 * chunk_size).
+        start_frame: First frame to produce; feed audio from `start_sample` on.
+    """
+
+    def __init__(self, sample_rate: float, chunk_size: int = 1024, hop: int = 256,
+                 frequencies=DEFAULT_TARGET_FREQUENCIES, fft_size: Optional[int] = None, start_frame: int = 0):
+        if chunk_size <= 0 or hop <= 0:
+            raise ValueError(f"chunk_size and hop must be positive, got {chunk_size} and {hop}.")
+        self.sample_rate = float(sample_rate)
+        self.taps = chunk_size
+        self.hop = hop
+        self.fft_size = fft_size or _default_fft_size(chunk_size, hop)
+        if self.fft_size < 2 * chunk_size or self.fft_size % hop:
+            raise ValueError(f"fft_size must be a multiple of hop ({hop}) and at least 2 * chunk_size "
+                             f"({2 * chunk_size}), got {self.fft_size}.")
+        self._spectra = _folded_spectra(self.fft_size, chunk_size, hop, self.sample_rate, frequency_key(frequencies))
+        self.bands = self._spectra.shape[2]
+        self._bins = np.arange(self.fft_size)
+
+        self.next_frame = max(0, start_frame)
+        # Frame k needs x[k * hop + M // 2 - M + 1 ...]; anything before sample 0 is silence.
+        self.start_sample = max(0, self.next_frame * hop + chunk_size // 2 - chunk_size + 1)
+        self._buffer = np.zeros((2, self.fft_size), dtype=np.float32)
+        self._filled = chunk_size - 1  # the first M - 1 slots are history (silence before start_sample)
+        self._buffer_start = self.start_sample - (chunk_size - 1)  # absolute sample index of _buffer[:, 0]
+        self._end_frame: Optional[int] = None  # frames past this are not produced (set by finish())
+
+    @property
+    def samples_fed(self) -> int:
+        return self._buffer_start + self._filled
+
+    def frame_time(self, index: int) -> float:
+        return index * self.hop / self.sample_rate
+
+    def feed(self, left, right=None) -> HologramFrames:
+        """Appends samples: `feed(block)` with a (2, n) array, or `feed(left, right)`."""
+        block = np.asarray(left, dtype=np.float32) if right is None else np.stack([
+            np.asarray(left, dtype=np.float32), np.asarray(right, dtype=np.float32)])
+        if block.ndim != 2 or block.shape[0] != 2:
+            raise ValueError(f"Expected stereo samples shaped (2, n), got {block.shape}.")
+        outputs = []
+        offset = 0
+        while offset < block.shape[1]:
+            take = min(self.fft_size - self._filled, block.shape[1] - offset)
+            self._buffer[:, self._filled:self._filled + take] = block[:, offset:offset + take]
+            self._filled += take
+            offset += take
+            if self._filled == self.fft_size:
+                outputs.append(self._process())
+        return self._concat(outputs)
+
+    def finish(self, total_samples: Optional[int] = None) -> HologramFrames:
+        """
+        Flushes the tail with silence so every frame centred inside the audio is produced
+        (`total_samples` defaults to everything fed so far).
+        """
+        total = self.samples_fed if total_samples is None else total_samples
+        self._end_frame = -(-total // self.hop)
+        needed = (self._end_frame - 1) * self.hop + self.taps // 2 + 1  # samples the last frame reaches
+        outputs = []
+        if needed > self.samples_fed:
+            outputs.append(self.feed(np.zeros((2, needed - self.samples_fed), dtype=np.float32)))
+        if self._filled > self.taps - 1 and self.next_frame < self._end_frame:
+            self._buffer[:, self._filled:] = 0.0
+            outputs.append(self._process())
+        return self._concat(outputs)
+
+    def _process(self) -> HologramFrames:
+        taps, filled = self.taps, self._filled
+        # Exact outputs: t in [buffer_start + M - 1, buffer_start + filled); frame k sits at t = k * hop + M // 2.
+        first_t, end_t = self._buffer_start + taps - 1, self._buffer_start + filled
+        first = max(self.next_frame, -(-(first_t - taps // 2) // self.hop))
+        end = -(-(end_t - taps // 2) // self.hop)
+        if self._end_frame is not None:
+            end = min(end, self._end_frame)
+
+        result = self._empty()
+        if end > first:
+            p0 = first * self.hop + taps // 2 - self._buffer_start  # buffer position of the first frame
+            shift = np.exp(2j * np.pi * self._bins * p0 / self.fft_size).astype(np.complex64)
+            spectrum = np.fft.fft(self._buffer, axis=-1) * shift  # (2, L)
+            bins = self.fft_size // self.hop
+            folded = np.matmul(np.ascontiguousarray(spectrum.reshape(2, self.hop, bins).transpose(2, 0, 1)),
+                               self._spectra)  # (Q, 2, bands)
+            coefficients = np.fft.ifft(folded, axis=0)[:end - first] / self.hop  # (frames, 2, bands)
+            db_levels, pan_angles = levels_and_pan(coefficients)
+            result = HologramFrames(first, db_levels, pan_angles)
+            self.next_frame = end
+
+        keep = taps - 1
+        self._buffer[:, :keep] = self._buffer[:, filled - keep:filled]
+        self._buffer_start += filled - keep
+        self._filled = keep
+        return result
+
+    def _empty(self) -> HologramFrames:
+        return HologramFrames(self.next_frame, np.empty((0, 2 * self.bands), dtype=np.float32),
+                              np.empty((0, self.bands), dtype=np.float32))
+
+    def _concat(self, outputs) -> HologramFrames:
+        outputs = [frames for frames in outputs if len(frames)]
+        if not outputs:
+            return self._empty()
+        if len(outputs) == 1:
+            return outputs[0]
+        return HologramFrames(outputs[0].start_index, np.concatenate([o.db_levels for o in outputs]),
+                              np.concatenate([o.pan_angles for o in outputs]))
+
+
+def iter_hologram_blocks(reader: PcmReader, chunk_size: int = 1024, hop: int = 256, start_frame: int = 0,
+                         frequencies=DEFAULT_TARGET_FREQUENCIES, read_samples: Optional[int] = None,
+                         fft_size: Optional[int] = None) -> Iterator[HologramFrames]:
+    """
+    Reads `reader` incrementally and yields blocks of consecutive hologram frames, starting at
+    `start_frame` (the reader is seeked there, so a stream can be resumed by frame index).
+    """
+    encoder = StreamingCwtEncoder(reader.sample_rate, chunk_size, hop, frequencies, fft_size, start_frame)
+    reader.seek(encoder.start_sample)
+    for block in reader.blocks(read_samples or encoder.fft_size):
+        frames = encoder.feed(block)
+        if len(frames):
+            yield frames
+    frames = encoder.finish(reader.total_samples)
+    if len(frames):
+        yield frames
+
+
+def iter_hologram_frames(reader: PcmReader, chunk_size: int = 1024, hop: int = 256, start_frame: int = 0,
+                         frequencies=DEFAULT_TARGET_FREQUENCIES) -> Iterator[HologramFrame]:
+    """Frame-by-frame view of `iter_hologram_blocks`."""
+    for block in iter_hologram_blocks(reader, chunk_size, hop, start_frame, frequencies):
+        for offset in range(len(block)):
+            index = block.start_index + offset
+            yield HologramFrame(index, index * hop / reader.sample_rate,
+                                block.db_levels[offset], block.pan_angles[offset])
@@ -0,0 +1,33 @@
+# backend/utils/env.py
+"""
+Numeric settings from environment variables, used by the module-level singletons.
+
+An unset or empty variable gives the default; an unparsable one logs a warning and gives the
+default too, so a typo in the deployment config never stops the application from starting.
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def env_number(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Invalid value for {name}: {value!r}. Falling back to {default}.")
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Invalid integer for {name}: {value!r}. Falling back to {default}.")
+        return default
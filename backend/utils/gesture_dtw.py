@@ -0,0 +1,112 @@
+# backend/utils/gesture_dtw.py
+"""
+Dynamic time warping over hand-landmark sequences.
+
+A sequence is an array of frames, each frame `hands x 21 x 3` landmarks. Before matching it is
+normalized (translated so the first frame's wrist is the origin, scaled by the mean wrist ->
+middle-finger-MCP distance, so hand size and camera distance do not matter) and resampled to a
+fixed number of frames, which gives query and templates the equal length LB_Keogh needs.
+
+`dtw_distances` uses a Sakoe-Chiba band and squared Euclidean frame cost. Each row of the cost
+matrix is computed in one vectorized step for a whole batch of templates: the left-neighbour
+dependency `row[j] = min(a[j], row[j-1] + c[j])` is a min-plus prefix scan, solved as
+`S + minimum.accumulate(a - S)` with `S = cumsum(c)`. A template whose row minimum already
+exceeds the best distance found so far is abandoned early.
+"""
+from typing import Tuple
+
+import numpy as np
+
+WRIST = 0
+MIDDLE_FINGER_MCP = 9
+DEFAULT_SEQUENCE_LENGTH = 32
+
+
+def normalize_sequence(frames) -> np.ndarray:
+    """(T, hands, 21, 3) or (T, 21, 3) landmarks -> normalized float32 (T, hands * 63)."""
+    array = np.asarray(frames, dtype=np.float32)
+    if array.ndim == 3:
+        array = array[:, None]
+    if array.ndim != 4 or array.shape[2:] != (21, 3) or array.shape[0] == 0:
+        raise ValueError(f"Expected landmark frames shaped (T, hands, 21, 3), got {array.shape}.")
+    origin = array[0, 0, WRIST]
+    scale = float(np.linalg.norm(array[:, 0, MIDDLE_FINGER_MCP] - array[:, 0, WRIST], axis=-1).mean())
+    normalized = (array - origin) / (scale if scale > 1e-6 else 1.0)
+    return normalized.reshape(array.shape[0], -1)
+
+
+def resample(sequence: np.ndarray, length: int = DEFAULT_SEQUENCE_LENGTH) -> np.ndarray:
+    """Linear interpolation of a (T, D) sequence to (length, D)."""
+    count = sequence.shape[0]
+    if count == length:
+        return sequence
+    if count == 1:
+        return np.repeat(sequence, length, axis=0)
+    positions = np.linspace(0.0, count - 1, length, dtype=np.float32)
+    left = np.floor(positions).astype(np.intp)
+    right = np.minimum(left + 1, count - 1)
+    weight = (positions - left)[:, None]
+    return (sequence[left] * (1.0 - weight) + sequence[right] * weight).astype(np.float32)
+
+
+def prepare_sequence(frames, length: int = DEFAULT_SEQUENCE_LENGTH) -> np.ndarray:
+    return resample(normalize_sequence(frames), length)
+
+
+def envelope(templates: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Upper/lower LB_Keogh envelopes of (K, L, D) templates for a band of +-window frames."""
+    length = templates.shape[1]
+    upper = np.empty_like(templates)
+    lower = np.empty_like(templates)
+    for i in range(length):
+        lo, hi = max(0, i - window), min(length, i + window + 1)
+        upper[:, i] = templates[:, lo:hi].max(axis=1)
+        lower[:, i] = templates[:, lo:hi].min(axis=1)
+    return upper, lower
+
+
+def lb_keogh(query: np.ndarray, upper: np.ndarray, lower: np.ndarray) -> np.ndarray:
+    """Lower bounds of the banded DTW distance between a (L, D) query and every (K, L, D) template."""
+    above = np.maximum(query - upper, 0.0)
+    below = np.maximum(lower - query, 0.0)
+    return np.einsum("kld,kld->k", above, above) + np.einsum("kld,kld->k", below, below)
+
+
+def dtw_distances(query: np.ndarray, templates: np.ndarray, window: int, abandon_at: float = np.inf) -> np.ndarray:
+    """
+    Banded DTW distances (sum of squared frame distances along the best path) between a (L, D)
+    query and each of K equal-length (K, L, D) templates, all computed together row by row.
+    A template whose partial row minimum exceeds `abandon_at` gets `inf`; the loop stops once
+    every template is abandoned.
+    """
+    length = query.shape[0]
+    cost = (np.einsum("id,id->i", query, query)[None, :, None]
+            + np.einsum("kjd,kjd->kj", templates, templates)[:, None, :]
+            - 2.0 * np.einsum("id,kjd->kij", query, templates)).astype(np.float64)
+    np.maximum(cost, 0.0, out=cost)
+
+    # Column 0 is a permanent inf sentinel, so frame j lives in column j + 1 and the diagonal
+    # predecessor of the band [lo, hi) is simply columns [lo, hi) of the previous row.
+    count = templates.shape[0]
+    previous = np.full((count, length + 1), np.inf)
+    current = np.full((count, length + 1), np.inf)
+    hi = min(length, window + 1)
+    previous[:, 1:hi + 1] = np.cumsum(cost[:, 0, :hi], axis=1)
+    alive = np.ones(count, dtype=bool)
+    for i in range(1, length):
+        lo, hi = max(0, i - window), min(length, i + window + 1)
+        row_cost = cost[:, i, lo:hi]
+        best_above = np.minimum(previous[:, lo + 1:hi + 1], previous[:, lo:hi]) + row_cost
+        prefix = np.cumsum(row_cost, axis=1)
+        row = prefix + np.minimum.accumulate(best_above - prefix, axis=1)
+        alive &= row.min(axis=1) <= abandon_at
+        if not alive.any():
+            return np.full(count, np.inf)
+        current[:, 1:lo + 1] = np.inf
+        current[:, lo + 1:hi + 1] = row
+        previous, current = current, previous
+    return np.where(alive, previous[:, -1], np.inf)
+
+
+def dtw_distance(query: np.ndarray, template: np.ndarray, window: int, abandon_at: float = np.inf) -> float:
+    return float(dtw_distances(query, template[None], window, abandon_at)[0])
@@ -0,0 +1,71 @@
+# backend/utils/gesture_intent_codec.py
+"""
+Binary mode of /ws/v1/gesture-intent.
+
+A client that offers the WebSocket subprotocol `SUBPROTOCOL_PROTOBUF` sends each intent as a
+serialized `GestureChunk` and receives `GestureIntentResponse` messages instead of JSON:
+
+    intent         -> recognized_gesture_type
+    context        -> temporal_spatial_metadata_json (JSON object)
+    correlation_id -> gesture_id
+    intensity      -> confidence
+    landmarks      -> landmark_data_3d (packed float32, 21 x 3 per hand)
+
+Landmarks are exposed as a zero-copy (N, 21, 3) view into the received bytes.
+"""
+import json
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from backend.utils.landmark_buffers import landmarks_from_gesture_chunk_bytes, write_packed_floats
+from nethologlyph.generated_pb2 import definitions_pb2 as pb
+
+SUBPROTOCOL_JSON = "holograms.gesture-intent.v1+json"
+SUBPROTOCOL_PROTOBUF = "holograms.gesture-intent.v1+protobuf"
+
+_RESPONSE_FIELDS = ("correlation_id", "status", "message")
+
+
+def parse_intent_chunk(data: bytes) -> Tuple["pb.GestureChunk", Optional[np.ndarray]]:
+    """Parses a binary intent; landmarks is None if the chunk has none (or they are not packed)."""
+    chunk = pb.GestureChunk()
+    chunk.ParseFromString(data)
+    landmarks = landmarks_from_gesture_chunk_bytes(data) if len(chunk.landmark_data_3d) else None
+    return chunk, landmarks
+
+
+def describe_gesture_chunk(chunk: "pb.GestureChunk") -> Tuple[Optional[str], Optional[str], str]:
+    """(correlation_id, intent, context key) for GestureIntentPipeline."""
+    return chunk.gesture_id or None, chunk.recognized_gesture_type or None, chunk.temporal_spatial_metadata_json
+
+
+def encode_intent_chunk(intent: str, context: Optional[Dict[str, Any]] = None, correlation_id: str = "",
+                        intensity: float = 0.0, landmarks=None) -> bytes:
+    """Client-side counterpart of parse_intent_chunk (used by tools, tests and benchmarks)."""
+    chunk = pb.GestureChunk(gesture_id=correlation_id, recognized_gesture_type=intent, confidence=intensity)
+    if context:
+        chunk.temporal_spatial_metadata_json = json.dumps(context, separators=(",", ":"))
+    if landmarks is not None:
+        write_packed_floats(chunk, "landmark_data_3d", landmarks)
+    return chunk.SerializeToString()
+
+
+def encode_response(response: Dict[str, Any]) -> bytes:
+    message = pb.GestureIntentResponse(
+        correlation_id=str(response.get("correlation_id") or ""),
+        status=str(response.get("status") or response.get("type") or ""),
+        message=str(response.get("message") or response.get("state") or ""),
+    )
+    rest = {key: value for key, value in response.items() if key not in _RESPONSE_FIELDS}
+    if rest:
+        message.result_json = json.dumps(rest, separators=(",", ":"), default=str)
+    return message.SerializeToString()
+
+
+def decode_response(data: bytes) -> Dict[str, Any]:
+    message = pb.GestureIntentResponse()
+    message.ParseFromString(data)
+    response: Dict[str, Any] = json.loads(message.result_json) if message.result_json else {}
+    response.update({"correlation_id": message.correlation_id, "status": message.status, "message": message.message})
+    return response
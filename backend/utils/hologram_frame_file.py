@@ -0,0 +1,254 @@
+# backend/utils/hologram_frame_file.py
+"""
+Columnar on-disk format for precomputed hologram frames (".holo").
+
+    header   HEADER struct (magic, version, band count, sample rate, chunk size, hop,
+             start frame, frame count, pan scale, column offsets, content hash)
+    freqs    float32[bands]                  band centre frequencies
+    db       float16[frames, 2 * bands]      dB levels, left bands then right (64-byte aligned)
+    pan      int8[frames, bands]             pan angle * PAN_SCALE, i.e. 127 = +90 degrees
+
+Columns are fixed-width rows, so frame k of a column sits at `offset + k * row_bytes`: the
+header alone is the frame index, a reader can memory-map the columns without parsing
+anything else, and a client can fetch any frame range with two HTTP Range requests. Files are
+written once (through two spool files, one per column) and renamed into place atomically.
+"""
+import os
+import struct
+import tempfile
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"HOLOFRM1"
+VERSION = 1
+HEADER = struct.Struct("<8sHHdIIIIfQQ32s")
+ALIGNMENT = 64
+PAN_SCALE = 127.0 / 90.0
+DB_DTYPE = np.dtype("<f2")
+PAN_DTYPE = np.dtype("i1")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def quantize_pan(pan_angles: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(np.asarray(pan_angles, dtype=np.float32) * PAN_SCALE), -127, 127).astype(PAN_DTYPE)
+
+
+class FrameFileHeader:
+    def __init__(self, bands: int, sample_rate: float, chunk_size: int, hop: int, frame_count: int,
+                 frequencies: np.ndarray, start_frame: int = 0, content_hash: bytes = b""):
+        self.bands = bands
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.hop = hop
+        self.frame_count = frame_count
+        self.start_frame = start_frame  # non-zero for a slice served from a larger file
+        self.frequencies = np.asarray(frequencies, dtype=np.float32)
+        self.content_hash = content_hash
+        self.db_row_bytes = 2 * bands * DB_DTYPE.itemsize
+        self.pan_row_bytes = bands * PAN_DTYPE.itemsize
+        self.db_offset = _aligned(HEADER.size + 4 * bands)
+        self.pan_offset = _aligned(self.db_offset + frame_count * self.db_row_bytes)
+        self.size = self.pan_offset + frame_count * self.pan_row_bytes
+
+    def pack(self) -> bytes:
+        fixed = HEADER.pack(MAGIC, VERSION, self.bands, self.sample_rate, self.chunk_size, self.hop,
+                            self.start_frame, self.frame_count, PAN_SCALE, self.db_offset, self.pan_offset,
+                            self.content_hash.ljust(32, b"\0"))
+        packed = fixed + self.frequencies.astype("<f4").tobytes()
+        return packed + b"\0" * (self.db_offset - len(packed))
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "FrameFileHeader":
+        if len(data) < HEADER.size:
+            raise ValueError("Truncated hologram frame file header.")
+        (magic, version, bands, sample_rate, chunk_size, hop, start_frame, frame_count, _, db_offset,
+         pan_offset, content_hash) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a hologram frame file (magic {magic!r}, version {version}).")
+        frequencies = np.frombuffer(data, dtype="<f4", count=bands, offset=HEADER.size)
+        header = cls(bands, sample_rate, chunk_size, hop, frame_count, frequencies, start_frame, content_hash.rstrip(b"\0"))
+        if (header.db_offset, header.pan_offset) != (db_offset, pan_offset):
+            raise ValueError("Hologram frame file header has inconsistent column offsets.")
+        return header
+
+    def byte_ranges(self, start: int, count: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """Inclusive (first, last) byte ranges of frames [start, start + count) in the db and pan columns."""
+        start, end = max(0, start), min(self.frame_count, start + count)
+        if end <= start:
+            raise ValueError(f"Frame range {start}+{count} is outside 0..{self.frame_count}.")
+        return ((self.db_offset + start * self.db_row_bytes, self.db_offset + end * self.db_row_bytes - 1),
+                (self.pan_offset + start * self.pan_row_bytes, self.pan_offset + end * self.pan_row_bytes - 1))
+
+
+def _read_range(f: BinaryIO, first: int, last: int, block_size: int) -> Iterator[bytes]:
+    """Bytes first..last (inclusive) of `f` in blocks."""
+    f.seek(first)
+    remaining = last - first + 1
+    while remaining > 0:
+        block = f.read(min(block_size, remaining))
+        if not block:
+            raise ValueError("Hologram frame file is shorter than its header says.")
+        remaining -= len(block)
+        yield block
+
+
+def read_header(path: str) -> FrameFileHeader:
+    """Header of a .holo file, read without mapping the columns."""
+    with open(path, "rb") as f:
+        head = f.read(HEADER.size)
+        bands = HEADER.unpack_from(head)[2] if len(head) == HEADER.size else 0
+        return FrameFileHeader.unpack(head + f.read(4 * bands))
+
+
+class FrameFile:
+    """
+    Read-only, memory-mapped view of a .holo file (a valid empty file has no columns to map).
+    The mapping lives as long as any array taken from it, so dropping a FrameFile never
+    invalidates data another thread is still reading.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header = read_header(path)
+        header = self.header
+        if header.frame_count:
+            self.db_levels = np.memmap(path, DB_DTYPE, "r", header.db_offset, (header.frame_count, 2 * header.bands))
+            self.pan_codes = np.memmap(path, PAN_DTYPE, "r", header.pan_offset, (header.frame_count, header.bands))
+        else:
+            self.db_levels = np.empty((0, 2 * header.bands), dtype=DB_DTYPE)
+            self.pan_codes = np.empty((0, header.bands), dtype=PAN_DTYPE)
+
+    def __len__(self) -> int:
+        return self.header.frame_count
+
+    @property
+    def size(self) -> int:
+        return self.header.size
+
+    def frames(self, start: int = 0, count: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """float32 (dB levels, pan angles in degrees) for frames [start, start + count)."""
+        end = len(self) if count is None else min(len(self), start + count)
+        return (self.db_levels[start:end].astype(np.float32),
+                self.pan_codes[start:end].astype(np.float32) / np.float32(PAN_SCALE))
+
+    def slice_header(self, start: int, count: int) -> FrameFileHeader:
+        """Header of the .holo file holding frames [start, start + count) (header start_frame = start)."""
+        start = max(0, start)
+        end = min(len(self), start + max(0, count))
+        header = self.header
+        return FrameFileHeader(header.bands, header.sample_rate, header.chunk_size, header.hop, max(0, end - start),
+                               header.frequencies, header.start_frame + start, header.content_hash)
+
+    def iter_slice(self, start: int, count: int, block_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        `slice_bytes` as a stream: the header, then both column ranges read from the file in
+        blocks of at most `block_size` bytes, so a large slice is never held in memory at once.
+        """
+        sliced = self.slice_header(start, count)
+        yield sliced.pack()
+        if not sliced.frame_count:
+            return
+        (db_first, db_last), (pan_first, pan_last) = self.header.byte_ranges(max(0, start), sliced.frame_count)
+        with open(self.path, "rb") as f:
+            yield from _read_range(f, db_first, db_last, block_size)
+            yield b"\0" * (sliced.pan_offset - sliced.db_offset - sliced.frame_count * sliced.db_row_bytes)
+            yield from _read_range(f, pan_first, pan_last, block_size)
+
+    def slice_bytes(self, start: int, count: int) -> bytes:
+        """A self-contained .holo file holding frames [start, start + count) (header start_frame = start)."""
+        return b"".join(self.iter_slice(start, count))
+
+    def close(self) -> None:
+        """Drops this object's references to the columns; the file is unmapped once no view of it is left."""
+        self.db_levels = np.empty((0, 2 * self.header.bands), dtype=DB_DTYPE)
+        self.pan_codes = np.empty((0, self.header.bands), dtype=PAN_DTYPE)
+
+
+class FrameFileWriter:
+    """
+    Appends frames to two column spool files next to `path`; `commit()` assembles the final file
+    and renames it into place, `discard()` drops everything.
+    """
+
+    def __init__(self, path: str, sample_rate: float, chunk_size: int, hop: int, frequencies):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.hop = hop
+        self.frequencies = np.asarray(frequencies, dtype=np.float32)
+        self.frame_count = 0
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        self._db = tempfile.NamedTemporaryFile(dir=directory, prefix=".db-", suffix=".spool", delete=False)
+        self._pan = tempfile.NamedTemporaryFile(dir=directory, prefix=".pan-", suffix=".spool", delete=False)
+
+    def write(self, db_levels: np.ndarray, pan_angles: np.ndarray) -> None:
+        if len(db_levels) != len(pan_angles) or db_levels.shape[1:] != (2 * len(self.frequencies),):
+            raise ValueError(f"Frame block shapes do not match {len(self.frequencies)} bands: "
+                             f"{db_levels.shape} and {pan_angles.shape}.")
+        self._db.write(np.asarray(db_levels).astype(DB_DTYPE).tobytes())
+        self._pan.write(quantize_pan(pan_angles).tobytes())
+        self.frame_count += len(db_levels)
+
+    def commit(self, content_hash: bytes = b"", path: Optional[str] = None) -> str:
+        path = path or self.path
+        header = FrameFileHeader(len(self.frequencies), self.sample_rate, self.chunk_size, self.hop,
+                                 self.frame_count, self.frequencies, content_hash=content_hash)
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".holo-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(header.pack())
+                for spool, end_offset in ((self._db, header.pan_offset), (self._pan, header.size)):
+                    spool.flush()
+                    spool.seek(0)
+                    while True:
+                        block = spool.read(1 << 20)
+                        if not block:
+                            break
+                        out.write(block)
+                    out.write(b"\0" * (end_offset - out.tell()))
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        finally:
+            self.discard()
+        return path
+
+    def discard(self) -> None:
+        for spool in (self._db, self._pan):
+            spool.close()
+            if os.path.exists(spool.name):
+                os.unlink(spool.name)
+
+
+def parse_byte_range(value: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single-range `Range: bytes=...` header -> inclusive (first, last), or None to serve the whole
+    file (no header, another unit, or several ranges). Raises ValueError if unsatisfiable.
+    """
+    if not value or not value.strip().lower().startswith("bytes=") or "," in value:
+        return None
+    first, _, last = value.strip()[6:].partition("-")
+    try:
+        if not first:  # suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        raise ValueError(f"Malformed Range header: {value!r}.")
+    if start >= size or end < start:
+        raise ValueError(f"Range {value!r} not satisfiable for {size} bytes.")
+    return start, end
@@ -0,0 +1,149 @@
+# backend/utils/landmark_buffers.py
+"""
+Compact hand-landmark buffers for `GestureChunk.landmark_data_3d`.
+
+The proto field is a packed `repeated float` (21 landmarks x 3 coordinates per hand). Here it
+is handled as one little-endian float32 buffer exposed as an `(N, 21, 3)` NumPy array:
+
+- `landmarks_from_packet()` scans a serialized NetHoloPacket and returns a zero-copy view
+  straight into the received bytes (no message parse, no per-point objects);
+- `read_packed_floats()` / `write_packed_floats()` move the field between a parsed message and
+  an array with a single buffer copy (serialized bytes read with `np.frombuffer`, encoded packed
+  bytes fed to `MergeFromString`).
+"""
+from typing import Optional, Tuple, Union
+
+import numpy as np
+from google.protobuf.message import Message
+
+LANDMARKS_PER_HAND = 21
+COORDS_PER_LANDMARK = 3
+FLOATS_PER_HAND = LANDMARKS_PER_HAND * COORDS_PER_LANDMARK
+
+# Field numbers from nethologlyph/protocol/definitions.proto
+NETHOLOPACKET_GESTURE_CHUNK_FIELD = 5
+GESTURECHUNK_LANDMARKS_FIELD = 6
+
+_WIRE_VARINT, _WIRE_FIXED64, _WIRE_LEN, _WIRE_FIXED32 = 0, 1, 2, 5
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def as_landmark_array(values) -> np.ndarray:
+    """Any flat/nested float sequence or array -> float32 array of shape (N, 21, 3)."""
+    array = np.asarray(values, dtype=np.float32)
+    if array.size % FLOATS_PER_HAND:
+        raise ValueError(f"Landmark data must hold a multiple of {FLOATS_PER_HAND} floats (21 x 3 per hand), got {array.size}.")
+    return array.reshape(-1, LANDMARKS_PER_HAND, COORDS_PER_LANDMARK)
+
+
+def _read_varint(buf: memoryview, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("Malformed varint.")
+
+
+def _encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def find_length_delimited(buf: Buffer, field_number: int) -> Optional[memoryview]:
+    """
+    Returns a zero-copy slice of the single length-delimited occurrence of `field_number` in a
+    serialized message. Returns None if the field is absent, repeated on the wire (parts would
+    have to be merged), encoded unpacked, or the buffer cannot be scanned.
+    """
+    view = memoryview(buf)
+    pos, end = 0, len(view)
+    found: Optional[memoryview] = None
+    try:
+        while pos < end:
+            key, pos = _read_varint(view, pos)
+            number, wire_type = key >> 3, key & 0x7
+            if wire_type == _WIRE_VARINT:
+                _, pos = _read_varint(view, pos)
+            elif wire_type == _WIRE_FIXED64:
+                pos += 8
+            elif wire_type == _WIRE_FIXED32:
+                if number == field_number:
+                    return None  # Unpacked repeated float; let the regular parser handle it.
+                pos += 4
+            elif wire_type == _WIRE_LEN:
+                length, pos = _read_varint(view, pos)
+                if number == field_number:
+                    if found is not None:
+                        return None
+                    found = view[pos:pos + length]
+                pos += length
+            else:
+                return None  # Groups are not used by this protocol.
+    except (IndexError, ValueError):
+        return None
+    if pos != end:
+        return None
+    return found
+
+
+def landmarks_from_gesture_chunk_bytes(buf: Buffer) -> Optional[np.ndarray]:
+    """Zero-copy (N, 21, 3) view of landmark_data_3d in a serialized GestureChunk."""
+    packed = find_length_delimited(buf, GESTURECHUNK_LANDMARKS_FIELD)
+    if packed is None or len(packed) % 4:
+        return None
+    values = np.frombuffer(packed, dtype="<f4")
+    if values.size % FLOATS_PER_HAND:
+        return None
+    return values.reshape(-1, LANDMARKS_PER_HAND, COORDS_PER_LANDMARK)
+
+
+def landmarks_from_packet(buf: Buffer) -> Optional[np.ndarray]:
+    """
+    Zero-copy (N, 21, 3) view of the gesture chunk landmarks in a serialized NetHoloPacket.
+    The view is read-only and keeps `buf` alive; None means "use the parsed message instead".
+    """
+    chunk = find_length_delimited(buf, NETHOLOPACKET_GESTURE_CHUNK_FIELD)
+    if chunk is None:
+        return None
+    return landmarks_from_gesture_chunk_bytes(chunk)
+
+
+def read_packed_floats(message: Message, field_name: str) -> np.ndarray:
+    """
+    Copies a repeated float field into a flat, writable float32 array. The repeated container
+    exposes no buffer, so the message is serialized (in C) and the packed payload is copied out
+    of the bytes in one go; 6300 floats take ~9 us this way against ~330 us element by element.
+    """
+    field_number = message.DESCRIPTOR.fields_by_name[field_name].number
+    packed = find_length_delimited(message.SerializeToString(), field_number)
+    if packed is not None and len(packed) % 4 == 0:
+        return np.frombuffer(packed, dtype="<f4").copy()
+    container = getattr(message, field_name)  # absent or unpacked on the wire
+    return np.fromiter(container, dtype=np.float32, count=len(container))
+
+
+def encode_packed_floats(field_number: int, values) -> bytes:
+    """Wire encoding of a packed repeated float field: tag, byte length, raw little-endian floats."""
+    payload = np.ascontiguousarray(values, dtype="<f4").tobytes()
+    return _encode_varint((field_number << 3) | _WIRE_LEN) + _encode_varint(len(payload)) + payload
+
+
+def write_packed_floats(message: Message, field_name: str, values) -> None:
+    """Replaces a repeated float field with `values` via one buffer copy (no per-float Python calls)."""
+    field_number = message.DESCRIPTOR.fields_by_name[field_name].number
+    message.ClearField(field_name)
+    message.MergeFromString(encode_packed_floats(field_number, values))
@@ -0,0 +1,58 @@
+# backend/utils/packet_framing.py
+"""
+Multi-packet WebSocket frames for NetHoloGlyph (feature "packet_framing_v1").
+
+A frame is one marker byte followed by length-prefixed serialized NetHoloPackets:
+
+    0xB7 | uint32 LE length | packet bytes | uint32 LE length | packet bytes | ...
+
+0xB7 is a protobuf key with wire type 7, which does not exist, so a frame can never be mistaken
+for a bare NetHoloPacket and both can share one connection.
+"""
+import struct
+from typing import Iterator, Sequence, Union
+
+FEATURE_PACKET_FRAMING = "packet_framing_v1"
+
+FRAME_MARKER = 0xB7
+_LENGTH = struct.Struct("<I")
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def is_frame(data: Buffer) -> bool:
+    return len(data) > 0 and data[0] == FRAME_MARKER
+
+
+def framed_size(packet_sizes: Sequence[int]) -> int:
+    return 1 + sum(packet_sizes) + _LENGTH.size * len(packet_sizes)
+
+
+def encode_frame(packets: Sequence[bytes]) -> bytes:
+    """Packs already-serialized packets into one frame (a single buffer allocation)."""
+    frame = bytearray(framed_size([len(packet) for packet in packets]))
+    frame[0] = FRAME_MARKER
+    pos = 1
+    for packet in packets:
+        _LENGTH.pack_into(frame, pos, len(packet))
+        pos += _LENGTH.size
+        frame[pos:pos + len(packet)] = packet
+        pos += len(packet)
+    return bytes(frame)
+
+
+def split_frame(frame: Buffer) -> Iterator[memoryview]:
+    """Yields zero-copy views of the packets in a frame. Raises ValueError on a malformed frame."""
+    view = memoryview(frame)
+    if not is_frame(view):
+        raise ValueError("Not a NetHoloGlyph frame (missing 0xB7 marker).")
+    pos, end = 1, len(view)
+    while pos < end:
+        if pos + _LENGTH.size > end:
+            raise ValueError(f"Truncated length prefix at offset {pos}.")
+        (length,) = _LENGTH.unpack_from(view, pos)
+        pos += _LENGTH.size
+        if pos + length > end:
+            raise ValueError(f"Packet at offset {pos} declares {length} bytes, only {end - pos} left.")
+        yield view[pos:pos + length]
+        pos += length
@@ -0,0 +1,182 @@
+# backend/utils/pcm_reader.py
+"""
+Incremental readers for uploaded audio: WAV (integer PCM) and headerless interleaved PCM.
+
+Readers work on any binary file object - a local file, BytesIO, or the `Body` of an S3/R2
+`get_object` response - and hand out float32 stereo blocks shaped (2, n) in [-1, 1) (mono is
+duplicated, channels beyond the second are dropped), so memory use depends on the block size,
+not on the length of the recording. `seek()` uses the file's own seek when it has one and
+otherwise reads forward and discards.
+"""
+import io
+import logging
+import wave
+from typing import BinaryIO, Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WAV_CONTENT_TYPES = {"audio/wav", "audio/wave", "audio/x-wav", "audio/vnd.wave"}
+PCM_CONTENT_TYPES = {"audio/pcm", "audio/l16", "audio/x-raw", "application/octet-stream"}
+
+
+def decode_pcm(data: bytes, channels: int, sample_width: int) -> np.ndarray:
+    """Interleaved little-endian PCM bytes -> float32 (channels, samples). 8-bit is unsigned, wider is signed."""
+    block_align = channels * sample_width
+    data = data[:len(data) - len(data) % block_align]
+    if sample_width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = (np.where(values >= 1 << 23, values - (1 << 24), values) / float(1 << 23)).astype(np.float32)
+    elif sample_width == 4:
+        samples = (np.frombuffer(data, dtype="<i4") / float(1 << 31)).astype(np.float32)
+    else:
+        raise ValueError(f"Unsupported PCM sample width: {sample_width} bytes.")
+    return samples.reshape(-1, channels).T
+
+
+def to_stereo(samples: np.ndarray) -> np.ndarray:
+    if samples.shape[0] == 1:
+        return np.repeat(samples, 2, axis=0)
+    return samples[:2]
+
+
+class PcmReader:
+    """Base reader; subclasses implement `_read_bytes` and, where possible, `_seek_bytes`."""
+
+    def __init__(self, fileobj: BinaryIO, sample_rate: int, channels: int, sample_width: int,
+                 total_samples: Optional[int] = None):
+        if channels < 1 or sample_rate <= 0:
+            raise ValueError(f"Invalid PCM format: {channels} channel(s) at {sample_rate} Hz.")
+        self.fileobj = fileobj
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.total_samples = total_samples  # None when the length is not known up front (raw streams)
+        self.position = 0  # next sample to be read
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        return None if self.total_samples is None else self.total_samples / self.sample_rate
+
+    def _read_bytes(self, count: int) -> bytes:
+        return self.fileobj.read(count)
+
+    def _seekable(self) -> bool:
+        seekable = getattr(self.fileobj, "seekable", None)
+        return bool(seekable and seekable())
+
+    def _seek_bytes(self, sample: int) -> bool:
+        return False
+
+    def read(self, count: int) -> np.ndarray:
+        """Up to `count` samples as float32 (2, n); n < count only at the end of the stream."""
+        block_align = self.channels * self.sample_width
+        wanted = count * block_align
+        data = self._read_bytes(wanted)
+        while data and len(data) < wanted:  # network bodies may return short reads before the end
+            more = self._read_bytes(wanted - len(data))
+            if not more:
+                break
+            data += more
+        samples = to_stereo(decode_pcm(data, self.channels, self.sample_width))
+        self.position += samples.shape[1]
+        return samples
+
+    def seek(self, sample: int) -> None:
+        sample = max(0, sample)
+        if self.total_samples is not None:
+            sample = min(sample, self.total_samples)
+        if sample == self.position:
+            return
+        if self._seek_bytes(sample):
+            self.position = sample
+            return
+        if sample < self.position:
+            raise io.UnsupportedOperation("Cannot seek backwards in a non-seekable audio stream.")
+        while self.position < sample:
+            if not self.read(min(65536, sample - self.position)).shape[1]:
+                break
+
+    def blocks(self, block_samples: int = 65536) -> Iterator[np.ndarray]:
+        while True:
+            block = self.read(block_samples)
+            if not block.shape[1]:
+                return
+            yield block
+
+    def close(self) -> None:
+        close = getattr(self.fileobj, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class WavReader(PcmReader):
+    def __init__(self, fileobj: BinaryIO):
+        self._wave = wave.open(fileobj, "rb")
+        super().__init__(fileobj, self._wave.getframerate(), self._wave.getnchannels(),
+                         self._wave.getsampwidth(), self._wave.getnframes())
+
+    def _read_bytes(self, count: int) -> bytes:
+        return self._wave.readframes(count // (self.channels * self.sample_width))
+
+    def _seek_bytes(self, sample: int) -> bool:
+        if not self._seekable():
+            return False
+        self._wave.setpos(sample)
+        return True
+
+    def close(self) -> None:
+        self._wave.close()
+        super().close()
+
+
+class RawPcmReader(PcmReader):
+    """Headerless interleaved little-endian PCM (e.g. 16-bit chunks recorded by the client)."""
+
+    def __init__(self, fileobj: BinaryIO, sample_rate: int = 48000, channels: int = 2, sample_width: int = 2,
+                 total_bytes: Optional[int] = None):
+        total = None if total_bytes is None else total_bytes // (channels * sample_width)
+        super().__init__(fileobj, sample_rate, channels, sample_width, total)
+        self._origin = fileobj.tell() if self._seekable() else 0
+
+    def _seek_bytes(self, sample: int) -> bool:
+        if not self._seekable():
+            return False
+        self.fileobj.seek(self._origin + sample * self.channels * self.sample_width)
+        return True
+
+
+def open_pcm(fileobj: BinaryIO, content_type: Optional[str] = None, sample_rate: int = 48000,
+             channels: int = 2, sample_width: int = 2, total_bytes: Optional[int] = None) -> PcmReader:
+    """
+    Picks a reader by content type ("audio/wav", "audio/pcm", ...). Without a recognised type the
+    stream is treated as WAV if it starts with a RIFF header (checked with seek, or with `peek`
+    on buffered streams), else as raw PCM in the given format.
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in WAV_CONTENT_TYPES:
+        return WavReader(fileobj)
+    if content_type not in PCM_CONTENT_TYPES:
+        if getattr(fileobj, "seekable", lambda: False)():
+            start = fileobj.tell()
+            is_riff = fileobj.read(4) == b"RIFF"
+            fileobj.seek(start)
+        else:
+            is_riff = hasattr(fileobj, "peek") and fileobj.peek(4)[:4] == b"RIFF"
+        if is_riff:
+            return WavReader(fileobj)
+    if content_type and content_type not in PCM_CONTENT_TYPES:
+        logger.warning(f"open_pcm: unknown audio content type {content_type!r}, reading as raw PCM.")
+    return RawPcmReader(fileobj, sample_rate, channels, sample_width, total_bytes)
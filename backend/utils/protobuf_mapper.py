@@ -1,76 +1,342 @@
 # backend/utils/protobuf_mapper.py
+"""
+Conversion between Pydantic models and Protobuf messages.
 
-from typing import Any, Dict, Type, TypeVar
-from pydantic import BaseModel
+The first conversion for a (model class, message type) pair introspects the message
+`DESCRIPTOR` and the model's fields and compiles a plan: one small converter per mapped
+field, chosen by field kind (scalar, nested message, repeated, Timestamp, JSON string,
+flattened vectors). Later conversions only run the cached converters.
+
+Field names are matched by name. A model can declare:
+- `proto_field_map`: ClassVar {model_field: proto_field} for fields whose names differ;
+- `proto_json_rest_field`: ClassVar naming a proto `string` field into which all model fields
+  without a proto counterpart are packed as JSON (and unpacked on the way back);
+- `proto_exclude`: ClassVar of model fields that never travel (e.g. derived views).
+
+`np.ndarray` model fields map to packed `repeated float` fields as one float32 buffer.
+
+Proto fields inside a oneof are written when the model value is not None and read only when
+they are the active member. Fields with explicit presence (`optional`, messages) are checked
+with `HasField` and come back as None when unset. Plain proto3 scalars have no presence: an
+unset one is indistinguishable from its default, so an Optional model field that was None
+comes back as "", 0 or False (e.g. `GestureChunkNetModel.confidence`). Declare the proto field
+`optional` where None has to survive the round trip.
+"""
+
+import json
+import math
+import typing
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
+
+from google.protobuf.descriptor import FieldDescriptor
 from google.protobuf.message import Message
 from google.protobuf.timestamp_pb2 import Timestamp
-from datetime import datetime, timezone
+import numpy as np
+from pydantic import BaseModel
+
+from backend.utils.landmark_buffers import read_packed_floats, write_packed_floats
 
 # Define a type variable for Pydantic models
 PydanticModel = TypeVar('PydanticModel', bound=BaseModel)
 # Define a type variable for Protobuf messages
 ProtoMessage = TypeVar('ProtoMessage', bound=Message)
 
+_TIMESTAMP_FULL_NAME = Timestamp.DESCRIPTOR.full_name
+_VECTOR_COMPONENTS = ("x", "y", "z")
+
+
+def _unwrap_annotation(annotation: Any) -> Tuple[Any, Optional[Any]]:
+    """Strips Optional[...] and returns (base type, list item type or None)."""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return _unwrap_annotation(args[0])
+        return annotation, None
+    if origin in (list, List):
+        args = typing.get_args(annotation)
+        return list, (args[0] if args else Any)
+    return (origin or annotation), None
+
+
+def _is_model(tp: Any) -> bool:
+    return isinstance(tp, type) and issubclass(tp, BaseModel)
+
+
+def _is_vector_model(tp: Any) -> bool:
+    return _is_model(tp) and set(tp.model_fields) == set(_VECTOR_COMPONENTS)
+
+
+# Writer: (message, value) -> None, called only for non-None values.
+# Reader: (message) -> value or None.
+Writer = Callable[[Message, Any], None]
+Reader = Callable[[Message], Any]
+
+
+class _MessagePlan:
+    """Compiled conversion plan for one (Pydantic model, Protobuf message) pair."""
+
+    def __init__(self, model_cls: Type[BaseModel], descriptor):
+        self.model_cls = model_cls
+        self.descriptor = descriptor
+        self.fields: List[Tuple[str, Writer, Reader]] = []
+        self.rest_field: Optional[str] = None
+        self.rest_model_fields: set = set()
+
+        field_map: Dict[str, str] = dict(getattr(model_cls, "proto_field_map", {}) or {})
+        exclude = set(getattr(model_cls, "proto_exclude", ()) or ())
+        proto_fields = descriptor.fields_by_name
+        for model_name, model_field in model_cls.model_fields.items():
+            if model_name in exclude:
+                continue
+            proto_name = field_map.get(model_name, model_name)
+            fd = proto_fields.get(proto_name)
+            if fd is None:
+                self.rest_model_fields.add(model_name)
+                continue
+            writer, reader = _compile_field(fd, model_field.annotation)
+            self.fields.append((model_name, writer, reader))
+
+        rest_field = getattr(model_cls, "proto_json_rest_field", None)
+        if rest_field and self.rest_model_fields:
+            fd = proto_fields.get(rest_field)
+            if fd is None or fd.type != FieldDescriptor.TYPE_STRING:
+                raise ValueError(f"{model_cls.__name__}.proto_json_rest_field '{rest_field}' is not a string field of {descriptor.full_name}.")
+            self.rest_field = rest_field
+
+    def fill(self, model: BaseModel, message: Message) -> None:
+        for model_name, writer, _ in self.fields:
+            value = getattr(model, model_name)
+            if value is not None:
+                writer(message, value)
+        if self.rest_field:
+            rest = model.model_dump(include=self.rest_model_fields, mode="json", exclude_none=True)
+            if rest:
+                setattr(message, self.rest_field, json.dumps(rest, separators=(",", ":")))
+
+    def read(self, message: Message, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        if self.rest_field:
+            raw = getattr(message, self.rest_field)
+            if raw:
+                rest = json.loads(raw)
+                if isinstance(rest, dict):
+                    data.update({k: v for k, v in rest.items() if k in self.rest_model_fields})
+        for model_name, _, reader in self.fields:
+            if overrides and model_name in overrides:
+                continue
+            value = reader(message)
+            if value is not None:
+                data[model_name] = value
+        if overrides:
+            data.update(overrides)
+        return data
+
+
+_plans: Dict[Tuple[Type[BaseModel], str], _MessagePlan] = {}
+
+
+def get_plan(model_cls: Type[BaseModel], descriptor) -> _MessagePlan:
+    key = (model_cls, descriptor.full_name)
+    plan = _plans.get(key)
+    if plan is None:
+        plan = _plans[key] = _MessagePlan(model_cls, descriptor)
+    return plan
+
+
+def _compile_field(fd: FieldDescriptor, annotation: Any) -> Tuple[Writer, Reader]:
+    name = fd.name
+    base, item = _unwrap_annotation(annotation)
+    repeated = fd.label == FieldDescriptor.LABEL_REPEATED
+    is_message = fd.type == FieldDescriptor.TYPE_MESSAGE
+    oneof = fd.containing_oneof.name if fd.containing_oneof is not None and not _is_synthetic_oneof(fd) else None
+
+    if repeated and is_message:
+        item_plan_cls = item if _is_model(item) else None
+        if item_plan_cls is None:
+            raise TypeError(f"Field '{name}': repeated message needs List[BaseModel] on the model side.")
+        message_descriptor = fd.message_type
+
+        def write(msg, value):
+            plan = get_plan(item_plan_cls, message_descriptor)
+            container = getattr(msg, name)
+            for element in value:
+                plan.fill(element, container.add())
+
+        def read(msg):
+            plan = get_plan(item_plan_cls, message_descriptor)
+            return [plan.read(element) for element in getattr(msg, name)]
+
+        return write, read
+
+    if repeated:
+        if base is np.ndarray:
+            if fd.type != FieldDescriptor.TYPE_FLOAT:
+                raise TypeError(f"Field '{name}': np.ndarray is only supported for repeated float.")
+
+            def write(msg, value):
+                write_packed_floats(msg, name, value)
+
+            def read(msg):
+                return read_packed_floats(msg, name) if len(getattr(msg, name)) else None
+
+            return write, read
+
+        if base is list and _is_vector_model(item):
+            # repeated float <-> List[Vector3-like]: flattened xyz triplets
+            def write(msg, value):
+                getattr(msg, name).extend([c for p in value for c in (p.x, p.y, p.z)])
+
+            def read(msg):
+                flat = getattr(msg, name)
+                return [{"x": flat[i], "y": flat[i + 1], "z": flat[i + 2]} for i in range(0, len(flat) - 2, 3)]
+
+            return write, read
+
+        def write(msg, value):
+            getattr(msg, name).extend(value)
+
+        def read(msg):
+            return list(getattr(msg, name))
+
+        return write, read
+
+    has_presence = is_message or oneof is not None or _is_synthetic_oneof(fd)
+
+    def present(msg) -> bool:
+        if oneof is not None:
+            return msg.WhichOneof(oneof) == name
+        return not has_presence or msg.HasField(name)
+
+    if is_message and fd.message_type.full_name == _TIMESTAMP_FULL_NAME:
+        if base is datetime:
+            def write(msg, value):
+                getattr(msg, name).FromDatetime(value.astimezone(timezone.utc) if value.tzinfo else value)
+
+            def read(msg):
+                return getattr(msg, name).ToDatetime(tzinfo=timezone.utc) if present(msg) else None
+        else:
+            # Epoch seconds as float (NetModels use float timestamps).
+            def write(msg, value):
+                seconds = math.floor(value)
+                nanos = min(int(round((value - seconds) * 1e9)), 999_999_999)
+                ts = getattr(msg, name)
+                ts.seconds = seconds
+                ts.nanos = nanos
+
+            def read(msg):
+                if not present(msg):
+                    return None
+                ts = getattr(msg, name)
+                return ts.seconds + ts.nanos / 1e9
+
+        return write, read
+
+    if is_message:
+        if not _is_model(base):
+            raise TypeError(f"Field '{name}': message field needs a BaseModel annotation, got {annotation!r}.")
+        message_descriptor = fd.message_type
+
+        def write(msg, value):
+            sub = getattr(msg, name)
+            sub.SetInParent()
+            get_plan(base, message_descriptor).fill(value, sub)
+
+        def read(msg):
+            return get_plan(base, message_descriptor).read(getattr(msg, name)) if present(msg) else None
+
+        return write, read
+
+    if fd.type == FieldDescriptor.TYPE_STRING and (base is dict or base is list):
+        # dict/list on the model side <-> JSON string in the message (e.g. *_json fields)
+        def write(msg, value):
+            setattr(msg, name, json.dumps(value, separators=(",", ":"), default=str))
+
+        def read(msg):
+            if not present(msg):
+                return None
+            raw = getattr(msg, name)
+            return json.loads(raw) if raw else None
+
+        return write, read
+
+    if fd.type == FieldDescriptor.TYPE_STRING and base is not str and base is not Any:
+        # e.g. UUID ids on the model side
+        def write(msg, value):
+            setattr(msg, name, str(value))
+    else:
+        def write(msg, value):
+            setattr(msg, name, value)
+
+    def read(msg):
+        return getattr(msg, name) if present(msg) else None
+
+    return write, read
+
+
+def _is_synthetic_oneof(fd: FieldDescriptor) -> bool:
+    """proto3 `optional` fields are implemented as single-member synthetic oneofs."""
+    oneof = fd.containing_oneof
+    if oneof is None:
+        return False
+    synthetic = getattr(oneof, "is_synthetic", None)
+    if synthetic is not None:
+        return synthetic if not callable(synthetic) else synthetic()
+    return len(oneof.fields) == 1 and oneof.name == f"_{fd.name}"
+
+
+def fill_protobuf(pydantic_model: BaseModel, proto_message: Message) -> Message:
+    """Writes the model into an existing message (e.g. a oneof member of a packet) without copying."""
+    get_plan(type(pydantic_model), proto_message.DESCRIPTOR).fill(pydantic_model, proto_message)
+    return proto_message
+
+
 def to_protobuf(pydantic_model: PydanticModel, proto_message_class: Type[ProtoMessage]) -> ProtoMessage:
     """
     Converts a Pydantic model instance to a Protobuf message instance.
-    (Placeholder - actual implementation will involve field mapping and type conversion)
     """
-    # print(f"DEBUG: [to_protobuf] Called for Pydantic model: {type(pydantic_model)}, Target Proto: {proto_message_class}")
-    # In a real implementation, you'd iterate through fields, handle type conversions,
-    # nested messages, repeated fields, etc.
-    # For now, just return an empty instance of the target proto message class.
-    # This is a very basic placeholder.
+    message = proto_message_class()
     if pydantic_model is None:
-        return proto_message_class()
-        
-    # Example of how one might start to implement this:
-    # proto_instance = proto_message_class()
-    # for field_name, field_value in pydantic_model.model_dump().items(): # pydantic v2
-    # # for field_name, field_value in pydantic_model.dict().items(): # pydantic v1
-    #     if hasattr(proto_instance, field_name):
-    #         # This is a naive assignment and doesn't handle type mismatches or complex types
-    #         try:
-    #             setattr(proto_instance, field_name, field_value)
-    #         except TypeError as e:
-    #             print(f"Warning: [to_protobuf] Type error setting field {field_name} on {proto_message_class.__name__}: {e}. Value: {field_value}")
-    #         except Exception as e:
-    #             print(f"Warning: [to_protobuf] Error setting field {field_name} on {proto_message_class.__name__}: {e}. Value: {field_value}")
-
-    # return proto_instance
-    print(f"Placeholder: [to_protobuf] Converting {type(pydantic_model).__name__} to {proto_message_class.__name__}. Returning empty instance.")
-    return proto_message_class()
-
-
-def from_protobuf(proto_message: ProtoMessage, pydantic_model_class: Type[PydanticModel]) -> PydanticModel:
+        return message
+    get_plan(type(pydantic_model), proto_message_class.DESCRIPTOR).fill(pydantic_model, message)
+    return message
+
+
+def from_protobuf(proto_message: ProtoMessage, pydantic_model_class: Type[PydanticModel],
+                  overrides: Optional[Dict[str, Any]] = None) -> PydanticModel:
     """
-    Converts a Protobuf message instance to a Pydantic model instance.
-    (Placeholder - actual implementation will involve field mapping and type conversion)
+    Converts a Protobuf message instance to a Pydantic model instance (validated).
+    `overrides` supplies ready values for some model fields, which are then not read from the message.
     """
-    # print(f"DEBUG: [from_protobuf] Called for Proto message: {type(proto_message)}, Target Pydantic: {pydantic_model_class}")
-    # In a real implementation, you'd iterate through fields, handle type conversions,
-    # nested messages, repeated fields, etc.
-    # For now, just return an empty instance of the target Pydantic model class.
-    # This is a very basic placeholder.
     if proto_message is None:
         return pydantic_model_class()
+    data = get_plan(pydantic_model_class, proto_message.DESCRIPTOR).read(proto_message, overrides)
+    return pydantic_model_class.model_validate(data)
+
+
+def to_protobuf_many(pydantic_models: Iterable[PydanticModel], proto_message_class: Type[ProtoMessage]) -> List[ProtoMessage]:
+    """Bulk variant of to_protobuf; the plan is looked up once per model class."""
+    messages = []
+    plan = None
+    for model in pydantic_models:
+        if plan is None or plan.model_cls is not type(model):
+            plan = get_plan(type(model), proto_message_class.DESCRIPTOR)
+        message = proto_message_class()
+        plan.fill(model, message)
+        messages.append(message)
+    return messages
+
+
+def from_protobuf_many(proto_messages: Iterable[ProtoMessage], pydantic_model_class: Type[PydanticModel]) -> List[PydanticModel]:
+    """Bulk variant of from_protobuf."""
+    messages = list(proto_messages)
+    if not messages:
+        return []
+    plan = get_plan(pydantic_model_class, messages[0].DESCRIPTOR)
+    validate = pydantic_model_class.model_validate
+    return [validate(plan.read(message)) for message in messages]
 
-    # Example of how one might start to implement this:
-    # pydantic_data = {}
-    # for field_descriptor in proto_message.DESCRIPTOR.fields:
-    #     field_name = field_descriptor.name
-    #     field_value = getattr(proto_message, field_name)
-        
-    #     # This is a naive assignment and doesn't handle type mismatches or complex types
-    #     pydantic_data[field_name] = field_value
-        
-    # try:
-    #     return pydantic_model_class(**pydantic_data)
-    # except Exception as e:
-    #     print(f"Warning: [from_protobuf] Error creating Pydantic model {pydantic_model_class.__name__} from proto data: {e}. Data: {pydantic_data}")
-    #     return pydantic_model_class() # Return empty on failure
-    print(f"Placeholder: [from_protobuf] Converting {type(proto_message).__name__} to {pydantic_model_class.__name__}. Returning empty instance.")
-    return pydantic_model_class()
 
 def datetime_to_protobuf_timestamp(dt: datetime) -> Timestamp:
     """Converts a Python datetime object to a Google Protobuf Timestamp."""
@@ -80,4 +346,4 @@ def datetime_to_protobuf_timestamp(dt: datetime) -> Timestamp:
 
 def protobuf_timestamp_to_datetime(ts: Timestamp) -> datetime:
     """Converts a Google Protobuf Timestamp to a Python datetime object (timezone-aware UTC)."""
-    pass
\ No newline at end of file
+    return ts.ToDatetime(tzinfo=timezone.utc)
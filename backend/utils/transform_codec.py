@@ -0,0 +1,148 @@
+# backend/utils/transform_codec.py
+"""
+Compact transform encoding for NetHoloGlyph (`PackedTransforms`, feature "quantized_transforms_v1").
+
+Transforms of a whole batch of elements are encoded at once with NumPy into a few contiguous
+little-endian arrays instead of nested float32 `Vector3`/`Quaternion` messages:
+
+- position: int16 fixed point relative to a scene origin (`position_step` units per step,
+  error <= step / 2, range +-32767 steps);
+- orientation: smallest-three quaternion in a uint32 (2-bit index of the dropped largest
+  component + three 10-bit components in [-1/sqrt(2), 1/sqrt(2)]);
+- scale: float16, one value when the scale is uniform, three otherwise.
+
+Missing values are NaN rows on the array side and cleared flags on the wire.
+"""
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+FEATURE_QUANTIZED_TRANSFORMS = "quantized_transforms_v1"
+
+FLAG_POSITION = 1
+FLAG_ORIENTATION = 2
+FLAG_SCALE = 4
+FLAG_UNIFORM_SCALE = 8
+
+_INT16_LIMIT = 32767
+_QUAT_COMPONENT_BITS = 10
+_QUAT_COMPONENT_MAX = (1 << _QUAT_COMPONENT_BITS) - 1
+_QUAT_COMPONENT_RANGE = 1.0 / np.sqrt(2.0)  # |non-largest component| <= 1/sqrt(2)
+
+
+def encode_quaternions(quaternions) -> np.ndarray:
+    """(N, 4) x, y, z, w -> (N,) uint32 smallest-three encoding. Inputs need not be normalized."""
+    q = np.asarray(quaternions, dtype=np.float64).reshape(-1, 4)
+    norms = np.linalg.norm(q, axis=1, keepdims=True)
+    q = q / np.where(norms > 0.0, norms, 1.0)
+    largest = np.argmax(np.abs(q), axis=1)
+    rows = np.arange(len(q))
+    # q and -q are the same rotation: make the dropped component positive so it can be rebuilt.
+    q *= np.where(q[rows, largest] < 0.0, -1.0, 1.0)[:, None]
+    keep = np.ones_like(q, dtype=bool)
+    keep[rows, largest] = False
+    rest = q[keep].reshape(-1, 3)
+    scaled = (rest + _QUAT_COMPONENT_RANGE) / (2.0 * _QUAT_COMPONENT_RANGE) * _QUAT_COMPONENT_MAX
+    quantized = np.clip(np.rint(scaled), 0, _QUAT_COMPONENT_MAX).astype(np.uint32)
+    return (
+        (largest.astype(np.uint32) << 30)
+        | (quantized[:, 0] << 20)
+        | (quantized[:, 1] << 10)
+        | quantized[:, 2]
+    )
+
+
+def decode_quaternions(packed) -> np.ndarray:
+    """(N,) uint32 smallest-three -> (N, 4) float32 unit quaternions (x, y, z, w)."""
+    packed = np.asarray(packed, dtype=np.uint32)
+    largest = (packed >> 30).astype(np.intp)
+    quantized = np.stack([(packed >> 20) & _QUAT_COMPONENT_MAX, (packed >> 10) & _QUAT_COMPONENT_MAX, packed & _QUAT_COMPONENT_MAX], axis=1)
+    rest = quantized.astype(np.float64) / _QUAT_COMPONENT_MAX * (2.0 * _QUAT_COMPONENT_RANGE) - _QUAT_COMPONENT_RANGE
+    out = np.empty((len(packed), 4), dtype=np.float64)
+    rows = np.arange(len(packed))
+    keep = np.ones_like(out, dtype=bool)
+    keep[rows, largest] = False
+    out[keep] = rest.ravel()
+    out[rows, largest] = np.sqrt(np.maximum(0.0, 1.0 - np.sum(rest * rest, axis=1)))
+    return out.astype(np.float32)
+
+
+class TransformCodec:
+    """
+    Args:
+        origin: Scene point positions are encoded relative to.
+        position_step: Scene units per int16 step (1e-3 -> millimetres, +-32.767 around the origin).
+        uniform_scale_tolerance: Max difference between scale axes still sent as one value.
+    """
+
+    def __init__(self, origin: Sequence[float] = (0.0, 0.0, 0.0), position_step: float = 1e-3,
+                 uniform_scale_tolerance: float = 1e-4):
+        if position_step <= 0.0:
+            raise ValueError("position_step must be positive.")
+        self.origin = np.asarray(origin, dtype=np.float64).reshape(3)
+        self.position_step = float(position_step)
+        self.uniform_scale_tolerance = uniform_scale_tolerance
+
+    def positions_in_range(self, positions) -> np.ndarray:
+        """Rows that fit the int16 grid (NaN rows count as in range: they are not encoded)."""
+        offsets = np.abs(np.asarray(positions, dtype=np.float64).reshape(-1, 3) - self.origin) / self.position_step
+        return ~np.any(offsets > _INT16_LIMIT, axis=1)
+
+    def encode_positions(self, positions) -> np.ndarray:
+        steps = np.rint((np.asarray(positions, dtype=np.float64).reshape(-1, 3) - self.origin) / self.position_step)
+        if np.any(np.abs(steps) > _INT16_LIMIT):
+            raise ValueError(f"Positions exceed +-{_INT16_LIMIT * self.position_step} around the origin.")
+        return steps.astype("<i2")
+
+    def decode_positions(self, encoded) -> np.ndarray:
+        return (np.asarray(encoded, dtype=np.float64).reshape(-1, 3) * self.position_step + self.origin).astype(np.float32)
+
+    def pack(self, message, symbol_ids: Sequence[str], positions, orientations, scales) -> None:
+        """
+        Fills a `PackedTransforms` message. `positions`/`scales` are (N, 3) and `orientations`
+        (N, 4) float arrays with NaN rows where an element has no such value.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        orientations = np.asarray(orientations, dtype=np.float64).reshape(-1, 4)
+        scales = np.asarray(scales, dtype=np.float64).reshape(-1, 3)
+
+        has_position = ~np.isnan(positions).any(axis=1)
+        has_orientation = ~np.isnan(orientations).any(axis=1)
+        has_scale = ~np.isnan(scales).any(axis=1)
+        uniform = has_scale & (np.ptp(np.nan_to_num(scales), axis=1) <= self.uniform_scale_tolerance)
+
+        flags = (
+            has_position * FLAG_POSITION
+            | has_orientation * FLAG_ORIENTATION
+            | has_scale * FLAG_SCALE
+            | uniform * FLAG_UNIFORM_SCALE
+        ).astype(np.uint8)
+
+        message.symbol_ids.extend(symbol_ids)
+        message.flags = flags.tobytes()
+        message.origin.x, message.origin.y, message.origin.z = (float(v) for v in self.origin)
+        message.position_step = self.position_step
+        message.positions = self.encode_positions(positions[has_position]).tobytes()
+        message.orientations = encode_quaternions(orientations[has_orientation]).astype("<u4").tobytes()
+        message.uniform_scales = scales[uniform, 0].astype("<f2").tobytes()
+        message.scales = scales[has_scale & ~uniform].astype("<f2").tobytes()
+
+    @staticmethod
+    def unpack(message) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """`PackedTransforms` -> (symbol_ids, positions (N,3), orientations (N,4), scales (N,3)), NaN where absent."""
+        flags = np.frombuffer(message.flags, dtype=np.uint8)
+        count = len(flags)
+        positions = np.full((count, 3), np.nan, dtype=np.float32)
+        orientations = np.full((count, 4), np.nan, dtype=np.float32)
+        scales = np.full((count, 3), np.nan, dtype=np.float32)
+
+        codec = TransformCodec((message.origin.x, message.origin.y, message.origin.z), message.position_step or 1e-3)
+        has_position = (flags & FLAG_POSITION).astype(bool)
+        positions[has_position] = codec.decode_positions(np.frombuffer(message.positions, dtype="<i2"))
+        has_orientation = (flags & FLAG_ORIENTATION).astype(bool)
+        orientations[has_orientation] = decode_quaternions(np.frombuffer(message.orientations, dtype="<u4"))
+        has_scale = (flags & FLAG_SCALE).astype(bool)
+        uniform = has_scale & (flags & FLAG_UNIFORM_SCALE).astype(bool)
+        scales[uniform] = np.frombuffer(message.uniform_scales, dtype="<f2").astype(np.float32)[:, None]
+        scales[has_scale & ~uniform] = np.frombuffer(message.scales, dtype="<f2").astype(np.float32).reshape(-1, 3)
+        return list(message.symbol_ids), positions, orientations, scales
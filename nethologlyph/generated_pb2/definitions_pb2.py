@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: definitions.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11\x64\x65\x66initions.proto\x12\x0cnethologlyph\x1a\x1fgoogle/protobuf/timestamp.proto\"*\n\x07Vector3\x12\t\n\x01x\x18\x01 \x01(\x02\x12\t\n\x01y\x18\x02 \x01(\x02\x12\t\n\x01z\x18\x03 \x01(\x02\"8\n\nQuaternion\x12\t\n\x01x\x18\x01 \x01(\x02\x12\t\n\x01y\x18\x02 \x01(\x02\x12\t\n\x01z\x18\x03 \x01(\x02\x12\t\n\x01w\x18\x04 \x01(\x02\"\x8b\x03\n\x11HolographicSymbol\x12\x11\n\tsymbol_id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\'\n\x08position\x18\x03 \x01(\x0b\x32\x15.nethologlyph.Vector3\x12-\n\x0borientation\x18\x04 \x01(\x0b\x32\x18.nethologlyph.Quaternion\x12$\n\x05scale\x18\x05 \x01(\x0b\x32\x15.nethologlyph.Vector3\x12 \n\x18material_properties_json\x18\x06 \x01(\t\x12\x13\n\x0b\x63ustom_data\x18\x07 \x01(\x0c\x12\x30\n\x0clast_updated\x18\x08 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x1a\n\rcode_language\x18\t \x01(\tH\x00\x88\x01\x01\x12$\n\x17\x65mbedding_model_version\x18\n \x01(\tH\x01\x88\x01\x01\x42\x10\n\x0e_code_languageB\x1a\n\x18_embedding_model_version\"\xa2\x03\n\x0cGestureChunk\x12\x12\n\ngesture_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12-\n\ttimestamp\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x1f\n\x17recognized_gesture_type\x18\x04 \x01(\t\x12\x12\n\nconfidence\x18\x05 \x01(\x02\x12\x18\n\x10landmark_data_3d\x18\x06 \x03(\x02\x12\x17\n\x0fsource_modality\x18\x07 \x01(\t\x12 \n\x13gesture_sequence_id\x18\x08 \x01(\tH\x00\x88\x01\x01\x12*\n\x1dis_continuous_gesture_segment\x18\t \x01(\x08H\x01\x88\x01\x01\x12+\n\x1etemporal_spatial_metadata_json\x18\n \x01(\tH\x02\x88\x01\x01\x42\x16\n\x14_gesture_sequence_idB \n\x1e_is_continuous_gesture_segmentB!\n\x1f_temporal_spatial_metadata_json\"e\n\x15GestureIntentResponse\x12\x16\n\x0e\x63orrelation_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x13\n\x0bresult_json\x18\x04 \x01(\t\"\x8d\x01\n\x0fTriaStateUpdate\x12\x11\n\tstate_key\x18\x01 \x01(\t\x12\x18\n\x10state_value_json\x18\x02 \x01(\t\x12-\n\ttimestamp\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x13\n\x06\x62ot_id\x18\x04 \x01(\tH\x00\x88\x01\x01\x42\t\n\x07_bot_id\"\xe6\x01\n\x0bThreeDEmoji\x12\x10\n\x08\x65moji_id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\'\n\x08position\x18\x03 \x01(\x0b\x32\x15.nethologlyph.Vector3\x12-\n\x0borientation\x18\x04 \x01(\x0b\x32\x18.nethologlyph.Quaternion\x12\x1c\n\x0f\x61nimation_speed\x18\x05 \x01(\x02H\x00\x88\x01\x01\x12-\n\ttimestamp\x18\x06 \x01(\x0b\x32\x1a.google.protobuf.TimestampB\x12\n\x10_animation_speed\"\x8f\x01\n\x17\x41udioVisualizationState\x12\x11\n\tstream_id\x18\x01 \x01(\t\x12\x17\n\x0f\x66requency_bands\x18\x02 \x03(\x02\x12\x19\n\x11overall_intensity\x18\x03 \x01(\x02\x12-\n\ttimestamp\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"\x86\x02\n\x0c\x45lementDelta\x12\x11\n\tsymbol_id\x18\x01 \x01(\t\x12\x14\n\x0c\x63hanged_mask\x18\x02 \x01(\r\x12\'\n\x08position\x18\x03 \x01(\x0b\x32\x15.nethologlyph.Vector3\x12-\n\x0borientation\x18\x04 \x01(\x0b\x32\x18.nethologlyph.Quaternion\x12$\n\x05scale\x18\x05 \x01(\x0b\x32\x15.nethologlyph.Vector3\x12\x12\n\ncolor_rgba\x18\x06 \x03(\x02\x12\x0c\n\x04type\x18\x07 \x01(\t\x12\x17\n\x0fproperties_json\x18\x08 \x01(\t\x12\x14\n\x0c\x63leared_mask\x18\t \x01(\r\"\xc4\x01\n\x10PackedTransforms\x12\x12\n\nsymbol_ids\x18\x01 \x03(\t\x12\r\n\x05\x66lags\x18\x02 \x01(\x0c\x12%\n\x06origin\x18\x03 \x01(\x0b\x32\x15.nethologlyph.Vector3\x12\x15\n\rposition_step\x18\x04 \x01(\x02\x12\x11\n\tpositions\x18\x05 \x01(\x0c\x12\x14\n\x0corientations\x18\x06 \x01(\x0c\x12\x16\n\x0euniform_scales\x18\x07 \x01(\x0c\x12\x0e\n\x06scales\x18\x08 \x01(\x0c\"\xc3\x02\n\nSceneDelta\x12\x10\n\x08scene_id\x18\x01 \x01(\t\x12\x14\n\x0c\x62\x61se_version\x18\x02 \x01(\x04\x12\x0f\n\x07version\x18\x03 \x01(\x04\x12\x13\n\x0bis_keyframe\x18\x04 \x01(\x08\x12\x30\n\x07upserts\x18\x05 \x03(\x0b\x32\x1f.nethologlyph.HolographicSymbol\x12+\n\x07\x63hanges\x18\x06 \x03(\x0b\x32\x1a.nethologlyph.ElementDelta\x12\x13\n\x0bremoved_ids\x18\x07 \x03(\t\x12 \n\x13scene_settings_json\x18\x08 \x01(\tH\x00\x88\x01\x01\x12\x39\n\x11packed_transforms\x18\t \x01(\x0b\x32\x1e.nethologlyph.PackedTransformsB\x16\n\x14_scene_settings_json\"B\n\x12SceneResyncRequest\x12\x10\n\x08scene_id\x18\x01 \x01(\t\x12\x1a\n\x12last_known_version\x18\x02 \x01(\x04\"\xec\x03\n\rNetHoloPacket\x12\x11\n\tpacket_id\x18\x01 \x01(\t\x12-\n\ttimestamp\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x11\n\tsource_id\x18\x03 \x01(\t\x12\x36\n\x0bholo_symbol\x18\x04 \x01(\x0b\x32\x1f.nethologlyph.HolographicSymbolH\x00\x12\x33\n\rgesture_chunk\x18\x05 \x01(\x0b\x32\x1a.nethologlyph.GestureChunkH\x00\x12\x33\n\ntria_state\x18\x06 \x01(\x0b\x32\x1d.nethologlyph.TriaStateUpdateH\x00\x12*\n\x05\x65moji\x18\x07 \x01(\x0b\x32\x19.nethologlyph.ThreeDEmojiH\x00\x12:\n\taudio_viz\x18\x08 \x01(\x0b\x32%.nethologlyph.AudioVisualizationStateH\x00\x12/\n\x0bscene_delta\x18\t \x01(\x0b\x32\x18.nethologlyph.SceneDeltaH\x00\x12@\n\x14scene_resync_request\x18\n \x01(\x0b\x32 .nethologlyph.SceneResyncRequestH\x00\x42\t\n\x07payloadb\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'definitions_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _VECTOR3._serialized_start=68
+  _VECTOR3._serialized_end=110
+  _QUATERNION._serialized_start=112
+  _QUATERNION._serialized_end=168
+  _HOLOGRAPHICSYMBOL._serialized_start=171
+  _HOLOGRAPHICSYMBOL._serialized_end=566
+  _GESTURECHUNK._serialized_start=569
+  _GESTURECHUNK._serialized_end=987
+  _GESTUREINTENTRESPONSE._serialized_start=989
+  _GESTUREINTENTRESPONSE._serialized_end=1090
+  _TRIASTATEUPDATE._serialized_start=1093
+  _TRIASTATEUPDATE._serialized_end=1234
+  _THREEDEMOJI._serialized_start=1237
+  _THREEDEMOJI._serialized_end=1467
+  _AUDIOVISUALIZATIONSTATE._serialized_start=1470
+  _AUDIOVISUALIZATIONSTATE._serialized_end=1613
+  _ELEMENTDELTA._serialized_start=1616
+  _ELEMENTDELTA._serialized_end=1878
+  _PACKEDTRANSFORMS._serialized_start=1881
+  _PACKEDTRANSFORMS._serialized_end=2077
+  _SCENEDELTA._serialized_start=2080
+  _SCENEDELTA._serialized_end=2403
+  _SCENERESYNCREQUEST._serialized_start=2405
+  _SCENERESYNCREQUEST._serialized_end=2471
+  _NETHOLOPACKET._serialized_start=2474
+  _NETHOLOPACKET._serialized_end=2966
+# @@protoc_insertion_point(module_scope)
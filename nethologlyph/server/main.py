@@ -9,36 +9,78 @@
 # TODO: Broadcast outgoing messages (serialize, send to connected clients).
 # TODO: Add authentication and authorization for clients.
 
+from typing import Dict, Optional
+
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 # from ..protocol import serialization  # Assuming serialization.py is accessible
 # from ..protocol import definitions_pb2 # If using protobuf and generated stubs
+from backend.services.client_send_queue import ClientSendQueue
+from backend.services.glyph_rooms import RoomRegistry, scene_topic
 
 app = FastAPI(title="NetHoloGlyph Server")
 
+class _TextSocket:
+    """Lets a ClientSendQueue (which writes bytes) drive this text-based placeholder protocol."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+
+    async def send_bytes(self, data: bytes):
+        await self.websocket.send_text(data.decode("utf-8"))
+
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: list[WebSocket] = []
+        self.active_connections: Dict[str, WebSocket] = {}  # client_id -> websocket
+        self.send_queues: Dict[str, ClientSendQueue] = {}  # client_id -> outgoing queue
+        self.rooms = RoomRegistry()
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, client_id: str, websocket: WebSocket, scene_id: Optional[str] = None):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections[client_id] = websocket
+        send_queue = ClientSendQueue(client_id, _TextSocket(websocket), on_dead=self._evict)
+        send_queue.start()
+        self.send_queues[client_id] = send_queue
+        if scene_id:
+            self.rooms.subscribe(client_id, scene_topic(scene_id))
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+    async def disconnect(self, client_id: str):
+        self.active_connections.pop(client_id, None)
+        self.rooms.remove_client(client_id)
+        send_queue = self.send_queues.pop(client_id, None)
+        if send_queue is not None:
+            await send_queue.close()
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+    def _evict(self, client_id: str):
+        # Slow or broken client: stop queueing for it; the receive loop ends on its own.
+        self.active_connections.pop(client_id, None)
+        self.send_queues.pop(client_id, None)
+        self.rooms.remove_client(client_id)
+
+    def _enqueue(self, client_id: str, message: str):
+        send_queue = self.send_queues.get(client_id)
+        if send_queue is not None:
+            send_queue.enqueue(message.encode("utf-8"))
+
+    async def send_personal_message(self, message: str, client_id: str):
+        # Through the client's queue: its flusher is the only writer on the socket
+        self._enqueue(client_id, message)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        for client_id in list(self.send_queues):
+            self._enqueue(client_id, message)
+
+    async def publish(self, topic: str, message: str, exclude_client_id: Optional[str] = None):
+        """Queues the message for the topic's subscribers only; a slow client never delays the others."""
+        for client_id in list(self.rooms.subscribers(topic)):
+            if client_id != exclude_client_id:
+                self._enqueue(client_id, message)
 
 manager = ConnectionManager()
 
 @app.websocket("/ws/hologlyph/{client_id}")
-async def websocket_endpoint(websocket: WebSocket, client_id: str):
-    await manager.connect(websocket)
-    print(f"Client {client_id} connected to NetHoloGlyph server.")
+async def websocket_endpoint(websocket: WebSocket, client_id: str, scene_id: Optional[str] = None):
+    await manager.connect(client_id, websocket, scene_id)
+    print(f"Client {client_id} connected to NetHoloGlyph server (scene: {scene_id}).")
     try:
         while True:
             data = await websocket.receive_text() # Or receive_bytes for binary protocols
@@ -47,20 +89,22 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
             print(f"Received from {client_id}: {data}")
             # TODO: Process message (e.g., route to Tria, update world state)
             response = f"Server received from {client_id}: {data}"
-            await manager.send_personal_message(response, websocket)
-            # TODO: Broadcast updates to other clients if necessary
-            # await manager.broadcast(f"Client {client_id} sent: {data}")
+            await manager.send_personal_message(response, client_id)
+            # Updates go to clients viewing the same scene only
+            if scene_id:
+                await manager.publish(scene_topic(scene_id), f"Client {client_id} sent: {data}", exclude_client_id=client_id)
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        await manager.disconnect(client_id)
         print(f"Client {client_id} disconnected.")
     except Exception as e:
+        await manager.disconnect(client_id)
         print(f"Error with client {client_id}: {e}")
         # Optionally send error to client before closing
         await websocket.close(code=1011) # Internal error
 
 @app.get("/nethologlyph/status")
 async def get_status():
-    return {"status": "NetHoloGlyph server is running (placeholder)", "active_connections": len(manager.active_connections)}
+    return {"status": "NetHoloGlyph server is running (placeholder)", "active_connections": len(manager.active_connections), "rooms": manager.rooms.stats()}
 
 # To run this (conceptual, if it were the main app):
 # import uvicorn
@@ -0,0 +1,71 @@
+"""
+Throughput of the NumPy CWT hologram encoder (backend/utils/cwt_hologram.py).
+
+Compares frames/second of a per-frequency port of the WASM encoder (one wavelet FFT and two
+IFFTs per band, as in backend/rust/fastcwt_processor) with the cached-bank engine, both one
+stereo chunk at a time and batched, and reports the streaming overlap-save encoder
+(backend/utils/cwt_stream.py) on a longer recording. Run from the repository root:
+
+    python -m tests.performance.bench_cwt_encoder
+"""
+import time
+
+import numpy as np
+
+from backend.utils.cwt_hologram import (
+    DEFAULT_TARGET_FREQUENCIES, OMEGA0, encode_audio_to_hologram, encode_frames, morlet_wavelet,
+)
+from backend.utils.cwt_stream import StreamingCwtEncoder
+
+
+def _per_band(left, right, sample_rate, frequencies):
+    n = len(left)
+    left_fft, right_fft = np.fft.fft(left), np.fft.fft(right)
+    coefficients = np.empty((2, len(frequencies)), dtype=np.complex64)
+    for i, freq in enumerate(frequencies):
+        wavelet_fft = np.fft.fft(morlet_wavelet(OMEGA0 * sample_rate / (2.0 * np.pi * freq), n))
+        coefficients[0, i] = np.fft.ifft(left_fft * wavelet_fft)[n // 2]
+        coefficients[1, i] = np.fft.ifft(right_fft * wavelet_fft)[n // 2]
+    return coefficients
+
+
+def _frames_per_second(fn, frame_count: int, repeats: int) -> float:
+    fn()  # warm-up (fills the wavelet bank cache)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return frame_count * repeats / (time.perf_counter() - start)
+
+
+def _stream(audio, sample_rate, chunk_size, hop, read_samples=4096) -> int:
+    encoder = StreamingCwtEncoder(sample_rate, chunk_size, hop)
+    frames = sum(len(encoder.feed(audio[:, start:start + read_samples]))
+                 for start in range(0, audio.shape[1], read_samples))
+    return frames + len(encoder.finish())
+
+
+def main(sample_rate: float = 48000.0, batch: int = 512, stream_seconds: float = 30.0) -> None:
+    rng = np.random.default_rng(0)
+    print(f"{len(DEFAULT_TARGET_FREQUENCIES)} bands, {sample_rate:.0f} Hz")
+    for chunk_size in (128, 1024, 4096):
+        frames = rng.normal(scale=0.01, size=(batch, 2, chunk_size)).astype(np.float32)
+        left, right = frames[0]
+        rows = [
+            ("per-band FFT/IFFT", lambda: _per_band(left, right, sample_rate, DEFAULT_TARGET_FREQUENCIES), 1, 5),
+            ("cached bank, 1 chunk", lambda: encode_audio_to_hologram(left, right, sample_rate), 1, 200),
+            (f"cached bank, {batch} chunks", lambda: encode_frames(frames, sample_rate), batch, 5),
+        ]
+        for label, fn, frame_count, repeats in rows:
+            print(f"N={chunk_size:5d}  {label:24s} {_frames_per_second(fn, frame_count, repeats):12.0f} frames/s")
+
+    audio = rng.normal(scale=0.01, size=(2, int(stream_seconds * sample_rate))).astype(np.float32)
+    for chunk_size, hop in ((1024, 256), (1024, 128), (4096, 512)):
+        start = time.perf_counter()
+        frames = _stream(audio, sample_rate, chunk_size, hop)
+        elapsed = time.perf_counter() - start
+        print(f"N={chunk_size:5d}  streaming, hop {hop:4d}     {frames / elapsed:12.0f} frames/s  "
+              f"({stream_seconds / elapsed:.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
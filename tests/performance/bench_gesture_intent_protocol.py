@@ -0,0 +1,63 @@
+"""
+JSON vs binary (GestureChunk) modes of /ws/v1/gesture-intent.
+
+For a landmark-carrying intent, reports bytes per message, CPU time per message and throughput
+of the server-side work for one round trip: decode the incoming intent, build the intent vector
+the way GestureBot does, encode the response. Run from the repository root:
+
+    python -m tests.performance.bench_gesture_intent_protocol
+"""
+import json
+import time
+
+import numpy as np
+
+from backend.utils.gesture_intent_codec import encode_intent_chunk, encode_response, parse_intent_chunk
+
+CONTEXT = {"scene_id": "scene-1", "target": "sym-42"}
+RESPONSE = {"status": "success", "message": "Intent applied", "correlation_id": "c-1", "new_embedding_id": 1234}
+
+
+def _json_round_trip(text: str) -> str:
+    data = json.loads(text)
+    landmarks = np.asarray(data["landmarks"], dtype=np.float32)  # what a consumer of the JSON form has to do
+    intent_vector = {"type": data["intent"], "intensity": data.get("intensity", 0.5),
+                     "target_context": data.get("context", {}), "hands": int(landmarks.shape[0])}
+    return json.dumps({**RESPONSE, "intent": intent_vector["type"]})
+
+
+def _binary_round_trip(data: bytes) -> bytes:
+    chunk, landmarks = parse_intent_chunk(data)
+    intent_vector = {"type": chunk.recognized_gesture_type, "intensity": chunk.confidence or 0.5,
+                     "target_context": json.loads(chunk.temporal_spatial_metadata_json), "hands": int(landmarks.shape[0])}
+    return encode_response({**RESPONSE, "intent": intent_vector["type"]})
+
+
+def _measure(fn, payload, iterations: int):
+    fn(payload)  # warm-up
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(iterations):
+        fn(payload)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return cpu / iterations * 1e6, iterations / wall
+
+
+def main(iterations: int = 20000, hands: int = 2) -> None:
+    landmarks = np.random.default_rng(0).random((hands, 21, 3), dtype=np.float32)
+    json_message = json.dumps({"intent": "grab", "context": CONTEXT, "correlation_id": "c-1",
+                               "intensity": 0.8, "landmarks": landmarks.tolist()})
+    binary_message = encode_intent_chunk("grab", CONTEXT, "c-1", 0.8, landmarks)
+
+    rows = [
+        ("json", len(json_message.encode()), len(_json_round_trip(json_message).encode()), _json_round_trip, json_message),
+        ("binary", len(binary_message), len(_binary_round_trip(binary_message)), _binary_round_trip, binary_message),
+    ]
+    print(f"intent with {hands} hand(s) x 21 landmarks, {iterations} iterations")
+    for label, request_bytes, response_bytes, fn, payload in rows:
+        cpu_us, per_second = _measure(fn, payload, iterations)
+        print(f"{label:8s} request {request_bytes:5d} B  response {response_bytes:4d} B  "
+              f"{cpu_us:7.2f} us CPU/msg  {per_second:10.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
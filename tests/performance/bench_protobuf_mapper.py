@@ -0,0 +1,72 @@
+"""
+Microbenchmark for backend/utils/protobuf_mapper.py.
+
+Reports the per-message cost of Pydantic -> Protobuf -> bytes and back for the NetHoloGlyph
+payloads. Run from the repository root:
+
+    python -m tests.performance.bench_protobuf_mapper
+"""
+import time
+
+from backend.core.models.nethologlyph_models import (
+    GestureChunkNetModel,
+    HolographicSymbolNetModel,
+    QuaternionNetModel,
+    Vector3NetModel,
+)
+from backend.utils.protobuf_mapper import from_protobuf, from_protobuf_many, to_protobuf, to_protobuf_many
+from nethologlyph.generated_pb2 import definitions_pb2 as pb
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    fn()  # warm-up (compiles the plan)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int = 20000) -> None:
+    symbol = HolographicSymbolNetModel(
+        element_id="sym-1", symbol_type="cube",
+        position=Vector3NetModel(x=1.0, y=2.0, z=3.0), rotation=QuaternionNetModel(),
+        scale=Vector3NetModel(x=1.0, y=1.0, z=1.0), color_rgba=[1.0, 0.5, 0.2, 1.0],
+    )
+    chunk = GestureChunkNetModel(
+        sequence_id="seq-1", timestamp=time.time(), hand="right", recognized_intent="pinch", confidence=0.9,
+        key_points=[Vector3NetModel(x=i * 0.01, y=i * 0.02, z=i * 0.03) for i in range(21)],
+    )
+    symbol_msg = to_protobuf(symbol, pb.HolographicSymbol)
+    chunk_msg = to_protobuf(chunk, pb.GestureChunk)
+    symbol_bytes = symbol_msg.SerializeToString()
+    chunk_bytes = chunk_msg.SerializeToString()
+
+    def decode_symbol():
+        message = pb.HolographicSymbol()
+        message.ParseFromString(symbol_bytes)
+        return from_protobuf(message, HolographicSymbolNetModel)
+
+    def decode_chunk():
+        message = pb.GestureChunk()
+        message.ParseFromString(chunk_bytes)
+        return from_protobuf(message, GestureChunkNetModel)
+
+    rows = [
+        ("HolographicSymbol to_protobuf", lambda: to_protobuf(symbol, pb.HolographicSymbol)),
+        ("HolographicSymbol parse+from_protobuf", decode_symbol),
+        ("GestureChunk(21 pts) to_protobuf", lambda: to_protobuf(chunk, pb.GestureChunk)),
+        ("GestureChunk(21 pts) parse+from_protobuf", decode_chunk),
+    ]
+    for label, fn in rows:
+        print(f"{label:45s} {_per_call_us(fn, iterations):8.2f} us/msg")
+
+    batch = [symbol] * 100
+    messages = to_protobuf_many(batch, pb.HolographicSymbol)
+    bulk_to = _per_call_us(lambda: to_protobuf_many(batch, pb.HolographicSymbol), iterations // 100) / len(batch)
+    bulk_from = _per_call_us(lambda: from_protobuf_many(messages, HolographicSymbolNetModel), iterations // 100) / len(batch)
+    print(f"{'HolographicSymbol to_protobuf_many (x100)':45s} {bulk_to:8.2f} us/msg")
+    print(f"{'HolographicSymbol from_protobuf_many (x100)':45s} {bulk_from:8.2f} us/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Event-loop latency while /upload_chunk sends a large file to R2/S3.
+
+The old handler read the whole UploadFile and called the blocking `put_object` on the event
+loop; the streaming uploader (backend/services/streaming_upload.py) reads fixed-size parts and
+sends them from threads. A probe task sleeps 5 ms in a loop and records how late it wakes up,
+standing in for every other request served by the same worker. The fake S3 client blocks for
+the time a 200 MB/s link would need and hashes the body, as the real client signs it. Run from
+the repository root:
+
+    python -m tests.performance.bench_streaming_upload
+"""
+import asyncio
+import hashlib
+import statistics
+import time
+import tempfile
+import tracemalloc
+
+from starlette.datastructures import UploadFile
+
+from backend.services.streaming_upload import StreamingUploader
+
+MB = 1024 * 1024
+LINK_BYTES_PER_SECOND = 200 * MB
+PROBE_INTERVAL = 0.005
+
+
+def _upload_file(size: int) -> UploadFile:
+    # Like a multipart form field: spooled to a temporary file once past 1 MB, so
+    # UploadFile.read() runs in Starlette's thread pool, as in the real request.
+    spooled = tempfile.SpooledTemporaryFile(max_size=1 * MB)
+    block = bytes(MB)
+    for _ in range(size // MB):
+        spooled.write(block)
+    spooled.seek(0)
+    return UploadFile(spooled, size=size, filename="chunk.wav")
+
+
+class _SlowS3:
+    def _send(self, body: bytes) -> None:
+        hashlib.sha256(body).digest()
+        time.sleep(len(body) / LINK_BYTES_PER_SECOND)
+
+    def put_object(self, Body, **kwargs):
+        self._send(Body)
+        return {"ETag": '"x"'}
+
+    def create_multipart_upload(self, **kwargs):
+        return {"UploadId": "u"}
+
+    def upload_part(self, Body, PartNumber, **kwargs):
+        self._send(Body)
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, **kwargs):
+        return {"ETag": '"x"'}
+
+    def abort_multipart_upload(self, **kwargs):
+        pass
+
+
+async def _whole_file(s3, source):
+    data = await source.read()
+    s3.put_object(Bucket="b", Key="k", Body=data)
+
+
+async def _streaming(s3, source, uploader):
+    await uploader.upload(s3, source, "b", "k")
+
+
+async def _measure(upload, trace_memory: bool = True) -> dict:
+    lags = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+    probe_task = asyncio.ensure_future(probe())
+    await asyncio.sleep(0.05)
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    await upload()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+    tracemalloc.stop()
+    done.set()
+    await probe_task
+    lags.sort()
+    return {"seconds": elapsed, "lag_p50": statistics.median(lags), "lag_p99": lags[int(0.99 * (len(lags) - 1))],
+            "lag_max": lags[-1], "peak_mb": peak / MB}
+
+
+def main() -> None:
+    uploader = StreamingUploader(part_size=8 * MB, max_concurrency=4)
+    for size_mb in (64, 256):
+        print(f"{size_mb} MB upload (simulated link {LINK_BYTES_PER_SECOND // MB} MB/s):")
+        rows = [
+            ("whole file + put_object on the loop", _whole_file),
+            ("streaming, 8 MB parts x 4", lambda s3, source: _streaming(s3, source, uploader)),
+        ]
+        for label, upload in rows:
+            source = _upload_file(size_mb * MB)
+            result = asyncio.run(_measure(lambda: upload(_SlowS3(), source)))
+            source.file.close()
+            print(f"  {label:38s} {result['seconds']:6.2f} s   loop lag p50 {result['lag_p50']:6.2f} ms"
+                  f"  p99 {result['lag_p99']:6.2f} ms  max {result['lag_max']:7.2f} ms   peak alloc {result['peak_mb']:6.1f} MB")
+    uploader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import asyncio
+import io
+import os
+import wave
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from backend.services.audio_analysis_pool import STATUS_EXTRACTED, STATUS_FAILED, AudioAnalysisPool, load_shared_pcm
+from backend.services.learning_log_sink import WriteBehindSink
+from backend.core.models.multimodal_models import AudioChunkFeaturesUpdate
+from backend.utils.audio_features import compute_audio_features
+
+
+def _wav_bytes(seconds=0.5, sample_rate=16000, frequency=1000.0, amplitude=0.5):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    tone = amplitude * np.sin(2 * np.pi * frequency * t)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(2)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes((np.stack([tone, 0.5 * tone]).T * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def _shared_blocks():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def test_features_describe_a_tone():
+    t = np.arange(48000) / 48000
+    tone = (0.5 * np.sin(2 * np.pi * 1000 * t)).astype(np.float32)
+    features = compute_audio_features(np.stack([tone, tone]), 48000)
+    assert features["duration_seconds"] == 1.0
+    assert features["loudness"]["peak_dbfs"] == pytest.approx(-6.02, abs=0.05)
+    assert features["loudness"]["rms_dbfs"] == pytest.approx(-9.03, abs=0.05)
+    assert features["loudness"]["silence_ratio"] == 0.0
+    assert features["spectrum"]["centroid_hz"] == pytest.approx(1000, abs=25)
+    assert max(features["spectrum"]["octave_band_db"], key=features["spectrum"]["octave_band_db"].get) == "1000"
+    assert len(features["cwt"]["band_mean_db"]) == len(features["cwt"]["band_mean_pan"]) == 130
+
+
+def test_load_shared_pcm_truncates_and_matches_the_decoded_stream():
+    data = _wav_bytes(seconds=1.0)
+    block, shape, sample_rate, truncated = load_shared_pcm(io.BytesIO(data), "audio/wav", max_seconds=0.25)
+    try:
+        assert (shape, sample_rate, truncated) == ((2, 4000), 16000, True)
+        pcm = np.ndarray(shape, dtype=np.float32, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+    raw = np.frombuffer(data[44:44 + 4000 * 4], dtype="<i2").reshape(-1, 2).T / 32768.0
+    np.testing.assert_allclose(pcm, raw, atol=1e-6)
+
+
+def test_pool_analyses_in_worker_processes_and_writes_results_in_batches():
+    batches = []
+
+    async def write_batch(updates):
+        batches.append(list(updates))
+
+    good, bad = uuid4(), uuid4()
+    data = _wav_bytes()
+    before = _shared_blocks()
+
+    async def scenario():
+        sink = WriteBehindSink(write_batch, AudioChunkFeaturesUpdate, max_batch_size=10, flush_interval=60.0)
+        pool = AudioAnalysisPool(sink, max_workers=1, max_pending=2)
+        assert pool.submit(good, io.BytesIO(data), "audio/wav", len(data))
+        assert pool.submit(bad, io.BytesIO(b"RIFF not really a wav"), "audio/wav")
+        assert not pool.submit(uuid4(), io.BytesIO(data), "audio/wav")  # the queue holds two chunks
+        await pool.close(timeout=60)
+        return pool.stats()
+
+    stats = asyncio.run(scenario())
+    assert len(batches) == 1  # both results went out together when the sink was flushed
+    updates = {update.chunk_id: update for update in batches[0]}
+    assert updates[good].tria_processing_status == STATUS_EXTRACTED
+    assert updates[good].duration_seconds == pytest.approx(0.5)
+    assert updates[good].tria_extracted_features_json == {**compute_audio_features(
+        np.frombuffer(data[44:], dtype="<i2").reshape(-1, 2).T.astype(np.float32) / 32768.0, 16000), "truncated": False}
+    assert updates[bad].tria_processing_status == STATUS_FAILED
+    assert (stats["completed"], stats["failed"], stats["rejected"]) == (1, 1, 1)
+    assert _shared_blocks() <= before  # every shared memory block was unlinked
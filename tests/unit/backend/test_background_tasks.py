@@ -0,0 +1,68 @@
+import asyncio
+
+from backend.services.background_tasks import PRIORITY_HIGH, PRIORITY_LOW, BackgroundTaskRunner
+
+
+def test_priority_order_and_concurrency_limit():
+    async def scenario():
+        runner = BackgroundTaskRunner(max_concurrency=1)
+        order = []
+        gate = asyncio.Event()
+
+        async def job(label):
+            await gate.wait()
+            order.append(label)
+
+        runner.submit(job, "first")
+        await asyncio.sleep(0)  # the single worker picks "first" and blocks on the gate
+        runner.submit(job, "low", priority=PRIORITY_LOW)
+        runner.submit(job, "normal")
+        runner.submit(job, "high", priority=PRIORITY_HIGH)
+        running_before = runner.stats()["running"]
+        gate.set()
+        await runner.drain()
+        await runner.shutdown()
+        return order, running_before, runner.stats()
+
+    order, running_before, stats = asyncio.run(scenario())
+    assert order == ["first", "high", "normal", "low"]
+    assert running_before == 1
+    assert stats["completed"] == 4 and stats["backlog"] == 0
+
+
+def test_timeouts_failures_and_backlog_limit():
+    async def scenario():
+        runner = BackgroundTaskRunner(max_concurrency=1, max_backlog=2, default_timeout=0.01)
+
+        async def hang():
+            await asyncio.sleep(1)
+
+        async def boom():
+            raise RuntimeError("boom")
+
+        accepted = [runner.submit(hang), runner.submit(boom), runner.submit(boom)]
+        await runner.shutdown(timeout=1.0)
+        return accepted, runner.stats()
+
+    accepted, stats = asyncio.run(scenario())
+    assert accepted == [True, True, False]
+    assert (stats["timed_out"], stats["failed"], stats["rejected"]) == (1, 1, 1)
+
+
+def test_shutdown_cancels_jobs_past_the_deadline():
+    async def scenario():
+        runner = BackgroundTaskRunner(max_concurrency=1, default_timeout=None)
+        finished = []
+
+        async def slow(label):
+            await asyncio.sleep(0.2)
+            finished.append(label)
+
+        runner.submit(slow, "a")
+        runner.submit(slow, "b")
+        await runner.shutdown(timeout=0.05)
+        return finished, runner.stats()
+
+    finished, stats = asyncio.run(scenario())
+    assert finished == []
+    assert stats["completed"] == 0 and stats["running"] == 0
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import logging
+import uuid
+
+from backend.core.models.multimodal_models import AudioChunkFeaturesUpdate
+from backend.core.tria_bots.ChunkProcessorBot import ChunkProcessorBot
+from backend.repositories.chunk_repository import ChunkRepository
+
+
+class FakeChunksTable:
+    """Answers the INSERT ... RETURNING * and the UPDATE ... FROM unnest(...) RETURNING id."""
+
+    def __init__(self):
+        self.rows = {}
+        self.updates = []
+        self.log_entries = 0
+
+    async def fetchrow(self, sql, *args):
+        if "tria_learning_log" in sql:  # entry written by the bot after the insert
+            self.log_entries += 1
+            return None
+        columns = ["id", "user_id", "chunk_type", "storage_ref", "original_filename", "mime_type", "duration_seconds",
+                   "resolution_width", "resolution_height", "tria_processing_status", "tria_extracted_features_json",
+                   "related_gesture_id", "related_hologram_id", "custom_metadata_json", "created_at", "updated_at"]
+        row = dict(zip(columns, args))
+        self.rows[row["id"]] = row
+        return row
+
+    async def fetch(self, sql, ids, features, statuses, durations):
+        self.updates.append(list(ids))
+        updated = []
+        for chunk_id, feature_json, status, duration in zip(ids, features, statuses, durations):
+            row = self.rows.get(chunk_id)
+            if row is not None:
+                row["tria_extracted_features_json"] = feature_json
+                row["tria_processing_status"] = status
+                row["duration_seconds"] = row["duration_seconds"] if row["duration_seconds"] is not None else duration
+                updated.append({"id": chunk_id})
+        return updated
+
+
+def test_uploaded_chunk_row_keeps_its_id_and_receives_features(caplog):
+    table = FakeChunksTable()
+    chunk_id, unknown = uuid.uuid4(), uuid.uuid4()
+
+    async def scenario():
+        saved = await ChunkProcessorBot().process_chunk_metadata(db=table, chunk_metadata={
+            "chunk_id": str(chunk_id), "user_id": "u1", "chunk_type": "audio", "storage_ref": "user_chunks/u1/a.wav",
+            "original_filename": "a.wav", "mime_type": "audio/wav", "custom_metadata_json": {"size": 10},
+        })
+        updated = await ChunkRepository(table).update_extracted_features([
+            AudioChunkFeaturesUpdate(chunk_id=chunk_id, tria_processing_status="features_failed"),
+            AudioChunkFeaturesUpdate(chunk_id=unknown, tria_processing_status="features_extracted"),
+            AudioChunkFeaturesUpdate(chunk_id=chunk_id, tria_processing_status="features_extracted",
+                                     tria_extracted_features_json={"rms": 0.5}, duration_seconds=1.5),
+        ])
+        return saved, updated
+
+    with caplog.at_level(logging.WARNING, logger="backend.repositories.chunk_repository"):
+        saved, updated = asyncio.run(scenario())
+
+    assert saved.id == chunk_id and saved.custom_metadata_json == {"size": 10}
+    assert set(table.rows) == {chunk_id} and table.log_entries == 1
+    assert updated == 1
+    assert table.updates == [[chunk_id, unknown]]  # one statement, last update per chunk wins
+    row = table.rows[chunk_id]
+    assert row["tria_processing_status"] == "features_extracted" and row["duration_seconds"] == 1.5
+    assert json.loads(row["tria_extracted_features_json"]) == {"rms": 0.5}
+    assert str(unknown) in caplog.text
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from backend.services.client_send_queue import COALESCE_LATEST, DROP_OLDEST, ClientSendQueue
+from backend.utils.packet_framing import is_frame, split_frame
+
+
+class FakeSocket:
+    def __init__(self, fail=False, hang=False):
+        self.fail = fail
+        self.hang = hang
+        self.sent = []
+        self.release = asyncio.Event()
+
+    async def send_bytes(self, data):
+        if self.hang:
+            await asyncio.sleep(3600)
+        if self.fail:
+            raise ConnectionResetError("client went away")
+        await self.release.wait()
+        self.sent.append(bytes(data))
+
+
+def _payloads(sent):
+    out = []
+    for message in sent:
+        if is_frame(message):
+            out.extend(bytes(p) for p in split_frame(message))
+        else:
+            out.append(message)
+    return out
+
+
+def test_drop_oldest_keeps_the_newest_packets():
+    async def scenario():
+        socket = FakeSocket()
+        socket.release.set()
+        queue = ClientSendQueue("c1", socket, max_size=3, drop_policy=DROP_OLDEST)
+        for i in range(5):
+            assert queue.enqueue(f"p{i}".encode(), coalesce_key="same")  # keys are ignored here
+        queue.start()
+        await asyncio.sleep(0.01)
+        await queue.close()
+        return socket.sent, queue.stats()
+
+    sent, stats = asyncio.run(scenario())
+    assert sent == [b"p2", b"p3", b"p4"]
+    assert stats["dropped"] == 2 and stats["coalesced"] == 0 and stats["max_depth"] == 3
+
+
+def test_coalesce_latest_replaces_waiting_state_in_place():
+    async def scenario():
+        socket = FakeSocket()
+        socket.release.set()
+        queue = ClientSendQueue("c1", socket, max_size=2, drop_policy=COALESCE_LATEST)
+        queue.enqueue(b"a1", coalesce_key="a")
+        queue.enqueue(b"b1", coalesce_key="b")
+        queue.enqueue(b"a2", coalesce_key="a")  # same slot, queue order kept
+        queue.enqueue(b"c1", coalesce_key="c")  # full: evicts a2, and "a" is no longer coalescable
+        queue.enqueue(b"a3", coalesce_key="a")  # evicts b1
+        queue.start()
+        await asyncio.sleep(0.01)
+        await queue.close()
+        return socket.sent, queue.stats()
+
+    sent, stats = asyncio.run(scenario())
+    assert sent == [b"c1", b"a3"]
+    assert stats["coalesced"] == 1 and stats["dropped"] == 2
+
+
+def test_priority_packets_jump_the_queue_and_the_tick():
+    async def scenario():
+        socket = FakeSocket()
+        queue = ClientSendQueue("c1", socket, flush_interval=0.05)
+        queue.start()
+        queue.enqueue(b"state-1")
+        queue.enqueue(b"state-2")
+        await asyncio.sleep(0)  # writer sends the first batch immediately and blocks on the socket
+        queue.enqueue(b"state-3")
+        queue.enqueue(b"control", priority=True)
+        socket.release.set()
+        await asyncio.sleep(0.01)  # well before the next tick
+        before_tick = list(socket.sent)
+        await asyncio.sleep(0.06)
+        await queue.close()
+        return before_tick, socket.sent, queue.stats()
+
+    before_tick, sent, stats = asyncio.run(scenario())
+    assert _payloads(before_tick) == [b"state-1", b"state-2", b"control"]
+    assert is_frame(before_tick[0])  # the first two went out as one frame
+    assert _payloads(sent) == [b"state-1", b"state-2", b"control", b"state-3"]
+    assert stats["sent"] == 4 and stats["messages_sent"] == 3
+
+
+@pytest.mark.parametrize("socket", [FakeSocket(fail=True), FakeSocket(hang=True)], ids=["error", "timeout"])
+def test_dead_client_is_evicted_once(socket):
+    async def scenario():
+        evicted = []
+        queue = ClientSendQueue("c1", socket, send_timeout=0.02, on_dead=evicted.append)
+        queue.start()
+        queue.enqueue(b"p1")
+        queue.enqueue(b"p2")
+        await asyncio.sleep(0.1)
+        accepted = queue.enqueue(b"p3")
+        await queue.close()
+        return evicted, accepted, len(queue)
+
+    evicted, accepted, depth = asyncio.run(scenario())
+    assert evicted == ["c1"]
+    assert accepted is False and depth == 0
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ClientSendQueue("c1", FakeSocket(), drop_policy="drop_newest")
@@ -0,0 +1,75 @@
+import numpy as np
+
+from backend.utils.cwt_hologram import (
+    DEFAULT_TARGET_FREQUENCIES, encode_audio_to_hologram, encode_frames, encode_signal, wavelet_bank,
+    wavelet_bank_cache_info,
+)
+
+
+def _rust_reference(left, right, sample_rate, frequencies):
+    """Line-by-line port of encode_audio_to_hologram in backend/rust/fastcwt_processor/src/lib.rs (f32)."""
+    n = len(left)
+    left_fft = np.fft.fft(np.asarray(left, dtype=np.complex64))
+    right_fft = np.fft.fft(np.asarray(right, dtype=np.complex64))
+    db_levels = np.zeros(2 * len(frequencies), dtype=np.float32)
+    pan_angles = np.zeros(len(frequencies), dtype=np.float32)
+    for i, freq in enumerate(np.asarray(frequencies, dtype=np.float32)):
+        s = np.float32(6.0) * np.float32(sample_rate) / (np.float32(2.0 * np.pi) * freq)
+        t = (np.arange(n, dtype=np.float32) - np.float32(n / 2.0)) / s
+        wavelet = (np.exp(np.float32(-0.5) * t * t) * (np.cos(6.0 * t) + 1j * np.sin(6.0 * t))).astype(np.complex64)
+        wavelet_fft = np.fft.fft(wavelet)
+        left_coeff = np.fft.ifft(left_fft * wavelet_fft)[n // 2]
+        right_coeff = np.fft.ifft(right_fft * wavelet_fft)[n // 2]
+        db_levels[i] = min(max(20.0 * np.log10(abs(left_coeff) + 1e-6), -100.0), 0.0)
+        db_levels[i + len(frequencies)] = min(max(20.0 * np.log10(abs(right_coeff) + 1e-6), -100.0), 0.0)
+        phase_diff = np.angle(left_coeff) - np.angle(right_coeff)
+        while phase_diff <= -np.pi:
+            phase_diff += 2.0 * np.pi
+        while phase_diff > np.pi:
+            phase_diff -= 2.0 * np.pi
+        pan_angles[i] = min(max(phase_diff / np.pi * 90.0, -90.0), 90.0)
+    return db_levels, pan_angles
+
+
+def _stereo_chunk(n, sample_rate, seed):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / sample_rate
+    left = 0.002 * np.sin(2 * np.pi * 440.0 * t) + 0.0005 * rng.normal(size=n)
+    right = 0.002 * np.sin(2 * np.pi * 440.0 * t - 0.7) + 0.0005 * rng.normal(size=n)
+    return left.astype(np.float32), right.astype(np.float32)
+
+
+def test_matches_rust_encoder_golden_output():
+    sample_rate = 48000.0
+    for n in (128, 1024, 1000):
+        left, right = _stereo_chunk(n, sample_rate, seed=n)
+        db_levels, pan_angles = encode_audio_to_hologram(left, right, sample_rate, DEFAULT_TARGET_FREQUENCIES)
+        expected_db, expected_pan = _rust_reference(left, right, sample_rate, DEFAULT_TARGET_FREQUENCIES)
+        assert db_levels.shape == (260,) and pan_angles.shape == (130,)
+        np.testing.assert_allclose(db_levels, expected_db, atol=1e-3)
+
+        # Phase is only meaningful where both channels carry energy well above the dB floor.
+        audible = (expected_db[:130] > -80.0) & (expected_db[130:] > -80.0)
+        assert audible.sum() > 20
+        pan_error = np.abs(pan_angles - expected_pan)
+        pan_error = np.minimum(pan_error, 180.0 - pan_error)  # +-90 wrap-around at the phase discontinuity
+        assert pan_error[audible].max() < 1e-2
+
+
+def test_batched_frames_and_signal_match_single_chunks():
+    sample_rate, n = 44100.0, 256
+    chunks = np.stack([np.stack(_stereo_chunk(n, sample_rate, seed)) for seed in range(5)])
+    db_levels, pan_angles = encode_frames(chunks, sample_rate)
+    for frame, chunk in enumerate(chunks):
+        single_db, single_pan = encode_audio_to_hologram(chunk[0], chunk[1], sample_rate)
+        np.testing.assert_allclose(db_levels[frame], single_db, atol=1e-4)
+        np.testing.assert_allclose(pan_angles[frame], single_pan, atol=1e-3)
+
+    left, right = chunks[:, 0].ravel(), chunks[:, 1].ravel()
+    signal_db, signal_pan = encode_signal(left[:-10], right[:-10], sample_rate, chunk_size=n, block_frames=2)
+    assert signal_db.shape == (5, 260) and signal_pan.shape == (5, 130)
+    np.testing.assert_allclose(signal_db[:4], db_levels[:4], atol=1e-4)
+
+    before = wavelet_bank_cache_info().hits
+    assert wavelet_bank(n, sample_rate) is wavelet_bank(n, sample_rate)
+    assert wavelet_bank_cache_info().hits > before
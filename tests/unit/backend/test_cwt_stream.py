@@ -0,0 +1,108 @@
+import io
+import wave
+
+import numpy as np
+
+from backend.utils.cwt_hologram import DEFAULT_TARGET_FREQUENCIES, encode_audio_to_hologram, levels_and_pan, morlet_wavelet
+from backend.utils.cwt_stream import StreamingCwtEncoder, iter_hologram_blocks, iter_hologram_frames
+from backend.utils.pcm_reader import RawPcmReader, decode_pcm, open_pcm
+
+BANDS = DEFAULT_TARGET_FREQUENCIES[40:100:6]
+
+
+def _direct_frames(signal, sample_rate, taps, hop, frequencies):
+    """Linear convolution of the whole signal with every wavelet, sampled at k * hop + taps // 2."""
+    frame_count = -(-signal.shape[1] // hop)
+    positions = np.arange(frame_count) * hop + taps // 2
+    coefficients = np.empty((frame_count, 2, len(frequencies)), dtype=np.complex128)
+    for band, freq in enumerate(frequencies):
+        wavelet = morlet_wavelet(6.0 * sample_rate / (2.0 * np.pi * float(freq)), taps)
+        for channel in range(2):
+            convolved = np.convolve(signal[channel].astype(np.float64), wavelet)
+            coefficients[:, channel, band] = convolved[positions]
+    return levels_and_pan(coefficients)
+
+
+def _wav_bytes(samples, sample_rate):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(samples.shape[0])
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes((samples.T * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def test_overlap_save_matches_direct_convolution_for_any_feed_pattern():
+    rng = np.random.default_rng(1)
+    sample_rate, taps, hop = 8000.0, 64, 48
+    signal = (0.01 * rng.normal(size=(2, 1000))).astype(np.float32)
+    expected_db, expected_pan = _direct_frames(signal, sample_rate, taps, hop, BANDS)
+
+    encoder = StreamingCwtEncoder(sample_rate, taps, hop, BANDS, fft_size=144)
+    blocks, offset = [], 0
+    for size in (1, 7, 200, 63, 129, 600):
+        blocks.append(encoder.feed(signal[:, offset:offset + size]))
+        offset += size
+    blocks.append(encoder.finish())
+    blocks = [block for block in blocks if len(block)]
+    assert all(b.start_index == a.start_index + len(a) for a, b in zip(blocks, blocks[1:]))
+    db_levels = np.concatenate([block.db_levels for block in blocks])
+    pan_angles = np.concatenate([block.pan_angles for block in blocks])
+
+    assert db_levels.shape == expected_db.shape == (21, 2 * len(BANDS))
+    np.testing.assert_allclose(db_levels, expected_db, atol=1e-3)
+    audible = (expected_db[:, :len(BANDS)] > -80.0) & (expected_db[:, len(BANDS):] > -80.0)
+    pan_error = np.abs(pan_angles - expected_pan)
+    assert np.minimum(pan_error, 180.0 - pan_error)[audible].max() < 1e-2
+
+
+def test_periodic_audio_reproduces_the_chunk_encoder():
+    rng = np.random.default_rng(2)
+    chunk = (0.01 * rng.normal(size=(2, 256))).astype(np.float32)
+    encoder = StreamingCwtEncoder(48000.0, chunk_size=256, hop=256)
+    frames = encoder.feed(np.tile(chunk, 6))
+    frames = [frames, encoder.finish()]
+    db_levels = np.concatenate([block.db_levels for block in frames])
+    expected_db, _ = encode_audio_to_hologram(chunk[0], chunk[1], 48000.0)
+    assert len(db_levels) == 6
+    for frame in range(1, 6):  # frame 0 also sees the silence before the start
+        np.testing.assert_allclose(db_levels[frame], expected_db, atol=1e-3)
+
+
+def test_wav_stream_resumes_by_frame_index_and_reads_pcm_formats():
+    rng = np.random.default_rng(3)
+    sample_rate = 16000
+    mono = (0.2 * np.sin(2 * np.pi * 440 * np.arange(5000) / sample_rate) + 0.01 * rng.normal(size=5000))[None]
+    data = _wav_bytes(mono.astype(np.float32), sample_rate)
+
+    full = list(iter_hologram_frames(open_pcm(io.BytesIO(data)), chunk_size=256, hop=128))
+    resumed = list(iter_hologram_blocks(open_pcm(io.BytesIO(data), "audio/wav"), chunk_size=256, hop=128,
+                                        start_frame=17, read_samples=333))
+    assert len(full) == -(-5000 // 128) and full[-1].index == len(full) - 1
+    assert resumed[0].start_index == 17
+    resumed_db = np.concatenate([block.db_levels for block in resumed])
+    np.testing.assert_allclose(resumed_db, np.stack([frame.db_levels for frame in full[17:]]), atol=1e-3)
+    np.testing.assert_allclose(full[5].db_levels[:130], full[5].db_levels[130:])  # mono -> identical channels
+
+    class ForwardOnly(io.RawIOBase):
+        def __init__(self, payload):
+            self._inner = io.BytesIO(payload)
+
+        def readable(self):
+            return True
+
+        def readinto(self, target):
+            chunk = self._inner.read(min(len(target), 100))  # short reads, like a network body
+            target[:len(chunk)] = chunk
+            return len(chunk)
+
+    pcm = np.array([[0, 1], [-32768, 32767], [100, -100]], dtype="<i2")
+    reader = RawPcmReader(ForwardOnly(pcm.tobytes() * 200), sample_rate=8000, channels=2)
+    reader.seek(300)
+    assert reader.position == 300
+    np.testing.assert_allclose(reader.read(3), pcm.T / 32768.0)
+    assert reader.read(1000).shape == (2, 597 - 300)
+
+    packed = bytes([0x00, 0x00, 0x80, 0xFF, 0xFF, 0x7F])  # 24-bit: -2^23 and 2^23 - 1
+    np.testing.assert_allclose(decode_pcm(packed, 1, 3)[0], [-1.0, (2 ** 23 - 1) / 2 ** 23])
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from backend.services.embedding_batcher import EmbeddingBatcher, FakeEmbedder
+
+
+def test_concurrent_requests_share_one_batch():
+    fake = FakeEmbedder(dimension=8)
+
+    async def scenario():
+        batcher = EmbeddingBatcher(embed_batch=fake, window_ms=5)
+        texts = [f"text {i}" for i in range(20)] + ["text 0"]
+        return texts, await asyncio.gather(*(batcher.embed(t) for t in texts))
+
+    texts, vectors = asyncio.run(scenario())
+    assert fake.batch_sizes == [20]  # duplicate "text 0" is sent once
+    for text, vector in zip(texts, vectors):
+        assert vector == fake.vector_for(text)
+
+
+def test_batch_is_sent_when_full():
+    fake = FakeEmbedder(dimension=4)
+
+    async def scenario():
+        batcher = EmbeddingBatcher(embed_batch=fake, window_ms=1000, max_batch_size=4)
+        await asyncio.wait_for(asyncio.gather(*(batcher.embed(str(i)) for i in range(8))), timeout=0.5)
+
+    asyncio.run(scenario())
+    assert fake.batch_sizes == [4, 4]
+
+
+def test_transient_failures_are_retried():
+    fake = FakeEmbedder(dimension=4, fail_times=2)
+
+    async def scenario():
+        batcher = EmbeddingBatcher(embed_batch=fake, window_ms=1, retry_base_delay=0.001)
+        vector = await batcher.embed("hello")
+        return batcher, vector
+
+    batcher, vector = asyncio.run(scenario())
+    assert vector == fake.vector_for("hello")
+    assert batcher.metrics["retries"] == 2
+
+
+def test_error_propagates_after_retries():
+    fake = FakeEmbedder(dimension=4, fail_times=10)
+
+    async def scenario():
+        batcher = EmbeddingBatcher(embed_batch=fake, window_ms=1, max_retries=1, retry_base_delay=0.001)
+        await batcher.embed("hello")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(scenario())
+    assert len(fake.batch_sizes) == 2
+
+
+def test_max_in_flight_limits_concurrent_batches():
+    active = 0
+    peak = 0
+
+    async def slow_batch(texts, model, task_type):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return [[0.0] for _ in texts]
+
+    async def scenario():
+        batcher = EmbeddingBatcher(embed_batch=slow_batch, window_ms=1, max_batch_size=1, max_in_flight=2)
+        await asyncio.gather(*(batcher.embed(str(i)) for i in range(6)))
+
+    asyncio.run(scenario())
+    assert peak == 2
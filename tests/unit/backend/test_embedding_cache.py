@@ -0,0 +1,87 @@
+import asyncio
+import gc
+
+from backend.services.embedding_cache import EmbeddingCache
+
+
+class CountingCompute:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    async def __call__(self, text, model, task_type):
+        self.calls.append(text)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("embedding API unavailable")
+        return [float(len(text)), 1.0, 2.0]
+
+
+def test_memory_lru_hits_and_eviction():
+    compute = CountingCompute()
+    cache = EmbeddingCache(compute, max_entries=2)
+
+    async def scenario():
+        first = await cache.get_embedding("  hello   world ")
+        first.append(99.0)  # callers get copies; the cached vector is untouched
+        again = await cache.get_embedding("hello world")
+        await cache.get_embedding("b")
+        await cache.get_embedding("hello world")  # refreshes recency
+        await cache.get_embedding("c")  # evicts "b"
+        await cache.get_embedding("b")
+        return again
+
+    assert asyncio.run(scenario()) == [11.0, 1.0, 2.0]
+    assert compute.calls == ["hello world", "b", "c", "b"]
+    stats = cache.stats()
+    assert stats["memory_hits"] == 2 and stats["misses"] == 4 and stats["memory_entries"] == 2
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    first = CountingCompute()
+    cache = EmbeddingCache(first, sqlite_path=path)
+    asyncio.run(cache.get_embedding("persisted", task_type="SEMANTIC_SIMILARITY"))
+    cache.close()
+
+    second = CountingCompute()
+    restarted = EmbeddingCache(second, sqlite_path=path)
+    vector = asyncio.run(restarted.get_embedding("persisted", task_type="SEMANTIC_SIMILARITY"))
+    other_task = asyncio.run(restarted.get_embedding("persisted", task_type="RETRIEVAL_QUERY"))
+    restarted.close()
+
+    assert vector == [9.0, 1.0, 2.0] and other_task == vector
+    assert second.calls == ["persisted"]  # only the other task type had to be computed
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_concurrent_misses_share_one_compute():
+    compute = CountingCompute(delay=0.01)
+    cache = EmbeddingCache(compute)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_embedding("same query") for _ in range(10)))
+
+    vectors = asyncio.run(scenario())
+    assert compute.calls == ["same query"]
+    assert all(v == vectors[0] for v in vectors)
+    assert cache.stats()["coalesced"] == 9 and cache.stats()["in_flight"] == 0
+
+
+def test_failure_with_cancelled_only_waiter_is_retrieved(caplog):
+    compute = CountingCompute(delay=0.01, fail=True)
+    cache = EmbeddingCache(compute)
+
+    async def scenario():
+        waiter = asyncio.ensure_future(cache.get_embedding("doomed"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.03)  # the shielded load fails with nobody awaiting it
+        return waiter.cancelled()
+
+    with caplog.at_level("ERROR", logger="asyncio"):
+        assert asyncio.run(scenario())
+        gc.collect()
+    assert "never retrieved" not in caplog.text
+    assert cache.stats()["errors"] == 1 and cache.stats()["in_flight"] == 0
@@ -0,0 +1,100 @@
+import json
+import uuid
+
+import numpy as np
+
+from backend.services.embedding_index import EmbeddingIndex
+
+
+def _clustered_rows(n_clusters=8, per_cluster=40, dimension=16, seed=1):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(n_clusters, dimension)) * 10
+    rows = []
+    for c, centre in enumerate(centres):
+        for i in range(per_cluster):
+            rows.append({
+                "id": f"c{c}-{i}",
+                "content": f"doc {c}/{i}",
+                "embedding": (centre + rng.normal(size=dimension)).tolist(),
+                "metadata": {"cluster": c, "tags": ["even" if i % 2 == 0 else "odd"]},
+            })
+    return rows
+
+
+def _exact_nearest(rows, query, k):
+    vectors = np.asarray([r["embedding"] for r in rows], dtype=np.float32)
+    order = np.argsort(np.sum((vectors - query) ** 2, axis=1))[:k]
+    return [rows[i]["id"] for i in order]
+
+
+def test_ivf_build_and_search_matches_exhaustive():
+    rows = _clustered_rows()
+    index = EmbeddingIndex(exact_search_threshold=64, nprobe=3)
+    assert index.load_rows(rows) == len(rows)
+    assert index._centroids is not None and index._centroids.shape == (int(np.sqrt(len(rows))), 16)
+
+    query = np.asarray(rows[17]["embedding"], dtype=np.float32) + 0.01
+    hits = index.search(query, k=5)
+    assert [h.id for h in hits] == _exact_nearest(rows, query, 5)
+    assert hits[0].id == "c0-17" and hits[0].content == "doc 0/17"
+    assert all(a.distance <= b.distance for a, b in zip(hits, hits[1:]))
+
+
+def test_small_index_is_exhaustive_and_filters_metadata():
+    rows = _clustered_rows(n_clusters=2, per_cluster=10)
+    index = EmbeddingIndex(exact_search_threshold=4096)
+    index.load_rows(rows)
+    assert index._centroids is None
+
+    query = rows[0]["embedding"]
+    hits = index.search(query, k=3, filters={"cluster": 1, "tags": "odd"})
+    assert len(hits) == 3
+    assert all(h.metadata["cluster"] == 1 and "odd" in h.metadata["tags"] for h in hits)
+    assert index.search(query, k=3, filters={"cluster": 5}) == []
+
+
+def test_update_and_remove_keep_rows_consistent():
+    rows = _clustered_rows(n_clusters=4, per_cluster=20)
+    index = EmbeddingIndex(exact_search_threshold=32, nprobe=2)
+    index.load_rows(rows)
+    target = np.asarray(rows[79]["embedding"], dtype=np.float32)
+
+    assert index.update_vector("c0-0", target.tolist())
+    assert not index.update_vector("missing", target.tolist())  # unknown ids are never added
+    assert {h.id for h in index.search(target, k=2)} == {"c0-0", "c3-19"}
+    assert index._metadata[index._row_by_id["c0-0"]] == rows[0]["metadata"]  # metadata kept
+
+    assert index.remove("c3-19") and not index.remove("c3-19")
+    assert len(index) == len(rows) - 1
+    assert index.search(target, k=1)[0].id == "c0-0"
+    moved = index._row_by_id["c3-18"]
+    assert index._ids[moved] == "c3-18"
+
+
+def test_covers_checks_dimension_readiness_and_age(monkeypatch):
+    index = EmbeddingIndex(max_age_seconds=10.0)
+    assert not index.covers([0.0] * 16)
+    index.load_rows(_clustered_rows(n_clusters=1, per_cluster=3))
+    assert index.covers([0.0] * 16)
+    assert not index.covers([0.0] * 3072)  # different embedding model: pgvector answers
+
+    loaded_at = index.loaded_at
+    monkeypatch.setattr("backend.services.embedding_index.time.monotonic", lambda: loaded_at + 10.5)
+    assert not index.covers([0.0] * 16)
+
+
+def test_json_dump_without_ids_is_not_loaded(tmp_path):
+    genkit_dump = tmp_path / "embeddings_database.json"
+    genkit_dump.write_text(json.dumps([{"text": "a", "embedding": [0.1, 0.2], "source": "doc.md"}]))
+    index = EmbeddingIndex()
+    assert index.load_from_json(str(genkit_dump)) == 0
+    assert not index.is_ready
+
+    row_id = str(uuid.uuid4())
+    table_dump = tmp_path / "table.json"
+    table_dump.write_text(json.dumps([
+        {"id": row_id, "text": "a", "embedding": [0.1, 0.2], "metadata": {"source": "doc.md"}},
+        {"text": "orphan", "embedding": [0.3, 0.4]},
+    ]))
+    assert index.load_from_json(str(table_dump)) == 1
+    assert index.search([0.1, 0.2], k=5)[0].id == row_id
@@ -0,0 +1,7 @@
+from backend.repositories.embedding_repository import _vector_from_sql, _vector_to_sql
+
+
+def test_vectors_travel_in_pgvector_text_form():
+    text = _vector_to_sql([0.5, -1, 2.25])
+    assert text == "[0.5,-1.0,2.25]"
+    assert _vector_from_sql(text) == [0.5, -1.0, 2.25]
@@ -0,0 +1,19 @@
+import logging
+
+from backend.utils.env import env_int, env_number
+
+
+def test_env_helpers_fall_back_on_missing_empty_and_invalid_values(monkeypatch, caplog):
+    monkeypatch.setenv("TEST_ENV_FLOAT", "2.5")
+    monkeypatch.setenv("TEST_ENV_INT", "7")
+    monkeypatch.setenv("TEST_ENV_EMPTY", "")
+    monkeypatch.setenv("TEST_ENV_BAD", "many")
+    monkeypatch.delenv("TEST_ENV_MISSING", raising=False)
+
+    with caplog.at_level(logging.WARNING, logger="backend.utils.env"):
+        assert env_number("TEST_ENV_FLOAT", 1.0) == 2.5
+        assert env_int("TEST_ENV_INT", 1) == 7
+        assert env_number("TEST_ENV_EMPTY", 1.0) == 1.0 and env_int("TEST_ENV_MISSING", 3) == 3
+        assert env_number("TEST_ENV_BAD", 1.0) == 1.0 and env_int("TEST_ENV_FLOAT", 4) == 4
+
+    assert "TEST_ENV_BAD" in caplog.text and "TEST_ENV_FLOAT" in caplog.text
@@ -0,0 +1,182 @@
+import asyncio
+import uuid
+
+import numpy as np
+
+from backend.repositories import embedding_repository
+from backend.repositories.embedding_repository import EmbeddingDB, _vector_from_sql, _vector_to_sql
+from backend.services.embedding_index import EmbeddingIndex
+from backend.services.gesture_intent_service import DIRECTION_MATRIX, DIRECTION_ROWS, EMBEDDING_DIMENSION, GestureIntentService
+
+
+class FakeEmbeddingsTable:
+    """Answers the two queries the batch path issues: the vector re-read and UPDATE ... RETURNING."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.updates = []
+
+    async def fetch(self, sql, *args):
+        if "RETURNING" in sql:
+            ids, vectors = args
+            self.updates.append(list(ids))
+            updated = []
+            for embedding_id, text in zip(ids, vectors):
+                if embedding_id in self.rows:
+                    self.rows[embedding_id] = _vector_from_sql(text)
+                    updated.append({"id": embedding_id})
+            return updated
+        (ids,) = args
+        return [{"id": i, "embedding": _vector_to_sql(self.rows[i])} for i in ids if i in self.rows]
+
+
+class FakeSink:
+    def __init__(self):
+        self.entries = []
+
+    def add_many(self, entries):
+        self.entries.extend(entries)
+
+
+def _unit(seed):
+    vector = np.random.default_rng(seed).normal(size=EMBEDDING_DIMENSION)
+    return (vector / np.linalg.norm(vector)).astype(np.float32).tolist()
+
+
+def _context(embedding_id, vector):
+    return EmbeddingDB(id=embedding_id, content="doc", embedding_vector=vector,
+                       metadata={"gesture_affordances": ["select", "grab"]})
+
+
+def _expected(vector, *intents):
+    result = np.asarray(vector, dtype=np.float32)
+    for intent_type, intensity in intents:
+        result = result + DIRECTION_MATRIX[DIRECTION_ROWS[intent_type]] * np.float32(intensity)
+        result = result / np.linalg.norm(result)
+    return result
+
+
+def _service(table, monkeypatch, index=None):
+    monkeypatch.setattr(embedding_repository, "get_embedding_index", lambda: index or EmbeddingIndex())
+    service = GestureIntentService(table)
+    service.learning_log_sink = FakeSink()
+    return service
+
+
+def test_repeated_ids_apply_in_order_and_write_once(monkeypatch):
+    a, b = uuid.uuid4(), uuid.uuid4()
+    table = FakeEmbeddingsTable({a: _unit(1), b: _unit(2)})
+    service = _service(table, monkeypatch)
+    stale = _context(a, _unit(99))  # the request context lags the table; the table wins
+    items = [
+        ("u1", {"type": "select", "intensity": 0.2}, stale),
+        ("u2", {"type": "grab", "intensity": 0.5}, _context(b, _unit(2))),
+        ("u3", {"type": "grab", "intensity": "0.3"}, stale),
+    ]
+
+    results = asyncio.run(service.apply_intents_batch(items))
+
+    assert [r["status"] for r in results] == ["success", "success", "success"]
+    assert table.updates == [[a, b]]  # one UPDATE, one row per embedding
+    np.testing.assert_allclose(table.rows[a], _expected(_unit(1), ("select", 0.2), ("grab", 0.3)), atol=1e-5)
+    np.testing.assert_allclose(table.rows[b], _expected(_unit(2), ("grab", 0.5)), atol=1e-5)
+    assert [e.action_result for e in service.learning_log_sink.entries] == ["success"] * 3
+
+
+def test_unknown_id_is_an_error_and_never_reaches_the_index(monkeypatch):
+    known, phantom = uuid.uuid4(), uuid.uuid4()
+    table = FakeEmbeddingsTable({known: _unit(1)})
+    index = EmbeddingIndex()
+    index.load_rows([{"id": known, "embedding": _unit(1)}, {"id": phantom, "embedding": _unit(3)}])
+    service = _service(table, monkeypatch, index)
+
+    results = asyncio.run(service.apply_intents_batch([
+        ("u1", {"type": "select", "intensity": 0.2}, _context(phantom, _unit(3))),
+        ("u2", {"type": "select", "intensity": 0.2}, _context(known, _unit(1))),
+    ]))
+
+    assert results[0]["status"] == "error" and results[1]["status"] == "success"
+    np.testing.assert_allclose(index._vectors[index._row_by_id[phantom]], _unit(3))
+    np.testing.assert_allclose(index._vectors[index._row_by_id[known]], table.rows[known], atol=1e-6)
+
+
+def test_row_deleted_between_read_and_update_is_not_reported_as_success(monkeypatch):
+    a, b = uuid.uuid4(), uuid.uuid4()
+    table = FakeEmbeddingsTable({a: _unit(1), b: _unit(2)})
+    service = _service(table, monkeypatch)
+    original_fetch = table.fetch
+
+    async def fetch(sql, *args):
+        rows = await original_fetch(sql, *args)
+        if "RETURNING" not in sql:
+            del table.rows[b]  # concurrent delete after the re-read
+        return rows
+
+    table.fetch = fetch
+    results = asyncio.run(service.apply_intents_batch([
+        ("u1", {"type": "select", "intensity": 0.2}, _context(a, _unit(1))),
+        ("u2", {"type": "grab", "intensity": 0.2}, _context(b, _unit(2))),
+    ]))
+    assert [r["status"] for r in results] == ["success", "error"]
+
+
+def test_bad_intensity_fails_only_its_own_item(monkeypatch):
+    a = uuid.uuid4()
+    table = FakeEmbeddingsTable({a: _unit(1)})
+    service = _service(table, monkeypatch)
+
+    results = asyncio.run(service.apply_intents_batch([
+        ("u1", {"type": "select", "intensity": "strong"}, _context(a, _unit(1))),
+        ("u2", {"type": "select", "intensity": None}, _context(a, _unit(1))),
+        ("u3", {"type": "select", "intensity": float("nan")}, _context(a, _unit(1))),
+        ("u4", {"type": "select", "intensity": 0.2}, _context(a, _unit(1))),
+    ]))
+
+    assert [r["status"] for r in results] == ["error", "error", "error", "success"]
+    assert "Invalid intensity" in results[0]["message"]
+    np.testing.assert_allclose(table.rows[a], _expected(_unit(1), ("select", 0.2)), atol=1e-5)
+
+
+class FakeRunner:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted.append(args)
+
+
+def test_concurrent_gesture_intents_share_one_bulk_update(monkeypatch):
+    from backend.tria_bots import CoordinationService as coordination_module
+
+    ids = [uuid.uuid4() for _ in range(8)]
+    table = FakeEmbeddingsTable({embedding_id: _unit(seed) for seed, embedding_id in enumerate(ids)})
+    monkeypatch.setattr(embedding_repository, "get_embedding_index", lambda: EmbeddingIndex())
+    runner = FakeRunner()
+    monkeypatch.setattr(coordination_module, "get_background_runner", lambda: runner)
+    coordination = coordination_module.CoordinationService(table)
+    coordination.gesture_intent_service.learning_log_sink = FakeSink()
+
+    async def analyze_raw_gesture(intent_data, user_id=None):
+        return {"type": "select", "intensity": 0.2, "target": intent_data["target"]}
+
+    async def find_and_prepare_context(intent_vector):
+        embedding_id = intent_vector["target"]
+        return {"base_embedding": _context(embedding_id, table.rows[embedding_id])}
+
+    monkeypatch.setattr(coordination.gesture_bot, "analyze_raw_gesture", analyze_raw_gesture)
+    monkeypatch.setattr(coordination.memory_bot, "find_and_prepare_context", find_and_prepare_context)
+
+    async def scenario():
+        results = await asyncio.gather(*(
+            coordination.handle_gesture_intent(f"u{i}", {"intent": "select", "target": embedding_id})
+            for i, embedding_id in enumerate(ids)
+        ))
+        await coordination.gesture_intent_service.intent_batcher.close()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert [r["modified_embedding_id"] for r in results] == [str(embedding_id) for embedding_id in ids]
+    assert table.updates == [ids]  # one UPDATE for all eight requests
+    assert coordination.gesture_intent_service.intent_batcher.stats()["batches"] == 1
+    assert len(runner.submitted) == len(ids)
@@ -0,0 +1,30 @@
+import numpy as np
+
+from backend.utils.gesture_intent_codec import (
+    decode_response, describe_gesture_chunk, encode_intent_chunk, encode_response, parse_intent_chunk,
+)
+
+
+def test_intent_chunk_roundtrip_with_zero_copy_landmarks():
+    landmarks = np.arange(2 * 21 * 3, dtype=np.float32).reshape(2, 21, 3)
+    data = encode_intent_chunk("navigate", {"scene_id": "s1"}, "c-7", 0.75, landmarks)
+
+    chunk, parsed = parse_intent_chunk(data)
+    assert describe_gesture_chunk(chunk) == ("c-7", "navigate", '{"scene_id":"s1"}')
+    assert parsed.shape == (2, 21, 3)
+    np.testing.assert_array_equal(parsed, landmarks)
+    assert not parsed.flags.owndata
+
+
+def test_intent_chunk_without_landmarks():
+    chunk, parsed = parse_intent_chunk(encode_intent_chunk("select"))
+    assert parsed is None
+    assert describe_gesture_chunk(chunk) == (None, "select", "")
+
+
+def test_response_roundtrip_keeps_extra_fields():
+    response = decode_response(encode_response({"status": "success", "message": "ok", "correlation_id": "c-1", "new_embedding_id": 5}))
+    assert response == {"status": "success", "message": "ok", "correlation_id": "c-1", "new_embedding_id": 5}
+
+    backpressure = decode_response(encode_response({"type": "backpressure", "state": "pause", "queue_depth": 48}))
+    assert (backpressure["status"], backpressure["message"], backpressure["queue_depth"]) == ("backpressure", "pause", 48)
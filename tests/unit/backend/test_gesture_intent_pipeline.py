@@ -0,0 +1,88 @@
+import asyncio
+
+from backend.services.gesture_intent_pipeline import GestureIntentPipeline
+
+
+def _run(scenario):
+    return asyncio.run(scenario())
+
+
+def test_responses_keep_arrival_order_with_concurrent_workers():
+    async def scenario():
+        sent = []
+        delays = {"slow": 0.05, "fast": 0.0}
+
+        async def handler(data):
+            await asyncio.sleep(delays[data["intent"]])
+            return {"status": "ok", "intent": data["intent"]}
+
+        async def send(message):
+            sent.append(message)
+
+        pipeline = GestureIntentPipeline(handler, send, concurrency=4)
+        pipeline.start()
+        for i, intent in enumerate(["slow", "fast", "fast"]):
+            await pipeline.submit({"intent": intent, "correlation_id": f"c{i}"})
+        await pipeline.drain()
+        await pipeline.close()
+        return sent
+
+    sent = _run(scenario)
+    assert [m["correlation_id"] for m in sent] == ["c0", "c1", "c2"]
+    assert [m["intent"] for m in sent] == ["slow", "fast", "fast"]
+
+
+def test_waiting_navigate_is_superseded_and_full_queue_rejects():
+    async def scenario():
+        sent = []
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(data):
+            await release.wait()
+            handled.append(data["correlation_id"])
+            return {"status": "ok"}
+
+        async def send(message):
+            sent.append(message)
+
+        pipeline = GestureIntentPipeline(handler, send, max_queue=2, concurrency=1, high_watermark=2, low_watermark=0)
+        pipeline.start()
+        await pipeline.submit({"intent": "select", "correlation_id": "busy"})
+        await asyncio.sleep(0)  # the single worker picks it up
+        await pipeline.submit({"intent": "navigate", "context": {"to": "a"}, "correlation_id": "n1"})
+        await pipeline.submit({"intent": "navigate", "context": {"to": "a"}, "correlation_id": "n2"})
+        await pipeline.submit({"intent": "grab", "correlation_id": "g"})
+        await pipeline.submit({"intent": "grab", "correlation_id": "overflow"})
+        release.set()
+        await pipeline.drain()
+        await pipeline.close()
+        return sent, handled, pipeline.stats()
+
+    sent, handled, stats = _run(scenario)
+    assert handled == ["busy", "n2", "g"]
+    controls = [m["state"] for m in sent if m.get("type") == "backpressure"]
+    assert controls == ["pause", "resume"]
+    responses = [(m["correlation_id"], m["status"]) for m in sent if "type" not in m]
+    assert responses == [("busy", "ok"), ("n1", "superseded"), ("n2", "ok"), ("g", "ok"), ("overflow", "rejected")]
+    assert stats["superseded"] == 1 and stats["rejected"] == 1
+
+
+def test_handler_error_is_reported_with_correlation_id():
+    async def scenario():
+        sent = []
+
+        async def handler(data):
+            raise RuntimeError("db down")
+
+        async def send(message):
+            sent.append(message)
+
+        pipeline = GestureIntentPipeline(handler, send)
+        pipeline.start()
+        await pipeline.submit({"intent": "select", "correlation_id": "x"})
+        await pipeline.drain()
+        await pipeline.close()
+        return sent
+
+    assert _run(scenario) == [{"status": "error", "message": "db down", "correlation_id": "x"}]
@@ -0,0 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.services.gesture_matcher import GestureMatcher
+from backend.utils.gesture_dtw import dtw_distances, envelope, lb_keogh
+
+
+def _reference_dtw(query, template, window):
+    n = len(query)
+    table = np.full((n + 1, n + 1), np.inf)
+    table[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(max(1, i - window), min(n, i + window) + 1):
+            cost = float(((query[i - 1] - template[j - 1]) ** 2).sum())
+            table[i, j] = cost + min(table[i - 1, j], table[i, j - 1], table[i - 1, j - 1])
+    return table[n, n]
+
+
+def _hand(offset):
+    rng = np.random.default_rng(7)
+    hand = rng.normal(size=(21, 3)).astype(np.float32) * 0.3
+    hand[9] = hand[0] + np.array([0.0, 1.0, 0.0], dtype=np.float32)  # unit hand size
+    return hand + offset
+
+
+def _swipe(direction, frames=24, speed=1.0):
+    steps = np.linspace(0.0, 1.0, frames, dtype=np.float32) ** speed
+    return np.stack([_hand(np.asarray(direction, dtype=np.float32) * 3.0 * t) for t in steps])
+
+
+def _definition(gesture_id, name, sample, intent=None):
+    body = {"samples": [sample.tolist()]}
+    if intent:
+        body["intent"] = intent
+    return SimpleNamespace(id=gesture_id, gesture_name=name, gesture_definition=body)
+
+
+def test_vectorized_dtw_matches_reference_and_lb_keogh_bounds_it():
+    rng = np.random.default_rng(0)
+    query = rng.random((16, 6), dtype=np.float32)
+    templates = rng.random((5, 16, 6), dtype=np.float32)
+    for window in (0, 2, 15):
+        distances = dtw_distances(query, templates, window)
+        expected = [_reference_dtw(query, template, window) for template in templates]
+        np.testing.assert_allclose(distances, expected, rtol=1e-5)
+        upper, lower = envelope(templates, window)
+        assert np.all(lb_keogh(query, upper, lower) <= distances + 1e-4)
+    assert np.isinf(dtw_distances(query, templates, 2, abandon_at=0.0)).all()
+
+
+def test_matches_time_warped_gesture_and_rejects_unknown_motion():
+    matcher = GestureMatcher(min_confidence=0.5, batch_size=1)
+    definitions = [
+        _definition(1, "swipe_right", _swipe([1, 0, 0]), intent="navigate"),
+        _definition(2, "swipe_up", _swipe([0, 1, 0])),
+        _definition(3, "push", _swipe([0, 0, 1])),
+    ]
+
+    async def scenario():
+        async def load():
+            return definitions
+
+        compiled = await matcher.templates_for("u1", load)
+        # Slower start, different frame count and a hand shifted in space: still a right swipe.
+        warped = _swipe([1, 0, 0], frames=40, speed=1.6) + np.float32(5.0)
+        return compiled, matcher.match(warped, compiled), matcher.match(_swipe([-1, -1, 0]), compiled)
+
+    compiled, match, unknown = asyncio.run(scenario())
+    assert compiled.template_count == 3
+    assert (match.gesture_name, match.intent) == ("swipe_right", "navigate")
+    assert match.confidence > 0.5
+    assert unknown is None
+    assert matcher.stats()["lb_pruned"] > 0
+
+
+def test_compiled_templates_are_cached_until_invalidated():
+    matcher = GestureMatcher()
+    loads = []
+
+    async def scenario():
+        async def load():
+            loads.append(1)
+            await asyncio.sleep(0.01)
+            return [_definition(1, "swipe_right", _swipe([1, 0, 0]))]
+
+        await asyncio.gather(*(matcher.templates_for("u1", load) for _ in range(3)))  # one shared load
+        await matcher.templates_for("u1", load)  # cache hit
+        matcher.invalidate("u1")
+        await matcher.templates_for("u1", load)  # reload
+        loads_before_race = len(loads)
+
+        matcher.invalidate("u1")
+        pending = asyncio.ensure_future(matcher.templates_for("u1", load))
+        await asyncio.sleep(0)
+        matcher.invalidate("u1")  # a definition changed while templates were loading
+        await pending
+        return loads_before_race, "u1" in matcher._cache
+
+    loads_before_race, cached_after_racing_invalidation = asyncio.run(scenario())
+    assert loads_before_race == 2
+    assert not cached_after_racing_invalidation
+
+
+@pytest.mark.parametrize("landmarks", [5, [1.0, 2.0], "abc", {"x": 1}, [[0.0] * 10], [[[0.0] * 3] * 21, [[0.0] * 3]]])
+def test_malformed_landmarks_raise_value_error(landmarks):
+    matcher = GestureMatcher()
+
+    async def scenario():
+        async def load():
+            return [_definition(1, "swipe_right", _swipe([1, 0, 0]))]
+
+        compiled = await matcher.templates_for("u1", load)
+        with pytest.raises(ValueError):
+            matcher.match(landmarks, compiled)
+
+    asyncio.run(scenario())
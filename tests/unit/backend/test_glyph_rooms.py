@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from backend.core.models.internal_bus_models import InternalMessage
+from backend.core.models.nethologlyph_models import HandshakeRequestPayload
+from backend.services.NetHoloGlyphService import NetHoloGlyphService
+from backend.services.glyph_rooms import RoomRegistry, scene_topic, session_topic
+
+
+def test_subscribers_respect_topic_and_interest_filter():
+    rooms = RoomRegistry()
+    rooms.subscribe("a", scene_topic("s1"))
+    rooms.subscribe("b", scene_topic("s1"), ["holo_symbol"])
+    rooms.subscribe("c", scene_topic("s2"))
+
+    assert sorted(rooms.subscribers(scene_topic("s1"))) == ["a", "b"]
+    assert list(rooms.subscribers(scene_topic("s1"), "tria_state")) == ["a"]
+    assert list(rooms.subscribers(scene_topic("s1"), "holo_symbol")) == ["a", "b"]
+    assert list(rooms.subscribers(scene_topic("missing"))) == []
+
+    rooms.subscribe("b", scene_topic("s1"))  # re-subscribing replaces the filter
+    assert list(rooms.subscribers(scene_topic("s1"), "tria_state")) == ["a", "b"]
+
+
+def test_unsubscribe_and_remove_client_drop_empty_entries():
+    rooms = RoomRegistry()
+    rooms.subscribe("a", scene_topic("s1"))
+    rooms.subscribe("a", session_topic("x"))
+    rooms.subscribe("b", scene_topic("s1"))
+    assert rooms.stats() == {"topics": 2, "subscriptions": 3, "clients": 2}
+    assert rooms.topics_of("a") == ["scene:s1", "session:x"]
+
+    rooms.unsubscribe("a", session_topic("x"))
+    assert rooms.stats() == {"topics": 1, "subscriptions": 2, "clients": 2}
+    rooms.unsubscribe("a", "never-joined")  # no-op
+
+    rooms.remove_client("a")
+    assert not rooms.is_subscribed("a") and rooms.topics_of("a") == []
+    assert rooms.client_count == 1
+    rooms.remove_client("b")
+    assert rooms.stats() == {"topics": 0, "subscriptions": 0, "clients": 0}
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_bytes(self, data):
+        self.sent.append(bytes(data))
+
+
+def _tria_state(scene_id):
+    return InternalMessage(message_id=uuid4(), timestamp=datetime.now(timezone.utc), source_service="test",
+                           event_type="tria_state_update_external",
+                           payload={"status": "idle", "scene_id": scene_id})
+
+
+def test_scene_messages_reach_members_and_clients_without_rooms(monkeypatch):
+    monkeypatch.delenv("NETHOLOGLYPH_BACKPLANE_URL", raising=False)
+
+    async def scenario():
+        service = NetHoloGlyphService(coordination_service=None)
+        sockets = {client_id: FakeSocket() for client_id in ("member", "other-room", "legacy")}
+        for client_id, socket in sockets.items():
+            await service.register_client(client_id, socket)
+        service.handle_handshake("member", HandshakeRequestPayload(client_version="1", scene_ids=["s1"]))
+        service.subscribe_client("other-room", scene_id="s2")
+
+        await service.send_outgoing_glyph(_tria_state("s1"))
+        await asyncio.sleep(0.01)
+        await service.close()
+        return {client_id: len(socket.sent) for client_id, socket in sockets.items()}
+
+    assert asyncio.run(scenario()) == {"member": 1, "other-room": 0, "legacy": 1}
@@ -0,0 +1,132 @@
+import asyncio
+import io
+import json
+import wave
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from backend.services.hologram_frame_store import HologramFrameStore
+from backend.utils.cwt_stream import iter_hologram_frames
+from backend.utils.hologram_frame_file import PAN_SCALE, FrameFile, parse_byte_range
+from backend.utils.pcm_reader import open_pcm
+
+
+def _wav_bytes(seconds=0.5, sample_rate=16000, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    left = 0.3 * np.sin(2 * np.pi * 330 * t) + 0.02 * rng.normal(size=t.size)
+    right = 0.3 * np.sin(2 * np.pi * 330 * t - 0.5) + 0.02 * rng.normal(size=t.size)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(2)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes((np.stack([left, right]).T * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+class _Unreadable(io.RawIOBase):
+    def readinto(self, buffer):
+        raise AssertionError("an already rendered track must not be read again")
+
+
+def test_render_quantizes_frames_and_deduplicates_by_content(tmp_path):
+    store = HologramFrameStore(str(tmp_path), chunk_size=256, hop=128)
+    data = _wav_bytes()
+    entry = store.render(io.BytesIO(data))
+    expected = list(iter_hologram_frames(open_pcm(io.BytesIO(data)), chunk_size=256, hop=128))
+
+    frame_file = store.open(entry["key"])
+    db_levels, pan_angles = frame_file.frames()
+    assert entry["frame_count"] == len(expected) == len(frame_file)
+    assert frame_file.db_levels.dtype == np.float16 and frame_file.pan_codes.dtype == np.int8
+    np.testing.assert_allclose(db_levels, [f.db_levels for f in expected], atol=0.05)
+    np.testing.assert_allclose(pan_angles, [f.pan_angles for f in expected], atol=0.5 / PAN_SCALE + 1e-4)
+
+    assert store.render(io.BytesIO(data), "audio/wav")["key"] == entry["key"]
+    assert store.render(_Unreadable(), content_hash=entry["content_hash"]) == entry
+    assert (store.metrics["renders"], store.metrics["dedup_hits"]) == (1, 2)
+    assert list(tmp_path.rglob("*.spool")) == [] and len(list(tmp_path.rglob("*.holo"))) == 1
+
+
+def test_evicted_files_stay_readable_and_render_does_not_open(tmp_path):
+    store = HologramFrameStore(str(tmp_path), chunk_size=256, hop=128, max_open_files=1)
+    keys = [store.render(io.BytesIO(_wav_bytes(seed=seed)))["key"] for seed in range(2)]
+    assert store.stats()["open_files"] == 0  # render describes from the header only
+
+    first = store.open(keys[0])
+    db_levels = first.db_levels
+    expected = np.array(db_levels)
+    store.open(keys[1])  # evicts the first file from the cache
+    assert store.stats()["open_files"] == 1
+    np.testing.assert_array_equal(db_levels, expected)  # still mapped for whoever holds it
+    np.testing.assert_array_equal(first.frames()[0], expected.astype(np.float32))
+
+    first.close()
+    np.testing.assert_array_equal(db_levels, expected)
+    assert len(first.frames()[0]) == 0
+
+
+def test_frame_slices_and_byte_ranges_agree(tmp_path):
+    store = HologramFrameStore(str(tmp_path), chunk_size=256, hop=128)
+    frame_file = store.open(store.render(io.BytesIO(_wav_bytes()))["key"])
+    header = frame_file.header
+
+    sliced_path = tmp_path / "slice.holo"
+    sliced_path.write_bytes(frame_file.slice_bytes(10, 5))
+    sliced = FrameFile(str(sliced_path))
+    assert (sliced.header.start_frame, len(sliced)) == (10, 5)
+    np.testing.assert_array_equal(sliced.db_levels, frame_file.db_levels[10:15])
+    np.testing.assert_array_equal(sliced.pan_codes, frame_file.pan_codes[10:15])
+    blocks = list(frame_file.iter_slice(10, 5, block_size=64))
+    assert b"".join(blocks) == sliced_path.read_bytes() and max(map(len, blocks[1:])) <= 64
+    assert len(b"".join(frame_file.iter_slice(10, 5))) == frame_file.slice_header(10, 5).size
+
+    raw = open(frame_file.path, "rb").read()
+    (db_first, db_last), (pan_first, pan_last) = header.byte_ranges(10, 5)
+    assert raw[db_first:db_last + 1] == frame_file.db_levels[10:15].tobytes()
+    assert raw[pan_first:pan_last + 1] == frame_file.pan_codes[10:15].tobytes()
+
+    assert parse_byte_range(None, 100) is None
+    assert parse_byte_range("bytes=10-19", 100) == (10, 19)
+    assert parse_byte_range("bytes=90-", 100) == (90, 99)
+    assert parse_byte_range("bytes=-30", 100) == (70, 99)
+    assert parse_byte_range("bytes=0-5,10-20", 100) is None
+    for unsatisfiable in ("bytes=100-", "bytes=20-10", "bytes=a-b"):
+        with pytest.raises(ValueError):
+            parse_byte_range(unsatisfiable, 100)
+
+
+def test_render_media_file_links_entry_from_media_files(tmp_path):
+    store = HologramFrameStore(str(tmp_path), chunk_size=256, hop=128)
+    data = _wav_bytes(seed=1)
+    row = {"id": 7, "user_id": "u1", "file_name": "track.wav", "storage_path": "r2://media/user_chunks/u1/track.wav",
+           "file_type": "audio/wav", "file_size_bytes": len(data), "duration_seconds": None,
+           "resolution_width": None, "resolution_height": None, "metadata": "{}",
+           "created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 1)}
+    requests = []
+
+    class FakeDB:
+        async def fetchrow(self, sql, *args):
+            if sql.strip().startswith("UPDATE"):
+                row["metadata"] = json.dumps({**json.loads(row["metadata"]), **json.loads(args[1])})
+                row["duration_seconds"] = row["duration_seconds"] or args[2]
+            return dict(row)
+
+    class FakeS3:
+        def get_object(self, Bucket, Key):
+            requests.append((Bucket, Key))
+            return {"Body": io.BytesIO(data), "ContentType": "audio/wav", "ContentLength": len(data)}
+
+    async def scenario():
+        first = await store.render_media_file(7, FakeDB(), FakeS3(), "default-bucket")
+        second = await store.render_media_file(7, FakeDB(), FakeS3(), "default-bucket")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second and store.exists(first["key"])
+    assert requests == [("media", "user_chunks/u1/track.wav")]  # linked entry is reused, nothing downloaded twice
+    assert json.loads(row["metadata"])["hologram_frames"]["key"] == first["key"]
+    assert row["duration_seconds"] == pytest.approx(first["duration_seconds"])
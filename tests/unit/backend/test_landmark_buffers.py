@@ -0,0 +1,58 @@
+import json
+
+import numpy as np
+
+from backend.core.models.nethologlyph_models import GestureChunkNetModel
+from backend.utils.landmark_buffers import landmarks_from_packet, read_packed_floats, write_packed_floats
+from backend.utils.protobuf_mapper import fill_protobuf
+from nethologlyph.generated_pb2 import definitions_pb2 as pb
+
+
+def _landmarks(hands=2):
+    return np.arange(hands * 63, dtype=np.float32).reshape(hands, 21, 3) / 7
+
+
+def _packet_bytes(landmarks):
+    packet = pb.NetHoloPacket(packet_id="p1", source_id="client-1")
+    chunk = GestureChunkNetModel(sequence_id="seq", timestamp=1700000000.5, hand="right", landmarks=landmarks,
+                                 recognized_intent="pinch", confidence=0.5)
+    fill_protobuf(chunk, packet.gesture_chunk)
+    return packet.SerializeToString()
+
+
+def test_packet_landmarks_are_a_zero_copy_view():
+    landmarks = _landmarks()
+    data = _packet_bytes(landmarks)
+
+    view = landmarks_from_packet(data)
+    assert view.shape == (2, 21, 3) and not view.flags.writeable
+    assert np.shares_memory(view, np.frombuffer(data, dtype=np.uint8))
+    np.testing.assert_array_equal(view, landmarks)
+
+
+def test_read_packed_floats_returns_an_owned_copy():
+    message = pb.GestureChunk(gesture_id="g", confidence=0.25)
+    write_packed_floats(message, "landmark_data_3d", _landmarks(3))
+
+    values = read_packed_floats(message, "landmark_data_3d")
+    assert values.dtype == np.float32 and values.shape == (189,)
+    assert values.flags.owndata and values.flags.writeable
+    np.testing.assert_array_equal(values, _landmarks(3).reshape(-1))
+    values[0] = 42.0
+    assert message.landmark_data_3d[0] == 0.0
+
+    assert read_packed_floats(pb.GestureChunk(), "landmark_data_3d").size == 0
+
+
+def test_gesture_chunk_json_round_trip():
+    chunk = GestureChunkNetModel(sequence_id="seq", timestamp=2.5, hand="left", landmarks=_landmarks(1))
+
+    dumped = chunk.model_dump(mode="json")
+    assert dumped["landmarks"] == _landmarks(1).tolist()
+    json.dumps(dumped)  # envelopes (e.g. the glyph backplane) serialize this dict
+    restored = GestureChunkNetModel.model_validate(dumped)
+    np.testing.assert_array_equal(restored.landmarks, chunk.landmarks)
+    assert GestureChunkNetModel.model_validate_json(chunk.model_dump_json()).landmarks.shape == (1, 21, 3)
+
+    assert isinstance(chunk.model_dump()["landmarks"], np.ndarray)  # python mode keeps the array
+    assert GestureChunkNetModel(timestamp=1.0).model_dump(mode="json")["landmarks"] is None
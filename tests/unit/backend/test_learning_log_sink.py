@@ -0,0 +1,103 @@
+import asyncio
+
+from backend.core.models.tria_learning_models import TriaLearningLogCreate
+from backend.services.learning_log_sink import WriteBehindSink
+
+
+def _entry(i):
+    return TriaLearningLogCreate(user_id=f"u{i}", intent_vector={"type": "select"}, action_result="success")
+
+
+class FlakyWriter:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    async def __call__(self, batch):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        self.batches.append([entry.user_id for entry in batch])
+
+
+def test_batches_by_size_and_time():
+    async def scenario():
+        writer = FlakyWriter()
+        sink = WriteBehindSink(writer, TriaLearningLogCreate, max_batch_size=3, flush_interval=0.02)
+        sink.add_many([_entry(i) for i in range(4)])  # one full batch goes out now, the rest waits for the timer
+        await asyncio.sleep(0)
+        after_size = list(writer.batches)
+        await asyncio.sleep(0.05)
+        sink.add(_entry(4))
+        await sink.close()
+        return after_size, writer.batches
+
+    after_size, batches = asyncio.run(scenario())
+    assert after_size == [["u0", "u1", "u2"]]
+    assert batches == [["u0", "u1", "u2"], ["u3"], ["u4"]]
+
+
+def test_failed_batches_spill_and_replay_after_recovery(tmp_path):
+    spill = str(tmp_path / "spill.jsonl")
+
+    async def scenario():
+        writer = FlakyWriter(fail=True)
+        sink = WriteBehindSink(writer, TriaLearningLogCreate, max_batch_size=2, max_retries=1,
+                               retry_base_delay=0.0, spill_path=spill)
+        sink.add_many([_entry(i) for i in range(3)])
+        await sink.close()  # database down: everything ends up on disk
+        spilled = sink.stats()["spilled"]
+
+        writer.fail = False
+        sink.add(_entry(3))
+        await sink.flush()  # a successful write replays the spill file
+        return spilled, writer.batches, sink.stats()
+
+    spilled, batches, stats = asyncio.run(scenario())
+    assert spilled == 3
+    assert batches == [["u3"], ["u0", "u1"], ["u2"]]
+    assert stats["replayed"] == 3 and stats["buffered"] == 0
+    assert not (tmp_path / "spill.jsonl").exists() and not (tmp_path / "spill.jsonl.replay").exists()
+
+
+def test_overflow_beyond_buffer_goes_to_disk(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+
+    async def scenario():
+        writer = FlakyWriter()
+        sink = WriteBehindSink(writer, TriaLearningLogCreate, max_batch_size=2, max_buffer=2,
+                               flush_interval=10.0, spill_path=str(spill))
+        sink.add_many([_entry(i) for i in range(3)])
+        await sink.close()
+        return writer.batches, sink.stats()
+
+    batches, stats = asyncio.run(scenario())
+    assert stats["spilled"] == 1 and stats["dropped"] == 0
+    # The overflow record was spilled, then replayed right after the first successful batch.
+    assert batches == [["u0", "u1"], ["u2"]]
+
+
+def test_processes_sharing_a_spill_file_replay_it_once(tmp_path):
+    spill = str(tmp_path / "spill.jsonl")
+
+    class SlowWriter(FlakyWriter):
+        async def __call__(self, batch):
+            await asyncio.sleep(0.02)
+            await super().__call__(batch)
+
+    async def scenario():
+        # Two sinks with their own in-process locks stand in for two worker processes.
+        writers = [SlowWriter(), SlowWriter()]
+        sinks = [WriteBehindSink(writer, TriaLearningLogCreate, max_batch_size=10, spill_path=spill) for writer in writers]
+        await sinks[0]._spill([_entry(i) for i in range(3)])
+        replays = asyncio.gather(*(sink.replay_spill() for sink in sinks))
+        await asyncio.sleep(0.005)
+        await sinks[1]._spill([_entry(3)])  # appended while the other sink replays
+        replayed = await replays
+        replayed_later = await sinks[1].replay_spill()
+        return replayed, replayed_later, [writer.batches for writer in writers]
+
+    replayed, replayed_later, batches = asyncio.run(scenario())
+    assert sorted(replayed) == [0, 3] and replayed_later == 1
+    written = [user_id for writer_batches in batches for batch in writer_batches for user_id in batch]
+    assert sorted(written) == ["u0", "u1", "u2", "u3"]
+    assert not (tmp_path / "spill.jsonl").exists() and not (tmp_path / "spill.jsonl.replay").exists()
@@ -0,0 +1,81 @@
+import numpy as np
+
+from backend.core.models.nethologlyph_models import (
+    GestureChunkNetModel,
+    HolographicSymbolNetModel,
+    QuaternionNetModel,
+    TriaStateUpdateNetModel,
+    Vector3NetModel,
+)
+from backend.utils.protobuf_mapper import from_protobuf, from_protobuf_many, to_protobuf, to_protobuf_many
+from nethologlyph.generated_pb2 import definitions_pb2 as pb
+
+
+def _through_wire(model, message_class, model_class):
+    data = to_protobuf(model, message_class).SerializeToString()
+    message = message_class()
+    message.ParseFromString(data)
+    return message, from_protobuf(message, model_class)
+
+
+def test_holographic_symbol_round_trip():
+    symbol = HolographicSymbolNetModel(
+        element_id="sym-1", symbol_type="text_label",
+        position=Vector3NetModel(x=1.0, y=-2.0, z=3.5), rotation=QuaternionNetModel(x=0.5, y=0.5, z=0.5, w=0.5),
+        scale=Vector3NetModel(x=2.0, y=2.0, z=2.0), color_rgba=[1.0, 0.5, 0.25, 1.0],
+        text_content="hello", is_interactive=True, metadata={"layer": 2, "tags": ["a"]},
+    )
+    message, decoded = _through_wire(symbol, pb.HolographicSymbol, HolographicSymbolNetModel)
+
+    assert (message.symbol_id, message.type, message.orientation.w) == ("sym-1", "text_label", 0.5)
+    assert decoded == symbol
+
+
+def test_holographic_symbol_unset_messages_stay_none():
+    symbol = HolographicSymbolNetModel(element_id="sym-2", symbol_type="cube")
+    message, decoded = _through_wire(symbol, pb.HolographicSymbol, HolographicSymbolNetModel)
+
+    assert not message.HasField("position") and not message.HasField("last_updated")
+    assert decoded.position is None and decoded.rotation is None and decoded.scale is None
+    assert decoded == symbol
+
+
+def test_gesture_chunk_round_trip():
+    landmarks = np.arange(2 * 21 * 3, dtype=np.float32).reshape(2, 21, 3) / 10
+    chunk = GestureChunkNetModel(sequence_id="seq-1", timestamp=1700000000.25, hand="left", landmarks=landmarks,
+                                 recognized_intent="pinch", confidence=0.75)
+    message, decoded = _through_wire(chunk, pb.GestureChunk, GestureChunkNetModel)
+
+    assert message.gesture_sequence_id == "seq-1" and len(message.landmark_data_3d) == 126
+    assert decoded.model_dump(exclude={"landmarks"}) == chunk.model_dump(exclude={"landmarks"})
+    assert decoded.landmarks.dtype == np.float32 and decoded.landmarks.shape == (2, 21, 3)
+    np.testing.assert_array_equal(decoded.landmarks, landmarks)
+
+
+def test_gesture_chunk_scalars_without_presence_come_back_as_defaults():
+    chunk = GestureChunkNetModel(timestamp=1.5)
+    message, decoded = _through_wire(chunk, pb.GestureChunk, GestureChunkNetModel)
+
+    # `optional` proto fields keep None ...
+    assert not message.HasField("gesture_sequence_id")
+    assert decoded.sequence_id is None and decoded.landmarks is None and decoded.hand is None
+    # ... plain proto3 scalars cannot: unset reads as the default value.
+    assert decoded.recognized_intent == "" and decoded.confidence == 0.0
+
+
+def test_tria_state_round_trip_packs_rest_as_json():
+    state = TriaStateUpdateNetModel(status="thinking", current_focus_entity_id="sym-1",
+                                    available_commands=["select", "grab"], message_to_user="One moment")
+    message, decoded = _through_wire(state, pb.TriaStateUpdate, TriaStateUpdateNetModel)
+
+    assert message.state_key == "thinking"
+    assert '"available_commands":["select","grab"]' in message.state_value_json
+    assert decoded == state
+
+
+def test_bulk_helpers_match_single_conversions():
+    symbols = [HolographicSymbolNetModel(element_id=f"sym-{i}", symbol_type="cube",
+                                         position=Vector3NetModel(x=float(i))) for i in range(3)]
+    messages = to_protobuf_many(symbols, pb.HolographicSymbol)
+    assert [m.SerializeToString() for m in messages] == [to_protobuf(s, pb.HolographicSymbol).SerializeToString() for s in symbols]
+    assert from_protobuf_many(messages, HolographicSymbolNetModel) == symbols
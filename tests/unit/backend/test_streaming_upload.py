@@ -0,0 +1,109 @@
+import asyncio
+import base64
+import hashlib
+import threading
+import time
+
+import pytest
+
+from backend.services.streaming_upload import StreamingUploader
+
+
+class _AsyncSource:
+    """UploadFile stand-in that hands out short reads."""
+
+    def __init__(self, data: bytes, max_read: int = 700):
+        self.data = data
+        self.offset = 0
+        self.max_read = max_read
+
+    async def read(self, size: int) -> bytes:
+        size = min(size, self.max_read)
+        chunk = self.data[self.offset:self.offset + size]
+        self.offset += len(chunk)
+        return chunk
+
+
+class _FakeS3:
+    def __init__(self, fail_parts=(), transient_failures=0):
+        self.lock = threading.Lock()
+        self.objects = {}
+        self.parts = {}
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_parts = set(fail_parts)
+        self.transient_failures = transient_failures
+
+    def put_object(self, Bucket, Key, Body, ContentMD5, **extra):
+        assert ContentMD5 == base64.b64encode(hashlib.md5(Body).digest()).decode()
+        self.calls.append(("put_object", extra))
+        self.objects[Key] = Body
+        return {"ETag": '"single"'}
+
+    def create_multipart_upload(self, Bucket, Key, **extra):
+        self.calls.append(("create_multipart_upload", extra))
+        return {"UploadId": "u1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, ContentMD5):
+        assert ContentMD5 == base64.b64encode(hashlib.md5(Body).digest()).decode()
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            transient = self.transient_failures > 0
+            self.transient_failures -= transient
+        try:
+            time.sleep(0.01)
+            if transient or PartNumber in self.fail_parts:
+                raise ConnectionError(f"part {PartNumber} failed")
+            self.parts[PartNumber] = Body
+            return {"ETag": f'"etag-{PartNumber}"'}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        assert numbers == sorted(numbers) and [p["ETag"] for p in MultipartUpload["Parts"]] == [f'"etag-{n}"' for n in numbers]
+        self.objects[Key] = b"".join(self.parts[n] for n in numbers)
+        self.calls.append(("complete_multipart_upload", len(numbers)))
+        return {"ETag": '"multi"'}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append(("abort_multipart_upload", UploadId))
+
+
+def _upload(uploader, s3, data, **kwargs):
+    async def scenario():
+        return await uploader.upload(s3, _AsyncSource(data), "bucket", "key", "audio/wav", **kwargs)
+    try:
+        return asyncio.run(scenario())
+    finally:
+        uploader.close()
+
+
+def test_small_file_goes_up_in_a_single_put():
+    s3, data = _FakeS3(), b"x" * 1500
+    result = _upload(StreamingUploader(part_size=2048), s3, data)
+    assert (result.size, result.parts, result.etag) == (1500, 1, '"single"')
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert s3.objects["key"] == data and s3.calls == [("put_object", {"ContentType": "audio/wav"})]
+
+
+def test_large_file_is_uploaded_in_bounded_concurrent_parts():
+    s3, data = _FakeS3(transient_failures=1), bytes(range(256)) * 41  # 10.25 parts of 1 KiB
+    uploader = StreamingUploader(part_size=1024, max_concurrency=3, retry_base_delay=0.001)
+    result = _upload(uploader, s3, data)
+    assert (result.size, result.parts, result.etag) == (len(data), 11, '"multi"')
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert s3.objects["key"] == data
+    assert 1 < s3.max_in_flight <= 3
+    assert uploader.metrics["retries"] == 1 and uploader.metrics["aborted"] == 0
+
+
+def test_failed_part_aborts_the_multipart_upload():
+    s3 = _FakeS3(fail_parts={2})
+    uploader = StreamingUploader(part_size=1024, max_concurrency=2, max_retries=1, retry_base_delay=0.001)
+    with pytest.raises(ConnectionError):
+        _upload(uploader, s3, b"y" * 5000)
+    assert ("abort_multipart_upload", "u1") in s3.calls and "key" not in s3.objects
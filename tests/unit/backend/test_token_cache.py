@@ -0,0 +1,117 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from backend.auth import token_cache
+from backend.auth.token_cache import LastLoginRecorder, SigningKeyRefresher, UserCache, VerifiedTokenCache
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_verified_token_expires_before_exp(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(token_cache.time, "time", clock)
+    cache = VerifiedTokenCache(max_entries=2, expiry_margin_seconds=5.0)
+
+    cache.put("token-a", {"uid": "a", "exp": 1100})
+    cache.put("no-exp", {"uid": "b"})  # never cached without exp
+    cache.put("almost-expired", {"uid": "c", "exp": 1004})  # already inside the margin
+    assert cache.get("token-a") == {"uid": "a", "exp": 1100}
+    assert cache.get("no-exp") is None and cache.get("almost-expired") is None
+
+    clock.now = 1094.9
+    assert cache.get("token-a") is not None
+    clock.now = 1095.0  # exp - 5s
+    assert cache.get("token-a") is None
+    assert cache.stats() == {"size": 0, "hits": 2, "misses": 3}
+
+
+def test_verified_token_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(token_cache.time, "time", Clock())
+    cache = VerifiedTokenCache(max_entries=2)
+    for name in ("a", "b"):
+        cache.put(name, {"uid": name, "exp": 2000})
+    cache.get("a")
+    cache.put("c", {"uid": "c", "exp": 2000})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_user_cache_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(token_cache.time, "monotonic", clock)
+    cache = UserCache(ttl_seconds=30.0)
+    user = object()
+    cache.put("uid-1", user)
+
+    clock.now += 30.0
+    assert cache.get("uid-1") is user
+    clock.now += 0.1
+    assert cache.get("uid-1") is None
+
+    cache.put("uid-1", user)
+    cache.invalidate("uid-1")
+    assert cache.get("uid-1") is None
+
+
+def test_last_login_recorder_coalesces_per_interval(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(token_cache.time, "monotonic", clock)
+    writes = []
+
+    class FakePool:
+        @asynccontextmanager
+        async def acquire(self):
+            yield "conn"
+
+    async def get_db_pool():
+        return FakePool()
+
+    async def update_users_last_login(conn, logins):
+        writes.append(sorted(uid for uid, _ in logins))
+
+    monkeypatch.setattr(token_cache, "get_db_pool", get_db_pool)
+    monkeypatch.setattr(token_cache.crud_operations, "update_users_last_login", update_users_last_login)
+    recorder = LastLoginRecorder(min_interval_seconds=300.0)
+
+    async def scenario():
+        for uid in ("a", "b", "a", "a"):
+            recorder.record(uid)
+        first = await recorder.flush()
+        clock.now += 100.0
+        recorder.record("a")  # still inside the window: no write
+        second = await recorder.flush()
+        clock.now += 300.0
+        recorder.record("a")
+        third = await recorder.flush()
+        return first, second, third
+
+    assert asyncio.run(scenario()) == (2, 0, 1)
+    assert writes == [["a", "b"], ["a"]]
+
+
+def test_last_login_recorder_keeps_pending_on_failure(monkeypatch):
+    async def get_db_pool():
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(token_cache, "get_db_pool", get_db_pool)
+    recorder = LastLoginRecorder()
+    recorder.record("a")
+    assert asyncio.run(recorder.flush()) == 0
+    assert list(recorder._pending) == ["a"]
+
+
+def test_signing_key_refresher_disables_itself_without_sdk_internals(monkeypatch):
+    monkeypatch.setattr(token_cache.firebase_admin, "_apps", {"[DEFAULT]": object()})
+    monkeypatch.setattr(token_cache.firebase_admin, "get_app", lambda: object())
+    monkeypatch.delattr(token_cache.auth, "_get_client", raising=False)
+    refresher = SigningKeyRefresher()
+
+    assert asyncio.run(refresher.refresh_once()) is False
+    assert refresher.supported is False
+    assert refresher.last_refresh_at is None
@@ -0,0 +1,261 @@
+import asyncio
+
+from backend.core.models.internal_bus_models import InternalMessage
+from backend.services.NetHoloGlyphService import NetHoloGlyphService
+from backend.services.glyph_backplane import (
+    Backplane,
+    InMemoryBackplane,
+    InMemoryHub,
+    RespBackplane,
+    BackplaneConnectionError,
+    BackplaneError,
+    RespConnection,
+    _encode_command,
+)
+from nethologlyph.generated_pb2 import definitions_pb2 as pb
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def send_bytes(self, data):
+        self.messages.append(data)
+
+
+def _tria_state(key):
+    return InternalMessage(source_service="test", event_type="tria_state_update_external", payload={"status": key})
+
+
+def _state_keys(socket):
+    keys = []
+    for data in socket.messages:
+        packet = pb.NetHoloPacket()
+        packet.ParseFromString(data)
+        keys.append(packet.tria_state.state_key)
+    return keys
+
+
+def test_messages_reach_clients_on_other_workers():
+    async def scenario():
+        hub = InMemoryHub()
+        workers = [NetHoloGlyphService(None, backplane=InMemoryBackplane(hub), worker_id=f"w{i}") for i in range(2)]
+        for worker in workers:
+            await worker.start()
+        sockets = {name: RecordingSocket() for name in ("a", "b")}
+        await workers[0].register_client("a", sockets["a"])
+        await workers[1].register_client("b", sockets["b"])
+
+        await workers[0].send_outgoing_glyph(_tria_state("to-b"), target_client_id="b")
+        await workers[1].send_outgoing_glyph(_tria_state("everyone"))
+        await workers[0].send_outgoing_glyphs([_tria_state("batch-1"), _tria_state("batch-2")])
+        await asyncio.sleep(0.01)
+
+        await workers[1].unregister_client("b")
+        presence_after = dict(hub.presence)
+        for worker in workers:
+            await worker.close()
+        return sockets, presence_after
+
+    sockets, presence_after = asyncio.run(scenario())
+    assert _state_keys(sockets["a"]) == ["everyone", "batch-1", "batch-2"]
+    assert _state_keys(sockets["b"]) == ["to-b", "everyone", "batch-1", "batch-2"]
+    assert presence_after == {"a": "w0"}
+
+
+def test_resp_replies_are_parsed():
+    async def scenario():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"+OK\r\n:3\r\n$5\r\nhello\r\n$-1\r\n*3\r\n$7\r\nmessage\r\n$2\r\nch\r\n$0\r\n\r\n")
+        connection = RespConnection(reader, writer=None)
+        return [await connection.read_reply() for _ in range(5)]
+
+    assert asyncio.run(scenario()) == ["OK", 3, b"hello", None, [b"message", b"ch", b""]]
+    assert _encode_command("PUBLISH", "ch", b"\x00x") == b"*3\r\n$7\r\nPUBLISH\r\n$2\r\nch\r\n$2\r\n\x00x\r\n"
+
+
+class MiniRespServer:
+    """Just enough of a RESP server for RespBackplane: SUBSCRIBE, PUBLISH, SET [EX], GET, DEL."""
+
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+        self.subscribers = {}  # channel -> set of writers
+        self.writers = []
+
+    async def start(self, path):
+        self.server = await asyncio.start_unix_server(self._serve, path=path)
+
+    async def _serve(self, reader, writer):
+        self.writers.append(writer)
+        connection = RespConnection(reader, writer)
+        try:
+            while True:
+                writer.write(self._handle(await connection.read_reply(), writer))
+        except Exception:
+            writer.close()
+
+    def _handle(self, command, writer):
+        name, args = command[0].decode().upper(), command[1:]
+        if name == "SUBSCRIBE":
+            replies = []
+            for count, channel in enumerate(args, 1):
+                self.subscribers.setdefault(channel.decode(), set()).add(writer)
+                replies.append(b"*3\r\n$9\r\nsubscribe\r\n" + _bulk(channel) + b":%d\r\n" % count)
+            return b"".join(replies)
+        if name == "PUBLISH":
+            channel, data = args
+            listeners = [w for w in self.subscribers.get(channel.decode(), ()) if not w.is_closing()]
+            for listener in listeners:
+                listener.write(b"*3\r\n$7\r\nmessage\r\n" + _bulk(channel) + _bulk(data))
+            return b":%d\r\n" % len(listeners)
+        if name == "SET":
+            self.values[args[0]] = args[1]
+            if len(args) == 4:
+                self.expiry[args[0]] = int(args[3])
+            return b"+OK\r\n"
+        if name == "GET":
+            value = self.values.get(args[0])
+            return b"$-1\r\n" if value is None else _bulk(value)
+        if name == "DEL":
+            return b":%d\r\n" % int(self.values.pop(args[0], None) is not None)
+        return b"-ERR unknown command\r\n"
+
+    def drop_connections(self):
+        for writer in self.writers:
+            writer.close()
+        self.writers = []
+        self.subscribers = {}
+
+    async def close(self):
+        self.drop_connections()
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def _bulk(data):
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+async def _wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def test_resp_backplane_reconnects_and_resubscribes(tmp_path):
+    async def scenario():
+        server = MiniRespServer()
+        await server.start(str(tmp_path / "resp.sock"))
+        received = []
+
+        async def on_message(channel, data):
+            received.append((channel, data))
+
+        backplane = RespBackplane(f"unix://{tmp_path / 'resp.sock'}", presence_ttl=30, reconnect_delay=0.01)
+        await backplane.start(["ch"], on_message)
+        await backplane.set_presence("client-1", "w0")
+        assert server.expiry[b"nethologlyph:presence:client-1"] == 30
+        assert await backplane.lookup("client-1") == "w0"
+
+        server.drop_connections()  # both connections die
+        await _wait_for(lambda: backplane.reconnects >= 1)
+        await backplane.publish("ch", b"after-drop")  # command connection reopened on demand
+        await _wait_for(lambda: received)
+        await backplane.clear_presence("client-1", "w0")
+        cleared = await backplane.lookup("client-1")
+        await backplane.close()
+        await server.close()
+        return received, cleared, backplane.reconnects
+
+    received, cleared, reconnects = asyncio.run(scenario())
+    assert received == [("ch", b"after-drop")]
+    assert cleared is None and reconnects == 2
+
+
+def test_error_reply_mid_pipeline_keeps_replies_in_order(tmp_path):
+    async def scenario():
+        server = MiniRespServer()
+        await server.start(str(tmp_path / "resp.sock"))
+        backplane = RespBackplane(f"unix://{tmp_path / 'resp.sock'}", presence_ttl=30)
+        await backplane.start(["ch"], lambda channel, data: None)
+        await backplane.set_presence("client-a", "w0")
+        await backplane.set_presence("client-b", "w1")
+
+        try:
+            await backplane._pipeline([("BOGUS",), ("GET", "nethologlyph:presence:client-a")])
+        except BackplaneError as e:
+            error = str(e)
+        owner = await backplane.lookup("client-b")  # must not read the GET reply left over above
+        await backplane.close()
+        await server.close()
+        return error, owner, backplane.reconnects
+
+    assert asyncio.run(scenario()) == ("ERR unknown command", "w1", 0)
+
+
+class HalfWriter:
+    def __init__(self):
+        self.closed = False
+
+    def write(self, data):
+        pass
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_cancelled_pipeline_marks_the_connection_broken():
+    async def scenario():
+        reader, writer = asyncio.StreamReader(), HalfWriter()
+        reader.feed_data(b"+OK\r\n")  # only one of the two replies arrives
+        connection = RespConnection(reader, writer)
+        task = asyncio.ensure_future(connection.pipeline([("SET", "k", "v"), ("GET", "k")]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        reader.feed_data(b"$1\r\nv\r\n")
+        try:
+            await connection.execute("GET", "k")
+        except BackplaneConnectionError:
+            return connection.broken, writer.closed
+        return None
+
+    assert asyncio.run(scenario()) == (True, True)
+
+
+class BrokenBackplane(Backplane):
+    async def start(self, channels, on_message):
+        pass
+
+    async def publish_batch(self, items):
+        raise ConnectionResetError("backplane down")
+
+    async def set_presence(self, client_id, worker_id):
+        raise ConnectionResetError("backplane down")
+
+    async def clear_presence(self, client_id, worker_id):
+        raise ConnectionResetError("backplane down")
+
+    async def lookup(self, client_id):
+        raise ConnectionResetError("backplane down")
+
+
+def test_local_clients_are_served_when_the_backplane_fails():
+    async def scenario():
+        worker = NetHoloGlyphService(None, backplane=BrokenBackplane(), worker_id="w0")
+        await worker.start()
+        socket = RecordingSocket()
+        await worker.register_client("a", socket)
+        await worker.send_outgoing_glyph(_tria_state("single"))
+        await worker.send_outgoing_glyphs([_tria_state("batch")])
+        await worker.send_outgoing_glyph(_tria_state("lost"), target_client_id="elsewhere")
+        await asyncio.sleep(0.01)
+        await worker.close()
+        return socket
+
+    assert _state_keys(asyncio.run(scenario())) == ["single", "batch"]
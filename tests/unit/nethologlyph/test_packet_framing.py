@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from backend.services.client_send_queue import ClientSendQueue
+from backend.utils.packet_framing import encode_frame, is_frame, split_frame
+from nethologlyph.generated_pb2 import definitions_pb2 as pb
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def send_bytes(self, data):
+        self.messages.append(data)
+
+
+def test_frame_roundtrip_and_marker_never_starts_a_packet():
+    packets = [pb.NetHoloPacket(packet_id=str(i), source_id="s").SerializeToString() for i in range(3)] + [b""]
+    frame = encode_frame(packets)
+    assert is_frame(frame)
+    assert not any(is_frame(packet) for packet in packets)
+    assert [bytes(view) for view in split_frame(frame)] == packets
+
+
+def test_truncated_frame_is_rejected():
+    frame = encode_frame([b"abc", b"defg"])
+    with pytest.raises(ValueError):
+        list(split_frame(frame[:-1]))
+
+
+def test_tick_batches_packets_and_priority_bypasses():
+    async def scenario():
+        socket = RecordingSocket()
+        queue = ClientSendQueue("c", socket, flush_interval=0.05)
+        queue.start()
+        queue.enqueue(b"first")  # idle writer: goes out immediately
+        await asyncio.sleep(0.01)
+        for i in range(5):
+            queue.enqueue(f"p{i}".encode())
+        queue.enqueue(b"urgent", priority=True)
+        await asyncio.sleep(0.01)
+        before_tick = list(socket.messages)
+        await asyncio.sleep(0.08)
+        await queue.close()
+        return before_tick, socket.messages, queue.stats()
+
+    before_tick, messages, stats = asyncio.run(scenario())
+    assert before_tick == [b"first", b"urgent"]
+    assert len(messages) == 3
+    assert [bytes(view) for view in split_frame(messages[2])] == [f"p{i}".encode() for i in range(5)]
+    assert stats["sent"] == 7 and stats["messages_sent"] == 3
+
+
+def test_frames_respect_max_size():
+    async def scenario():
+        socket = RecordingSocket()
+        queue = ClientSendQueue("c", socket, flush_interval=0.01, max_frame_bytes=64)
+        queue._next_flush = asyncio.get_running_loop().time() + 0.01  # start mid-tick
+        queue.start()
+        for _ in range(4):
+            queue.enqueue(b"x" * 20)
+        await asyncio.sleep(0.06)
+        await queue.close()
+        return socket.messages
+
+    messages = asyncio.run(scenario())
+    assert all(len(message) <= 64 for message in messages)
+    assert sum(len(list(split_frame(m))) if is_frame(m) else 1 for m in messages) == 4
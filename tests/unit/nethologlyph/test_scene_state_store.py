@@ -0,0 +1,117 @@
+from backend.core.models.nethologlyph_models import (
+    HolographicSymbolNetModel,
+    SceneUpdatePayload,
+    Vector3NetModel,
+)
+from backend.services.scene_state_store import MASK_COLOR, MASK_POSITION, SceneReplica, SceneStateStore
+
+
+def _symbol(element_id, x=0.0, **fields):
+    return HolographicSymbolNetModel(element_id=element_id, symbol_type="cube", position=Vector3NetModel(x=x), **fields)
+
+
+def _move(element_id, x):
+    return HolographicSymbolNetModel(element_id=element_id, symbol_type="cube", position=Vector3NetModel(x=x))
+
+
+def test_delta_carries_only_changed_fields():
+    store = SceneStateStore()
+    first = store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[
+        _symbol("a", color_rgba=[1.0, 0.0, 0.0, 1.0], text_content="label"),
+    ]))
+    assert (first.base_version, first.version, len(first.upserts)) == (0, 1, 1)
+
+    delta = store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[_move("a", 2.0)]))
+    assert (delta.base_version, delta.version) == (1, 2)
+    assert not delta.upserts
+    (change,) = delta.changes
+    assert change.changed_mask == MASK_POSITION
+    assert change.position.x == 2.0
+    assert not change.color_rgba and not change.properties_json
+
+    # Unchanged (or sub-epsilon) updates produce nothing and keep the version.
+    assert store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[_move("a", 2.0 + 1e-6)])) is None
+    assert store.version_of("s") == 2
+
+
+def test_replica_follows_deltas_and_resyncs_after_gap():
+    store = SceneStateStore(keyframe_interval=0, max_history=4)
+    replica = SceneReplica("s")
+    assert replica.apply(store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[_symbol("a"), _symbol("b")]))) is None
+
+    store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[_move("a", 1.0)]))  # lost in transit
+    latest = store.apply_update(SceneUpdatePayload(scene_id="s", delete_element_ids=["b"]))
+    request = replica.apply(latest)
+    assert request is not None and request.last_known_version == 1
+    assert replica.version == 1  # the out-of-order delta was not applied
+
+    replayed = store.resync("s", request.last_known_version)
+    assert [m.version for m in replayed] == [2, 3] and not any(m.is_keyframe for m in replayed)
+    for message in replayed:
+        assert replica.apply(message) is None
+    assert replica.version == 3
+    assert set(replica.elements) == {"a"}
+    assert replica.elements["a"].position.x == 1.0
+
+
+def test_resync_beyond_history_sends_keyframe():
+    store = SceneStateStore(keyframe_interval=0, max_history=2)
+    for step in range(5):
+        store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[_move("a", float(step))]))
+
+    (keyframe,) = store.resync("s", 1)
+    assert keyframe.is_keyframe and keyframe.version == 5
+    replica = SceneReplica("s")
+    replica.apply(keyframe)
+    assert replica.elements["a"].position.x == 4.0
+    assert store.resync("s", 5) == []
+
+
+def test_periodic_keyframe_is_published():
+    store = SceneStateStore(keyframe_interval=3)
+    messages = [
+        store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[_move("a", float(step))]))
+        for step in range(3)
+    ]
+    assert [m.is_keyframe for m in messages] == [False, False, True]
+    assert messages[-1].base_version == 2 and messages[-1].version == 3
+
+
+def test_cleared_field_is_flagged_not_zeroed():
+    store = SceneStateStore(keyframe_interval=0)
+    replica = SceneReplica("s")
+    replica.apply(store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[
+        _symbol("a", x=3.0, scale=Vector3NetModel(x=2.0, y=2.0, z=2.0), color_rgba=[1.0, 0.0, 0.0, 1.0]),
+    ])))
+
+    cleared = HolographicSymbolNetModel(element_id="a", symbol_type="cube", position=None, color_rgba=None)
+    delta = store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[cleared]))
+    (change,) = delta.changes
+    assert change.cleared_mask == change.changed_mask == MASK_POSITION | MASK_COLOR
+
+    replica.apply(delta)
+    element = replica.elements["a"]
+    assert element.position is None and element.color_rgba is None
+    assert element.scale == Vector3NetModel(x=2.0, y=2.0, z=2.0)
+
+    # Moving to the origin is a real value, not a clear.
+    replica.apply(store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[_move("a", 0.0)])))
+    assert replica.elements["a"].position == Vector3NetModel(x=0.0, y=0.0, z=0.0)
+
+
+def test_replica_recovers_after_server_restart():
+    store = SceneStateStore(keyframe_interval=0)
+    replica = SceneReplica("s")
+    for step in range(5):
+        replica.apply(store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[_move("a", float(step))])))
+    assert replica.version == 5
+
+    restarted = SceneStateStore(keyframe_interval=0)  # versions start again from 0
+    restarted.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[_symbol("b", x=7.0)]))
+    (keyframe,) = restarted.resync("s", replica.version)
+    assert keyframe.is_keyframe and keyframe.version == 1
+
+    assert replica.apply(keyframe) is None
+    assert replica.version == 1 and set(replica.elements) == {"b"}
+    follow_up = restarted.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[_move("b", 8.0)]))
+    assert replica.apply(follow_up) is None and replica.elements["b"].position.x == 8.0
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from backend.core.models.nethologlyph_models import (
+    HolographicSymbolNetModel,
+    QuaternionNetModel,
+    SceneUpdatePayload,
+    Vector3NetModel,
+)
+from backend.services.scene_state_store import SceneReplica, SceneStateStore, quantize_scene_delta
+from backend.utils.transform_codec import TransformCodec, decode_quaternions, encode_quaternions
+from nethologlyph.generated_pb2 import definitions_pb2 as pb
+
+# float32 output adds at most one ulp of the decoded value on top of the quantization step
+FLOAT32_SLACK = 1e-5
+
+
+def _random_unit_quaternions(rng, count):
+    q = rng.normal(size=(count, 4))
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def test_position_error_is_within_half_step():
+    rng = np.random.default_rng(1)
+    codec = TransformCodec(origin=(10.0, 0.0, -5.0), position_step=1e-3)
+    positions = codec.origin + rng.uniform(-32.0, 32.0, size=(5000, 3))
+    decoded = codec.decode_positions(codec.encode_positions(positions))
+    assert np.abs(decoded - positions).max() <= codec.position_step / 2 + FLOAT32_SLACK
+
+
+def test_positions_outside_int16_grid_are_rejected():
+    codec = TransformCodec(position_step=1e-3)
+    far = np.array([[0.0, 0.0, 40.0]])
+    assert not codec.positions_in_range(far)[0]
+    with pytest.raises(ValueError):
+        codec.encode_positions(far)
+
+
+def test_smallest_three_angle_error_bound():
+    rng = np.random.default_rng(2)
+    quaternions = _random_unit_quaternions(rng, 50000)
+    decoded = decode_quaternions(encode_quaternions(quaternions))
+    assert np.allclose(np.linalg.norm(decoded, axis=1), 1.0, atol=1e-6)
+    # q and -q are the same rotation, hence the absolute dot product.
+    dots = np.clip(np.abs(np.sum(quaternions * decoded, axis=1)), 0.0, 1.0)
+    assert np.degrees(2.0 * np.arccos(dots)).max() < 0.25
+
+
+def test_smallest_three_handles_axis_aligned_and_unnormalized_input():
+    quaternions = np.array([[0.0, 0.0, 0.0, 1.0], [0.0, 0.0, 0.0, -2.0], [1.0, 0.0, 0.0, 0.0], [0.5, 0.5, 0.5, 0.5]])
+    decoded = decode_quaternions(encode_quaternions(quaternions))
+    expected = quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+    assert np.allclose(np.abs(np.sum(decoded * expected, axis=1)), 1.0, atol=1e-5)
+
+
+def test_pack_roundtrip_with_missing_values_and_uniform_scale():
+    codec = TransformCodec(position_step=1e-3)
+    nan3, nan4 = [np.nan] * 3, [np.nan] * 4
+    positions = np.array([[1.0, 2.0, 3.0], nan3, [-4.0, 0.5, 0.25]])
+    orientations = np.array([nan4, [0.0, 0.0, 0.0, 1.0], [0.0, 0.7071068, 0.0, 0.7071068]])
+    scales = np.array([[2.0, 2.0, 2.0], [1.0, 0.5, 0.25], nan3])
+
+    message = pb.PackedTransforms()
+    codec.pack(message, ["a", "b", "c"], positions, orientations, scales)
+    assert len(message.uniform_scales) == 2 and len(message.scales) == 6  # one float16 vs three
+
+    ids, out_positions, out_orientations, out_scales = TransformCodec.unpack(pb.PackedTransforms.FromString(message.SerializeToString()))
+    assert ids == ["a", "b", "c"]
+    assert np.array_equal(np.isnan(out_positions), np.isnan(positions))
+    assert np.array_equal(np.isnan(out_orientations), np.isnan(orientations))
+    assert np.array_equal(np.isnan(out_scales), np.isnan(scales))
+    assert np.nanmax(np.abs(out_positions - positions)) <= 5e-4 + FLOAT32_SLACK
+    assert np.nanmax(np.abs(out_scales - scales) / np.abs(scales)) <= 2.0 ** -11  # float16 relative precision
+
+
+def test_quantized_scene_delta_is_smaller_and_applies():
+    store = SceneStateStore(keyframe_interval=0)
+    symbols = [
+        HolographicSymbolNetModel(element_id=f"e{i}", symbol_type="cube", position=Vector3NetModel(x=i * 0.5),
+                                  rotation=QuaternionNetModel(), scale=Vector3NetModel(x=1.0, y=1.0, z=1.0))
+        for i in range(50)
+    ]
+    replica = SceneReplica("s")
+    replica.apply(store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=symbols)))
+
+    moved = [
+        HolographicSymbolNetModel(element_id=f"e{i}", symbol_type="cube", position=Vector3NetModel(x=i * 0.5 + 0.123, y=1.5, z=-2.0),
+                                  rotation=QuaternionNetModel(x=0.0, y=0.3826834, z=0.0, w=0.9238795),
+                                  scale=Vector3NetModel(x=1.5, y=1.5, z=1.5))
+        for i in range(50)
+    ]
+    delta = store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=moved))
+    compact = quantize_scene_delta(delta, store.codec_for("s"))
+    assert not compact.changes and len(compact.packed_transforms.symbol_ids) == 50
+    assert len(compact.SerializeToString()) * 2 < len(delta.SerializeToString())
+
+    assert replica.apply(compact) is None
+    element = replica.elements["e7"]
+    assert abs(element.position.x - 3.623) <= 5e-4 + FLOAT32_SLACK
+    assert abs(element.rotation.y - 0.3826834) < 2e-3
+    assert element.scale.z == 1.5
+
+
+def test_out_of_range_positions_stay_as_float_changes():
+    store = SceneStateStore(keyframe_interval=0)
+    store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[
+        HolographicSymbolNetModel(element_id=name, symbol_type="cube") for name in ("near", "far")
+    ]))
+    delta = store.apply_update(SceneUpdatePayload(scene_id="s", upsert_elements=[
+        HolographicSymbolNetModel(element_id="near", symbol_type="cube", position=Vector3NetModel(x=1.0)),
+        HolographicSymbolNetModel(element_id="far", symbol_type="cube", position=Vector3NetModel(x=100.0)),
+    ]))
+    compact = quantize_scene_delta(delta, store.codec_for("s"))
+    assert list(compact.packed_transforms.symbol_ids) == ["near"]
+    assert [change.symbol_id for change in compact.changes] == ["far"]
@@ -1,4 +1,19 @@
 #!/bin/bash
-# Script to compile Protobuf files
-# Intentionally empty, will be populated later.
-echo "Protobuf compilation script - TBD"
+# Compiles the NetHoloGlyph Protobuf definitions into Python modules.
+# Output: nethologlyph/generated_pb2/definitions_pb2.py (imported by NetHoloGlyphService and protobuf_mapper).
+# Requires protoc >= 3.20 (generated code must be compatible with protobuf>=4.25 from backend/requirements.txt).
+set -euo pipefail
+
+REPO_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+PROTO_DIR="$REPO_ROOT/nethologlyph/protocol"
+PY_OUT="$REPO_ROOT/nethologlyph/generated_pb2"
+
+PROTOC="${PROTOC:-protoc}"
+if ! command -v "$PROTOC" >/dev/null 2>&1; then
+    # Fall back to grpcio-tools, which bundles protoc.
+    PROTOC="python -m grpc_tools.protoc"
+fi
+
+mkdir -p "$PY_OUT"
+$PROTOC -I="$PROTO_DIR" --python_out="$PY_OUT" "$PROTO_DIR/definitions.proto"
+echo "Generated $PY_OUT/definitions_pb2.py"